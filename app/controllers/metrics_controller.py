@@ -0,0 +1,30 @@
+# External Library imports
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+# Internal library imports
+from app.core.metrics import metrics_registry
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router: APIRouter = APIRouter()
+
+@router.get(
+    path="/metrics",
+    response_class=PlainTextResponse,
+    response_description=
+    """
+    Successfully retrieved the metrics.
+    Returns: The metrics in the Prometheus text exposition format.
+    """,
+    summary="Retrieve the API metrics.",
+    description=
+    """
+    Retrieves the request counts, error counts and latency histograms
+    per route, split by backend prefix and status class,
+    in the Prometheus text exposition format.
+    """
+)
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(content=metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,73 @@
+# External Library imports
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Path, Query
+
+# Internal library imports
+from db import Database, get_mongodb
+from app.services import analytics_service as service
+from app.controllers.error_handler import error_handler
+from app.core.security import get_current_sales_person_token
+from app.resources.analytics_resource import SalesDimension, SalesSource
+from app.repositories.analytics_repositories import (
+    MongoDBAnalyticsRepository,
+    SalesReturnResource
+)
+
+
+router: APIRouter = APIRouter()
+
+def get_db():  # pragma: no cover
+    with get_mongodb() as database:
+        yield database
+
+
+@router.get(
+    path="/analytics/sales/{dimension}",
+    response_model=List[SalesReturnResource],
+    response_description=
+    """
+    Successfully retrieved the sales.
+    Returns: List[SalesReturnResource].
+    """,
+    summary="Retrieve Sales grouped by a dimension - Requires authorization token in header.",
+    description=
+    """
+    Retrieves the units sold and the revenue per brand, model, color, sales person or month 
+    from the MongoDB database, aggregated with a pipeline in the database, 
+    for the purchases between the optional start and end date, both included, 
+    sorted by revenue and returns a list of 'SalesReturnResource'.
+    """,
+    dependencies=[Depends(get_current_sales_person_token)]
+)
+def get_sales(
+        dimension: SalesDimension = Path(
+            default=...,
+            description="""What the sales are grouped by: brand, model, color, sales_person or month."""
+        ),
+        start_date: Optional[date] = Query(
+            default=None,
+            description="""The first date of purchase to include in the sales."""
+        ),
+        end_date: Optional[date] = Query(
+            default=None,
+            description="""The last date of purchase to include in the sales."""
+        ),
+        source: SalesSource = Query(
+            default="rollup",
+            description="""Whether the sales are read from the daily rollup of the sales ever recorded, 
+            which is updated on every purchase and keeps the sales of deleted or archived purchases, 
+            or aggregated from the current purchases."""
+        ),
+        database: Database = Depends(get_db)
+):  # pragma: no cover
+    return error_handler(
+        error_message="Failed to get sales from the MongoDB database",
+        callback=lambda: service.get_sales(
+            repository=MongoDBAnalyticsRepository(database),
+            dimension=dimension,
+            start_date=start_date,
+            end_date=end_date,
+            source=source
+        )
+    )
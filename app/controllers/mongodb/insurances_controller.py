@@ -34,7 +34,7 @@ def get_db():  # pragma: no cover
     MongoDB database and returns a list of 'InsuranceReturnResource'.
     """
 )
-async def get_insurances(
+def get_insurances(
         limit: Optional[int] = Query(
             default=None, ge=1,
             description="""Set a limit for the amount of insurances that is returned."""
@@ -65,7 +65,7 @@ async def get_insurances(
     and returns it as an 'InsuranceReturnResource'.
     """
 )
-async def get_insurance(
+def get_insurance(
         insurance_id: UUID = Path(
             default=...,
             description="""The UUID of the insurance to retrieve."""
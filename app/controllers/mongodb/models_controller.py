@@ -35,7 +35,7 @@ def get_db():  # pragma: no cover
     and returns a list of 'ModelReturnResource'.
     """
 )
-async def get_models(
+def get_models(
         brand_id: Optional[UUID] = Query(
             default=None,
             description="""The UUID of the brand, to retrieve models belonging to that brand."""
@@ -73,7 +73,7 @@ async def get_models(
     and returns it as a 'ModelReturnResource'.
     """
 )
-async def get_model(
+def get_model(
         model_id: UUID = Path(
             default=...,
             description="""The UUID of the model to retrieve."""
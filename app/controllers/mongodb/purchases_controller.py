@@ -39,7 +39,7 @@ def get_db():  # pragma: no cover
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_purchases(
+def get_purchases(
         limit: Optional[int] = Query(
             default=None, ge=1,
             description="""Set a limit for the amount of purchases that is returned."""
@@ -72,7 +72,7 @@ async def get_purchases(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_purchase(
+def get_purchase(
         purchase_id: UUID = Path(
             default=...,
             description="""The UUID of the purchase to retrieve."""
@@ -105,7 +105,7 @@ async def get_purchase(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_purchase_by_car_id(
+def get_purchase_by_car_id(
         cars_id: UUID = Path(
             default=...,
             description="""The UUID of the purchase's car to retrieve."""
@@ -139,7 +139,7 @@ async def get_purchase_by_car_id(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def create_purchase(
+def create_purchase(
         purchase_create_data: PurchaseCreateResource,
         database: Database = Depends(get_db)
 ):  # pragma: no cover
@@ -44,7 +44,7 @@ def get_db():  # pragma: no cover
     sales person and returns a 'Token'.
     """
 )
-async def login_for_access_token(
+def login_for_access_token(
         username: str = Form(
             default=...,
             description="""The email of the sales person."""
@@ -87,7 +87,7 @@ async def login_for_access_token(
     of that sales person and returns a 'Token'.
     """
 )
-async def login(
+def login(
         sales_person_login_data: SalesPersonLoginResource,
         database: Database = Depends(get_db)
 ):  # pragma: no cover
@@ -116,7 +116,7 @@ async def login(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_sales_people(
+def get_sales_people(
         limit: Optional[int] = Query(
             default=None, ge=1,
             description="""Set a limit for the amount of sales people that is returned."""
@@ -149,7 +149,7 @@ async def get_sales_people(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_sales_person(
+def get_sales_person(
         sales_person_id: UUID = Path(
             default=...,
             description="""The UUID of the sales person to retrieve."""
@@ -182,7 +182,7 @@ async def get_sales_person(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def create_sales_person(
+def create_sales_person(
         sales_person_create_data: SalesPersonCreateResource,
         database: Database = Depends(get_db)
 ):  # pragma: no cover
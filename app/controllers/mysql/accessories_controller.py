@@ -35,7 +35,7 @@ def get_db():  # pragma: no cover
     MySQL database and returns a list of 'AccessoryReturnResource'.
     """
 )
-async def get_accessories(
+def get_accessories(
         limit: Optional[int] = Query(
             default=None, ge=1,
             description="""Set a limit for the amount of accessories that is returned."""
@@ -67,7 +67,7 @@ async def get_accessories(
     returns it as an 'AccessoryReturnResource'.
     """
 )
-async def get_accessory(
+def get_accessory(
         accessory_id: UUID = Path(
             default=...,
             description="""The UUID of the accessory to retrieve."""
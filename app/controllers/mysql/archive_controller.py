@@ -0,0 +1,119 @@
+# External Library imports
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+
+# Internal library imports
+from db import Session, get_db as get_db_session
+from app.services import archive_service as service
+from app.controllers.error_handler import error_handler
+from app.core.security import get_current_sales_person_token
+from app.repositories.archive_repositories import (
+    MySQLArchiveRepository,
+    ArchivedPurchaseReturnResource,
+    ArchivedCarReturnResource
+)
+
+
+router: APIRouter = APIRouter()
+
+def get_db():  # pragma: no cover
+    with get_db_session() as session:
+        yield session
+
+
+@router.get(
+    path="/archive/purchases",
+    response_model=List[ArchivedPurchaseReturnResource],
+    response_description=
+    """
+    Successfully retrieved a list of archived purchases.
+    Returns: List[ArchivedPurchaseReturnResource].
+    """,
+    summary="Retrieve Archived Purchases - Requires authorization token in header.",
+    description=
+    """
+    Retrieves the purchases moved to the archive, together with a snapshot of their cars, 
+    from the MySQL database, optionally only of one month and/or one customer, 
+    newest first, and returns a list of 'ArchivedPurchaseReturnResource'. 
+    A month only reads its own partition of the archived_purchases table.
+    """,
+    dependencies=[Depends(get_current_sales_person_token)]
+)
+def get_archived_purchases(
+        month: Optional[str] = Query(
+            default=None,
+            description="""The month of the date of purchase as YYYY-MM."""
+        ),
+        customer_id: Optional[str] = Query(
+            default=None,
+            description="""The UUID of the customer of the archived purchases."""
+        ),
+        limit: Optional[int] = Query(
+            default=None, ge=0,
+            description="""Set a limit for the amount of archived purchases that is returned."""
+        ),
+        offset: int = Query(
+            default=0, ge=0,
+            description="""The amount of archived purchases to skip."""
+        ),
+        session: Session = Depends(get_db)
+):  # pragma: no cover
+    return error_handler(
+        error_message="Failed to get archived purchases from the MySQL database",
+        callback=lambda: service.get_archived_purchases(
+            repository=MySQLArchiveRepository(session),
+            month=month,
+            customer_id=customer_id,
+            limit=limit,
+            offset=offset
+        )
+    )
+
+
+@router.get(
+    path="/archive/cars",
+    response_model=List[ArchivedCarReturnResource],
+    response_description=
+    """
+    Successfully retrieved a list of archived cars.
+    Returns: List[ArchivedCarReturnResource].
+    """,
+    summary="Retrieve Archived Cars - Requires authorization token in header.",
+    description=
+    """
+    Retrieves the cars whose purchase deadline passed without a purchase 
+    and that were moved to the archive by the car expiry worker, from the MySQL database, 
+    optionally only of one month and/or one customer, newest first, 
+    and returns a list of 'ArchivedCarReturnResource'.
+    """,
+    dependencies=[Depends(get_current_sales_person_token)]
+)
+def get_archived_cars(
+        month: Optional[str] = Query(
+            default=None,
+            description="""The month of the purchase deadline as YYYY-MM."""
+        ),
+        customer_id: Optional[str] = Query(
+            default=None,
+            description="""The UUID of the customer of the archived cars."""
+        ),
+        limit: Optional[int] = Query(
+            default=None, ge=0,
+            description="""Set a limit for the amount of archived cars that is returned."""
+        ),
+        offset: int = Query(
+            default=0, ge=0,
+            description="""The amount of archived cars to skip."""
+        ),
+        session: Session = Depends(get_db)
+):  # pragma: no cover
+    return error_handler(
+        error_message="Failed to get archived cars from the MySQL database",
+        callback=lambda: service.get_archived_cars(
+            repository=MySQLArchiveRepository(session),
+            month=month,
+            customer_id=customer_id,
+            limit=limit,
+            offset=offset
+        )
+    )
@@ -35,7 +35,7 @@ def get_db():  # pragma: no cover
     database and returns a list of 'BrandReturnResource'.
     """
 )
-async def get_brands(
+def get_brands(
         limit: Optional[int] = Query(
             default=None, ge=1,
             description="""Set a limit for the amount of brands that is returned."""
@@ -66,7 +66,7 @@ async def get_brands(
     in the path for the brand and returns it as a 'BrandReturnResource'.
     """
 )
-async def get_brand(
+def get_brand(
         brand_id: UUID = Path(
             default=...,
             description="""The UUID of the brand to retrieve."""
@@ -47,7 +47,7 @@ def get_db():  # pragma: no cover
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_cars(
+def get_cars(
         customer_id: Optional[UUID] = Query(
             default=None,
             description=
@@ -121,7 +121,7 @@ async def get_cars(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_car(
+def get_car(
         car_id: UUID = Path(
             default=...,
             description="""The UUID of the car to retrieve."""
@@ -154,7 +154,7 @@ async def get_car(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def create_car(
+def create_car(
         car_data: CarCreateResource,
         session: Session = Depends(get_db)
 ):  # pragma: no cover
@@ -190,7 +190,7 @@ async def create_car(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def delete_car(
+def delete_car(
         car_id: UUID = Path(
             default=...,
             description="""The UUID of the car to delete."""
@@ -38,16 +38,25 @@ def get_db():  # pragma: no cover
     summary="Retrieve sales person with cars - Requires authorization token in header.",
     description=
     """
-    Retrieves a Sales Person with cars from the MySQL database by giving a UUID in the 
-    path for the sales person and returns it as a 'SalesPersonWithCarsReturnResource'.
+    Retrieves a Sales Person with a page of their cars, ordered by car ID, and the summary of all their cars 
+    from the MySQL database by giving a UUID in the path for the sales person 
+    and returns it as a 'SalesPersonWithCarsReturnResource'.
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_sales_person_with_car_purchases(
+def get_sales_person_with_car_purchases(
         sales_person_id: UUID = Path(
             default=...,
             description="""The UUID of the sales person to retrieve with cars."""
         ),
+        cars_limit: Optional[int] = Query(
+            default=None, ge=0,
+            description="""Set a limit for the amount of cars that is returned, 0 returns only the summary."""
+        ),
+        cars_offset: int = Query(
+            default=0, ge=0,
+            description="""The amount of cars to skip before the returned cars."""
+        ),
         session: Session = Depends(get_db)
 ):  # pragma: no cover
     return error_handler(
@@ -56,7 +65,9 @@ async def get_sales_person_with_car_purchases(
         lambda: service.get_sales_person_with_cars(
             car_purchase_repository=MySQLCarPurchaseRepository(session),
             sales_person_repository=MySQLSalesPersonRepository(session),
-            sales_person_id=str(sales_person_id)
+            sales_person_id=str(sales_person_id),
+            cars_limit=cars_limit,
+            cars_offset=cars_offset
         )
     )
 
@@ -72,16 +83,25 @@ async def get_sales_person_with_car_purchases(
     summary="Retrieve customer with cars - Requires authorization token in header.",
     description=
     """
-    Retrieves a Customer with cars from the MySQL database by giving a UUID in the 
-    path for the customer and returns it as a 'CustomerWithCarsReturnResource'.
+    Retrieves a Customer with a page of their cars, ordered by car ID, and the summary of all their cars 
+    from the MySQL database by giving a UUID in the path for the customer 
+    and returns it as a 'CustomerWithCarsReturnResource'.
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_customer_with_car_purchases(
+def get_customer_with_car_purchases(
         customer_id: UUID = Path(
             default=...,
             description="""The UUID of the customer to retrieve with cars."""
         ),
+        cars_limit: Optional[int] = Query(
+            default=None, ge=0,
+            description="""Set a limit for the amount of cars that is returned, 0 returns only the summary."""
+        ),
+        cars_offset: int = Query(
+            default=0, ge=0,
+            description="""The amount of cars to skip before the returned cars."""
+        ),
         session: Session = Depends(get_db)
 ):  # pragma: no cover
     return error_handler(
@@ -90,7 +110,9 @@ async def get_customer_with_car_purchases(
         lambda: service.get_customer_with_cars(
             car_purchase_repository=MySQLCarPurchaseRepository(session),
             customer_repository=MySQLCustomerRepository(session),
-            customer_id=str(customer_id)
+            customer_id=str(customer_id),
+            cars_limit=cars_limit,
+            cars_offset=cars_offset
         )
     )
 
@@ -110,7 +132,7 @@ async def get_customer_with_car_purchases(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_cars_with_purchase(
+def get_cars_with_purchase(
         limit: Optional[int] = Query(
             default=None, ge=1,
             description="""Set a limit for the amount of cars with purchase that is returned."""
@@ -143,7 +165,7 @@ async def get_cars_with_purchase(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_sales_person(
+def get_sales_person(
         car_id: UUID = Path(
             default=...,
             description="""The UUID of the car to retrieve."""
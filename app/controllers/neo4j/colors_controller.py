@@ -34,7 +34,7 @@ def get_db():  # pragma: no cover
     database and returns a list of 'ColorReturnResource'.
     """
 )
-async def get_colors(
+def get_colors(
         limit: Optional[int] = Query(
             default=None, ge=1,
             description="""Set a limit for the amount of colors that is returned."""
@@ -65,7 +65,7 @@ async def get_colors(
     database and returns it as a 'ColorReturnResource'.
     """
 )
-async def get_color(
+def get_color(
         color_id: UUID = Path(
             default=...,
             description="""The UUID of the color to retrieve."""
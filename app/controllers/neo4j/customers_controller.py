@@ -15,6 +15,7 @@ from app.repositories.customer_repositories import (
     CustomerCreateResource,
     CustomerUpdateResource
 )
+from app.resources.customer_resource import EmailSearchMode
 
 router: APIRouter = APIRouter()
 
@@ -40,7 +41,7 @@ def get_db():  # pragma: no cover
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_customers(
+def get_customers(
         email_filter: Optional[str] = Query(
             default=None, min_length=1,
             description="""Filter customers by their email."""
@@ -49,6 +50,12 @@ async def get_customers(
             default=None, ge=1,
             description="""Set a limit for the amount of customers that is returned."""
         ),
+        email_search_mode: EmailSearchMode = Query(
+            default="contains",
+            description="""How the email filter is matched: 'contains' anywhere in the email, 
+            'prefix' at the start of the email ordered by email, or 'fulltext' anywhere in the email 
+            using the email index, ranked by how early in the email it matches."""
+        ),
         session: Neo4jSession = Depends(get_db)
 ):  # pragma: no cover
     return error_handler(
@@ -56,7 +63,8 @@ async def get_customers(
         callback=lambda: service.get_all(
             repository=Neo4jCustomerRepository(session),
             filter_customer_by_email=email_filter,
-            customers_limit=limit
+            customers_limit=limit,
+            email_search_mode=email_search_mode
         )
     )
 
@@ -77,7 +85,7 @@ async def get_customers(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def get_customer(
+def get_customer(
         customer_id: UUID = Path(
             default=...,
             description="""The UUID of the customer to retrieve."""
@@ -110,7 +118,7 @@ async def get_customer(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def create_customer(
+def create_customer(
         customer_create_data: CustomerCreateResource,
         session: Neo4jSession = Depends(get_db)
 ):  # pragma: no cover
@@ -141,7 +149,7 @@ async def create_customer(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def update_customer(
+def update_customer(
         customer_id: UUID = Path(
             default=...,
             description="""The UUID of the customer to update."""
@@ -179,7 +187,7 @@ async def update_customer(
     """,
     dependencies=[Depends(get_current_sales_person_token)]
 )
-async def delete_customer(
+def delete_customer(
         customer_id: UUID = Path(
             default=...,
             description="""The UUID of the customer to delete."""
@@ -0,0 +1,169 @@
+# External Library imports
+import json
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Internal library imports
+from app.core.config import ADMISSION_LIMITS, ADMISSION_QUEUE_TIMEOUT_SECONDS, ADMISSION_RETRY_AFTER_SECONDS
+from app.core.metrics import MetricsRegistry, metrics_registry
+
+
+def parse_admission_limits(value: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parses the path prefix=concurrency:queue pairs of ADMISSION_LIMITS, e.g. /neo4j=8:16,/mysql/analytics=2:4.
+    """
+    limits: Dict[str, Tuple[int, int]] = {}
+    for pair in value.split(","):
+        if not pair.strip():
+            continue
+        try:
+            prefix, limit = pair.split("=")
+            concurrency, queue = (int(amount) for amount in limit.split(":"))
+        except ValueError:
+            raise ValueError(f"Invalid admission limit '{pair.strip()}', expected prefix=concurrency:queue, "
+                             f"e.g. /neo4j=8:16")
+        if not prefix.strip().startswith("/") or concurrency < 1 or queue < 0:
+            raise ValueError(f"Invalid admission limit '{pair.strip()}', the prefix must start with / "
+                             f"and the concurrency must be at least 1 and the queue at least 0")
+        limits[prefix.strip().rstrip("/") or "/"] = (concurrency, queue)
+    return limits
+
+
+class AdmissionQueue:
+    """
+    The requests of a route group waiting for one of its slots, at most size of them, each for at most timeout_seconds.
+    """
+
+    def __init__(self, size: int, timeout_seconds: float):
+        self.size = size
+        self.timeout_seconds = timeout_seconds
+        self.waiting = 0
+
+    def is_full(self) -> bool:
+        return self.waiting >= self.size
+
+
+class AdmissionLimit:
+    """
+    The requests of a route group served at once, and the requests waiting in turn for one of them to finish.
+    A request is shed when the queue is full, or when it waited longer than the queue timeout.
+    """
+
+    def __init__(
+            self,
+            group: str,
+            concurrency: int,
+            queue: int,
+            queue_timeout_seconds: float = ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            registry: MetricsRegistry = metrics_registry
+    ):
+        self.group = group
+        self.concurrency = concurrency
+        self.queue = AdmissionQueue(queue, queue_timeout_seconds)
+        self.registry = registry
+        self.in_flight = 0
+        # The semaphore is created in the event loop of the first request, the loop uvicorn serves the requests in
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _record_depths(self):
+        labels = {"group": self.group}
+        self.registry.set_gauge(
+            "kea_admission_in_flight_requests", self.in_flight, labels,
+            "Requests being served per route group."
+        )
+        self.registry.set_gauge(
+            "kea_admission_queued_requests", self.queue.waiting, labels,
+            "Requests waiting for a route group to serve them."
+        )
+
+    def _shed(self, reason: str) -> bool:
+        self.registry.inc_counter(
+            "kea_admission_shed_requests_total", 1, {"group": self.group, "reason": reason},
+            "Requests answered with 503 since their route group was over capacity."
+        )
+        return False
+
+    async def acquire(self) -> bool:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        if self._semaphore.locked():
+            if self.queue.is_full():
+                return self._shed("queue_full")
+            self.queue.waiting += 1
+            self._record_depths()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue.timeout_seconds)
+            except asyncio.TimeoutError:
+                return self._shed("queue_timeout")
+            finally:
+                self.queue.waiting -= 1
+                self._record_depths()
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        self._record_depths()
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+        self._record_depths()
+
+
+class AdmissionControlMiddleware:
+    """
+    Limits the requests served at once per route group, the longest path prefix of the limits a request matches,
+    so a slow backend only fills its own slots and queue instead of every worker thread.
+    Requests over capacity are answered with 503 and a Retry-After header right away, without reaching the routes.
+    Implemented as a plain ASGI middleware so it does not wrap or buffer the response body.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            limits: Optional[Dict[str, Tuple[int, int]]] = None,
+            queue_timeout_seconds: float = ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            retry_after_seconds: int = ADMISSION_RETRY_AFTER_SECONDS,
+            registry: MetricsRegistry = metrics_registry
+    ):
+        self.app = app
+        self.retry_after_seconds = retry_after_seconds
+        if limits is None:
+            limits = parse_admission_limits(ADMISSION_LIMITS)
+        self.limits: List[AdmissionLimit] = [
+            AdmissionLimit(prefix, concurrency, queue, queue_timeout_seconds, registry)
+            for prefix, (concurrency, queue) in sorted(limits.items(), key=lambda item: len(item[0]), reverse=True)
+        ]
+
+    def get_limit(self, path: str) -> Optional[AdmissionLimit]:
+        for limit in self.limits:
+            if limit.group == "/" or path == limit.group or path.startswith(limit.group + "/"):
+                return limit
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limit = self.get_limit(scope.get("path", "")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limit.acquire():
+            body = json.dumps({
+                "detail": f"The {limit.group} routes are over capacity, retry after {self.retry_after_seconds} seconds"
+            }).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.retry_after_seconds).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
@@ -0,0 +1,179 @@
+# External Library imports
+import re
+import time
+import hashlib
+from threading import Lock
+from collections import OrderedDict
+from typing import List, Optional, Pattern, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Internal library imports
+from app.core.config import CATALOG_CACHE_MAX_AGE_SECONDS
+from app.core.metrics import BACKEND_PREFIXES
+
+
+class CachePolicy:
+    """
+    The Cache-Control header of a route and whether the ETag of its last response may be reused
+    to answer If-None-Match without calling the endpoint, for up to max_age seconds.
+    That is only safe for public data that the API itself never changes, like the catalog.
+    """
+
+    def __init__(self, cache_control: str, max_age: float = 0, reuse_etag: bool = False):
+        self.cache_control = cache_control
+        self.max_age = max_age
+        self.reuse_etag = reuse_etag
+
+
+BACKEND_PATH = f"/(?:{'|'.join(BACKEND_PREFIXES)})"
+
+CATALOG_CACHE_POLICY = CachePolicy(
+    cache_control=f"public, max-age={CATALOG_CACHE_MAX_AGE_SECONDS}",
+    max_age=CATALOG_CACHE_MAX_AGE_SECONDS,
+    reuse_etag=True
+)
+
+# The cars change through purchases and customer updates, so they are always revalidated against the database.
+CACHE_POLICIES: List[Tuple[Pattern, CachePolicy]] = [
+    (re.compile(rf"^{BACKEND_PATH}/(?:brands|colors|models|accessories|insurances)$"), CATALOG_CACHE_POLICY),
+    (re.compile(rf"^{BACKEND_PATH}/(?:brand|color|model|accessory|insurance)/[^/]+$"), CATALOG_CACHE_POLICY),
+    (re.compile(rf"^{BACKEND_PATH}/car/[^/]+$"), CachePolicy(cache_control="private, no-cache")),
+]
+
+
+def get_cache_policy(
+        path: str,
+        policies: Optional[List[Tuple[Pattern, CachePolicy]]] = None
+) -> Optional[CachePolicy]:
+    for pattern, policy in CACHE_POLICIES if policies is None else policies:
+        if pattern.match(path):
+            return policy
+    return None
+
+
+def compute_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+class ETagCache:
+    """
+    The ETags of the latest responses per path and query string, which expire after the max age of their route.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            etag, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return etag
+
+    def set(self, key: str, etag: str, max_age: float):
+        with self._lock:
+            self._entries[key] = (etag, time.monotonic() + max_age)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+etag_cache = ETagCache()
+
+
+class ConditionalGetMiddleware:
+    """
+    Adds a strong ETag, computed from the response body, and the Cache-Control header of the route
+    to successful GET responses, and answers a matching If-None-Match with 304 Not Modified.
+    For routes that reuse their ETag, a matching If-None-Match is answered from the ETag cache
+    without calling the endpoint, so the database is not touched.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            policies: Optional[List[Tuple[Pattern, CachePolicy]]] = None,
+            cache: ETagCache = etag_cache
+    ):
+        self.app = app
+        self.policies = CACHE_POLICIES if policies is None else policies
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        policy = get_cache_policy(scope["path"], self.policies)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        cache_key = f"{scope['path']}?{scope.get('query_string', b'').decode('latin-1')}"
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if policy.reuse_etag and if_none_match is not None:
+            cached_etag = self.cache.get(cache_key)
+            if cached_etag is not None and etag_matches(if_none_match, cached_etag):
+                await self.send_not_modified(send, [], cached_etag, policy)
+                return
+
+        response_start: Optional[Message] = None
+        body_parts: List[bytes] = []
+
+        async def buffering_send(message: Message):
+            nonlocal response_start
+            if message["type"] == "http.response.start":
+                response_start = message
+                if message["status"] != 200:
+                    await send(message)
+                return
+            if response_start is None or response_start["status"] != 200:
+                await send(message)
+                return
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(body_parts)
+            etag = compute_etag(body)
+            if policy.reuse_etag:
+                self.cache.set(cache_key, etag, policy.max_age)
+            if if_none_match is not None and etag_matches(if_none_match, etag):
+                await self.send_not_modified(send, response_start["headers"], etag, policy)
+                return
+            headers = MutableHeaders(raw=list(response_start["headers"]))
+            headers["etag"] = etag
+            headers["cache-control"] = policy.cache_control
+            await send({**response_start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, buffering_send)
+
+    @staticmethod
+    async def send_not_modified(send: Send, raw_headers: list, etag: str, policy: CachePolicy):
+        headers = MutableHeaders(raw=[
+            (name, value) for name, value in raw_headers if name.lower() not in (b"content-length", b"content-type")
+        ])
+        headers["etag"] = etag
+        headers["cache-control"] = policy.cache_control
+        await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
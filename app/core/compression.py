@@ -0,0 +1,201 @@
+# External Library imports
+import zlib
+from typing import Callable, Dict, List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# brotli and zstandard are optional, the encodings are only offered when they are installed
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Internal library imports
+from app.core.config import (
+    COMPRESSION_MINIMUM_SIZE,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_ZSTD_LEVEL
+)
+
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json", "application/javascript", "application/xml", "image/svg+xml", "text/"
+)
+
+
+class StreamCompressor:
+    """
+    Compresses a response body chunk by chunk, flushing after every chunk,
+    so a streaming response is sent to the client as soon as it is produced.
+    """
+
+    def compress(self, chunk: bytes) -> bytes:  # pragma: no cover
+        raise NotImplementedError
+
+    def finish(self) -> bytes:  # pragma: no cover
+        raise NotImplementedError
+
+
+class GzipCompressor(StreamCompressor):
+    def __init__(self, level: int = COMPRESSION_GZIP_LEVEL):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor(StreamCompressor):
+    def __init__(self, quality: int = COMPRESSION_BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor(StreamCompressor):
+    def __init__(self, level: int = COMPRESSION_ZSTD_LEVEL):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def compress(chunk: bytes, compressor: StreamCompressor) -> bytes:
+    return compressor.compress(chunk) + compressor.finish()
+
+
+# The supported encodings in the order the server prefers them, when the client accepts them equally
+COMPRESSORS: Dict[str, Callable[[], StreamCompressor]] = {
+    **({"zstd": ZstdCompressor} if zstandard is not None else {}),
+    **({"br": BrotliCompressor} if brotli is not None else {}),
+    "gzip": GzipCompressor,
+}
+
+
+def parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    encodings: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        encoding, *parameters = [value.strip() for value in part.split(";")]
+        if not encoding:
+            continue
+        quality = 1.0
+        for parameter in parameters:
+            if parameter.startswith("q="):
+                try:
+                    quality = float(parameter[2:])
+                except ValueError:
+                    quality = 0.0
+        encodings[encoding.lower()] = quality
+    return encodings
+
+
+def select_encoding(accept_encoding: str, supported_encodings: List[str]) -> Optional[str]:
+    """
+    Returns the supported encoding with the highest quality in the Accept-Encoding header,
+    preferring the earlier supported encodings on ties, or None if the client accepts none of them.
+    """
+    accepted_encodings = parse_accept_encoding(accept_encoding)
+    best_encoding: Optional[str] = None
+    best_quality = 0.0
+    for encoding in supported_encodings:
+        quality = accepted_encodings.get(encoding, accepted_encodings.get("*", 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+
+def is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Compresses the responses with the best encoding the client accepts among zstd, br and gzip.
+    Complete responses smaller than the minimum size are sent as they are,
+    and streaming responses are compressed chunk by chunk.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+            compressors: Dict[str, Callable[[], StreamCompressor]] = COMPRESSORS
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressors = compressors
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = select_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), list(self.compressors)
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        response_start: Optional[Message] = None
+        compressor: Optional[StreamCompressor] = None
+        is_passthrough = False
+
+        async def compressing_send(message: Message):
+            nonlocal response_start, compressor, is_passthrough
+            if message["type"] == "http.response.start":
+                response_start = message
+                is_passthrough = not is_compressible(Headers(raw=message["headers"]))
+                if is_passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or is_passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    is_passthrough = True
+                    await send(response_start)
+                    await send(message)
+                    return
+                compressor = self.compressors[encoding]()
+                headers = MutableHeaders(raw=list(response_start["headers"]))
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                # The body is no longer byte for byte the one the strong ETag was computed from
+                if headers.get("etag", "").startswith('"'):
+                    headers["etag"] = f"W/{headers['etag']}"
+                if more_body:
+                    del headers["content-length"]
+                    await send({**response_start, "headers": headers.raw})
+                else:
+                    compressed_body = compress(body, compressor)
+                    headers["content-length"] = str(len(compressed_body))
+                    await send({**response_start, "headers": headers.raw})
+                    await send({"type": "http.response.body", "body": compressed_body, "more_body": False})
+                    return
+
+            if more_body:
+                compressed_chunk = compressor.compress(body)
+            else:
+                compressed_chunk = compressor.compress(body) + compressor.finish()
+            await send({"type": "http.response.body", "body": compressed_chunk, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
@@ -0,0 +1,135 @@
+# External Library imports
+from functools import wraps
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Internal library imports
+from app.core.metrics import MetricsRegistry, metrics_registry
+from app.core.tracing import current_trace
+
+
+class IdentityCache:
+    """
+    The entities loaded while handling a single request, keyed by entity name and id,
+    so every entity is fetched at most once per request, no matter how many services and repositories ask for it.
+    Entities that were not found are cached as None too.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Any] = {}
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def load(self, entity_name: str, key: str, loader: Callable[[], Any]) -> Any:
+        cache_key = (entity_name, key)
+        if cache_key in self._entries:
+            self.hits[entity_name] += 1
+            return self._entries[cache_key]
+        self.misses[entity_name] += 1
+        value = self._entries[cache_key] = loader()
+        return value
+
+    def store(self, entity_name: str, key: str, value: Any):
+        self._entries[(entity_name, key)] = value
+
+    def evict(self, entity_name: str, key: Optional[str] = None):
+        """
+        Evicts a single entity, or every entity with the name when no key is given.
+        """
+        if key is not None:
+            self._entries.pop((entity_name, key), None)
+            return
+        for cache_key in [cache_key for cache_key in self._entries if cache_key[0] == entity_name]:
+            del self._entries[cache_key]
+
+    def as_dict(self) -> Dict[str, Dict[str, int]]:
+        return {
+            entity_name: {"hits": self.hits[entity_name], "misses": self.misses[entity_name]}
+            for entity_name in sorted(set(self.hits) | set(self.misses))
+        }
+
+
+current_identity_cache: ContextVar[Optional[IdentityCache]] = ContextVar("current_identity_cache", default=None)
+
+
+@contextmanager
+def identity_cache_scope() -> Iterator[IdentityCache]:
+    identity_cache = IdentityCache()
+    token = current_identity_cache.set(identity_cache)
+    try:
+        yield identity_cache
+    finally:
+        current_identity_cache.reset(token)
+
+
+def load(entity_name: str, key: str, loader: Callable[[], Any]) -> Any:
+    """
+    Returns the entity from the identity cache of the current request, loading it on the first lookup.
+    Outside a request, like in the workers and the tests of the repositories, the entity is always loaded.
+    """
+    identity_cache = current_identity_cache.get()
+    if identity_cache is None:
+        return loader()
+    return identity_cache.load(entity_name, key, loader)
+
+
+def store(entity_name: str, key: str, value: Any):
+    identity_cache = current_identity_cache.get()
+    if identity_cache is not None:
+        identity_cache.store(entity_name, key, value)
+
+
+def evict(entity_name: str, key: Optional[str] = None):
+    identity_cache = current_identity_cache.get()
+    if identity_cache is not None:
+        identity_cache.evict(entity_name, key)
+
+
+def cached_per_request(entity_name: str, get_key: Callable[[Any], str] = str):
+    """
+    Caches a repository method taking a single argument in the identity cache of the current request,
+    keyed by get_key of the argument.
+    """
+    def decorator(method: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+        @wraps(method)
+        def wrapper(self, argument):
+            return load(entity_name, get_key(argument), lambda: method(self, argument))
+        return wrapper
+    return decorator
+
+
+class IdentityCacheMiddleware:
+    """
+    Gives every request its own identity cache and reports the cache hits and misses per entity
+    in the request trace and the kea_identity_cache_lookups_total metric.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics_registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with identity_cache_scope() as identity_cache:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.report(identity_cache)
+
+    def report(self, identity_cache: IdentityCache):
+        trace = current_trace.get()
+        if trace is not None:
+            trace.identity_cache = identity_cache.as_dict()
+        for result, counter in (("hit", identity_cache.hits), ("miss", identity_cache.misses)):
+            for entity_name, amount in counter.items():
+                self.registry.inc_counter(
+                    "kea_identity_cache_lookups_total", amount,
+                    labels={"entity": entity_name, "result": result},
+                    help_text="Entity lookups answered by the identity cache of the request (hit) or the database (miss)."
+                )
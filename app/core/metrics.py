@@ -0,0 +1,273 @@
+# External Library imports
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+BACKEND_PREFIXES = ("mysql", "mongodb", "neo4j")
+
+# Upper bounds in seconds, the last implicit bucket is +Inf
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0
+)
+LATENCY_QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts: List[int] = [0] * (len(buckets) + 1)
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile by linear interpolation inside the bucket
+        the quantile falls into, the same way Prometheus' histogram_quantile does.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            if bucket_count == 0:
+                continue
+            if cumulative + bucket_count >= rank:
+                if index == len(self.buckets):
+                    # The quantile is in the +Inf bucket, so the best estimate is the highest bound.
+                    return self.buckets[-1]
+                lower_bound = self.buckets[index - 1] if index > 0 else 0.0
+                upper_bound = self.buckets[index]
+                return lower_bound + (upper_bound - lower_bound) * ((rank - cumulative) / bucket_count)
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests: int = 0
+        self.errors: int = 0
+        self.latency: Histogram = Histogram()
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in labels) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_histogram(name: str, labels: LabelSet, histogram: Histogram) -> List[str]:
+    lines: List[str] = []
+    cumulative = 0
+    for upper_bound, bucket_count in zip(histogram.buckets + (float("inf"),), histogram.bucket_counts):
+        cumulative += bucket_count
+        bucket_labels = labels + (("le", format_value(upper_bound)),)
+        lines.append(f"{name}_bucket{format_labels(bucket_labels)} {cumulative}")
+    lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram.sum)}")
+    lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+    return lines
+
+
+def render_family(name: str, metric_type: str, series: Dict[LabelSet, float], help_text: Optional[str]) -> List[str]:
+    lines: List[str] = [f"# HELP {name} {help_text}"] if help_text is not None else []
+    lines.append(f"# TYPE {name} {metric_type}")
+    for label_set, value in series.items():
+        lines.append(f"{name}{format_labels(label_set)} {format_value(value)}")
+    return lines
+
+
+class MetricsRegistry:
+    """
+    In-process registry for the API metrics, rendered in the Prometheus text exposition format.
+    Route metrics are keyed by (backend, method, route template, status class),
+    where the route template keeps the label cardinality bounded.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._routes: Dict[Tuple[str, str, str, str], RouteStats] = {}
+        self._counters: Dict[str, Dict[LabelSet, float]] = {}
+        self._gauges: Dict[str, Dict[LabelSet, float]] = {}
+        self._help: Dict[str, str] = {}
+
+    def observe_request(
+            self,
+            backend: str,
+            method: str,
+            route: str,
+            status_code: int,
+            duration: float
+    ):
+        key = (backend, method, route, f"{status_code // 100}xx")
+        route_stats = self._routes.get(key)
+        if route_stats is None:
+            with self._lock:
+                route_stats = self._routes.setdefault(key, RouteStats())
+        route_stats.requests += 1
+        if status_code >= 500:
+            route_stats.errors += 1
+        route_stats.latency.observe(duration)
+
+    def inc_counter(
+            self,
+            name: str,
+            amount: float = 1,
+            labels: Optional[Dict[str, str]] = None,
+            help_text: str = ""
+    ):
+        label_set: LabelSet = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[label_set] = series.get(label_set, 0) + amount
+            if help_text:
+                self._help[name] = help_text
+
+    def set_gauge(
+            self,
+            name: str,
+            value: float,
+            labels: Optional[Dict[str, str]] = None,
+            help_text: str = ""
+    ):
+        label_set: LabelSet = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            self._gauges.setdefault(name, {})[label_set] = value
+            if help_text:
+                self._help[name] = help_text
+
+    def get_route_stats(
+            self,
+            backend: str,
+            method: str,
+            route: str,
+            status_class: str
+    ) -> Optional[RouteStats]:
+        return self._routes.get((backend, method, route, status_class))
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._counters.clear()
+            self._gauges.clear()
+            self._help.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            routes = list(self._routes.items())
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            help_texts = dict(self._help)
+
+        route_labels: List[Tuple[LabelSet, RouteStats]] = [
+            ((("backend", backend), ("method", method), ("route", route), ("status_class", status_class)), route_stats)
+            for (backend, method, route, status_class), route_stats in routes
+        ]
+        lines: List[str] = [
+            "# HELP kea_http_requests_total Total HTTP requests per route, backend and status class.",
+            "# TYPE kea_http_requests_total counter",
+        ]
+        for labels, route_stats in route_labels:
+            lines.append(f"kea_http_requests_total{format_labels(labels)} {route_stats.requests}")
+
+        lines.append("# HELP kea_http_request_errors_total Total HTTP requests answered with a 5xx status.")
+        lines.append("# TYPE kea_http_request_errors_total counter")
+        for labels, route_stats in route_labels:
+            lines.append(f"kea_http_request_errors_total{format_labels(labels)} {route_stats.errors}")
+
+        lines.append("# HELP kea_http_request_duration_seconds HTTP request latency in seconds.")
+        lines.append("# TYPE kea_http_request_duration_seconds histogram")
+        for labels, route_stats in route_labels:
+            lines += render_histogram("kea_http_request_duration_seconds", labels, route_stats.latency)
+
+        lines.append("# HELP kea_http_request_duration_quantile_seconds "
+                     "HTTP request latency quantiles estimated from the histogram buckets.")
+        lines.append("# TYPE kea_http_request_duration_quantile_seconds gauge")
+        for labels, route_stats in route_labels:
+            for quantile in LATENCY_QUANTILES:
+                quantile_labels = labels + (("quantile", format_value(quantile)),)
+                value = route_stats.latency.quantile(quantile)
+                lines.append(
+                    f"kea_http_request_duration_quantile_seconds{format_labels(quantile_labels)} {format_value(value)}"
+                )
+
+        for metric_type, families in (("counter", counters), ("gauge", gauges)):
+            for name, series in sorted(families.items()):
+                lines += render_family(name, metric_type, series, help_texts.get(name))
+
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+def get_backend(path: str) -> str:
+    first_segment = path.lstrip("/").split("/", 1)[0]
+    return first_segment if first_segment in BACKEND_PREFIXES else "other"
+
+
+def get_route_template(scope: Scope) -> str:
+    # FastAPI stores the matched route in the scope, using its path template
+    # instead of the raw path keeps ids out of the metric labels.
+    route = scope.get("route")
+    route_path = getattr(route, "path", None)
+    return route_path if route_path else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Records request counts, error counts and latency histograms per route.
+    Implemented as a plain ASGI middleware so it does not wrap or buffer the response body.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics_registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            self.registry.observe_request(
+                backend=get_backend(scope.get("path", "")),
+                method=scope.get("method", ""),
+                route=get_route_template(scope),
+                status_code=status_code,
+                duration=time.perf_counter() - start_time
+            )
@@ -0,0 +1,40 @@
+# External Library imports
+from typing import Any, Dict
+from pymongo import monitoring
+
+# Internal library imports
+from app.core.tracing import get_command_shape, get_reply_size, record_statement
+
+
+class MongoCommandTracer(monitoring.CommandListener):
+    """
+    Attributes the MongoDB commands to the current request trace, using the server round trip time.
+    PyMongo calls the listener on the thread that runs the command, so the trace context is preserved.
+    """
+
+    IGNORED_COMMANDS = {
+        "hello", "ismaster", "isMaster", "ping", "buildInfo", "buildinfo",
+        "saslStart", "saslContinue", "authenticate", "getnonce", "endSessions"
+    }
+
+    def __init__(self):
+        self._pending_commands: Dict[Any, str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name in self.IGNORED_COMMANDS:
+            return
+        self._pending_commands[(event.connection_id, event.request_id)] = \
+            get_command_shape(event.command_name, event.command)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        shape = self._pending_commands.pop((event.connection_id, event.request_id), None)
+        if shape is not None:
+            record_statement("mongodb", shape, event.duration_micros / 1_000_000, get_reply_size(event.reply))
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        shape = self._pending_commands.pop((event.connection_id, event.request_id), None)
+        if shape is not None:
+            record_statement("mongodb", shape, event.duration_micros / 1_000_000)
+
+
+mongo_command_tracer = MongoCommandTracer()
@@ -0,0 +1,330 @@
+# External Library imports
+import re
+import json
+import time
+import logging
+from functools import lru_cache
+from collections import Counter
+from collections.abc import Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Internal library imports
+from app.core.config import (
+    SQL_N_PLUS_ONE_THRESHOLD,
+    SQL_SLOW_STATEMENT_MS,
+    MONGODB_SLOW_COMMAND_MS,
+    NEO4J_SLOW_QUERY_MS
+)
+from app.core.metrics import get_route_template
+
+
+logger = logging.getLogger(__name__)
+
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+NUMBER_LITERAL_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+# Cypher labels like (c:Customer) must not be mistaken for :name placeholders
+PLACEHOLDER_PATTERN = re.compile(r"%\(\w+\)s|%s|(?<![\w:]):\w+|\$\w+|\?")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+SLOW_STATEMENT_THRESHOLDS_MS: Dict[str, float] = {
+    "mongodb": MONGODB_SLOW_COMMAND_MS,
+    "neo4j": NEO4J_SLOW_QUERY_MS,
+}
+
+
+@lru_cache(maxsize=1024)
+def normalize_statement(statement: str) -> str:
+    """
+    Reduces a statement to its shape, so the same query with other parameters
+    or a different number of IN values is counted as the same statement.
+    """
+    shape = STRING_LITERAL_PATTERN.sub("?", statement)
+    shape = NUMBER_LITERAL_PATTERN.sub("?", shape)
+    shape = PLACEHOLDER_PATTERN.sub("?", shape)
+    shape = PLACEHOLDER_LIST_PATTERN.sub("(?)", shape)
+    return WHITESPACE_PATTERN.sub(" ", shape).strip()
+
+
+class BackendTiming:
+    def __init__(self):
+        self.count: int = 0
+        self.duration: float = 0.0
+        self.result_size: int = 0
+        self.shapes: Counter = Counter()
+
+
+class RequestTrace:
+    """
+    Collects the statements executed against the databases while handling a single request.
+    """
+
+    def __init__(self, n_plus_one_threshold: int = SQL_N_PLUS_ONE_THRESHOLD):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.backends: Dict[str, BackendTiming] = {}
+        # The hits and misses per entity of the identity cache, reported by the IdentityCacheMiddleware
+        self.identity_cache: Dict[str, Dict[str, int]] = {}
+
+    def record(self, backend: str, statement: str, duration: float, result_size: Optional[int] = None):
+        timing = self.backends.get(backend)
+        if timing is None:
+            timing = self.backends[backend] = BackendTiming()
+        timing.count += 1
+        timing.duration += duration
+        if result_size is not None:
+            timing.result_size += result_size
+        timing.shapes[normalize_statement(statement)] += 1
+
+    def count(self, backend: Optional[str] = None) -> int:
+        if backend is None:
+            return sum(timing.count for timing in self.backends.values())
+        timing = self.backends.get(backend)
+        return timing.count if timing is not None else 0
+
+    def duration(self, backend: Optional[str] = None) -> float:
+        if backend is None:
+            return sum(timing.duration for timing in self.backends.values())
+        timing = self.backends.get(backend)
+        return timing.duration if timing is not None else 0.0
+
+    def get_repeated_statements(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the statement shapes per backend that were executed
+        at least n_plus_one_threshold times, which usually means an N+1 query.
+        """
+        repeated_statements: Dict[str, Dict[str, int]] = {}
+        for backend, timing in self.backends.items():
+            repeated = {
+                shape: count for shape, count in timing.shapes.items()
+                if count >= self.n_plus_one_threshold
+            }
+            if repeated:
+                repeated_statements[backend] = repeated
+        return repeated_statements
+
+    def server_timing(self, total_duration: Optional[float] = None) -> str:
+        metrics: List[str] = []
+        if total_duration is not None:
+            metrics.append(f"app;dur={total_duration * 1000:.2f}")
+        for backend, timing in self.backends.items():
+            metrics.append(f'{backend};dur={timing.duration * 1000:.2f};desc="{timing.count} statements"')
+        return ", ".join(metrics)
+
+    def as_dict(self) -> dict:
+        return {
+            "backends": {
+                backend: {
+                    "statements": timing.count,
+                    "duration_ms": round(timing.duration * 1000, 3),
+                    "result_size": timing.result_size
+                } for backend, timing in self.backends.items()
+            },
+            "repeated_statements": self.get_repeated_statements(),
+            "identity_cache": self.identity_cache
+        }
+
+
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+# Callables called with every finished request trace, used by the tests to assert query counts.
+trace_observers: List[Callable[[RequestTrace], None]] = []
+
+
+@contextmanager
+def trace_request(n_plus_one_threshold: int = SQL_N_PLUS_ONE_THRESHOLD) -> Iterator[RequestTrace]:
+    trace = RequestTrace(n_plus_one_threshold)
+    token = current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        current_trace.reset(token)
+
+
+def record_statement(backend: str, statement: str, duration: float, result_size: Optional[int] = None):
+    """
+    Attributes a statement, command or query to the current request trace
+    and logs it when it is slower than the threshold of its backend.
+    """
+    threshold_ms = SLOW_STATEMENT_THRESHOLDS_MS.get(backend, SQL_SLOW_STATEMENT_MS)
+    if duration * 1000 >= threshold_ms:
+        logger.warning(json.dumps({
+            "event": "slow_statement",
+            "backend": backend,
+            "statement": normalize_statement(statement),
+            "duration_ms": round(duration * 1000, 3),
+            "result_size": result_size
+        }))
+    trace = current_trace.get()
+    if trace is not None:
+        trace.record(backend, statement, duration, result_size)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, _parameters, _context, _executemany):
+    query_start_times = conn.info.get("query_start_times")
+    if not query_start_times:
+        return
+    duration = time.perf_counter() - query_start_times.pop()
+    # The row count of a SELECT is only known by drivers that buffer the result, others report -1.
+    result_size = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+    record_statement(conn.engine.dialect.name, statement, duration, result_size)
+
+
+@event.listens_for(Engine, "handle_error")
+def handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute, so its start time must be discarded here.
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_times"):
+        connection.info["query_start_times"].pop()
+
+
+def get_command_shape(command_name: str, command: Mapping) -> str:
+    """
+    Describes a MongoDB command by its name, collection and the fields it filters on,
+    so the same command with other values is counted as the same shape.
+    """
+    collection = command.get(command_name)
+    query = command.get("filter", command.get("query"))
+    for key in ("updates", "deletes"):
+        if query is None and command.get(key):
+            query = command[key][0].get("q")
+    if command_name == "aggregate":
+        stages = [next(iter(stage), "") for stage in command.get("pipeline", [])]
+        return f"aggregate {collection} [{', '.join(stages)}]"
+    fields = ", ".join(sorted(query)) if isinstance(query, Mapping) else ""
+    return f"{command_name} {collection} {{{fields}}}"
+
+
+def get_reply_size(reply: Mapping) -> Optional[int]:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, Mapping):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        return len(batch) if batch is not None else None
+    n = reply.get("n")
+    return n if isinstance(n, int) else None
+
+
+class TracedNeo4jResult:
+    """
+    A fully fetched Neo4j result, supporting the parts of the neo4j Result API the repositories use.
+    """
+
+    def __init__(self, records: list, keys: list, summary):
+        self._records = records
+        self._keys = keys
+        self._summary = summary
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def keys(self) -> list:
+        return self._keys
+
+    def single(self, strict: bool = False):
+        if strict and len(self._records) != 1:
+            raise ValueError(f"Expected a result with a single record, but found {len(self._records)}.")
+        return self._records[0] if self._records else None
+
+    def data(self, *keys) -> List[dict]:
+        return [record.data(*keys) for record in self._records]
+
+    def consume(self):
+        return self._summary
+
+
+class TracedNeo4jSession:
+    """
+    Wraps a Neo4j session, so every query run through it is attributed to the current request trace.
+    The result is fetched when the query is run, which is when the server reports its timings.
+    """
+
+    def __init__(self, session):
+        self._session = session
+
+    def run(self, query, parameters: Optional[dict] = None, **kwargs) -> TracedNeo4jResult:
+        start_time = time.perf_counter()
+        result = self._session.run(query, parameters, **kwargs)
+        keys = list(result.keys())
+        records = list(result)
+        summary = result.consume()
+        duration = time.perf_counter() - start_time
+        available_after = getattr(summary, "result_available_after", None)
+        consumed_after = getattr(summary, "result_consumed_after", None)
+        if available_after is not None and consumed_after is not None:
+            duration = (available_after + consumed_after) / 1000
+        record_statement("neo4j", getattr(query, "text", str(query)), duration, len(records))
+        return TracedNeo4jResult(records, keys, summary)
+
+    def __getattr__(self, name: str):
+        return getattr(self._session, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._session.__exit__(exc_type, exc_value, traceback)
+
+
+class TracingMiddleware:
+    """
+    Traces the statements executed per request and reports them
+    in a Server-Timing response header and a structured log line.
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = SQL_N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        with trace_request(self.n_plus_one_threshold) as trace:
+            async def send_wrapper(message: Message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", trace.server_timing(time.perf_counter() - start_time))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                log_trace(scope, status_code, time.perf_counter() - start_time, trace)
+                for observer in trace_observers:
+                    observer(trace)
+
+
+def log_trace(scope: Scope, status_code: int, duration: float, trace: RequestTrace):
+    log_entry = {
+        "event": "request_trace",
+        "method": scope.get("method"),
+        "path": scope.get("path"),
+        "route": get_route_template(scope),
+        "status_code": status_code,
+        "duration_ms": round(duration * 1000, 3),
+        **trace.as_dict()
+    }
+    if log_entry["repeated_statements"]:
+        logger.warning(json.dumps({**log_entry, "event": "n_plus_one_detected"}))
+    else:
+        logger.info(json.dumps(log_entry))
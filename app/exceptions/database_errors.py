@@ -1,8 +1,31 @@
 from datetime import date
-from typing import Union
+from typing import Any, Iterator, Union
 from uuid import UUID
+from contextlib import contextmanager
+from sqlalchemy.exc import IntegrityError
 from app.resources.car_resource import CarReturnResource, ModelReturnResource, ColorReturnResource
 
+# The errors each backend raises when an insert or update violates a unique index or constraint
+MYSQL_DUPLICATE_ENTRY_ERROR_CODE = 1062
+MONGODB_DUPLICATE_KEY_ERROR_CODE = 11000
+NEO4J_CONSTRAINT_VALIDATION_FAILED_CODE = "Neo.ClientError.Schema.ConstraintValidationFailed"
+
+class InMemoryDuplicateKeyError(Exception):
+    def __init__(self, table: str, column: str, value: Any):
+        self.message = f"Duplicate entry '{value}' for key '{table}.{column}'"
+        super().__init__(self.message)
+
+def is_duplicate_key_error(error: Exception) -> bool:
+    """
+    Whether the error is a unique index or constraint violation of any of the backends.
+    The codes are compared instead of the exception types, so pymongo and neo4j don't have to be imported.
+    """
+    if isinstance(error, InMemoryDuplicateKeyError):
+        return True
+    if isinstance(error, IntegrityError):
+        return bool(error.orig.args) and error.orig.args[0] == MYSQL_DUPLICATE_ENTRY_ERROR_CODE
+    return getattr(error, "code", None) in (MONGODB_DUPLICATE_KEY_ERROR_CODE, NEO4J_CONSTRAINT_VALIDATION_FAILED_CODE)
+
 class DatabaseError(Exception):
     pass
 
@@ -15,6 +38,19 @@ class AlreadyTakenFieldValueError(DatabaseError):
     def __str__(self):
         return f"{self.message}"
 
+@contextmanager
+def raise_already_taken_on_duplicate(entity_name: str, field: str, value: str) -> Iterator[None]:
+    """
+    Turns a unique index or constraint violation of any backend inside the block into an AlreadyTakenFieldValueError,
+    so an insert can rely on the database instead of checking the field first.
+    """
+    try:
+        yield
+    except Exception as error:
+        if is_duplicate_key_error(error):
+            raise AlreadyTakenFieldValueError(entity_name, field, value) from error
+        raise
+
 class UnableToFindIdError(DatabaseError):
     def __init__(self, entity_name: str, entity_id: Union[str, UUID]):
         entity_id= str(entity_id) if isinstance(entity_id, UUID) else entity_id
@@ -5,20 +5,20 @@ from sqlalchemy import Table, Column, String, Double, ForeignKey
 from pydantic import BaseModel, ConfigDict, Field
 
 # Internal library imports
-from db import Base
+from db import Base, UUIDString, new_uuid
 from app.resources.accessory_resource import AccessoryReturnResource
 
 
 cars_has_accessories = Table(
     'cars_has_accessories',
     Base.metadata,
-    Column('cars_id', String(36), ForeignKey('cars.id'), nullable=False, primary_key=True),
-    Column('accessories_id', String(36), ForeignKey('accessories.id'), nullable=False, primary_key=True),
+    Column('cars_id', UUIDString(), ForeignKey('cars.id'), nullable=False, primary_key=True),
+    Column('accessories_id', UUIDString(), ForeignKey('accessories.id'), nullable=False, primary_key=True),
 )
 
 class AccessoryMySQLEntity(Base):
     __tablename__ = 'accessories'
-    id: Mapped[str] = Column(String(36), primary_key=True, default=lambda: str(uuid4()), index=True, nullable=False)
+    id: Mapped[str] = Column(UUIDString(), primary_key=True, default=new_uuid, index=True, nullable=False)
     name: Mapped[str] = Column(String(60), unique=True, index=True, nullable=False)
     price: Mapped[float] = Column(Double, nullable=False)
 
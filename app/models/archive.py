@@ -0,0 +1,59 @@
+# External Library imports
+from datetime import date, datetime
+from sqlalchemy import Column, Date, DateTime, JSON
+from sqlalchemy.orm import Mapped
+
+# Internal library imports
+from db import Base, UUIDString
+from app.resources.archive_resource import ArchivedPurchaseReturnResource, ArchivedCarReturnResource
+
+
+def get_archive_month(day: date) -> date:
+    """
+    The first day of the month of the day, which the archived purchases and cars are partitioned by.
+    """
+    return day.replace(day=1)
+
+
+class ArchivedPurchaseMySQLEntity(Base):
+    """
+    A purchase moved out of the purchases table together with a snapshot of its car,
+    partitioned by the month of the date of purchase, see scripts/mysql.sql.
+    The archive has no foreign keys, so the customers, models and sales people of the snapshots can still be deleted.
+    """
+    __tablename__ = 'archived_purchases'
+    id: Mapped[str] = Column(UUIDString(), primary_key=True, nullable=False)
+    archive_month: Mapped[date] = Column(Date, primary_key=True, nullable=False)
+    cars_id: Mapped[str] = Column(UUIDString(), nullable=False)
+    customers_id: Mapped[str] = Column(UUIDString(), index=True, nullable=False)
+    date_of_purchase: Mapped[date] = Column(Date, nullable=False)
+    archived_at: Mapped[datetime] = Column(DateTime, nullable=False)
+    snapshot: Mapped[dict] = Column(JSON, nullable=False)
+
+    def as_resource(self) -> ArchivedPurchaseReturnResource:
+        return ArchivedPurchaseReturnResource(
+            **self.snapshot,
+            archive_month=self.archive_month.strftime("%Y-%m"),
+            archived_at=self.archived_at
+        )
+
+
+class ArchivedCarMySQLEntity(Base):
+    """
+    A car whose purchase deadline passed without a purchase, moved out of the cars table by the car expiry worker,
+    partitioned by the month of the purchase deadline.
+    """
+    __tablename__ = 'archived_cars'
+    id: Mapped[str] = Column(UUIDString(), primary_key=True, nullable=False)
+    archive_month: Mapped[date] = Column(Date, primary_key=True, nullable=False)
+    customers_id: Mapped[str] = Column(UUIDString(), index=True, nullable=False)
+    purchase_deadline: Mapped[date] = Column(Date, nullable=False)
+    archived_at: Mapped[datetime] = Column(DateTime, nullable=False)
+    snapshot: Mapped[dict] = Column(JSON, nullable=False)
+
+    def as_resource(self) -> ArchivedCarReturnResource:
+        return ArchivedCarReturnResource(
+            **self.snapshot,
+            archive_month=self.archive_month.strftime("%Y-%m"),
+            archived_at=self.archived_at
+        )
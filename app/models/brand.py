@@ -5,13 +5,13 @@ from sqlalchemy.orm import Mapped, relationship
 from pydantic import BaseModel, ConfigDict, Field
 
 # Internal library imports
-from db import Base
+from db import Base, UUIDString, new_uuid
 from app.resources.brand_resource import BrandReturnResource
 
 
 class BrandMySQLEntity(Base):
     __tablename__ = 'brands'
-    id: Mapped[str] = Column(String(36), primary_key=True, default=lambda: str(uuid4()), index=True, nullable=False)
+    id: Mapped[str] = Column(UUIDString(), primary_key=True, default=new_uuid, index=True, nullable=False)
     name: Mapped[str] = Column(String(60), unique=True, index=True, nullable=False)
     logo_url: Mapped[str] = Column(String(255), nullable=False)
     models = relationship('ModelMySQLEntity', back_populates='brand')
@@ -1,14 +1,13 @@
 # External Library imports
 from uuid import uuid4
-from typing import List, Union, Mapping
-from datetime import date
-from pymongo.database import Database
+from typing import List, Union, Mapping, TYPE_CHECKING
+from datetime import date, datetime
 from sqlalchemy.orm import Mapped, relationship
-from sqlalchemy import Column, String, Double, Date, ForeignKey
+from sqlalchemy import Column, Double, Date, ForeignKey
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 # Internal library imports
-from db import Base
+from db import Base, as_mongodb_datetime, as_date, UUIDString, new_uuid
 from app.resources.car_resource import CarReturnResource
 from app.models.customer import CustomerMySQLEntity, CustomerMongoEntity
 from app.models.sales_person import SalesPersonMySQLEntity, SalesPersonMongoEntity
@@ -22,14 +21,17 @@ from app.models.model import (
 from app.models.insurance import InsuranceMySQLEntity, InsuranceMongoEntity, cars_has_insurances
 from app.models.accessory import AccessoryMySQLEntity, AccessoryMongoEntity, cars_has_accessories
 
+if TYPE_CHECKING:
+    from pymongo.database import Database
+
 
 class CarMySQLEntity(Base):
     __tablename__ = 'cars'
-    id: Mapped[str] = Column(String(36), primary_key=True, default=lambda: str(uuid4()), index=True, nullable=False)
-    models_id: Mapped[str] = Column(String(36), ForeignKey('models.id'), nullable=False)
-    colors_id: Mapped[str] = Column(String(36), ForeignKey('colors.id'), nullable=False)
-    customers_id: Mapped[str] = Column(String(36), ForeignKey('customers.id'), nullable=False)
-    sales_people_id: Mapped[str] = Column(String(36), ForeignKey('sales_people.id'), nullable=False)
+    id: Mapped[str] = Column(UUIDString(), primary_key=True, default=new_uuid, index=True, nullable=False)
+    models_id: Mapped[str] = Column(UUIDString(), ForeignKey('models.id'), nullable=False)
+    colors_id: Mapped[str] = Column(UUIDString(), ForeignKey('colors.id'), nullable=False)
+    customers_id: Mapped[str] = Column(UUIDString(), ForeignKey('customers.id'), nullable=False)
+    sales_people_id: Mapped[str] = Column(UUIDString(), ForeignKey('sales_people.id'), nullable=False)
     total_price: Mapped[float] = Column(Double, nullable=False)
     purchase_deadline: Mapped[date] = Column(Date, nullable=False)
 
@@ -72,7 +74,7 @@ class CarMySQLEntity(Base):
 class CarMongoEntity(BaseModel):  # pragma: no cover
     id: str = Field(default_factory=lambda: str(uuid4()), alias="_id")
     total_price: float
-    purchase_deadline: Union[date, str]
+    purchase_deadline: datetime
 
     model: ModelMongoEntity
     color: ColorMongoEntity
@@ -83,11 +85,10 @@ class CarMongoEntity(BaseModel):  # pragma: no cover
 
     model_config = ConfigDict(from_attributes=True)
 
-    @field_validator("purchase_deadline")
-    def validate_purchase_deadline(cls, purchase_deadline: Union[date, str]) -> str:
-        if isinstance(purchase_deadline, date):
-            return purchase_deadline.isoformat()
-        return purchase_deadline
+    @field_validator("purchase_deadline", mode="before")
+    def validate_purchase_deadline(cls, purchase_deadline: Union[date, str]) -> datetime:
+        # Stored as a BSON datetime, the strings are cars not yet migrated by scripts/migrate_mongodb_dates.py
+        return as_mongodb_datetime(purchase_deadline)
 
     def as_resource(self, is_purchased: bool) -> CarReturnResource:
         if not isinstance(is_purchased, bool):
@@ -96,7 +97,7 @@ class CarMongoEntity(BaseModel):  # pragma: no cover
         return CarReturnResource(
             id=self.id,
             total_price=self.total_price,
-            purchase_deadline=self.purchase_deadline,
+            purchase_deadline=as_date(self.purchase_deadline),
             model=self.model.as_resource(),
             color=self.color.as_resource(),
             customer=self.customer.as_resource(),
@@ -108,7 +109,7 @@ class CarMongoEntity(BaseModel):  # pragma: no cover
 
 
 
-def prepare_car_resourcer(database: Database, car: CarReturnResource) -> dict[str, any]:
+def prepare_car_resourcer(database: "Database", car: CarReturnResource) -> dict[str, any]:
     model_resource = car.model
     model_brand_resource = model_resource.brand
     model_brand = {
@@ -194,7 +195,7 @@ def prepare_car_resourcer(database: Database, car: CarReturnResource) -> dict[st
     }
 
 
-def prepare_car(database: Database, car: Union[Mapping[str, any], dict[str, any], CarReturnResource]) -> CarMongoEntity:
+def prepare_car(database: "Database", car: Union[Mapping[str, any], dict[str, any], CarReturnResource]) -> CarMongoEntity:
     if isinstance(car, CarReturnResource):
         car = prepare_car_resourcer(database, car)
     print(car.get("customer"))
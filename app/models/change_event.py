@@ -0,0 +1,75 @@
+# External Library imports
+from datetime import datetime, timezone
+from typing import Iterable, Literal, Tuple, get_args
+from sqlalchemy import Column, BigInteger, String, DateTime
+from sqlalchemy.orm import Mapped, Session
+
+# Internal library imports
+from db import Base, UUIDString, InMemoryDatabase
+
+
+ChangeAggregate = Literal["customer", "sales_person", "car", "purchase"]
+ChangeOperation = Literal["upsert", "delete"]
+# In the order the replicas upsert them, so a car is written after its customer and sales person
+CHANGE_AGGREGATES: Tuple[str, ...] = get_args(ChangeAggregate)
+
+
+def get_changed_at() -> datetime:
+    # In UTC without a time zone, the way the DATETIME column stores it
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class ChangeEventMySQLEntity(Base):
+    """
+    A row of the transactional outbox, appended by the MySQL repositories in the transaction of the change,
+    which the change replicator applies to the MongoDB and Neo4j replicas in the order of the ID.
+    Only the changed aggregate is recorded, the replicas copy its current state from MySQL.
+    """
+    __tablename__ = 'change_events'
+    id: Mapped[int] = Column(BigInteger, primary_key=True, autoincrement=True)
+    aggregate: Mapped[str] = Column(String(20), nullable=False)
+    aggregate_id: Mapped[str] = Column(UUIDString(), nullable=False)
+    operation: Mapped[str] = Column(String(10), nullable=False)
+    created_at: Mapped[datetime] = Column(DateTime, nullable=False, default=get_changed_at)
+
+
+class ReplicationOffsetMySQLEntity(Base):
+    """
+    The ID of the last change event applied to a replica, which a replay sets back.
+    """
+    __tablename__ = 'replication_offsets'
+    replica: Mapped[str] = Column(String(20), primary_key=True, nullable=False)
+    last_change_id: Mapped[int] = Column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = Column(DateTime, nullable=False, default=get_changed_at, onupdate=get_changed_at)
+
+
+def record_mysql_changes(
+        session: Session,
+        aggregate: ChangeAggregate,
+        aggregate_ids: Iterable[str],
+        operation: ChangeOperation
+):
+    """
+    Appends the changes to the outbox in the current transaction, so they are committed or rolled back with it.
+    """
+    session.add_all([
+        ChangeEventMySQLEntity(aggregate=aggregate, aggregate_id=aggregate_id, operation=operation)
+        for aggregate_id in aggregate_ids
+    ])
+
+
+def record_in_memory_changes(
+        database: InMemoryDatabase,
+        aggregate: ChangeAggregate,
+        aggregate_ids: Iterable[str],
+        operation: ChangeOperation
+):
+    with database.lock:
+        for aggregate_id in aggregate_ids:
+            database.insert("change_events", {
+                "id": database.next_id("change_events"),
+                "aggregate": aggregate,
+                "aggregate_id": aggregate_id,
+                "operation": operation,
+                "created_at": get_changed_at()
+            })
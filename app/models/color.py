@@ -5,20 +5,20 @@ from sqlalchemy import Table, Column, Integer, String, Double, ForeignKey
 from pydantic import BaseModel, ConfigDict, Field
 
 # Internal library imports
-from db import Base
+from db import Base, UUIDString, new_uuid
 from app.resources.color_resource import ColorReturnResource
 
 
 models_has_colors = Table(
     'models_has_colors',
     Base.metadata,
-    Column('models_id', String(36), ForeignKey('models.id'), primary_key=True, nullable=False),
-    Column('colors_id', String(36), ForeignKey('colors.id'), primary_key=True, nullable=False),
+    Column('models_id', UUIDString(), ForeignKey('models.id'), primary_key=True, nullable=False),
+    Column('colors_id', UUIDString(), ForeignKey('colors.id'), primary_key=True, nullable=False),
 )
 
 class ColorMySQLEntity(Base):
     __tablename__ = 'colors'
-    id: Mapped[str] = Column(String(36), primary_key=True, default=lambda: str(uuid4()), index=True, nullable=False)
+    id: Mapped[str] = Column(UUIDString(), primary_key=True, default=new_uuid, index=True, nullable=False)
     name: Mapped[str] = Column(String(45), unique=True, index=True, nullable=False)
     price: Mapped[float] = Column(Double, nullable=False)
     red_value: Mapped[int] = Column(Integer, nullable=False)
@@ -1,18 +1,36 @@
 # External Library imports
 from uuid import uuid4
-from typing import Optional
-from sqlalchemy import Column, String
+from typing import Optional, List
+from sqlalchemy import Column, String, Index
 from sqlalchemy.orm import Mapped, relationship
 from pydantic import BaseModel, ConfigDict, Field
 
 # Internal library imports
-from db import Base
+from db import Base, UUIDString, new_uuid
 from app.resources.customer_resource import CustomerReturnResource
 
 
+# The n-gram size of the MySQL ngram parser (ngram_token_size) and of the MongoDB email_ngrams field.
+# Shorter email filters can't be looked up in the n-gram indexes, so they are searched with contains instead.
+MYSQL_EMAIL_NGRAM_SIZE = 2
+MONGODB_EMAIL_NGRAM_SIZE = 3
+
+
+def get_email_ngrams(email: str, ngram_size: int = MONGODB_EMAIL_NGRAM_SIZE) -> List[str]:
+    """
+    Returns the distinct lowercased n-grams of the email, which are stored in the email_ngrams field
+    of the MongoDB customers, so infix email searches can use a multikey index instead of a collection scan.
+    """
+    email = email.lower()
+    return sorted({email[index:index + ngram_size] for index in range(len(email) - ngram_size + 1)})
+
+
 class CustomerMySQLEntity(Base):
     __tablename__ = 'customers'
-    id: Mapped[str] = Column(String(36), primary_key=True, default=lambda: str(uuid4()), index=True, nullable=False)
+    __table_args__ = (
+        Index('customer_email_FULLTEXT', 'email', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+    )
+    id: Mapped[str] = Column(UUIDString(), primary_key=True, default=new_uuid, index=True, nullable=False)
     email: Mapped[str] = Column(String(50), unique=True, index=True, nullable=False)
     phone_number: Mapped[Optional[str]] = Column(String(30), nullable=True)
     first_name: Mapped[str] = Column(String(45), nullable=False)
@@ -5,20 +5,20 @@ from sqlalchemy import Table, Column, ForeignKey, String, Double
 from pydantic import BaseModel, ConfigDict, Field
 
 # Internal library imports
-from db import Base
+from db import Base, UUIDString, new_uuid
 from app.resources.insurance_resource import InsuranceReturnResource
 
 
 cars_has_insurances = Table(
     'cars_has_insurances',
     Base.metadata,
-    Column('cars_id', String(36), ForeignKey('cars.id'), primary_key=True, nullable=False),
-    Column('insurances_id', String(36), ForeignKey('insurances.id'), primary_key=True, nullable=False),
+    Column('cars_id', UUIDString(), ForeignKey('cars.id'), primary_key=True, nullable=False),
+    Column('insurances_id', UUIDString(), ForeignKey('insurances.id'), primary_key=True, nullable=False),
 )
 
 class InsuranceMySQLEntity(Base):
     __tablename__ = 'insurances'
-    id: Mapped[str] = Column(String(36), primary_key=True, default=lambda: str(uuid4()), index=True, nullable=False)
+    id: Mapped[str] = Column(UUIDString(), primary_key=True, default=new_uuid, index=True, nullable=False)
     name: Mapped[str] = Column(String(45), unique=True, index=True, nullable=False)
     price: Mapped[float] = Column(Double, nullable=False)
 
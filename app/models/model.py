@@ -6,7 +6,7 @@ from sqlalchemy import Column, String, Double, ForeignKey
 from pydantic import BaseModel, ConfigDict, Field
 
 # Internal library imports
-from db import Base
+from db import Base, UUIDString, new_uuid
 from app.models.brand import BrandMySQLEntity, BrandMongoEntity, BrandNeo4jEntity
 from app.resources.model_resource import ModelReturnResource, ModelBaseReturnResource
 from app.models.color import (
@@ -19,8 +19,8 @@ from app.models.color import (
 
 class ModelMySQLEntity(Base):
     __tablename__ = 'models'
-    id: Mapped[str] = Column(String(36), primary_key=True, default=lambda: str(uuid4()), index=True, nullable=False)
-    brands_id: Mapped[str] = Column(String(36), ForeignKey('brands.id'), nullable=False)
+    id: Mapped[str] = Column(UUIDString(), primary_key=True, default=new_uuid, index=True, nullable=False)
+    brands_id: Mapped[str] = Column(UUIDString(), ForeignKey('brands.id'), nullable=False)
     name: Mapped[str] = Column(String(60), unique=True, index=True, nullable=False)
     price: Mapped[float] = Column(Double, nullable=False)
     image_url: Mapped[str] = Column(String(255), nullable=False)
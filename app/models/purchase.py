@@ -1,22 +1,22 @@
 # External Library imports
 from typing import Union
 from uuid import uuid4
-from datetime import date
+from datetime import date, datetime
 from sqlalchemy.orm import Mapped, relationship
-from sqlalchemy import Column, String, Date, ForeignKey
+from sqlalchemy import Column, Date, ForeignKey
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 # Internal library imports
-from db import Base
+from db import Base, as_mongodb_datetime, as_date, UUIDString, new_uuid
 from app.models.car import CarMySQLEntity, CarMongoEntity
 from app.resources.purchase_resource import PurchaseReturnResource, PurchaseBaseReturnResource
 
 
 class PurchaseMySQLEntity(Base):
     __tablename__ = 'purchases'
-    id: Mapped[str] = Column(String(36), primary_key=True, default=lambda: str(uuid4()), index=True, nullable=False)
-    cars_id: Mapped[str] = Column(String(36), ForeignKey('cars.id'), nullable=False)
+    id: Mapped[str] = Column(UUIDString(), primary_key=True, default=new_uuid, index=True, nullable=False)
+    cars_id: Mapped[str] = Column(UUIDString(), ForeignKey('cars.id'), nullable=False)
     date_of_purchase: Mapped[date] = Column(Date, nullable=False)
 
     car: Mapped[CarMySQLEntity] = relationship('CarMySQLEntity', back_populates='purchase', uselist=False, lazy=False)
@@ -39,26 +39,24 @@ class PurchaseMySQLEntity(Base):
 
 class PurchaseMongoEntity(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid4()), alias="_id")
-    date_of_purchase: Union[date, str]
+    date_of_purchase: datetime
     car: CarMongoEntity
 
     model_config = ConfigDict(from_attributes=True)
 
-    @field_validator("date_of_purchase")
-    def validate_purchase_deadline(cls, date_of_purchase: Union[date, str]) -> str:
-        if isinstance(date_of_purchase, date):
-            return date_of_purchase.isoformat()
-        return date_of_purchase
+    @field_validator("date_of_purchase", mode="before")
+    def validate_date_of_purchase(cls, date_of_purchase: Union[date, str]) -> datetime:
+        return as_mongodb_datetime(date_of_purchase)
 
     def as_resource_without_car(self) -> PurchaseBaseReturnResource:
         return PurchaseBaseReturnResource(
             id=self.id,
-            date_of_purchase=self.date_of_purchase,
+            date_of_purchase=as_date(self.date_of_purchase),
         )
 
     def as_resource(self) -> PurchaseReturnResource:
         return PurchaseReturnResource(
             id=self.id,
-            date_of_purchase=self.date_of_purchase,
+            date_of_purchase=as_date(self.date_of_purchase),
             car=self.car.as_resource(is_purchased=True),
         )
@@ -5,14 +5,14 @@ from sqlalchemy.orm import Mapped, relationship
 from pydantic import BaseModel, ConfigDict, Field
 
 # Internal library imports
-from db import Base
+from db import Base, UUIDString, new_uuid
 from app.resources.sales_person_resource import SalesPersonReturnResource
 
 
 
 class SalesPersonMySQLEntity(Base):
     __tablename__ = 'sales_people'
-    id: Mapped[str] = Column(String(36), primary_key=True, default=lambda: str(uuid4()), index=True, nullable=False)
+    id: Mapped[str] = Column(UUIDString(), primary_key=True, default=new_uuid, index=True, nullable=False)
     email: Mapped[str] = Column(String(100), index=True, unique=True, nullable=False)
     hashed_password: Mapped[str] = Column(String(130), nullable=False)
     first_name: Mapped[str] = Column(String(45), nullable=False)
@@ -0,0 +1,33 @@
+# External Library imports
+from datetime import date
+from sqlalchemy import Column, Date, Integer, Double
+from sqlalchemy.orm import Mapped
+
+# Internal library imports
+from db import Base, UUIDString
+from app.resources.car_resource import CarReturnResource
+
+
+class SalesDailyRollupMySQLEntity(Base):
+    """
+    The units and revenue sold per day, model, color and sales person, updated by every purchase.
+    The sales stay in the rollup when their car or customer is deleted later, like a ledger.
+    """
+    __tablename__ = 'sales_daily_rollups'
+    day: Mapped[date] = Column(Date, primary_key=True, nullable=False)
+    brands_id: Mapped[str] = Column(UUIDString(), primary_key=True, nullable=False)
+    models_id: Mapped[str] = Column(UUIDString(), primary_key=True, nullable=False)
+    colors_id: Mapped[str] = Column(UUIDString(), primary_key=True, nullable=False)
+    sales_people_id: Mapped[str] = Column(UUIDString(), primary_key=True, nullable=False)
+    units: Mapped[int] = Column(Integer, nullable=False, default=0)
+    revenue: Mapped[float] = Column(Double, nullable=False, default=0)
+
+
+def get_sales_rollup_id(day: date, car_resource: CarReturnResource) -> str:
+    return "|".join([
+        day.isoformat(),
+        car_resource.model.brand.id,
+        car_resource.model.id,
+        car_resource.color.id,
+        car_resource.sales_person.id
+    ])
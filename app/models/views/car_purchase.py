@@ -1,10 +1,10 @@
 # External Library imports
 from typing import Optional
 from sqlalchemy.orm import Mapped, relationship
-from sqlalchemy import Column, String, ForeignKey, Boolean
+from sqlalchemy import Column, ForeignKey, Boolean
 
 # Internal library imports
-from db import Base
+from db import Base, UUIDString
 from app.models.customer import CustomerMySQLEntity
 from app.models.sales_person import SalesPersonMySQLEntity
 from app.models.purchase import PurchaseMySQLEntity, CarMySQLEntity
@@ -17,10 +17,10 @@ from app.resources.view_resources.car_purchase_resource import (
 
 class CarPurchaseView(Base):
     __tablename__ = 'car_purchase_view'
-    car_id: Mapped[str] = Column(String(36), ForeignKey('cars.id'), primary_key=True, index=True, nullable=False)
-    purchase_id: Mapped[Optional[str]] = Column(String(36), ForeignKey('purchases.id'), nullable=True)
-    customer_id: Mapped[str] = Column(String(36), ForeignKey('customers.id'), nullable=False)
-    sales_person_id: Mapped[str] = Column(String(36), ForeignKey('sales_people.id'), nullable=False)
+    car_id: Mapped[str] = Column(UUIDString(), ForeignKey('cars.id'), primary_key=True, index=True, nullable=False)
+    purchase_id: Mapped[Optional[str]] = Column(UUIDString(), ForeignKey('purchases.id'), nullable=True)
+    customer_id: Mapped[str] = Column(UUIDString(), ForeignKey('customers.id'), nullable=False)
+    sales_person_id: Mapped[str] = Column(UUIDString(), ForeignKey('sales_people.id'), nullable=False)
     is_past_deadline: Mapped[bool] = Column(Boolean, nullable=False)
 
     car: Mapped[CarMySQLEntity] = relationship("CarMySQLEntity", back_populates="car_purchase_view", lazy=False)
@@ -1,11 +1,10 @@
 # External Library imports
 from abc import ABC, abstractmethod
-from typing import Optional, List, cast
+from typing import Optional, List, cast, TYPE_CHECKING
 from sqlalchemy.orm import Session as MySQLSession
-from pymongo.database import Database
-from neo4j import Session as Neo4jSession, Query
 
 # Internal library imports
+from db import InMemoryDatabase
 from app.models.accessory import (
     AccessoryReturnResource,
     AccessoryMySQLEntity,
@@ -13,6 +12,10 @@ from app.models.accessory import (
     AccessoryNeo4jEntity
 )
 
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from neo4j import Session as Neo4jSession
+
 
 class AccessoryRepository(ABC):  # pragma: no cover
     @abstractmethod
@@ -43,7 +46,7 @@ class MySQLAccessoryRepository(AccessoryRepository):
 
 
 class MongoDBAccessoryRepository(AccessoryRepository):  # pragma: no cover
-    def __init__(self, database: Database):
+    def __init__(self, database: "Database"):
         self.database = database
 
     def get_all(self, limit: Optional[int] = None) -> List[AccessoryReturnResource]:
@@ -67,14 +70,14 @@ class MongoDBAccessoryRepository(AccessoryRepository):  # pragma: no cover
 
 
 class Neo4jAccessoryRepository(AccessoryRepository):  # pragma: no cover
-    def __init__(self, neo4j_session: Neo4jSession):
+    def __init__(self, neo4j_session: "Neo4jSession"):
         self.neo4j_session = neo4j_session
 
     def get_all(self, limit: Optional[int] = None) -> List[AccessoryReturnResource]:
-        query = Query("MATCH (a:Accessory) RETURN a")
+        query = "MATCH (a:Accessory) RETURN a"
         parameters = {}
         if limit is not None and isinstance(limit, int) and limit > 0:
-            query = Query("MATCH (a:Accessory) RETURN a LIMIT $limit")
+            query = "MATCH (a:Accessory) RETURN a LIMIT $limit"
             parameters["limit"] = limit
         result = self.neo4j_session.run(query, parameters)
         accessories = [AccessoryNeo4jEntity(**record["a"]).as_resource() for record in result]
@@ -89,3 +92,20 @@ class Neo4jAccessoryRepository(AccessoryRepository):  # pragma: no cover
         if record is not None:
             return AccessoryNeo4jEntity(**record["a"]).as_resource()
         return None
+
+
+class InMemoryAccessoryRepository(AccessoryRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def get_all(self, limit: Optional[int] = None) -> List[AccessoryReturnResource]:
+        accessories = self.database.all("accessories")
+        if limit is not None and isinstance(limit, int) and limit > 0:
+            accessories = accessories[:limit]
+        return [AccessoryReturnResource(**accessory) for accessory in accessories]
+
+    def get_by_id(self, accessory_id: str) -> Optional[AccessoryReturnResource]:
+        accessory = self.database.get("accessories", accessory_id)
+        if accessory is not None:
+            return AccessoryReturnResource(**accessory)
+        return None
@@ -0,0 +1,325 @@
+# External Library imports
+from datetime import date
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from sqlalchemy import func
+from sqlalchemy.sql import functions
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+# Internal library imports
+from db import InMemoryDatabase, as_mongodb_datetime
+from app.models.car import CarMySQLEntity
+from app.models.brand import BrandMySQLEntity
+from app.models.color import ColorMySQLEntity
+from app.models.model import ModelMySQLEntity
+from app.models.purchase import PurchaseMySQLEntity
+from app.models.sales_person import SalesPersonMySQLEntity
+from app.models.sales_rollup import SalesDailyRollupMySQLEntity, get_sales_rollup_id
+from app.resources.car_resource import CarReturnResource
+from app.resources.analytics_resource import SalesReturnResource, SalesDimension, SalesSource
+
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from neo4j import Session as Neo4jSession
+
+
+SALES_ROLLUP_COLLECTION = "sales_daily_rollups"
+
+
+def as_sales_resource(key: str, name: str, units: int, revenue: float) -> SalesReturnResource:
+    return SalesReturnResource(key=key, name=name, units=int(units), revenue=round(float(revenue or 0), 2))
+
+
+def sort_sales(sales: List[SalesReturnResource]) -> List[SalesReturnResource]:
+    return sorted(sales, key=lambda sale: (-sale.revenue, sale.key))
+
+
+def add_sale_to_mysql_rollup(session: Session, car_resource: CarReturnResource, day: date):
+    insert_statement = mysql_insert(SalesDailyRollupMySQLEntity).values(
+        day=day,
+        brands_id=car_resource.model.brand.id,
+        models_id=car_resource.model.id,
+        colors_id=car_resource.color.id,
+        sales_people_id=car_resource.sales_person.id,
+        units=1,
+        revenue=car_resource.total_price
+    )
+    session.execute(insert_statement.on_duplicate_key_update(
+        units=SalesDailyRollupMySQLEntity.units + 1,
+        revenue=SalesDailyRollupMySQLEntity.revenue + insert_statement.inserted.revenue
+    ))
+
+
+def add_sale_to_mongodb_rollup(database: "Database", car_resource: CarReturnResource, day: date):  # pragma: no cover
+    sales_person = car_resource.sales_person
+    database.get_collection(SALES_ROLLUP_COLLECTION).update_one(
+        {"_id": get_sales_rollup_id(day, car_resource)},
+        {
+            "$setOnInsert": {
+                "day": as_mongodb_datetime(day),
+                "brand": {"_id": car_resource.model.brand.id, "name": car_resource.model.brand.name},
+                "model": {"_id": car_resource.model.id, "name": car_resource.model.name},
+                "color": {"_id": car_resource.color.id, "name": car_resource.color.name},
+                "sales_person": {
+                    "_id": sales_person.id, "first_name": sales_person.first_name, "last_name": sales_person.last_name
+                }
+            },
+            "$inc": {"units": 1, "revenue": car_resource.total_price}
+        },
+        upsert=True
+    )
+
+
+def add_sale_to_in_memory_rollup(database: InMemoryDatabase, car_resource: CarReturnResource, day: date):
+    rollup_id = get_sales_rollup_id(day, car_resource)
+    with database.lock:
+        rollup = database.get("sales_daily_rollups", rollup_id)
+        if rollup is None:
+            database.insert("sales_daily_rollups", {
+                "id": rollup_id,
+                "day": day,
+                "brands_id": car_resource.model.brand.id,
+                "models_id": car_resource.model.id,
+                "colors_id": car_resource.color.id,
+                "sales_people_id": car_resource.sales_person.id,
+                "units": 1,
+                "revenue": car_resource.total_price
+            })
+        else:
+            database.update("sales_daily_rollups", rollup_id, {
+                "units": rollup["units"] + 1,
+                "revenue": rollup["revenue"] + car_resource.total_price
+            })
+
+
+class AnalyticsRepository(ABC):  # pragma: no cover
+    @abstractmethod
+    def get_sales(
+            self,
+            dimension: SalesDimension,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None,
+            source: SalesSource = "rollup"
+    ) -> List[SalesReturnResource]:
+        """
+        Returns the units and revenue per brand, model, color, sales person or month
+        of the purchases between the start and end date, both included, sorted by revenue.
+        """
+        pass
+
+
+class MySQLAnalyticsRepository(AnalyticsRepository):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_sales(
+            self,
+            dimension: SalesDimension,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None,
+            source: SalesSource = "rollup"
+    ) -> List[SalesReturnResource]:
+
+        if source == "rollup":
+            rollup = SalesDailyRollupMySQLEntity
+            day_column = rollup.day
+            units = functions.sum(rollup.units)
+            revenue = functions.sum(rollup.revenue)
+            id_columns = {
+                "brand": rollup.brands_id,
+                "model": rollup.models_id,
+                "color": rollup.colors_id,
+                "sales_person": rollup.sales_people_id
+            }
+            sales_query = self.session.query().select_from(rollup)
+        else:
+            day_column = PurchaseMySQLEntity.date_of_purchase
+            units = functions.count(PurchaseMySQLEntity.id)
+            revenue = functions.sum(CarMySQLEntity.total_price)
+            id_columns = {
+                "brand": ModelMySQLEntity.brands_id,
+                "model": CarMySQLEntity.models_id,
+                "color": CarMySQLEntity.colors_id,
+                "sales_person": CarMySQLEntity.sales_people_id
+            }
+            sales_query = (
+                self.session.query()
+                .select_from(PurchaseMySQLEntity)
+                .join(CarMySQLEntity, PurchaseMySQLEntity.cars_id == CarMySQLEntity.id)
+                .join(ModelMySQLEntity, CarMySQLEntity.models_id == ModelMySQLEntity.id)
+            )
+
+        if dimension == "month":
+            key = name = func.date_format(day_column, "%Y-%m")
+        else:
+            # Aliased, since the purchases are already joined with the models
+            named_entity = aliased({
+                "brand": BrandMySQLEntity,
+                "model": ModelMySQLEntity,
+                "color": ColorMySQLEntity,
+                "sales_person": SalesPersonMySQLEntity
+            }[dimension])
+            sales_query = sales_query.join(named_entity, named_entity.id == id_columns[dimension])
+            key = named_entity.id
+            if dimension == "sales_person":
+                name = functions.concat(named_entity.first_name, " ", named_entity.last_name)
+            else:
+                name = named_entity.name
+
+        if start_date is not None:
+            sales_query = sales_query.filter(day_column >= start_date)
+        if end_date is not None:
+            sales_query = sales_query.filter(day_column <= end_date)
+        sales_query = (
+            sales_query
+            .add_columns(key.label("key"), name.label("name"), units.label("units"), revenue.label("revenue"))
+            .group_by(key, name)
+            .order_by(revenue.desc(), key)
+        )
+        return [as_sales_resource(row.key, row.name, row.units, row.revenue) for row in sales_query.all()]
+
+
+class MongoDBAnalyticsRepository(AnalyticsRepository):  # pragma: no cover
+    def __init__(self, database: "Database"):
+        self.database = database
+
+    def get_sales(
+            self,
+            dimension: SalesDimension,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None,
+            source: SalesSource = "rollup"
+    ) -> List[SalesReturnResource]:
+
+        if source == "rollup":
+            collection, date_field, prefix = SALES_ROLLUP_COLLECTION, "day", ""
+            units, revenue = {"$sum": "$units"}, {"$sum": "$revenue"}
+        else:
+            collection, date_field, prefix = "purchases", "date_of_purchase", "car."
+            units, revenue = {"$sum": 1}, {"$sum": "$car.total_price"}
+
+        if dimension == "month":
+            key = name = {"$dateToString": {"format": "%Y-%m", "date": f"${date_field}"}}
+        else:
+            field = {
+                "brand": f"{prefix}model.brand",
+                "model": f"{prefix}model",
+                "color": f"{prefix}color",
+                "sales_person": f"{prefix}sales_person"
+            }[dimension]
+            key = f"${field}._id"
+            if dimension == "sales_person":
+                name = {"$concat": [f"${field}.first_name", " ", f"${field}.last_name"]}
+            else:
+                name = f"${field}.name"
+
+        # The dates are stored as datetimes at midnight, so the end date includes its own day.
+        date_filter = {}
+        if start_date is not None:
+            date_filter["$gte"] = as_mongodb_datetime(start_date)
+        if end_date is not None:
+            date_filter["$lte"] = as_mongodb_datetime(end_date)
+        pipeline = [{"$match": {date_field: date_filter}}] if date_filter else []
+        pipeline += [
+            {"$group": {"_id": key, "name": {"$first": name}, "units": units, "revenue": revenue}},
+            {"$sort": {"revenue": -1, "_id": 1}}
+        ]
+        return [
+            as_sales_resource(sale["_id"], sale["name"], sale["units"], sale["revenue"])
+            for sale in self.database.get_collection(collection).aggregate(pipeline)
+        ]
+
+
+class Neo4jAnalyticsRepository(AnalyticsRepository):  # pragma: no cover
+    def __init__(self, neo4j_session: "Neo4jSession"):
+        self.neo4j_session = neo4j_session
+
+    def get_sales(
+            self,
+            dimension: SalesDimension,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None,
+            source: SalesSource = "rollup"
+    ) -> List[SalesReturnResource]:
+        # Purchases are not created through the Neo4j API, so there is no rollup to read and the purchases are aggregated.
+        key, name = {
+            "brand": ("brand.id", "brand.name"),
+            "model": ("model.id", "model.name"),
+            "color": ("color.id", "color.name"),
+            "sales_person": ("sales_person.id", "sales_person.first_name + ' ' + sales_person.last_name"),
+            "month": ("left(toString(purchase.date_of_purchase), 7)", "left(toString(purchase.date_of_purchase), 7)"),
+        }[dimension]
+        query = (
+            f"""
+            MATCH (purchase:Purchase)-[:MADE_FOR]->(car:Car)-[:HAS_MODEL]->(model:Model)-[:BELONGS_TO]->(brand:Brand)
+            MATCH (car)-[:HAS_COLOR]->(color:Color)
+            MATCH (car)-[:SOLD_BY]->(sales_person:SalesPerson)
+            WHERE ($start_date IS NULL OR purchase.date_of_purchase >= $start_date)
+              AND ($end_date IS NULL OR purchase.date_of_purchase <= $end_date)
+            RETURN {key} AS key, {name} AS name, count(purchase) AS units, sum(car.total_price) AS revenue
+            ORDER BY revenue DESC, key
+            """
+        )
+        result = self.neo4j_session.run(query, {"start_date": start_date, "end_date": end_date})
+        return [as_sales_resource(record["key"], record["name"], record["units"], record["revenue"]) for record in result]
+
+
+class InMemoryAnalyticsRepository(AnalyticsRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def get_name(self, dimension: SalesDimension, key: str) -> str:
+        if dimension == "month":
+            return key
+        row = self.database.get({
+            "brand": "brands", "model": "models", "color": "colors", "sales_person": "sales_people"
+        }[dimension], key)
+        if dimension == "sales_person":
+            return f"{row['first_name']} {row['last_name']}"
+        return row["name"]
+
+    def get_sale_rows(self, source: SalesSource) -> List[Tuple[date, str, str, str, str, int, float]]:
+        """
+        Every sale as (day, brand, model, color, sales person, units, revenue), like the rows of the rollup.
+        """
+        if source == "rollup":
+            return [
+                (rollup["day"], rollup["brands_id"], rollup["models_id"], rollup["colors_id"],
+                 rollup["sales_people_id"], rollup["units"], rollup["revenue"])
+                for rollup in self.database.all("sales_daily_rollups")
+            ]
+        sales = []
+        for purchase in self.database.all("purchases"):
+            car = self.database.get("cars", purchase["cars_id"])
+            sales.append((
+                purchase["date_of_purchase"], self.database.get("models", car["models_id"])["brands_id"],
+                car["models_id"], car["colors_id"], car["sales_people_id"], 1, car["total_price"]
+            ))
+        return sales
+
+    def get_sales(
+            self,
+            dimension: SalesDimension,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None,
+            source: SalesSource = "rollup"
+    ) -> List[SalesReturnResource]:
+
+        totals: Dict[str, Tuple[int, float]] = {}
+        for day, brands_id, models_id, colors_id, sales_people_id, units, revenue in self.get_sale_rows(source):
+            if (start_date is not None and day < start_date) or (end_date is not None and day > end_date):
+                continue
+            key = {
+                "brand": brands_id,
+                "model": models_id,
+                "color": colors_id,
+                "sales_person": sales_people_id,
+                "month": day.strftime("%Y-%m")
+            }[dimension]
+            total_units, total_revenue = totals.get(key, (0, 0.0))
+            totals[key] = (total_units + units, total_revenue + revenue)
+        return sort_sales([
+            as_sales_resource(key, self.get_name(dimension, key), units, revenue)
+            for key, (units, revenue) in totals.items()
+        ])
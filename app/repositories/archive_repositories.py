@@ -0,0 +1,471 @@
+# External Library imports
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple, Type, Union, TYPE_CHECKING
+from sqlalchemy import and_, or_, text
+from sqlalchemy.orm import Session
+
+# Internal library imports
+from db import InMemoryDatabase, as_mongodb_datetime, as_date
+from app.models.car import CarMySQLEntity, prepare_car
+from app.models.purchase import PurchaseMySQLEntity, PurchaseMongoEntity
+from app.models.archive import ArchivedPurchaseMySQLEntity, ArchivedCarMySQLEntity, get_archive_month
+from app.models.change_event import record_mysql_changes, record_in_memory_changes
+from app.repositories import mongodb_operations
+from app.repositories.car_repositories import prepare_in_memory_car
+from app.repositories.purchase_repositories import prepare_in_memory_purchase
+from app.resources.archive_resource import ArchivedPurchaseReturnResource, ArchivedCarReturnResource
+
+if TYPE_CHECKING:
+    from pymongo.database import Database
+
+
+# The date of purchase and ID of a purchase, the order the purchases are archived in
+ArchiveCursor = Tuple[date, str]
+ArchivedResource = Union[ArchivedPurchaseReturnResource, ArchivedCarReturnResource]
+
+ARCHIVED_PURCHASES_COLLECTION = "archived_purchases"
+ARCHIVED_CARS_COLLECTION = "archived_cars"
+# The partition of the months that have not been archived yet, see ensure_mysql_archive_partitions
+MYSQL_FUTURE_PARTITION = "p_future"
+
+
+def get_archived_at() -> datetime:
+    # In UTC without a time zone, the way MySQL DATETIME columns and PyMongo store it
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def get_next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def as_archived_resource(
+        resource_class: Type[ArchivedResource],
+        snapshot: dict,
+        archive_month: date,
+        archived_at: datetime
+) -> ArchivedResource:
+    return resource_class(**snapshot, archive_month=archive_month.strftime("%Y-%m"), archived_at=archived_at)
+
+
+def ensure_mysql_archive_partitions(session: Session, table: str, months: Iterable[date]):
+    """
+    Splits a partition off the future partition for each month newer than the existing partitions,
+    so every archived month gets a partition of its own. Older months are stored in the partition covering them.
+    Partitioning commits the transaction, so it has to happen before the archived rows are locked or written.
+    """
+    bounds = [
+        date.fromisoformat(description.strip("'"))
+        for (description,) in session.execute(text(
+            """
+            SELECT PARTITION_DESCRIPTION FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_DESCRIPTION <> 'MAXVALUE'
+            """
+        ), {"table": table})
+    ]
+    newest_bound = max(bounds, default=date.min)
+    for month in sorted(set(months)):
+        if month < newest_bound:
+            continue
+        next_month = get_next_month(month)
+        session.execute(text(
+            f"ALTER TABLE `{table}` REORGANIZE PARTITION {MYSQL_FUTURE_PARTITION} INTO ("
+            f"PARTITION p{month.strftime('%Y_%m')} VALUES LESS THAN ('{next_month.isoformat()}'), "
+            f"PARTITION {MYSQL_FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE))"
+        ))
+        newest_bound = next_month
+
+
+def archive_mysql_cars(session: Session, cars: List[CarMySQLEntity]):
+    """
+    Adds snapshots of the expired cars to the archive, in the transaction that deletes them.
+    """
+    archived_at = get_archived_at()
+    for car in cars:
+        session.add(ArchivedCarMySQLEntity(
+            id=car.id,
+            archive_month=get_archive_month(car.purchase_deadline),
+            customers_id=car.customers_id,
+            purchase_deadline=car.purchase_deadline,
+            archived_at=archived_at,
+            snapshot=car.as_resource(is_purchased=False).model_dump(mode="json")
+        ))
+
+
+def archive_mongodb_cars(database: "Database", cars: List[dict]):  # pragma: no cover
+    """
+    Upserts snapshots of the expired cars into the archive before they are deleted,
+    so a batch that fails halfway is archived once when it is retried.
+    """
+    archived_at = get_archived_at()
+    operations = [
+        mongodb_operations.ReplaceOne({"_id": car["_id"]}, {
+            "archive_month": as_mongodb_datetime(get_archive_month(as_date(car["purchase_deadline"]))),
+            "customer_id": car["customer"]["_id"],
+            "archived_at": archived_at,
+            "car": prepare_car(database, car).as_resource(is_purchased=False).model_dump(mode="json")
+        }, upsert=True)
+        for car in cars
+    ]
+    if operations:
+        database.get_collection(ARCHIVED_CARS_COLLECTION).bulk_write(operations, ordered=False)
+
+
+def archive_in_memory_car(database: InMemoryDatabase, car: dict):
+    database.insert("archived_cars", {
+        "id": car["id"],
+        "archive_month": get_archive_month(car["purchase_deadline"]),
+        "customers_id": car["customers_id"],
+        "archived_at": get_archived_at(),
+        "snapshot": prepare_in_memory_car(database, car, is_purchased=False).model_dump(mode="json")
+    })
+
+
+class ArchiveRepository(ABC):  # pragma: no cover
+    @abstractmethod
+    def get_archivable_purchases(
+            self,
+            purchased_before: date,
+            after: Optional[ArchiveCursor],
+            limit: int
+    ) -> List[ArchiveCursor]:
+        """
+        Returns up to limit purchases made before purchased_before, ordered by date of purchase and ID,
+        starting after the given cursor.
+        """
+        pass
+
+    @abstractmethod
+    def archive_purchases(self, purchase_ids: List[str], purchased_before: date) -> int:
+        """
+        Moves the given purchases made before purchased_before and their cars to the archive,
+        and returns the amount of archived purchases.
+        """
+        pass
+
+    @abstractmethod
+    def get_archived_purchases(
+            self,
+            month: Optional[date] = None,
+            customer_id: Optional[str] = None,
+            limit: Optional[int] = None,
+            offset: int = 0
+    ) -> List[ArchivedPurchaseReturnResource]:
+        """
+        Returns the archived purchases, newest month first, of the month starting at the given date
+        and of the given customer when they are given.
+        """
+        pass
+
+    @abstractmethod
+    def get_archived_cars(
+            self,
+            month: Optional[date] = None,
+            customer_id: Optional[str] = None,
+            limit: Optional[int] = None,
+            offset: int = 0
+    ) -> List[ArchivedCarReturnResource]:
+        pass
+
+
+class MySQLArchiveRepository(ArchiveRepository):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_archivable_purchases(
+            self,
+            purchased_before: date,
+            after: Optional[ArchiveCursor],
+            limit: int
+    ) -> List[ArchiveCursor]:
+        # Walks the purchases_date_of_purchase_idx index on (date_of_purchase, id)
+        purchases_query = self.session.query(PurchaseMySQLEntity.date_of_purchase, PurchaseMySQLEntity.id).filter(
+            PurchaseMySQLEntity.date_of_purchase < purchased_before
+        )
+        if after is not None:
+            after_date, after_id = after
+            purchases_query = purchases_query.filter(or_(
+                PurchaseMySQLEntity.date_of_purchase > after_date,
+                and_(PurchaseMySQLEntity.date_of_purchase == after_date, PurchaseMySQLEntity.id > after_id)
+            ))
+        purchases_query = purchases_query.order_by(
+            PurchaseMySQLEntity.date_of_purchase, PurchaseMySQLEntity.id
+        ).limit(limit)
+        return [tuple(purchase) for purchase in purchases_query.all()]
+
+    def archive_purchases(self, purchase_ids: List[str], purchased_before: date) -> int:
+        if not purchase_ids:
+            return 0
+        dates_of_purchase = self.session.query(PurchaseMySQLEntity.date_of_purchase).filter(
+            PurchaseMySQLEntity.id.in_(purchase_ids)
+        ).distinct().all()
+        ensure_mysql_archive_partitions(
+            self.session, "archived_purchases", [get_archive_month(day) for (day,) in dates_of_purchase]
+        )
+        purchases: List[PurchaseMySQLEntity] = self.session.query(PurchaseMySQLEntity).filter(
+            PurchaseMySQLEntity.id.in_(purchase_ids),
+            PurchaseMySQLEntity.date_of_purchase < purchased_before
+        ).with_for_update().all()
+        archived_at = get_archived_at()
+        for purchase in purchases:
+            self.session.add(ArchivedPurchaseMySQLEntity(
+                id=purchase.id,
+                archive_month=get_archive_month(purchase.date_of_purchase),
+                cars_id=purchase.cars_id,
+                customers_id=purchase.car.customers_id,
+                date_of_purchase=purchase.date_of_purchase,
+                archived_at=archived_at,
+                snapshot=purchase.as_resource().model_dump(mode="json")
+            ))
+        archived_purchase_ids = [purchase.id for purchase in purchases]
+        car_ids = [purchase.cars_id for purchase in purchases]
+        self.session.query(PurchaseMySQLEntity).filter(
+            PurchaseMySQLEntity.id.in_(archived_purchase_ids)
+        ).delete(synchronize_session=False)
+        # The accessories and insurances of the cars are deleted by their foreign keys
+        self.session.query(CarMySQLEntity).filter(CarMySQLEntity.id.in_(car_ids)).delete(synchronize_session=False)
+        # The replicas delete the purchases with their cars, the archive is not replicated
+        record_mysql_changes(self.session, "car", car_ids, "delete")
+        # Every batch is its own short transaction, like the car expiry
+        self.session.commit()
+        return len(purchases)
+
+    def get_archive_page(
+            self,
+            archived_entity: Union[Type[ArchivedPurchaseMySQLEntity], Type[ArchivedCarMySQLEntity]],
+            month: Optional[date],
+            customer_id: Optional[str],
+            limit: Optional[int],
+            offset: int
+    ) -> list:
+        archive_query = self.session.query(archived_entity)
+        if month is not None:
+            # Only the partition of the month is read
+            archive_query = archive_query.filter(archived_entity.archive_month == month)
+        if customer_id is not None:
+            archive_query = archive_query.filter(archived_entity.customers_id == customer_id)
+        archive_query = archive_query.order_by(archived_entity.archive_month.desc(), archived_entity.id)
+        if limit is not None:
+            archive_query = archive_query.limit(limit)
+        return archive_query.offset(offset).all()
+
+    def get_archived_purchases(
+            self,
+            month: Optional[date] = None,
+            customer_id: Optional[str] = None,
+            limit: Optional[int] = None,
+            offset: int = 0
+    ) -> List[ArchivedPurchaseReturnResource]:
+        return [
+            archived_purchase.as_resource()
+            for archived_purchase in self.get_archive_page(
+                ArchivedPurchaseMySQLEntity, month, customer_id, limit, offset
+            )
+        ]
+
+    def get_archived_cars(
+            self,
+            month: Optional[date] = None,
+            customer_id: Optional[str] = None,
+            limit: Optional[int] = None,
+            offset: int = 0
+    ) -> List[ArchivedCarReturnResource]:
+        return [
+            archived_car.as_resource()
+            for archived_car in self.get_archive_page(ArchivedCarMySQLEntity, month, customer_id, limit, offset)
+        ]
+
+
+class MongoDBArchiveRepository(ArchiveRepository):  # pragma: no cover
+    def __init__(self, database: "Database"):
+        self.database = database
+
+    def get_archivable_purchases(
+            self,
+            purchased_before: date,
+            after: Optional[ArchiveCursor],
+            limit: int
+    ) -> List[ArchiveCursor]:
+        # Walks the date_of_purchase_1__id_1 index
+        purchases_query: dict = {"date_of_purchase": {"$lt": as_mongodb_datetime(purchased_before)}}
+        if after is not None:
+            after_date, after_id = after
+            purchases_query["$or"] = [
+                {"date_of_purchase": {"$gt": as_mongodb_datetime(after_date)}},
+                {"date_of_purchase": as_mongodb_datetime(after_date), "_id": {"$gt": after_id}}
+            ]
+        purchases = (
+            self.database.get_collection("purchases")
+            .find(purchases_query, projection={"date_of_purchase": True})
+            .sort([("date_of_purchase", 1), ("_id", 1)])
+            .limit(limit)
+        )
+        return [(as_date(purchase["date_of_purchase"]), purchase["_id"]) for purchase in purchases]
+
+    def archive_purchases(self, purchase_ids: List[str], purchased_before: date) -> int:
+        if not purchase_ids:
+            return 0
+        purchases = list(self.database.get_collection("purchases").find({
+            "_id": {"$in": purchase_ids},
+            "date_of_purchase": {"$lt": as_mongodb_datetime(purchased_before)}
+        }))
+        if not purchases:
+            return 0
+        archived_at = get_archived_at()
+        # The purchases are archived before they are deleted, and replaced when a failed batch is retried
+        self.database.get_collection(ARCHIVED_PURCHASES_COLLECTION).bulk_write([
+            mongodb_operations.ReplaceOne({"_id": purchase["_id"]}, {
+                "archive_month": as_mongodb_datetime(get_archive_month(as_date(purchase["date_of_purchase"]))),
+                "customer_id": purchase["car"]["customer"]["_id"],
+                "archived_at": archived_at,
+                "purchase": PurchaseMongoEntity(
+                    _id=purchase["_id"],
+                    car=prepare_car(self.database, purchase["car"]),
+                    date_of_purchase=purchase["date_of_purchase"]
+                ).as_resource().model_dump(mode="json")
+            }, upsert=True)
+            for purchase in purchases
+        ], ordered=False)
+        self.database.get_collection("purchases").delete_many({"_id": {"$in": [purchase["_id"] for purchase in purchases]}})
+        self.database.get_collection("cars").delete_many({"_id": {"$in": [purchase["car"]["_id"] for purchase in purchases]}})
+        return len(purchases)
+
+    def get_archive_page(
+            self,
+            collection: str,
+            month: Optional[date],
+            customer_id: Optional[str],
+            limit: Optional[int],
+            offset: int
+    ) -> List[dict]:
+        # Served by the (archive_month, _id) and (customer_id, archive_month) indexes
+        archive_query = {}
+        if month is not None:
+            archive_query["archive_month"] = as_mongodb_datetime(month)
+        if customer_id is not None:
+            archive_query["customer_id"] = customer_id
+        archived_documents = (
+            self.database.get_collection(collection)
+            .find(archive_query)
+            .sort([("archive_month", -1), ("_id", 1)])
+            .skip(offset)
+        )
+        if limit is not None:
+            # A limit of 0 means no limit to MongoDB
+            if limit == 0:
+                return []
+            archived_documents = archived_documents.limit(limit)
+        return list(archived_documents)
+
+    def get_archived_purchases(
+            self,
+            month: Optional[date] = None,
+            customer_id: Optional[str] = None,
+            limit: Optional[int] = None,
+            offset: int = 0
+    ) -> List[ArchivedPurchaseReturnResource]:
+        return [
+            as_archived_resource(
+                ArchivedPurchaseReturnResource, archived_purchase["purchase"],
+                as_date(archived_purchase["archive_month"]), archived_purchase["archived_at"]
+            )
+            for archived_purchase in self.get_archive_page(
+                ARCHIVED_PURCHASES_COLLECTION, month, customer_id, limit, offset
+            )
+        ]
+
+    def get_archived_cars(
+            self,
+            month: Optional[date] = None,
+            customer_id: Optional[str] = None,
+            limit: Optional[int] = None,
+            offset: int = 0
+    ) -> List[ArchivedCarReturnResource]:
+        return [
+            as_archived_resource(
+                ArchivedCarReturnResource, archived_car["car"],
+                as_date(archived_car["archive_month"]), archived_car["archived_at"]
+            )
+            for archived_car in self.get_archive_page(ARCHIVED_CARS_COLLECTION, month, customer_id, limit, offset)
+        ]
+
+
+class InMemoryArchiveRepository(ArchiveRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def get_archivable_purchases(
+            self,
+            purchased_before: date,
+            after: Optional[ArchiveCursor],
+            limit: int
+    ) -> List[ArchiveCursor]:
+        archivable_purchases = sorted(
+            (purchase["date_of_purchase"], purchase["id"])
+            for purchase in self.database.all("purchases") if purchase["date_of_purchase"] < purchased_before
+        )
+        if after is not None:
+            archivable_purchases = [purchase for purchase in archivable_purchases if purchase > after]
+        return archivable_purchases[:limit]
+
+    def archive_purchases(self, purchase_ids: List[str], purchased_before: date) -> int:
+        archived_purchases = 0
+        with self.database.lock:
+            for purchase_id in purchase_ids:
+                purchase = self.database.get("purchases", purchase_id)
+                if purchase is None or purchase["date_of_purchase"] >= purchased_before:
+                    continue
+                car = self.database.get("cars", purchase["cars_id"])
+                self.database.insert("archived_purchases", {
+                    "id": purchase["id"],
+                    "archive_month": get_archive_month(purchase["date_of_purchase"]),
+                    "customers_id": car["customers_id"],
+                    "archived_at": get_archived_at(),
+                    "snapshot": prepare_in_memory_purchase(self.database, purchase).model_dump(mode="json")
+                })
+                self.database.delete("purchases", purchase_id)
+                self.database.delete("cars", car["id"])
+                record_in_memory_changes(self.database, "car", [car["id"]], "delete")
+                archived_purchases += 1
+        return archived_purchases
+
+    def get_archive_page(
+            self,
+            table: str,
+            month: Optional[date],
+            customer_id: Optional[str],
+            limit: Optional[int],
+            offset: int
+    ) -> List[dict]:
+        archived_rows = [
+            row for row in self.database.all(table)
+            if (month is None or row["archive_month"] == month)
+            and (customer_id is None or row["customers_id"] == customer_id)
+        ]
+        archived_rows.sort(key=lambda row: (-row["archive_month"].toordinal(), row["id"]))
+        archived_rows = archived_rows[offset:]
+        return archived_rows[:limit] if limit is not None else archived_rows
+
+    def get_archived_purchases(
+            self,
+            month: Optional[date] = None,
+            customer_id: Optional[str] = None,
+            limit: Optional[int] = None,
+            offset: int = 0
+    ) -> List[ArchivedPurchaseReturnResource]:
+        return [
+            as_archived_resource(ArchivedPurchaseReturnResource, row["snapshot"], row["archive_month"], row["archived_at"])
+            for row in self.get_archive_page("archived_purchases", month, customer_id, limit, offset)
+        ]
+
+    def get_archived_cars(
+            self,
+            month: Optional[date] = None,
+            customer_id: Optional[str] = None,
+            limit: Optional[int] = None,
+            offset: int = 0
+    ) -> List[ArchivedCarReturnResource]:
+        return [
+            as_archived_resource(ArchivedCarReturnResource, row["snapshot"], row["archive_month"], row["archived_at"])
+            for row in self.get_archive_page("archived_cars", month, customer_id, limit, offset)
+        ]
@@ -1,11 +1,10 @@
 # External Library imports
 from abc import ABC, abstractmethod
-from typing import Optional, List, cast
+from typing import Optional, List, cast, TYPE_CHECKING
 from sqlalchemy.orm import Session
-from pymongo.database import Database
-from neo4j import Session as Neo4jSession, Query
 
 # Internal library imports
+from db import InMemoryDatabase
 from app.models.brand import (
     BrandReturnResource,
     BrandMySQLEntity,
@@ -13,6 +12,10 @@ from app.models.brand import (
     BrandNeo4jEntity
 )
 
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from neo4j import Session as Neo4jSession
+
 
 class BrandRepository(ABC):  # pragma: no cover
 
@@ -45,7 +48,7 @@ class MySQLBrandRepository(BrandRepository):
 
 
 class MongoDBBrandRepository(BrandRepository):  # pragma: no cover
-    def __init__(self, database: Database):
+    def __init__(self, database: "Database"):
         self.database = database
 
     def get_all(self, limit: Optional[int] = None) -> List[BrandReturnResource]:
@@ -69,14 +72,14 @@ class MongoDBBrandRepository(BrandRepository):  # pragma: no cover
 
 
 class Neo4jBrandRepository(BrandRepository):  # pragma: no cover
-    def __init__(self, neo4j_session: Neo4jSession):
+    def __init__(self, neo4j_session: "Neo4jSession"):
         self.neo4j_session = neo4j_session
 
     def get_all(self, limit: Optional[int] = None) -> List[BrandReturnResource]:
-        query = Query("MATCH (b:Brand) RETURN b")
+        query = "MATCH (b:Brand) RETURN b"
         parameters = {}
         if limit is not None and isinstance(limit, int) and limit > 0:
-            query += Query("MATCH (b:Brand) RETURN b LIMIT $limit")
+            query = "MATCH (b:Brand) RETURN b LIMIT $limit"
             parameters["limit"] = limit
         result = self.neo4j_session.run(query, parameters)
         brands = [BrandNeo4jEntity(**record["b"]).as_resource() for record in result]
@@ -91,3 +94,20 @@ class Neo4jBrandRepository(BrandRepository):  # pragma: no cover
         if record is not None:
             return BrandNeo4jEntity(**record["b"]).as_resource()
         return None
+
+
+class InMemoryBrandRepository(BrandRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def get_all(self, limit: Optional[int] = None) -> List[BrandReturnResource]:
+        brands = self.database.all("brands")
+        if limit is not None and isinstance(limit, int) and limit > 0:
+            brands = brands[:limit]
+        return [BrandReturnResource(**brand) for brand in brands]
+
+    def get_by_id(self, brand_id: str) -> Optional[BrandReturnResource]:
+        brand = self.database.get("brands", brand_id)
+        if brand is not None:
+            return BrandReturnResource(**brand)
+        return None
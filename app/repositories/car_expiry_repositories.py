@@ -0,0 +1,264 @@
+# External Library imports
+from datetime import date
+from abc import ABC, abstractmethod
+from typing import List, Optional, Set, Tuple, TYPE_CHECKING
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import Session
+
+# Internal library imports
+from db import InMemoryDatabase, as_mongodb_datetime, as_date
+from app.models.car import CarMySQLEntity
+from app.models.purchase import PurchaseMySQLEntity
+from app.models.archive import get_archive_month
+from app.models.change_event import record_mysql_changes, record_in_memory_changes
+from app.repositories import mongodb_operations
+from app.repositories.archive_repositories import (
+    ARCHIVED_CARS_COLLECTION,
+    ensure_mysql_archive_partitions,
+    archive_mysql_cars,
+    archive_mongodb_cars,
+    archive_in_memory_car
+)
+
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from neo4j import Session as Neo4jSession
+
+
+# The purchase deadline and ID of a car, the order the expired cars are visited in
+ExpiryCursor = Tuple[date, str]
+
+
+class CarExpiryRepository(ABC):  # pragma: no cover
+    @abstractmethod
+    def get_expired_cars(
+            self,
+            expired_before: date,
+            after: Optional[ExpiryCursor],
+            limit: int
+    ) -> List[ExpiryCursor]:
+        """
+        Returns up to limit cars that have not been purchased and whose purchase deadline is before expired_before,
+        ordered by purchase deadline and ID, starting after the given cursor.
+        """
+        pass
+
+    @abstractmethod
+    def delete_expired_cars(self, car_ids: List[str], expired_before: date) -> int:
+        """
+        Moves the given cars to the archive, unless they have been purchased or their purchase deadline moved
+        in the meantime, and returns the amount of deleted cars. Neo4j has no archive, so the cars are only deleted.
+        """
+        pass
+
+
+class MySQLCarExpiryRepository(CarExpiryRepository):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_expired_cars(
+            self,
+            expired_before: date,
+            after: Optional[ExpiryCursor],
+            limit: int
+    ) -> List[ExpiryCursor]:
+        # Walks the cars_purchase_deadline_idx index on (purchase_deadline, id)
+        expired_cars_query = self.session.query(CarMySQLEntity.purchase_deadline, CarMySQLEntity.id).filter(
+            CarMySQLEntity.purchase_deadline < expired_before,
+            ~exists().where(PurchaseMySQLEntity.cars_id == CarMySQLEntity.id)
+        )
+        if after is not None:
+            after_deadline, after_id = after
+            expired_cars_query = expired_cars_query.filter(or_(
+                CarMySQLEntity.purchase_deadline > after_deadline,
+                and_(CarMySQLEntity.purchase_deadline == after_deadline, CarMySQLEntity.id > after_id)
+            ))
+        expired_cars_query = expired_cars_query.order_by(
+            CarMySQLEntity.purchase_deadline, CarMySQLEntity.id
+        ).limit(limit)
+        return [tuple(expired_car) for expired_car in expired_cars_query.all()]
+
+    def delete_expired_cars(self, car_ids: List[str], expired_before: date) -> int:
+        if not car_ids:
+            return 0
+        purchase_deadlines = self.session.query(CarMySQLEntity.purchase_deadline).filter(
+            CarMySQLEntity.id.in_(car_ids)
+        ).distinct().all()
+        ensure_mysql_archive_partitions(
+            self.session, "archived_cars", [get_archive_month(deadline) for (deadline,) in purchase_deadlines]
+        )
+        # The cars are locked, so they cannot be purchased between being archived and deleted
+        expired_cars: List[CarMySQLEntity] = self.session.query(CarMySQLEntity).filter(
+            CarMySQLEntity.id.in_(car_ids),
+            CarMySQLEntity.purchase_deadline < expired_before,
+            ~exists().where(PurchaseMySQLEntity.cars_id == CarMySQLEntity.id)
+        ).with_for_update().all()
+        archive_mysql_cars(self.session, expired_cars)
+        expired_car_ids = [car.id for car in expired_cars]
+        # The accessories and insurances of the cars are deleted by their foreign keys
+        deleted_cars = self.session.query(CarMySQLEntity).filter(
+            CarMySQLEntity.id.in_(expired_car_ids)
+        ).delete(synchronize_session=False)
+        record_mysql_changes(self.session, "car", expired_car_ids, "delete")
+        # Every batch is its own short transaction, so the row locks are released right away
+        self.session.commit()
+        return deleted_cars
+
+
+class MongoDBCarExpiryRepository(CarExpiryRepository):  # pragma: no cover
+    def __init__(self, database: "Database"):
+        self.database = database
+
+    def get_expired_cars(
+            self,
+            expired_before: date,
+            after: Optional[ExpiryCursor],
+            limit: int
+    ) -> List[ExpiryCursor]:
+        # Walks the purchase_deadline_1__id_1 index.
+        # The purchased cars are skipped here, since the purchases are in another collection.
+        expired_cars: List[ExpiryCursor] = []
+        while len(expired_cars) < limit:
+            cars_query: dict = {"purchase_deadline": {"$lt": as_mongodb_datetime(expired_before)}}
+            if after is not None:
+                after_deadline, after_id = after
+                cars_query["$or"] = [
+                    {"purchase_deadline": {"$gt": as_mongodb_datetime(after_deadline)}},
+                    {"purchase_deadline": as_mongodb_datetime(after_deadline), "_id": {"$gt": after_id}}
+                ]
+            cars = list(
+                self.database.get_collection("cars")
+                .find(cars_query, projection={"purchase_deadline": True})
+                .sort([("purchase_deadline", 1), ("_id", 1)])
+                .limit(limit)
+            )
+            purchased_car_ids = self.get_purchased_car_ids([car["_id"] for car in cars])
+            expired_cars += [
+                (as_date(car["purchase_deadline"]), car["_id"])
+                for car in cars if car["_id"] not in purchased_car_ids
+            ]
+            if len(cars) < limit:
+                break
+            after = (as_date(cars[-1]["purchase_deadline"]), cars[-1]["_id"])
+        return expired_cars[:limit]
+
+    def get_purchased_car_ids(self, car_ids: List[str]) -> Set[str]:
+        return {
+            purchase["car"]["_id"] for purchase in self.database.get_collection("purchases").find(
+                {"car._id": {"$in": car_ids}},
+                projection={"car._id": True}
+            )
+        }
+
+    def delete_expired_cars(self, car_ids: List[str], expired_before: date) -> int:
+        if not car_ids:
+            return 0
+        purchased_car_ids = self.get_purchased_car_ids(car_ids)
+        expired_cars_query = {
+            "_id": {"$in": [car_id for car_id in car_ids if car_id not in purchased_car_ids]},
+            "purchase_deadline": {"$lt": as_mongodb_datetime(expired_before)}
+        }
+        expired_cars = list(self.database.get_collection("cars").find(expired_cars_query))
+        archive_mongodb_cars(self.database, expired_cars)
+        deleted_cars = self.database.get_collection("cars").delete_many(expired_cars_query).deleted_count
+        # MongoDB has no row lock like MySQL's SELECT ... FOR UPDATE, so a car purchased between the check
+        # and the delete is put back and taken out of the archive again
+        return deleted_cars - self.restore_purchased_cars(expired_cars)
+
+    def restore_purchased_cars(self, cars: List[dict]) -> int:
+        purchased_car_ids = self.get_purchased_car_ids([car["_id"] for car in cars])
+        if not purchased_car_ids:
+            return 0
+        # Only inserted when the car is missing, so a car the delete did not match is left as it is
+        result = self.database.get_collection("cars").bulk_write([
+            mongodb_operations.UpdateOne(
+                {"_id": car["_id"]},
+                {"$setOnInsert": {field: value for field, value in car.items() if field != "_id"}},
+                upsert=True
+            )
+            for car in cars if car["_id"] in purchased_car_ids
+        ], ordered=False)
+        self.database.get_collection(ARCHIVED_CARS_COLLECTION).delete_many({"_id": {"$in": list(purchased_car_ids)}})
+        return result.upserted_count
+
+
+class Neo4jCarExpiryRepository(CarExpiryRepository):  # pragma: no cover
+    def __init__(self, neo4j_session: "Neo4jSession"):
+        self.neo4j_session = neo4j_session
+
+    def get_expired_cars(
+            self,
+            expired_before: date,
+            after: Optional[ExpiryCursor],
+            limit: int
+    ) -> List[ExpiryCursor]:
+        after_deadline, after_id = after if after is not None else (None, None)
+        query = (
+            """
+            MATCH (car:Car)
+            WHERE car.purchase_deadline < $expired_before
+              AND ($after_deadline IS NULL OR car.purchase_deadline > $after_deadline
+                   OR (car.purchase_deadline = $after_deadline AND car.id > $after_id))
+              AND NOT (:Purchase)-[:MADE_FOR]->(car)
+            RETURN car.purchase_deadline AS purchase_deadline, car.id AS id
+            ORDER BY purchase_deadline, id
+            LIMIT $limit
+            """
+        )
+        result = self.neo4j_session.run(query, {
+            "expired_before": expired_before,
+            "after_deadline": after_deadline,
+            "after_id": after_id,
+            "limit": limit
+        })
+        return [(record["purchase_deadline"].to_native(), record["id"]) for record in result]
+
+    def delete_expired_cars(self, car_ids: List[str], expired_before: date) -> int:
+        if not car_ids:
+            return 0
+        query = (
+            """
+            MATCH (car:Car)
+            WHERE car.id IN $car_ids
+              AND car.purchase_deadline < $expired_before
+              AND NOT (:Purchase)-[:MADE_FOR]->(car)
+            DETACH DELETE car
+            RETURN count(car) AS deleted_cars
+            """
+        )
+        record = self.neo4j_session.run(query, {"car_ids": car_ids, "expired_before": expired_before}).single()
+        return record["deleted_cars"] if record is not None else 0
+
+
+class InMemoryCarExpiryRepository(CarExpiryRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def is_expired(self, car: dict, expired_before: date) -> bool:
+        return car["purchase_deadline"] < expired_before and not self.database.find("purchases", "cars_id", car["id"])
+
+    def get_expired_cars(
+            self,
+            expired_before: date,
+            after: Optional[ExpiryCursor],
+            limit: int
+    ) -> List[ExpiryCursor]:
+        expired_cars = sorted(
+            (car["purchase_deadline"], car["id"])
+            for car in self.database.all("cars") if self.is_expired(car, expired_before)
+        )
+        if after is not None:
+            expired_cars = [expired_car for expired_car in expired_cars if expired_car > after]
+        return expired_cars[:limit]
+
+    def delete_expired_cars(self, car_ids: List[str], expired_before: date) -> int:
+        deleted_cars = 0
+        with self.database.lock:
+            for car_id in car_ids:
+                car = self.database.get("cars", car_id)
+                if car is not None and self.is_expired(car, expired_before):
+                    archive_in_memory_car(self.database, car)
+                    self.database.delete("cars", car_id)
+                    record_in_memory_changes(self.database, "car", [car_id], "delete")
+                    deleted_cars += 1
+        return deleted_cars
@@ -1,13 +1,18 @@
 # External Library imports
+from uuid import uuid4
 from datetime import date
 from abc import ABC, abstractmethod
-from typing import Optional, List, cast
-from sqlalchemy import text, exists
+from typing import Optional, List, cast, TYPE_CHECKING
+from sqlalchemy import text, exists, bindparam
 from sqlalchemy.orm import Session
-from pymongo.database import Database
-from pymongo import MongoClient
 
 # Internal library imports
+from db import InMemoryDatabase, UUIDString, as_mongodb_datetime
+from app.core.identity_cache import cached_per_request, load, evict
+from app.exceptions.database_errors import UnableToDeleteCarWithoutDeletingPurchaseTooError
+from app.models.change_event import record_mysql_changes, record_in_memory_changes
+from app.repositories.model_repositories import prepare_in_memory_model
+from app.repositories.sales_person_repositories import prepare_in_memory_sales_person
 from app.models.purchase import PurchaseMySQLEntity
 from app.models.brand import BrandMongoEntity
 from app.models.car import (
@@ -34,6 +39,10 @@ from app.resources.car_resource import (
     InsuranceReturnResource
 )
 
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from pymongo import MongoClient
+
 
 def calculate_total_price_for_car(
         model_resource: ModelReturnResource,
@@ -52,6 +61,31 @@ def calculate_total_price_for_car(
     return total_price
 
 
+def prepare_in_memory_car(database: InMemoryDatabase, car: dict, is_purchased: bool) -> CarReturnResource:
+    return CarReturnResource(
+        id=car["id"],
+        purchase_deadline=car["purchase_deadline"],
+        total_price=car["total_price"],
+        model=prepare_in_memory_model(database, database.get("models", car["models_id"])),
+        color=ColorReturnResource(**database.get("colors", car["colors_id"])),
+        customer=load("customer", car["customers_id"], lambda: (
+            CustomerReturnResource(**database.get("customers", car["customers_id"]))
+        )),
+        sales_person=load("sales_person", car["sales_people_id"], lambda: (
+            prepare_in_memory_sales_person(database.get("sales_people", car["sales_people_id"]))
+        )),
+        accessories=[
+            AccessoryReturnResource(**database.get("accessories", accessory_id))
+            for accessory_id in car["accessories_ids"]
+        ],
+        insurances=[
+            InsuranceReturnResource(**database.get("insurances", insurance_id))
+            for insurance_id in car["insurances_ids"]
+        ],
+        is_purchased=is_purchased
+    )
+
+
 class CarRepository(ABC):  # pragma: no cover
 
     @abstractmethod
@@ -156,7 +190,10 @@ class MySQLCarRepository(CarRepository):
                             :p_current_date,
                             :p_limit
                         );
-                    """),
+                    """).bindparams(
+                bindparam("p_customer_id", type_=UUIDString()),
+                bindparam("p_sales_person_id", type_=UUIDString())
+            ).columns(id=UUIDString()),
             {
                 "p_customer_id": customer_id,
                 "p_sales_person_id": sales_person_id,
@@ -172,17 +209,19 @@ class MySQLCarRepository(CarRepository):
             car_id: str = car_result[0]
             car = self.session.get(CarMySQLEntity, car_id)
             car = cast(CarMySQLEntity, car)
-            is_car_purchased: bool = (self.session.query(PurchaseMySQLEntity)
-                                      .filter_by(cars_id=car.id).first() is not None)
-            cars.append(car.as_resource(is_car_purchased))
+            cars.append(car.as_resource(self.is_purchased(car.id)))
         return cars
 
+    def is_purchased(self, car_id: str) -> bool:
+        return load("car_is_purchased", car_id, lambda: (
+            self.session.query(PurchaseMySQLEntity).filter_by(cars_id=car_id).first() is not None
+        ))
+
+    @cached_per_request("car")
     def get_by_id(self, car_id: str) -> Optional[CarReturnResource]:
         car: Optional[CarMySQLEntity] = self.session.get(CarMySQLEntity, car_id)
         if car is not None:
-            is_car_purchased: bool = (self.session.query(PurchaseMySQLEntity)
-                                      .filter_by(cars_id=car.id).first() is not None)
-            return car.as_resource(is_car_purchased)
+            return car.as_resource(self.is_purchased(car.id))
         return None
 
     def create(
@@ -223,6 +262,7 @@ class MySQLCarRepository(CarRepository):
                 ).values(cars_id=new_car.id, insurances_id=insurance_resource.id)
                 self.session.execute(insert)
 
+            record_mysql_changes(self.session, "car", [new_car.id], "upsert")
             self.session.flush()
             self.session.refresh(new_car)
             return new_car.as_resource(is_purchased=False)
@@ -232,11 +272,15 @@ class MySQLCarRepository(CarRepository):
 
     def delete(self, car_resource: CarReturnResource, delete_purchase_too: bool):
         car_id = car_resource.id
+        evict("car", car_id)
+        evict("car_is_purchased", car_id)
         try:
             if delete_purchase_too:
                 self.session.query(PurchaseMySQLEntity).filter_by(cars_id=car_id).delete()
                 self.session.flush()
             self.session.query(CarMySQLEntity).filter_by(id=car_id).delete()
+            # The replicas delete the purchase of the car with it
+            record_mysql_changes(self.session, "car", [car_id], "delete")
             self.session.flush()
         except Exception as e:  # pragma: no cover
             self.session.rollback()
@@ -244,7 +288,7 @@ class MySQLCarRepository(CarRepository):
 
 
 class MongoDBCarRepository(CarRepository):  # pragma: no cover
-    def __init__(self, database: Database):
+    def __init__(self, database: "Database"):
         self.database = database
 
     def get_all(
@@ -262,18 +306,18 @@ class MongoDBCarRepository(CarRepository):  # pragma: no cover
         if sales_person is not None and isinstance(sales_person, SalesPersonReturnResource):
             car_query["sales_person._id"] = sales_person.id
         if is_past_purchase_deadline is not None and isinstance(is_past_purchase_deadline, bool):
-            current_date = date.today()
+            current_date = as_mongodb_datetime(date.today())
             if is_past_purchase_deadline:
-                car_query["purchase_deadline"] = {"$lt": current_date.strftime("%Y-%m-%d")}
+                car_query["purchase_deadline"] = {"$lt": current_date}
             else:
-                car_query["purchase_deadline"] = {"$gte": current_date.strftime("%Y-%m-%d")}
+                car_query["purchase_deadline"] = {"$gte": current_date}
 
         cars_query = self.database.get_collection("cars").find(car_query)
         if limit is not None and isinstance(limit, int) and limit > 0:
             cars_query = cars_query.limit(limit)
         cars: List[CarReturnResource] = []
         for car in cars_query:
-            is_car_purchased = self.database.get_collection("purchases").count_documents({"car._id": car["_id"]}) > 0
+            is_car_purchased = self.is_purchased(car["_id"])
             if is_purchased is not None:
                 if is_purchased and not is_car_purchased:
                     continue
@@ -284,13 +328,18 @@ class MongoDBCarRepository(CarRepository):  # pragma: no cover
             cars.append(car_resource)
         return cars
 
+    def is_purchased(self, car_id: str) -> bool:
+        return load("car_is_purchased", car_id, lambda: (
+            self.database.get_collection("purchases").count_documents({"car._id": car_id}) > 0
+        ))
+
+    @cached_per_request("car")
     def get_by_id(self, car_id: str) -> Optional[CarReturnResource]:
         car_query = self.database.get_collection("cars").find_one({"_id": car_id})
         if car_query is None:
             return None
         car_entity = prepare_car(self.database, car_query)
-        is_purchased = self.database.get_collection("purchases").count_documents({"car._id": car_query["_id"]}) > 0
-        return car_entity.as_resource(is_purchased)
+        return car_entity.as_resource(self.is_purchased(car_query["_id"]))
 
     def create(
             self,
@@ -347,6 +396,8 @@ class MongoDBCarRepository(CarRepository):  # pragma: no cover
 
     def delete(self, car_resource: CarReturnResource, delete_purchase_too: bool):
         car_id = car_resource.id
+        evict("car", car_id)
+        evict("car_is_purchased", car_id)
         client: MongoClient = self.database.client
         session = client.start_session()
         try:
@@ -361,6 +412,95 @@ class MongoDBCarRepository(CarRepository):  # pragma: no cover
         finally:
             session.end_session()
 
+
+class InMemoryCarRepository(CarRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def is_purchased(self, car_id: str) -> bool:
+        return load("car_is_purchased", car_id, lambda: len(self.database.find("purchases", "cars_id", car_id)) > 0)
+
+    def get_all(
+            self,
+            customer: Optional[CustomerReturnResource] = None,
+            sales_person: Optional[SalesPersonReturnResource] = None,
+            is_purchased: Optional[bool] = None,
+            is_past_purchase_deadline: Optional[bool] = None,
+            limit: Optional[int] = None
+    ) -> List[CarReturnResource]:
+
+        if customer is not None and isinstance(customer, CustomerReturnResource):
+            cars = self.database.find("cars", "customers_id", customer.id)
+        elif sales_person is not None and isinstance(sales_person, SalesPersonReturnResource):
+            cars = self.database.find("cars", "sales_people_id", sales_person.id)
+        else:
+            cars = self.database.all("cars")
+        if sales_person is not None and isinstance(sales_person, SalesPersonReturnResource):
+            cars = [car for car in cars if car["sales_people_id"] == sales_person.id]
+        if is_past_purchase_deadline is not None and isinstance(is_past_purchase_deadline, bool):
+            current_date = date.today()
+            cars = [car for car in cars if (car["purchase_deadline"] < current_date) == is_past_purchase_deadline]
+
+        car_resources: List[CarReturnResource] = []
+        for car in cars:
+            is_car_purchased = self.is_purchased(car["id"])
+            if is_purchased is not None and isinstance(is_purchased, bool) and is_purchased != is_car_purchased:
+                continue
+            car_resources.append(prepare_in_memory_car(self.database, car, is_car_purchased))
+            if limit is not None and isinstance(limit, int) and 0 < limit <= len(car_resources):
+                break
+        return car_resources
+
+    @cached_per_request("car")
+    def get_by_id(self, car_id: str) -> Optional[CarReturnResource]:
+        car = self.database.get("cars", car_id)
+        if car is not None:
+            return prepare_in_memory_car(self.database, car, self.is_purchased(car_id))
+        return None
+
+    def create(
+            self,
+            car_create_data: CarCreateResource,
+            customer_resource: CustomerReturnResource,
+            sales_person_resource: SalesPersonReturnResource,
+            model_resource: ModelReturnResource,
+            color_resource: ColorReturnResource,
+            accessory_resources: List[AccessoryReturnResource],
+            insurance_resources: List[InsuranceReturnResource]
+    ) -> CarReturnResource:
+
+        new_car = self.database.insert("cars", {
+            "id": str(uuid4()),
+            "purchase_deadline": car_create_data.purchase_deadline,
+            "total_price": calculate_total_price_for_car(
+                model_resource,
+                color_resource,
+                accessory_resources,
+                insurance_resources
+            ),
+            "models_id": model_resource.id,
+            "colors_id": color_resource.id,
+            "customers_id": customer_resource.id,
+            "sales_people_id": sales_person_resource.id,
+            "accessories_ids": [accessory_resource.id for accessory_resource in accessory_resources],
+            "insurances_ids": [insurance_resource.id for insurance_resource in insurance_resources]
+        })
+        record_in_memory_changes(self.database, "car", [new_car["id"]], "upsert")
+        return prepare_in_memory_car(self.database, new_car, is_purchased=False)
+
+    def delete(self, car_resource: CarReturnResource, delete_purchase_too: bool):
+        evict("car", car_resource.id)
+        evict("car_is_purchased", car_resource.id)
+        with self.database.lock:
+            purchases = self.database.find("purchases", "cars_id", car_resource.id)
+            # Mirrors the foreign key from the purchases to the cars in MySQL.
+            if purchases and not delete_purchase_too:
+                raise UnableToDeleteCarWithoutDeletingPurchaseTooError(car_resource)
+            for purchase in purchases:
+                self.database.delete("purchases", purchase["id"])
+            self.database.delete("cars", car_resource.id)
+            record_in_memory_changes(self.database, "car", [car_resource.id], "delete")
+
         # Placeholder for future repositories
         # class OtherDBCarRepository(CarRepository):
         #     ...
@@ -1,11 +1,10 @@
 # External Library imports
 from abc import ABC, abstractmethod
-from typing import Optional, List, cast
+from typing import Optional, List, cast, TYPE_CHECKING
 from sqlalchemy.orm import Session
-from pymongo.database import Database
-from neo4j import Session as Neo4jSession, Query
 
 # Internal library imports
+from db import InMemoryDatabase
 from app.models.color import (
     ColorReturnResource,
     ColorMySQLEntity,
@@ -13,6 +12,10 @@ from app.models.color import (
     ColorNeo4jEntity
 )
 
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from neo4j import Session as Neo4jSession
+
 
 class ColorRepository(ABC):  # pragma: no cover
 
@@ -44,7 +47,7 @@ class MySQLColorRepository(ColorRepository):
 
 
 class MongoDBColorRepository(ColorRepository):  # pragma: no cover
-    def __init__(self, database: Database):
+    def __init__(self, database: "Database"):
         self.database = database
 
     def get_all(self, limit: Optional[int] = None) -> List[ColorReturnResource]:
@@ -63,14 +66,14 @@ class MongoDBColorRepository(ColorRepository):  # pragma: no cover
 
 
 class Neo4jColorRepository(ColorRepository):  # pragma: no cover
-    def __init__(self, neo4j_session: Neo4jSession):
+    def __init__(self, neo4j_session: "Neo4jSession"):
         self.neo4j_session = neo4j_session
 
     def get_all(self, limit: Optional[int] = None) -> List[ColorReturnResource]:
-        query = Query("MATCH (c:Color) RETURN c")
+        query = "MATCH (c:Color) RETURN c"
         parameters = {}
         if limit is not None and isinstance(limit, int) and limit > 0:
-            query += Query("MATCH (c:Color) RETURN c LIMIT $limit")
+            query = "MATCH (c:Color) RETURN c LIMIT $limit"
             parameters["limit"] = limit
         result = self.neo4j_session.run(query, parameters)
         colors = [ColorNeo4jEntity(**record["c"]).as_resource() for record in result]
@@ -85,3 +88,20 @@ class Neo4jColorRepository(ColorRepository):  # pragma: no cover
         if record is not None:
             return ColorNeo4jEntity(**record["c"]).as_resource()
         return None
+
+
+class InMemoryColorRepository(ColorRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def get_all(self, limit: Optional[int] = None) -> List[ColorReturnResource]:
+        colors = self.database.all("colors")
+        if limit is not None and isinstance(limit, int) and limit > 0:
+            colors = colors[:limit]
+        return [ColorReturnResource(**color) for color in colors]
+
+    def get_by_id(self, color_id: str) -> Optional[ColorReturnResource]:
+        color = self.database.get("colors", color_id)
+        if color is not None:
+            return ColorReturnResource(**color)
+        return None
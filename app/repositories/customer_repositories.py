@@ -1,19 +1,44 @@
 # External Library imports
+import re
+from uuid import uuid4
+from datetime import datetime, timezone
 from abc import ABC, abstractmethod
-from typing import Optional, Union, List, cast
+from typing import Optional, Union, List, cast, TYPE_CHECKING
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from pymongo.database import Database
-from pymongo import MongoClient
-from neo4j import Session as Neo4jSession, Query
+from sqlalchemy.dialects.mysql import match
 
 # Internal library imports
+from db import InMemoryDatabase
+from app.core.identity_cache import cached_per_request, evict
+from app.exceptions.database_errors import raise_already_taken_on_duplicate
+from app.models.change_event import record_mysql_changes, record_in_memory_changes
 from app.models.customer import (
+    MYSQL_EMAIL_NGRAM_SIZE,
+    MONGODB_EMAIL_NGRAM_SIZE,
     CustomerReturnResource,
     CustomerMySQLEntity,
     CustomerMongoEntity,
-    CustomerNeo4jEntity
+    CustomerNeo4jEntity,
+    get_email_ngrams
 )
-from app.resources.customer_resource import CustomerCreateResource, CustomerUpdateResource
+from app.resources.customer_resource import CustomerCreateResource, CustomerUpdateResource, EmailSearchMode
+
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from pymongo import MongoClient
+    from neo4j import Session as Neo4jSession
+
+
+# The MongoDB collection of customer changes, which the CustomerOutboxPropagator
+# applies to the customers embedded in the cars and purchases.
+CUSTOMER_OUTBOX_COLLECTION = "customer_outbox"
+
+
+def evict_customer(customer_id: str):
+    # The cars loaded earlier in the request carry the previous customer
+    evict("customer", customer_id)
+    evict("car")
 
 
 class CustomerRepository(ABC):  # pragma: no cover
@@ -22,7 +47,8 @@ class CustomerRepository(ABC):  # pragma: no cover
     def get_all(
             self,
             email_filter: Optional[str] = None,
-            limit: Optional[int] = None
+            limit: Optional[int] = None,
+            email_search_mode: EmailSearchMode = "contains"
     ) -> List[CustomerReturnResource]:
         pass
 
@@ -63,17 +89,32 @@ class MySQLCustomerRepository(CustomerRepository):
     def get_all(
             self,
             email_filter: Optional[str] = None,
-            limit: Optional[int] = None
+            limit: Optional[int] = None,
+            email_search_mode: EmailSearchMode = "contains"
     ) -> List[CustomerReturnResource]:
 
         customers_query = self.session.query(CustomerMySQLEntity)
         if email_filter is not None and isinstance(email_filter, str):
-            customers_query = customers_query.filter(CustomerMySQLEntity.email.contains(email_filter))
+            if email_search_mode == "prefix":
+                customers_query = customers_query.filter(
+                    CustomerMySQLEntity.email.startswith(email_filter, autoescape=True)
+                ).order_by(CustomerMySQLEntity.email)
+            elif email_search_mode == "fulltext" and len(email_filter.strip()) >= MYSQL_EMAIL_NGRAM_SIZE:
+                # The phrase is looked up in the FULLTEXT ngram index,
+                # and the LIKE only checks the rows found in the index.
+                phrase = '"' + email_filter.replace('"', '') + '"'
+                customers_query = customers_query.filter(
+                    match(CustomerMySQLEntity.email, against=phrase).in_boolean_mode(),
+                    CustomerMySQLEntity.email.contains(email_filter, autoescape=True)
+                ).order_by(func.locate(email_filter, CustomerMySQLEntity.email), CustomerMySQLEntity.email)
+            else:
+                customers_query = customers_query.filter(CustomerMySQLEntity.email.contains(email_filter))
         if limit is not None and isinstance(limit, int) and limit > 0:
             customers_query = customers_query.limit(limit)
         customers: List[CustomerMySQLEntity] = cast(List[CustomerMySQLEntity], customers_query.all())
         return [customer.as_resource() for customer in customers]
 
+    @cached_per_request("customer")
     def get_by_id(
             self,
             customer_id: str
@@ -96,9 +137,12 @@ class MySQLCustomerRepository(CustomerRepository):
             last_name=customer_create_data.last_name,
             address=customer_create_data.address,
         )
-        self.session.add(new_customer)
-        self.session.flush()
+        # The savepoint keeps the transaction usable when the email is already taken
+        with raise_already_taken_on_duplicate("Customer", "email", customer_create_data.email):
+            with self.session.begin_nested():
+                self.session.add(new_customer)
         self.session.refresh(new_customer)
+        record_mysql_changes(self.session, "customer", [new_customer.id], "upsert")
 
         return new_customer.as_resource()
 
@@ -107,6 +151,7 @@ class MySQLCustomerRepository(CustomerRepository):
             customer_id: str,
             customer_update_data: CustomerUpdateResource
     ) -> Optional[CustomerReturnResource]:
+        evict_customer(customer_id)
 
         customer: Optional[CustomerMySQLEntity] = self.session.get(CustomerMySQLEntity, customer_id)
         if customer is None:
@@ -114,6 +159,7 @@ class MySQLCustomerRepository(CustomerRepository):
 
         for key, value in customer_update_data.get_updated_fields().items():
             setattr(customer, key, value)
+        record_mysql_changes(self.session, "customer", [customer_id], "upsert")
 
         self.session.flush()
         self.session.refresh(customer)
@@ -124,9 +170,12 @@ class MySQLCustomerRepository(CustomerRepository):
             self,
             customer_resource: CustomerReturnResource
     ) -> None:
+        evict_customer(customer_resource.id)
         self.session.query(CustomerMySQLEntity).filter_by(id=customer_resource.id).delete(
             synchronize_session=False
         )
+        # The replicas delete the cars and purchases of the customer too, like the trigger and foreign key
+        record_mysql_changes(self.session, "customer", [customer_resource.id], "delete")
         self.session.flush()
 
     def is_email_taken(
@@ -141,23 +190,50 @@ class MySQLCustomerRepository(CustomerRepository):
 
 
 class MongoDBCustomerRepository(CustomerRepository):  # pragma: no cover
-    def __init__(self, database: Database):
+    def __init__(self, database: "Database"):
         self.database = database
 
     def get_all(
             self,
             email_filter: Optional[str] = None,
-            limit: Optional[int] = None
+            limit: Optional[int] = None,
+            email_search_mode: EmailSearchMode = "contains"
     ) -> List[CustomerReturnResource]:
+        if email_filter is not None and isinstance(email_filter, str) and email_search_mode == "fulltext" \
+                and len(email_filter) >= MONGODB_EMAIL_NGRAM_SIZE:
+            return self._search_by_email_ngrams(email_filter, limit)
         query = {}
         if email_filter is not None and isinstance(email_filter, str):
-            query["email"] = {"$regex": email_filter}
+            if email_search_mode == "prefix":
+                # An anchored case-sensitive regex is a range scan on the email index
+                query["email"] = {"$regex": f"^{re.escape(email_filter)}"}
+            else:
+                query["email"] = {"$regex": email_filter}
         customers_query = self.database.get_collection("customers").find(query)
+        if email_filter is not None and isinstance(email_filter, str) and email_search_mode == "prefix":
+            customers_query = customers_query.sort("email")
         if limit is not None and isinstance(limit, int) and limit > 0:
             customers_query = customers_query.limit(limit)
         customers = [CustomerMongoEntity(**customer).as_resource() for customer in customers_query]
         return customers
 
+    def _search_by_email_ngrams(self, email_filter: str, limit: Optional[int]) -> List[CustomerReturnResource]:
+        # The multikey index on email_ngrams finds the customers having all the n-grams of the filter,
+        # the regex removes those where they aren't in order, and the match position ranks them.
+        pipeline = [
+            {"$match": {
+                "email_ngrams": {"$all": get_email_ngrams(email_filter)},
+                "email": {"$regex": re.escape(email_filter), "$options": "i"}
+            }},
+            {"$addFields": {"email_match_position": {"$indexOfCP": [{"$toLower": "$email"}, email_filter.lower()]}}},
+            {"$sort": {"email_match_position": 1, "email": 1}}
+        ]
+        if limit is not None and isinstance(limit, int) and limit > 0:
+            pipeline.append({"$limit": limit})
+        customers = self.database.get_collection("customers").aggregate(pipeline)
+        return [CustomerMongoEntity(**customer).as_resource() for customer in customers]
+
+    @cached_per_request("customer")
     def get_by_id(
             self,
             customer_id: str
@@ -178,7 +254,10 @@ class MongoDBCustomerRepository(CustomerRepository):  # pragma: no cover
             last_name=customer_create_data.last_name,
             address=customer_create_data.address,
         )
-        self.database.get_collection("customers").insert_one(new_customer.model_dump(by_alias=True))
+        with raise_already_taken_on_duplicate("Customer", "email", customer_create_data.email):
+            self.database.get_collection("customers").insert_one(
+                {**new_customer.model_dump(by_alias=True), "email_ngrams": get_email_ngrams(new_customer.email)}
+            )
         return new_customer.as_resource()
 
     def update(
@@ -186,27 +265,37 @@ class MongoDBCustomerRepository(CustomerRepository):  # pragma: no cover
             customer_id: str,
             customer_update_data: CustomerUpdateResource
     ) -> Optional[CustomerReturnResource]:
+        evict_customer(customer_id)
+        updated_fields = customer_update_data.get_updated_fields()
+        if updated_fields.get("email") is not None:
+            updated_fields["email_ngrams"] = get_email_ngrams(updated_fields["email"])
+        # The change is recorded in the outbox after the update, since MongoDB only allows transactions on a replica set.
+        # The propagator copies the current customer when it reads the entry, so it never copies the customer
+        # from before the update.
         updated_customer = self.database.get_collection("customers").find_one_and_update(
             {"_id": customer_id},
-            {"$set": customer_update_data.get_updated_fields()},
+            {"$set": updated_fields},
+            projection={"email_ngrams": False},
             return_document=True
         )
         if updated_customer is not None:
-            self.database.get_collection("cars").update_many(
-                {"customer._id": customer_id},
-                {"$set": {"customer": updated_customer}}
-            )
-            self.database.get_collection("purchases").update_many(
-                {"car.customer._id": customer_id},
-                {"$set": {"car.customer": updated_customer}}
-            )
+            self._record_customer_change(customer_id)
             return CustomerMongoEntity(**updated_customer).as_resource()
         return None
 
+    def _record_customer_change(self, customer_id: str):
+        self.database.get_collection(CUSTOMER_OUTBOX_COLLECTION).insert_one({
+            "_id": str(uuid4()),
+            "customer_id": customer_id,
+            "created_at": datetime.now(timezone.utc),
+            "processed_at": None
+        })
+
     def delete(
             self,
             customer_resource: CustomerReturnResource
     ) -> None:
+        evict_customer(customer_resource.id)
         client: MongoClient = self.database.client
         session = client.start_session()
         try:
@@ -233,24 +322,37 @@ class MongoDBCustomerRepository(CustomerRepository):  # pragma: no cover
 
 
 class Neo4jCustomerRepository(CustomerRepository):  # pragma: no cover
-    def __init__(self, session: Neo4jSession):
+    def __init__(self, session: "Neo4jSession"):
         self.session = session
 
     def get_all(
             self,
             email_filter: Optional[str] = None,
-            limit: Optional[int] = None
+            limit: Optional[int] = None,
+            email_search_mode: EmailSearchMode = "contains"
     ) -> List[CustomerReturnResource]:
         query = "MATCH (c:Customer) "
-        if email_filter is not None and isinstance(email_filter, str):
-            query += f"WHERE c.email CONTAINS '{email_filter}' "
-        query += "RETURN c"
+        parameters = {}
+        if email_filter is not None and isinstance(email_filter, str) and email_search_mode == "prefix":
+            # STARTS WITH is a range seek on the index of the email uniqueness constraint
+            query += "WHERE c.email STARTS WITH $email_filter RETURN c ORDER BY c.email"
+            parameters["email_filter"] = email_filter
+        elif email_filter is not None and isinstance(email_filter, str) and email_search_mode == "fulltext":
+            # CONTAINS is looked up in the customer_email_text TEXT index, ranked by the match position
+            query += ("WHERE c.email CONTAINS $email_filter "
+                      "RETURN c ORDER BY size(split(c.email, $email_filter)[0]), c.email")
+            parameters["email_filter"] = email_filter
+        else:
+            if email_filter is not None and isinstance(email_filter, str):
+                query += f"WHERE c.email CONTAINS '{email_filter}' "
+            query += "RETURN c"
         if limit is not None and isinstance(limit, int) and limit > 0:
             query += f" LIMIT {limit}"
-        result = self.session.run(query)
+        result = self.session.run(query, parameters)
         customers = [record["c"] for record in result]
         return [CustomerNeo4jEntity(**customer).as_resource() for customer in customers]
 
+    @cached_per_request("customer")
     def get_by_id(
             self,
             customer_id: str
@@ -273,8 +375,9 @@ class Neo4jCustomerRepository(CustomerRepository):  # pragma: no cover
             last_name=customer_create_data.last_name,
             address=customer_create_data.address,
         )
-        query = Query("CREATE (c:Customer $customer_creat_data) RETURN c")
-        result = self.session.run(query, customer_creat_data=new_customer.model_dump())
+        query = "CREATE (c:Customer $customer_creat_data) RETURN c"
+        with raise_already_taken_on_duplicate("Customer", "email", customer_create_data.email):
+            result = self.session.run(query, customer_creat_data=new_customer.model_dump())
         created_customer = result.single()
         return CustomerNeo4jEntity(**created_customer["c"]).as_resource()
 
@@ -283,9 +386,10 @@ class Neo4jCustomerRepository(CustomerRepository):  # pragma: no cover
             customer_id: str,
             customer_update_data: CustomerUpdateResource
     ) -> Optional[CustomerReturnResource]:
+        evict_customer(customer_id)
         updated_fields = customer_update_data.get_updated_fields()
         set_clause = ", ".join([f"c.{key} = ${key}" for key in updated_fields.keys()])
-        query = Query(f"MATCH (c:Customer {{id: $customer_id}}) SET {set_clause} RETURN c")
+        query = f"MATCH (c:Customer {{id: $customer_id}}) SET {set_clause} RETURN c"
         parameters = {"customer_id": customer_id, **updated_fields}
         result = self.session.run(query, parameters)
         updated_customer = result.single()
@@ -297,12 +401,13 @@ class Neo4jCustomerRepository(CustomerRepository):  # pragma: no cover
             self,
             customer_resource: CustomerReturnResource
     ) -> None:
-        query = Query("""
+        evict_customer(customer_resource.id)
+        query = """
         MATCH (customer:Customer {id: $customer_id})
         OPTIONAL MATCH (car:Car)-[:OWNED_BY]->(customer)
         OPTIONAL MATCH (purchase:Purchase)-[:MADE_FOR]->(car)
         DETACH DELETE customer, car, purchase
-        """)
+        """
         self.session.run(query, customer_id=customer_resource.id)
 
     def is_email_taken(
@@ -316,3 +421,99 @@ class Neo4jCustomerRepository(CustomerRepository):  # pragma: no cover
         query += " RETURN c"
         result = self.session.run(query)
         return result.single() is not None
+
+
+class InMemoryCustomerRepository(CustomerRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def get_all(
+            self,
+            email_filter: Optional[str] = None,
+            limit: Optional[int] = None,
+            email_search_mode: EmailSearchMode = "contains"
+    ) -> List[CustomerReturnResource]:
+
+        customers = self.database.all("customers")
+        if email_filter is not None and isinstance(email_filter, str):
+            # Case-insensitive like the MySQL collation
+            lowered_email_filter = email_filter.lower()
+            if email_search_mode == "prefix":
+                customers = sorted(
+                    [customer for customer in customers if customer["email"].lower().startswith(lowered_email_filter)],
+                    key=lambda customer: customer["email"].lower()
+                )
+            else:
+                customers = [customer for customer in customers if lowered_email_filter in customer["email"].lower()]
+            if email_search_mode == "fulltext":
+                customers.sort(key=lambda customer: (
+                    customer["email"].lower().index(lowered_email_filter), customer["email"].lower()
+                ))
+        if limit is not None and isinstance(limit, int) and limit > 0:
+            customers = customers[:limit]
+        return [CustomerReturnResource(**customer) for customer in customers]
+
+    @cached_per_request("customer")
+    def get_by_id(
+            self,
+            customer_id: str
+    ) -> Optional[CustomerReturnResource]:
+
+        customer = self.database.get("customers", customer_id)
+        if customer is not None:
+            return CustomerReturnResource(**customer)
+        return None
+
+    def create(
+            self,
+            customer_create_data: CustomerCreateResource
+    ) -> CustomerReturnResource:
+
+        with raise_already_taken_on_duplicate("Customer", "email", customer_create_data.email):
+            new_customer = self.database.insert("customers", {
+                "id": str(uuid4()),
+                "email": customer_create_data.email,
+                "phone_number": customer_create_data.phone_number,
+                "first_name": customer_create_data.first_name,
+                "last_name": customer_create_data.last_name,
+                "address": customer_create_data.address,
+            })
+        record_in_memory_changes(self.database, "customer", [new_customer["id"]], "upsert")
+        return CustomerReturnResource(**new_customer)
+
+    def update(
+            self,
+            customer_id: str,
+            customer_update_data: CustomerUpdateResource
+    ) -> Optional[CustomerReturnResource]:
+        evict_customer(customer_id)
+
+        customer = self.database.update("customers", customer_id, customer_update_data.get_updated_fields())
+        if customer is None:
+            return None
+        record_in_memory_changes(self.database, "customer", [customer_id], "upsert")
+        return CustomerReturnResource(**customer)
+
+    def delete(
+            self,
+            customer_resource: CustomerReturnResource
+    ) -> None:
+        evict_customer(customer_resource.id)
+        # Mirrors the customers_BEFORE_DELETE trigger and the cascading foreign key of the cars in MySQL.
+        with self.database.lock:
+            for car in self.database.find("cars", "customers_id", customer_resource.id):
+                for purchase in self.database.find("purchases", "cars_id", car["id"]):
+                    self.database.delete("purchases", purchase["id"])
+                self.database.delete("cars", car["id"])
+            self.database.delete("customers", customer_resource.id)
+            record_in_memory_changes(self.database, "customer", [customer_resource.id], "delete")
+
+    def is_email_taken(
+            self,
+            customer_resource: Union[CustomerUpdateResource, CustomerCreateResource],
+            customer_id: Optional[str] = None
+    ) -> bool:
+        return any(
+            customer["id"] != customer_id
+            for customer in self.database.find("customers", "email", customer_resource.email)
+        )
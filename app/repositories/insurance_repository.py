@@ -1,17 +1,20 @@
 # External Library imports
 from abc import ABC, abstractmethod
-from typing import Optional, List, cast
+from typing import Optional, List, cast, TYPE_CHECKING
 from sqlalchemy.orm import Session as MySQLSession
-from pymongo.database import Database
-from neo4j import Session as Neo4jSession, Query
 
 # Internal library imports
+from db import InMemoryDatabase
 from app.models.insurance import (
     InsuranceReturnResource,
     InsuranceMySQLEntity,
     InsuranceMongoEntity,
     InsuranceNeo4jEntity)
 
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from neo4j import Session as Neo4jSession
+
 
 class InsuranceRepository(ABC):  # pragma: no cover
     @abstractmethod
@@ -42,7 +45,7 @@ class MySQLInsuranceRepository(InsuranceRepository):
 
 
 class MongoDBInsuranceRepository(InsuranceRepository):  # pragma: no cover
-    def __init__(self, database: Database):
+    def __init__(self, database: "Database"):
         self.database = database
 
     def get_all(self, limit: Optional[int] = None) -> List[InsuranceReturnResource]:
@@ -66,14 +69,14 @@ class MongoDBInsuranceRepository(InsuranceRepository):  # pragma: no cover
 
 
 class Neo4jInsuranceRepository(InsuranceRepository):  # pragma: no cover
-    def __init__(self, session: Neo4jSession):
+    def __init__(self, session: "Neo4jSession"):
         self.session = session
 
     def get_all(self, limit: Optional[int] = None) -> List[InsuranceReturnResource]:
-        query = Query("MATCH (i:Insurance) RETURN i")
+        query = "MATCH (i:Insurance) RETURN i"
         parameters = {}
         if limit is not None and isinstance(limit, int) and limit > 0:
-            query = Query("MATCH (i:Insurance) RETURN i LIMIT $limit")
+            query = "MATCH (i:Insurance) RETURN i LIMIT $limit"
             parameters["limit"] = limit
         result = self.session.run(query, parameters)
         accessories = [InsuranceNeo4jEntity(**record["i"]).as_resource() for record in result]
@@ -88,3 +91,20 @@ class Neo4jInsuranceRepository(InsuranceRepository):  # pragma: no cover
         if record is not None:
             return InsuranceNeo4jEntity(**record["i"]).as_resource()
         return None
+
+
+class InMemoryInsuranceRepository(InsuranceRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def get_all(self, limit: Optional[int] = None) -> List[InsuranceReturnResource]:
+        insurances = self.database.all("insurances")
+        if limit is not None and isinstance(limit, int) and limit > 0:
+            insurances = insurances[:limit]
+        return [InsuranceReturnResource(**insurance) for insurance in insurances]
+
+    def get_by_id(self, insurance_id: str) -> Optional[InsuranceReturnResource]:
+        insurance = self.database.get("insurances", insurance_id)
+        if insurance is not None:
+            return InsuranceReturnResource(**insurance)
+        return None
@@ -1,12 +1,11 @@
 # External Library imports
 from abc import ABC, abstractmethod
-from typing import Optional, List, cast
+from typing import Optional, List, cast, TYPE_CHECKING
 from sqlalchemy.orm import Session
-from pymongo.database import Database
-from neo4j import Session as Neo4jSession, Query
 
 # Internal library imports
-from app.resources.model_resource import BrandReturnResource
+from db import InMemoryDatabase
+from app.resources.model_resource import BrandReturnResource, ColorReturnResource
 from app.models.model import (
     ModelReturnResource,
     ModelMySQLEntity,
@@ -18,6 +17,21 @@ from app.models.model import (
     ColorNeo4jEntity
 )
 
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from neo4j import Session as Neo4jSession
+
+
+def prepare_in_memory_model(database: InMemoryDatabase, model: dict) -> ModelReturnResource:
+    return ModelReturnResource(
+        id=model["id"],
+        name=model["name"],
+        price=model["price"],
+        image_url=model["image_url"],
+        brand=BrandReturnResource(**database.get("brands", model["brands_id"])),
+        colors=[ColorReturnResource(**database.get("colors", color_id)) for color_id in model["colors_ids"]]
+    )
+
 
 class ModelRepository(ABC):  # pragma: no cover
     @abstractmethod
@@ -61,7 +75,7 @@ class MySQLModelRepository(ModelRepository):
 
 
 class MongoDBModelRepository(ModelRepository):  # pragma: no cover
-    def __init__(self, database: Database):
+    def __init__(self, database: "Database"):
         self.database = database
 
     def get_all(self,
@@ -97,7 +111,7 @@ class MongoDBModelRepository(ModelRepository):  # pragma: no cover
 
 
 class Neo4jModelRepository(ModelRepository):  # pragma: no cover
-    def __init__(self, neo4j_session: Neo4jSession):
+    def __init__(self, neo4j_session: "Neo4jSession"):
         self.neo4j_session = neo4j_session
 
     def get_all(
@@ -106,7 +120,7 @@ class Neo4jModelRepository(ModelRepository):  # pragma: no cover
             limit: Optional[int] = None
     ) -> List[ModelReturnResource]:
 
-        query = Query(
+        query = (
             """
             MATCH (model:Model)-[:BELONGS_TO]->(brand:Brand)
             OPTIONAL MATCH (model)-[:HAS_COLOR]->(color:Color)
@@ -115,7 +129,7 @@ class Neo4jModelRepository(ModelRepository):  # pragma: no cover
         )
         parameters = {}
         if brand_resource is not None and isinstance(brand_resource, BrandReturnResource):
-            query = Query(
+            query = (
                 """
                 MATCH (model:Model)-[:BELONGS_TO]->(brand:Brand {id: $brand_id})
                 OPTIONAL MATCH (model)-[:HAS_COLOR]->(color:Color)
@@ -124,7 +138,7 @@ class Neo4jModelRepository(ModelRepository):  # pragma: no cover
             )
             parameters["brand_id"] = brand_resource.id
         if limit is not None and isinstance(limit, int) and limit > 0:
-            query = Query(f"{query.text} LIMIT $limit")
+            query = f"{query} LIMIT $limit"
             parameters["limit"] = limit
         result = self.neo4j_session.run(query, parameters)
         models: List[ModelReturnResource] = []
@@ -136,7 +150,7 @@ class Neo4jModelRepository(ModelRepository):  # pragma: no cover
         return models
 
     def get_by_id(self, model_id: str) -> Optional[ModelReturnResource]:
-        query = Query(
+        query = (
             """
             MATCH (model:Model {id: $model_id})-[:BELONGS_TO]->(brand:Brand)
             OPTIONAL MATCH (model)-[:HAS_COLOR]->(color:Color)
@@ -151,3 +165,28 @@ class Neo4jModelRepository(ModelRepository):  # pragma: no cover
             model = ModelNeo4jEntity(**record["model"], brand=brand, colors=colors)
             return model.as_resource()
         return None
+
+
+class InMemoryModelRepository(ModelRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def get_all(
+            self,
+            brand_resource: Optional[BrandReturnResource] = None,
+            limit: Optional[int] = None
+    ) -> List[ModelReturnResource]:
+
+        if brand_resource is not None and isinstance(brand_resource, BrandReturnResource):
+            models = self.database.find("models", "brands_id", brand_resource.id)
+        else:
+            models = self.database.all("models")
+        if limit is not None and isinstance(limit, int) and limit > 0:
+            models = models[:limit]
+        return [prepare_in_memory_model(self.database, model) for model in models]
+
+    def get_by_id(self, model_id: str) -> Optional[ModelReturnResource]:
+        model = self.database.get("models", model_id)
+        if model is not None:
+            return prepare_in_memory_model(self.database, model)
+        return None
@@ -0,0 +1,20 @@
+"""
+The PyMongo bulk write operations of the MongoDB repositories, imported when they are first used,
+like the MongoDB and Neo4j types of the db module, so deployments that only enable the MySQL backend
+never load pymongo, see ENABLED_BACKENDS.
+
+Usage:
+    from app.repositories import mongodb_operations
+    collection.bulk_write([mongodb_operations.ReplaceOne({"_id": car_id}, car)])
+"""
+from typing import Any
+
+MONGODB_OPERATIONS = ("ReplaceOne", "UpdateOne", "UpdateMany")
+
+
+def __getattr__(name: str) -> Any:
+    if name in MONGODB_OPERATIONS:
+        # The only place the operations are imported, on the first MongoDB bulk write
+        import pymongo  # pylint: disable=import-outside-toplevel
+        return getattr(pymongo, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
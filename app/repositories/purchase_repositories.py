@@ -1,14 +1,41 @@
 # External Library imports
+from uuid import uuid4
 from abc import ABC, abstractmethod
-from typing import Optional, List, cast
-from pymongo.database import Database
+from typing import Optional, List, cast, TYPE_CHECKING
 from sqlalchemy.orm import Session
 
 # Internal library imports
+from db import InMemoryDatabase
+from app.core.identity_cache import cached_per_request, store, evict
+from app.exceptions.database_errors import raise_already_taken_on_duplicate
 from app.models.car import prepare_car
+from app.models.change_event import record_mysql_changes, record_in_memory_changes
+from app.repositories.car_repositories import prepare_in_memory_car
+from app.repositories.analytics_repositories import (
+    add_sale_to_mysql_rollup,
+    add_sale_to_mongodb_rollup,
+    add_sale_to_in_memory_rollup
+)
 from app.models.purchase import PurchaseReturnResource, PurchaseMySQLEntity, PurchaseMongoEntity
 from app.resources.purchase_resource import PurchaseCreateResource, CarReturnResource
 
+if TYPE_CHECKING:
+    from pymongo.database import Database
+
+
+def prepare_in_memory_purchase(database: InMemoryDatabase, purchase: dict) -> PurchaseReturnResource:
+    return PurchaseReturnResource(
+        id=purchase["id"],
+        date_of_purchase=purchase["date_of_purchase"],
+        car=prepare_in_memory_car(database, database.get("cars", purchase["cars_id"]), is_purchased=True)
+    )
+
+
+def remember_purchase(car_resource: CarReturnResource):
+    # The car was loaded as not purchased earlier in the request
+    store("car_is_purchased", car_resource.id, True)
+    evict("car", car_resource.id)
+
 
 class PurchaseRepository(ABC):  # pragma: no cover
 
@@ -67,18 +94,26 @@ class MySQLPurchaseRepository(PurchaseRepository):
             cars_id=car_resource.id,
             date_of_purchase=purchase_create_data.date_of_purchase
         )
-        self.session.add(new_purchase)
-        self.session.flush()
+        # The savepoint keeps the transaction usable when the car is already purchased
+        with raise_already_taken_on_duplicate("Purchase", "cars_id", car_resource.id):
+            with self.session.begin_nested():
+                self.session.add(new_purchase)
+                self.session.flush()
+        # The rollup is updated in the same transaction, so it never disagrees with the purchases
+        add_sale_to_mysql_rollup(self.session, car_resource, new_purchase.date_of_purchase)
+        record_mysql_changes(self.session, "purchase", [new_purchase.id], "upsert")
         self.session.refresh(new_purchase)
+        remember_purchase(car_resource)
 
         return new_purchase.as_resource()
 
+    @cached_per_request("car_is_purchased", get_key=lambda car_resource: car_resource.id)
     def is_car_taken(self, car_resource: CarReturnResource) -> bool:
         return self.session.query(PurchaseMySQLEntity).filter_by(cars_id=car_resource.id).first() is not None
 
 
 class MongoDBPurchaseRepository(PurchaseRepository):  # pragma: no cover
-    def __init__(self, database: Database):
+    def __init__(self, database: "Database"):
         self.database = database
 
 
@@ -136,12 +171,61 @@ class MongoDBPurchaseRepository(PurchaseRepository):  # pragma: no cover
             car=car_entity,
             date_of_purchase=purchase_create_data.date_of_purchase
         )
-        self.database.get_collection("purchases").insert_one(new_purchase.model_dump(by_alias=True))
+        with raise_already_taken_on_duplicate("Purchase", "cars_id", car_resource.id):
+            self.database.get_collection("purchases").insert_one(new_purchase.model_dump(by_alias=True))
+        add_sale_to_mongodb_rollup(self.database, car_resource, purchase_create_data.date_of_purchase)
+        remember_purchase(car_resource)
         return new_purchase.as_resource()
 
+    @cached_per_request("car_is_purchased", get_key=lambda car_resource: car_resource.id)
     def is_car_taken(self, car_resource: CarReturnResource) -> bool:
         return self.database.get_collection("purchases").count_documents({"car._id": car_resource.id}) > 0
 
+
+class InMemoryPurchaseRepository(PurchaseRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def get_all(self, limit: Optional[int] = None) -> List[PurchaseReturnResource]:
+        purchases = self.database.all("purchases")
+        if limit is not None and isinstance(limit, int) and limit > 0:
+            purchases = purchases[:limit]
+        return [prepare_in_memory_purchase(self.database, purchase) for purchase in purchases]
+
+    def get_by_id(self, purchase_id: str) -> Optional[PurchaseReturnResource]:
+        purchase = self.database.get("purchases", purchase_id)
+        if purchase is not None:
+            return prepare_in_memory_purchase(self.database, purchase)
+        return None
+
+    def get_by_car_id(self, car_resource: CarReturnResource) -> Optional[PurchaseReturnResource]:
+        purchases = self.database.find("purchases", "cars_id", car_resource.id)
+        if purchases:
+            return prepare_in_memory_purchase(self.database, purchases[0])
+        return None
+
+    def create(
+            self,
+            purchase_create_data: PurchaseCreateResource,
+            car_resource: CarReturnResource
+    ) -> PurchaseReturnResource:
+        with raise_already_taken_on_duplicate("Purchase", "cars_id", car_resource.id):
+            new_purchase = self.database.insert("purchases", {
+                "id": str(uuid4()),
+                "cars_id": car_resource.id,
+                "date_of_purchase": purchase_create_data.date_of_purchase
+            })
+        add_sale_to_in_memory_rollup(self.database, car_resource, new_purchase["date_of_purchase"])
+        record_in_memory_changes(self.database, "purchase", [new_purchase["id"]], "upsert")
+        remember_purchase(car_resource)
+        return prepare_in_memory_purchase(self.database, new_purchase)
+
+    @cached_per_request("car_is_purchased", get_key=lambda car_resource: car_resource.id)
+    def is_car_taken(self, car_resource: CarReturnResource) -> bool:
+        return len(self.database.find("purchases", "cars_id", car_resource.id)) > 0
+
+
+
 # Placeholder for future repositories
 # class OtherDBPurchaseRepository(PurchaseRepository):
 #     ...
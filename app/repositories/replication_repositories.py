@@ -0,0 +1,578 @@
+# External Library imports
+from datetime import datetime
+from itertools import takewhile
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+from sqlalchemy.sql import functions
+from sqlalchemy.orm import Session
+
+# Internal library imports
+from db import InMemoryDatabase
+from app.core.config import SUPPORTED_REPLICAS
+from app.repositories import mongodb_operations
+from app.models.car import CarMySQLEntity, CarReturnResource, prepare_car
+from app.models.customer import CustomerMySQLEntity, CustomerMongoEntity, CustomerReturnResource, get_email_ngrams
+from app.models.purchase import PurchaseMySQLEntity, PurchaseMongoEntity, PurchaseReturnResource
+from app.models.sales_person import SalesPersonMySQLEntity, SalesPersonMongoEntity, SalesPersonReturnResource
+from app.models.change_event import ChangeEventMySQLEntity, ReplicationOffsetMySQLEntity
+from app.repositories.car_repositories import prepare_in_memory_car
+from app.repositories.purchase_repositories import prepare_in_memory_purchase
+from app.repositories.sales_person_repositories import prepare_in_memory_sales_person
+from app.repositories.analytics_repositories import add_sale_to_mongodb_rollup, add_sale_to_in_memory_rollup
+
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from neo4j import Session as Neo4jSession
+
+
+# The ID, aggregate, aggregate ID and creation time of a change event
+ChangeEvent = Tuple[int, str, str, datetime]
+# A sales person together with the hashed password, which the replicas store but the resource never holds
+SalesPersonWithPassword = Tuple[SalesPersonReturnResource, str]
+
+
+def get_applied_change_id(offsets: Dict[str, int]) -> int:
+    # A supported replica without an offset has not applied any change event yet, so nothing is pruned before it has
+    return min([offsets.get(replica, 0) for replica in SUPPORTED_REPLICAS] + list(offsets.values()))
+
+
+def takewhile_created_before(changes: List[Tuple[int, datetime]], created_before: datetime) -> Iterator[int]:
+    # The IDs of the change events roughly follow their creation time, so the pruning stops at the first newer one
+    return (change_id for change_id, _ in takewhile(lambda change: change[1] < created_before, changes))
+
+
+class ReplicationSourceRepository(ABC):  # pragma: no cover
+    """
+    The outbox of change events and the current state of the changed aggregates, which the replicas copy.
+    """
+
+    @abstractmethod
+    def get_changes(self, after_change_id: int, limit: int) -> List[ChangeEvent]:
+        """
+        Returns up to limit change events after the given change ID, ordered by ID.
+        """
+        pass
+
+    @abstractmethod
+    def get_changes_by_ids(self, change_ids: List[int]) -> List[ChangeEvent]:
+        """
+        Returns the change events of the given IDs that exist, ordered by ID.
+        """
+        pass
+
+    @abstractmethod
+    def get_pending_changes(self, after_change_id: int) -> Tuple[int, Optional[datetime]]:
+        """
+        Returns the amount of change events after the given change ID and when the oldest of them was created.
+        """
+        pass
+
+    @abstractmethod
+    def get_offset(self, replica: str) -> int:
+        """
+        Returns the ID of the last change event applied to the replica, 0 when none has been applied.
+        """
+        pass
+
+    @abstractmethod
+    def save_offset(self, replica: str, last_change_id: int):
+        pass
+
+    @abstractmethod
+    def prune_changes(self, created_before: datetime, limit: int) -> int:
+        """
+        Deletes up to limit of the oldest change events created before created_before that every replica has applied,
+        counting the supported replicas without an offset as having applied none, and returns the amount of deleted change events.
+        """
+        pass
+
+    @abstractmethod
+    def get_customers(self, customer_ids: List[str]) -> List[CustomerReturnResource]:
+        pass
+
+    @abstractmethod
+    def get_sales_people(self, sales_person_ids: List[str]) -> List[SalesPersonWithPassword]:
+        pass
+
+    @abstractmethod
+    def get_cars(self, car_ids: List[str]) -> List[CarReturnResource]:
+        pass
+
+    @abstractmethod
+    def get_purchases(self, purchase_ids: List[str]) -> List[PurchaseReturnResource]:
+        pass
+
+
+class MySQLReplicationSourceRepository(ReplicationSourceRepository):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_changes(self, after_change_id: int, limit: int) -> List[ChangeEvent]:
+        # Ends the previous read, so the REPEATABLE READ snapshot includes the changes committed since
+        self.session.commit()
+        changes_query = self.session.query(
+            ChangeEventMySQLEntity.id,
+            ChangeEventMySQLEntity.aggregate,
+            ChangeEventMySQLEntity.aggregate_id,
+            ChangeEventMySQLEntity.created_at
+        ).filter(ChangeEventMySQLEntity.id > after_change_id).order_by(ChangeEventMySQLEntity.id).limit(limit)
+        return [tuple(change) for change in changes_query.all()]
+
+    def get_changes_by_ids(self, change_ids: List[int]) -> List[ChangeEvent]:
+        changes_query = self.session.query(
+            ChangeEventMySQLEntity.id,
+            ChangeEventMySQLEntity.aggregate,
+            ChangeEventMySQLEntity.aggregate_id,
+            ChangeEventMySQLEntity.created_at
+        ).filter(ChangeEventMySQLEntity.id.in_(change_ids)).order_by(ChangeEventMySQLEntity.id)
+        return [tuple(change) for change in changes_query.all()]
+
+    def get_pending_changes(self, after_change_id: int) -> Tuple[int, Optional[datetime]]:
+        pending_changes, oldest_created_at = self.session.query(
+            functions.count(ChangeEventMySQLEntity.id), functions.min(ChangeEventMySQLEntity.created_at)
+        ).filter(ChangeEventMySQLEntity.id > after_change_id).one()
+        return pending_changes, oldest_created_at
+
+    def get_offset(self, replica: str) -> int:
+        offset: Optional[ReplicationOffsetMySQLEntity] = self.session.get(ReplicationOffsetMySQLEntity, replica)
+        return offset.last_change_id if offset is not None else 0
+
+    def save_offset(self, replica: str, last_change_id: int):
+        self.session.merge(ReplicationOffsetMySQLEntity(replica=replica, last_change_id=last_change_id))
+        self.session.commit()
+
+    def prune_changes(self, created_before: datetime, limit: int) -> int:
+        applied_change_id = get_applied_change_id(dict(self.session.query(
+            ReplicationOffsetMySQLEntity.replica, ReplicationOffsetMySQLEntity.last_change_id
+        ).all()))
+        if not applied_change_id:
+            return 0
+        # The oldest applied change events, which are old enough up to the first one created after created_before
+        oldest_changes = self.session.query(ChangeEventMySQLEntity.id, ChangeEventMySQLEntity.created_at).filter(
+            ChangeEventMySQLEntity.id <= applied_change_id
+        ).order_by(ChangeEventMySQLEntity.id).limit(limit).all()
+        prunable_change_ids = list(takewhile_created_before(oldest_changes, created_before))
+        if not prunable_change_ids:
+            return 0
+        # A range of the primary key, so the delete only locks the pruned change events
+        pruned_changes = self.session.query(ChangeEventMySQLEntity).filter(
+            ChangeEventMySQLEntity.id.between(prunable_change_ids[0], prunable_change_ids[-1])
+        ).delete(synchronize_session=False)
+        self.session.commit()
+        return pruned_changes
+
+    def get_customers(self, customer_ids: List[str]) -> List[CustomerReturnResource]:
+        customers = self.session.query(CustomerMySQLEntity).filter(CustomerMySQLEntity.id.in_(customer_ids)).all()
+        return [customer.as_resource() for customer in customers]
+
+    def get_sales_people(self, sales_person_ids: List[str]) -> List[SalesPersonWithPassword]:
+        sales_people = self.session.query(SalesPersonMySQLEntity).filter(
+            SalesPersonMySQLEntity.id.in_(sales_person_ids)
+        ).all()
+        return [(sales_person.as_resource(), sales_person.hashed_password) for sales_person in sales_people]
+
+    def get_cars(self, car_ids: List[str]) -> List[CarReturnResource]:
+        cars = self.session.query(CarMySQLEntity).filter(CarMySQLEntity.id.in_(car_ids)).all()
+        purchased_car_ids = {car_id for (car_id,) in self.session.query(PurchaseMySQLEntity.cars_id).filter(
+            PurchaseMySQLEntity.cars_id.in_(car_ids)
+        ).all()}
+        return [car.as_resource(is_purchased=car.id in purchased_car_ids) for car in cars]
+
+    def get_purchases(self, purchase_ids: List[str]) -> List[PurchaseReturnResource]:
+        purchases = self.session.query(PurchaseMySQLEntity).filter(PurchaseMySQLEntity.id.in_(purchase_ids)).all()
+        return [purchase.as_resource() for purchase in purchases]
+
+
+class InMemoryReplicationSourceRepository(ReplicationSourceRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def get_changes(self, after_change_id: int, limit: int) -> List[ChangeEvent]:
+        # The change events are inserted in the order of their ID
+        changes = [
+            (change["id"], change["aggregate"], change["aggregate_id"], change["created_at"])
+            for change in self.database.all("change_events") if change["id"] > after_change_id
+        ]
+        return changes[:limit]
+
+    def get_changes_by_ids(self, change_ids: List[int]) -> List[ChangeEvent]:
+        changes = (self.database.get("change_events", change_id) for change_id in sorted(change_ids))
+        return [
+            (change["id"], change["aggregate"], change["aggregate_id"], change["created_at"])
+            for change in changes if change is not None
+        ]
+
+    def get_pending_changes(self, after_change_id: int) -> Tuple[int, Optional[datetime]]:
+        pending_changes = [change for change in self.database.all("change_events") if change["id"] > after_change_id]
+        return len(pending_changes), min((change["created_at"] for change in pending_changes), default=None)
+
+    def get_offset(self, replica: str) -> int:
+        offset = self.database.get("replication_offsets", replica)
+        return offset["last_change_id"] if offset is not None else 0
+
+    def save_offset(self, replica: str, last_change_id: int):
+        with self.database.lock:
+            if self.database.update("replication_offsets", replica, {"last_change_id": last_change_id}) is None:
+                self.database.insert("replication_offsets", {"id": replica, "last_change_id": last_change_id})
+
+    def prune_changes(self, created_before: datetime, limit: int) -> int:
+        with self.database.lock:
+            applied_change_id = get_applied_change_id({
+                offset["id"]: offset["last_change_id"] for offset in self.database.all("replication_offsets")
+            })
+            oldest_changes = [
+                (change["id"], change["created_at"])
+                for change in self.database.all("change_events") if change["id"] <= applied_change_id
+            ][:limit]
+            prunable_change_ids = list(takewhile_created_before(oldest_changes, created_before))
+            for change_id in prunable_change_ids:
+                self.database.delete("change_events", change_id)
+        return len(prunable_change_ids)
+
+    def get_customers(self, customer_ids: List[str]) -> List[CustomerReturnResource]:
+        customers = [self.database.get("customers", customer_id) for customer_id in customer_ids]
+        return [CustomerReturnResource(**customer) for customer in customers if customer is not None]
+
+    def get_sales_people(self, sales_person_ids: List[str]) -> List[SalesPersonWithPassword]:
+        sales_people = [self.database.get("sales_people", sales_person_id) for sales_person_id in sales_person_ids]
+        return [
+            (prepare_in_memory_sales_person(sales_person), sales_person["hashed_password"])
+            for sales_person in sales_people if sales_person is not None
+        ]
+
+    def get_cars(self, car_ids: List[str]) -> List[CarReturnResource]:
+        cars = [self.database.get("cars", car_id) for car_id in car_ids]
+        return [
+            prepare_in_memory_car(self.database, car, is_purchased=bool(self.database.find("purchases", "cars_id", car["id"])))
+            for car in cars if car is not None
+        ]
+
+    def get_purchases(self, purchase_ids: List[str]) -> List[PurchaseReturnResource]:
+        purchases = [self.database.get("purchases", purchase_id) for purchase_id in purchase_ids]
+        return [prepare_in_memory_purchase(self.database, purchase) for purchase in purchases if purchase is not None]
+
+
+class ReplicaRepository(ABC):  # pragma: no cover
+    """
+    A copy of the MySQL aggregates in another database, written by the change replicator.
+    The upserts write the whole current state, so applying the same change again changes nothing.
+    """
+
+    @abstractmethod
+    def upsert_customers(self, customers: List[CustomerReturnResource]):
+        pass
+
+    @abstractmethod
+    def delete_customers(self, customer_ids: List[str]):
+        """
+        Deletes the customers together with their cars and purchases,
+        like the customers_BEFORE_DELETE trigger and the cascading foreign key of the cars in MySQL.
+        """
+        pass
+
+    @abstractmethod
+    def upsert_sales_people(self, sales_people: List[SalesPersonWithPassword]):
+        pass
+
+    @abstractmethod
+    def delete_sales_people(self, sales_person_ids: List[str]):
+        pass
+
+    @abstractmethod
+    def upsert_cars(self, cars: List[CarReturnResource]):
+        pass
+
+    @abstractmethod
+    def delete_cars(self, car_ids: List[str]):
+        """
+        Deletes the cars together with their purchases.
+        """
+        pass
+
+    @abstractmethod
+    def upsert_purchases(self, purchases: List[PurchaseReturnResource]):
+        """
+        Upserts the purchases and adds the new ones to the sales rollup of the replica.
+        """
+        pass
+
+    @abstractmethod
+    def delete_purchases(self, purchase_ids: List[str]):
+        pass
+
+
+class MongoDBReplicaRepository(ReplicaRepository):  # pragma: no cover
+    def __init__(self, database: "Database"):
+        self.database = database
+
+    def upsert_customers(self, customers: List[CustomerReturnResource]):
+        customer_documents = [
+            CustomerMongoEntity(**customer.model_dump(), _id=customer.id).model_dump(by_alias=True)
+            for customer in customers
+        ]
+        self.database.get_collection("customers").bulk_write([
+            mongodb_operations.ReplaceOne(
+                {"_id": customer["_id"]},
+                {**customer, "email_ngrams": get_email_ngrams(customer["email"])},
+                upsert=True
+            )
+            for customer in customer_documents
+        ], ordered=False)
+        # The embedded copies are written right away, instead of through the customer outbox
+        self.database.get_collection("cars").bulk_write([
+            mongodb_operations.UpdateMany({"customer._id": customer["_id"]}, {"$set": {"customer": customer}})
+            for customer in customer_documents
+        ], ordered=False)
+        self.database.get_collection("purchases").bulk_write([
+            mongodb_operations.UpdateMany({"car.customer._id": customer["_id"]}, {"$set": {"car.customer": customer}})
+            for customer in customer_documents
+        ], ordered=False)
+
+    def delete_customers(self, customer_ids: List[str]):
+        self.database.get_collection("purchases").delete_many({"car.customer._id": {"$in": customer_ids}})
+        self.database.get_collection("cars").delete_many({"customer._id": {"$in": customer_ids}})
+        self.database.get_collection("customers").delete_many({"_id": {"$in": customer_ids}})
+
+    def upsert_sales_people(self, sales_people: List[SalesPersonWithPassword]):
+        sales_person_documents = [
+            SalesPersonMongoEntity(
+                **sales_person.model_dump(), hashed_password=hashed_password, _id=sales_person.id
+            ).model_dump(by_alias=True)
+            for sales_person, hashed_password in sales_people
+        ]
+        self.database.get_collection("sales_people").bulk_write([
+            mongodb_operations.ReplaceOne({"_id": sales_person["_id"]}, sales_person, upsert=True)
+            for sales_person in sales_person_documents
+        ], ordered=False)
+        self.database.get_collection("cars").bulk_write([
+            mongodb_operations.UpdateMany(
+                {"sales_person._id": sales_person["_id"]}, {"$set": {"sales_person": sales_person}}
+            )
+            for sales_person in sales_person_documents
+        ], ordered=False)
+        self.database.get_collection("purchases").bulk_write([
+            mongodb_operations.UpdateMany(
+                {"car.sales_person._id": sales_person["_id"]}, {"$set": {"car.sales_person": sales_person}}
+            )
+            for sales_person in sales_person_documents
+        ], ordered=False)
+
+    def delete_sales_people(self, sales_person_ids: List[str]):
+        self.database.get_collection("sales_people").delete_many({"_id": {"$in": sales_person_ids}})
+
+    def upsert_cars(self, cars: List[CarReturnResource]):
+        # The sales people are upserted first, so prepare_car finds their hashed passwords
+        self.database.get_collection("cars").bulk_write([
+            mongodb_operations.ReplaceOne(
+                {"_id": car.id}, prepare_car(self.database, car).model_dump(by_alias=True), upsert=True
+            )
+            for car in cars
+        ], ordered=False)
+
+    def delete_cars(self, car_ids: List[str]):
+        self.database.get_collection("purchases").delete_many({"car._id": {"$in": car_ids}})
+        self.database.get_collection("cars").delete_many({"_id": {"$in": car_ids}})
+
+    def upsert_purchases(self, purchases: List[PurchaseReturnResource]):
+        result = self.database.get_collection("purchases").bulk_write([
+            mongodb_operations.ReplaceOne({"_id": purchase.id}, PurchaseMongoEntity(
+                _id=purchase.id,
+                car=prepare_car(self.database, purchase.car),
+                date_of_purchase=purchase.date_of_purchase
+            ).model_dump(by_alias=True), upsert=True)
+            for purchase in purchases
+        ], ordered=False)
+        # Only the purchases inserted by this batch are new sales, a replayed purchase is replaced
+        for operation_index in result.upserted_ids:
+            purchase = purchases[operation_index]
+            add_sale_to_mongodb_rollup(self.database, purchase.car, purchase.date_of_purchase)
+
+    def delete_purchases(self, purchase_ids: List[str]):
+        self.database.get_collection("purchases").delete_many({"_id": {"$in": purchase_ids}})
+
+
+class Neo4jReplicaRepository(ReplicaRepository):  # pragma: no cover
+    def __init__(self, neo4j_session: "Neo4jSession"):
+        self.neo4j_session = neo4j_session
+
+    def upsert_customers(self, customers: List[CustomerReturnResource]):
+        query = (
+            """
+            UNWIND $customers AS customer
+            MERGE (c:Customer {id: customer.id})
+            SET c += customer
+            """
+        )
+        self.neo4j_session.run(query, {"customers": [customer.model_dump() for customer in customers]})
+
+    def delete_customers(self, customer_ids: List[str]):
+        query = (
+            """
+            MATCH (customer:Customer)
+            WHERE customer.id IN $customer_ids
+            OPTIONAL MATCH (car:Car)-[:OWNED_BY]->(customer)
+            OPTIONAL MATCH (purchase:Purchase)-[:MADE_FOR]->(car)
+            DETACH DELETE customer, car, purchase
+            """
+        )
+        self.neo4j_session.run(query, {"customer_ids": customer_ids})
+
+    def upsert_sales_people(self, sales_people: List[SalesPersonWithPassword]):
+        query = (
+            """
+            UNWIND $sales_people AS sales_person
+            MERGE (sp:SalesPerson {id: sales_person.id})
+            SET sp += sales_person
+            """
+        )
+        self.neo4j_session.run(query, {"sales_people": [
+            {**sales_person.model_dump(), "hashed_password": hashed_password}
+            for sales_person, hashed_password in sales_people
+        ]})
+
+    def delete_sales_people(self, sales_person_ids: List[str]):
+        query = "MATCH (sp:SalesPerson) WHERE sp.id IN $sales_person_ids DETACH DELETE sp"
+        self.neo4j_session.run(query, {"sales_person_ids": sales_person_ids})
+
+    def upsert_cars(self, cars: List[CarReturnResource]):
+        # The relationships of a replayed car are replaced, so they always match the car in MySQL
+        query = (
+            """
+            UNWIND $cars AS car
+            MERGE (c:Car {id: car.id})
+            SET c.purchase_deadline = car.purchase_deadline, c.total_price = car.total_price
+            WITH c, car
+            OPTIONAL MATCH (c)-[relationship:HAS_MODEL|HAS_COLOR|OWNED_BY|SOLD_BY|HAS_ACCESSORY|HAS_INSURANCE]->()
+            DELETE relationship
+            WITH DISTINCT c, car
+            MATCH (m:Model {id: car.model_id}), (color:Color {id: car.color_id}),
+                  (customer:Customer {id: car.customer_id}), (sp:SalesPerson {id: car.sales_person_id})
+            CREATE (c)-[:HAS_MODEL]->(m), (c)-[:HAS_COLOR]->(color), (c)-[:OWNED_BY]->(customer), (c)-[:SOLD_BY]->(sp)
+            WITH c, car
+            CALL {
+                WITH c, car
+                UNWIND car.accessory_ids AS accessory_id
+                MATCH (a:Accessory {id: accessory_id})
+                CREATE (c)-[:HAS_ACCESSORY]->(a)
+            }
+            CALL {
+                WITH c, car
+                UNWIND car.insurance_ids AS insurance_id
+                MATCH (i:Insurance {id: insurance_id})
+                CREATE (c)-[:HAS_INSURANCE]->(i)
+            }
+            """
+        )
+        self.neo4j_session.run(query, {"cars": [
+            {
+                "id": car.id,
+                "purchase_deadline": car.purchase_deadline,
+                "total_price": car.total_price,
+                "model_id": car.model.id,
+                "color_id": car.color.id,
+                "customer_id": car.customer.id,
+                "sales_person_id": car.sales_person.id,
+                "accessory_ids": [accessory.id for accessory in car.accessories],
+                "insurance_ids": [insurance.id for insurance in car.insurances]
+            }
+            for car in cars
+        ]})
+
+    def delete_cars(self, car_ids: List[str]):
+        query = (
+            """
+            MATCH (car:Car)
+            WHERE car.id IN $car_ids
+            OPTIONAL MATCH (purchase:Purchase)-[:MADE_FOR]->(car)
+            DETACH DELETE car, purchase
+            """
+        )
+        self.neo4j_session.run(query, {"car_ids": car_ids})
+
+    def upsert_purchases(self, purchases: List[PurchaseReturnResource]):
+        # Neo4j aggregates the sales from the purchases, so it has no rollup to add the new purchases to
+        query = (
+            """
+            UNWIND $purchases AS purchase
+            MATCH (car:Car {id: purchase.car_id})
+            MERGE (p:Purchase {id: purchase.id})
+            SET p.date_of_purchase = purchase.date_of_purchase
+            MERGE (p)-[:MADE_FOR]->(car)
+            """
+        )
+        self.neo4j_session.run(query, {"purchases": [
+            {"id": purchase.id, "car_id": purchase.car.id, "date_of_purchase": purchase.date_of_purchase}
+            for purchase in purchases
+        ]})
+
+    def delete_purchases(self, purchase_ids: List[str]):
+        query = "MATCH (p:Purchase) WHERE p.id IN $purchase_ids DETACH DELETE p"
+        self.neo4j_session.run(query, {"purchase_ids": purchase_ids})
+
+
+class InMemoryReplicaRepository(ReplicaRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def upsert_row(self, table: str, row: dict) -> bool:
+        """
+        Inserts or replaces the row and returns whether it was inserted.
+        """
+        with self.database.lock:
+            if self.database.update(table, row["id"], row) is not None:
+                return False
+            self.database.insert(table, row)
+            return True
+
+    def upsert_customers(self, customers: List[CustomerReturnResource]):
+        for customer in customers:
+            self.upsert_row("customers", customer.model_dump())
+
+    def delete_customers(self, customer_ids: List[str]):
+        with self.database.lock:
+            for customer_id in customer_ids:
+                self.delete_cars([car["id"] for car in self.database.find("cars", "customers_id", customer_id)])
+                self.database.delete("customers", customer_id)
+
+    def upsert_sales_people(self, sales_people: List[SalesPersonWithPassword]):
+        for sales_person, hashed_password in sales_people:
+            self.upsert_row("sales_people", {**sales_person.model_dump(), "hashed_password": hashed_password})
+
+    def delete_sales_people(self, sales_person_ids: List[str]):
+        for sales_person_id in sales_person_ids:
+            self.database.delete("sales_people", sales_person_id)
+
+    def upsert_cars(self, cars: List[CarReturnResource]):
+        for car in cars:
+            self.upsert_row("cars", {
+                "id": car.id,
+                "purchase_deadline": car.purchase_deadline,
+                "total_price": car.total_price,
+                "models_id": car.model.id,
+                "colors_id": car.color.id,
+                "customers_id": car.customer.id,
+                "sales_people_id": car.sales_person.id,
+                "accessories_ids": [accessory.id for accessory in car.accessories],
+                "insurances_ids": [insurance.id for insurance in car.insurances]
+            })
+
+    def delete_cars(self, car_ids: List[str]):
+        with self.database.lock:
+            for car_id in car_ids:
+                for purchase in self.database.find("purchases", "cars_id", car_id):
+                    self.database.delete("purchases", purchase["id"])
+                self.database.delete("cars", car_id)
+
+    def upsert_purchases(self, purchases: List[PurchaseReturnResource]):
+        for purchase in purchases:
+            is_new_purchase = self.upsert_row("purchases", {
+                "id": purchase.id,
+                "cars_id": purchase.car.id,
+                "date_of_purchase": purchase.date_of_purchase
+            })
+            if is_new_purchase:
+                add_sale_to_in_memory_rollup(self.database, purchase.car, purchase.date_of_purchase)
+
+    def delete_purchases(self, purchase_ids: List[str]):
+        for purchase_id in purchase_ids:
+            self.database.delete("purchases", purchase_id)
@@ -1,10 +1,14 @@
 # External Library imports
+from uuid import uuid4
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple, List, cast
+from typing import Optional, Tuple, List, cast, TYPE_CHECKING
 from sqlalchemy.orm import Session
-from pymongo.database import Database
 
 # Internal library imports
+from db import InMemoryDatabase
+from app.core.identity_cache import cached_per_request
+from app.exceptions.database_errors import raise_already_taken_on_duplicate
+from app.models.change_event import record_mysql_changes, record_in_memory_changes
 from app.models.sales_person import (
     SalesPersonReturnResource,
     SalesPersonMySQLEntity,
@@ -12,6 +16,19 @@ from app.models.sales_person import (
 )
 from app.resources.sales_person_resource import SalesPersonCreateResource, SalesPersonLoginResource
 
+if TYPE_CHECKING:
+    from pymongo.database import Database
+
+
+def prepare_in_memory_sales_person(sales_person: dict) -> SalesPersonReturnResource:
+    # The hashed password is stored in the same row, but must never be part of the resource.
+    return SalesPersonReturnResource(
+        id=sales_person["id"],
+        email=sales_person["email"],
+        first_name=sales_person["first_name"],
+        last_name=sales_person["last_name"]
+    )
+
 
 class SalesPersonRepository(ABC):  # pragma: no cover
     @abstractmethod
@@ -68,6 +85,7 @@ class MySQLSalesPersonRepository(SalesPersonRepository):
         sales_people: List[SalesPersonMySQLEntity] = cast(List[SalesPersonMySQLEntity], sales_people_query.all())
         return [sales_person.as_resource() for sales_person in sales_people]
 
+    @cached_per_request("sales_person")
     def get_by_id(self, sales_person_id: str) -> Optional[SalesPersonReturnResource]:
         sales_person: Optional[SalesPersonMySQLEntity] = self.session.get(SalesPersonMySQLEntity, sales_person_id)
         if sales_person is None:
@@ -87,9 +105,12 @@ class MySQLSalesPersonRepository(SalesPersonRepository):
             first_name=sales_person_create_data.first_name,
             last_name=sales_person_create_data.last_name,
         )
-        self.session.add(new_sales_person)
-        self.session.flush()
+        # The savepoint keeps the transaction usable when the email is already taken
+        with raise_already_taken_on_duplicate("Sales Person", "email", sales_person_create_data.email):
+            with self.session.begin_nested():
+                self.session.add(new_sales_person)
         self.session.refresh(new_sales_person)
+        record_mysql_changes(self.session, "sales_person", [new_sales_person.id], "upsert")
 
         return new_sales_person.as_resource()
 
@@ -103,7 +124,7 @@ class MySQLSalesPersonRepository(SalesPersonRepository):
 
 
 class MongoDBSalesPersonRepository(SalesPersonRepository):  # pragma: no cover
-    def __init__(self, database: Database):
+    def __init__(self, database: "Database"):
         self.database = database
 
     def login_by_email(
@@ -128,6 +149,7 @@ class MongoDBSalesPersonRepository(SalesPersonRepository):  # pragma: no cover
         sales_people = [SalesPersonMongoEntity(**sales_person).as_resource() for sales_person in sales_people_query]
         return sales_people
 
+    @cached_per_request("sales_person")
     def get_by_id(self, sales_person_id: str) -> Optional[SalesPersonReturnResource]:
         sales_person_query = self.database.get_collection("sales_people").find_one({"_id": sales_person_id})
         if sales_person_query is None:
@@ -145,13 +167,61 @@ class MongoDBSalesPersonRepository(SalesPersonRepository):  # pragma: no cover
             **sales_person_create_data.model_dump(exclude={"password"}),
             hashed_password=hashed_password
         )
-        self.database.sales_people.insert_one(new_sales_person.model_dump(by_alias=True))
+        with raise_already_taken_on_duplicate("Sales Person", "email", sales_person_create_data.email):
+            self.database.get_collection("sales_people").insert_one(new_sales_person.model_dump(by_alias=True))
         return new_sales_person.as_resource()
 
     def is_email_taken(self, email: str) -> bool:
         return self.database.get_collection("sales_people").count_documents({"email": email}) > 0
 
 
+class InMemorySalesPersonRepository(SalesPersonRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def login_by_email(
+            self,
+            sales_person_login_info: SalesPersonLoginResource
+    ) -> Optional[Tuple[SalesPersonReturnResource, str]]:
+
+        sales_people = self.database.find("sales_people", "email", sales_person_login_info.email)
+        if not sales_people:
+            return None
+        return prepare_in_memory_sales_person(sales_people[0]), sales_people[0]["hashed_password"]
+
+    def get_all(self, limit: Optional[int] = None) -> List[SalesPersonReturnResource]:
+        sales_people = self.database.all("sales_people")
+        if limit is not None and isinstance(limit, int) and limit > 0:
+            sales_people = sales_people[:limit]
+        return [prepare_in_memory_sales_person(sales_person) for sales_person in sales_people]
+
+    @cached_per_request("sales_person")
+    def get_by_id(self, sales_person_id: str) -> Optional[SalesPersonReturnResource]:
+        sales_person = self.database.get("sales_people", sales_person_id)
+        if sales_person is None:
+            return None
+        return prepare_in_memory_sales_person(sales_person)
+
+    def create(
+            self,
+            sales_person_create_data: SalesPersonCreateResource,
+            hashed_password: str
+    ) -> SalesPersonReturnResource:
+
+        with raise_already_taken_on_duplicate("Sales Person", "email", sales_person_create_data.email):
+            new_sales_person = self.database.insert("sales_people", {
+                "id": str(uuid4()),
+                "email": sales_person_create_data.email,
+                "hashed_password": hashed_password,
+                "first_name": sales_person_create_data.first_name,
+                "last_name": sales_person_create_data.last_name,
+            })
+        record_in_memory_changes(self.database, "sales_person", [new_sales_person["id"]], "upsert")
+        return prepare_in_memory_sales_person(new_sales_person)
+
+    def is_email_taken(self, email: str) -> bool:
+        return len(self.database.find("sales_people", "email", email)) > 0
+
 
 # Placeholder for future repositories
 # class OtherDBSalesPersonRepository(SalesPersonRepository):
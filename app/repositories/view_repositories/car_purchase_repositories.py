@@ -1,14 +1,23 @@
 # External Library imports
+from datetime import date
 from abc import ABC, abstractmethod
 from typing import List, Optional, cast
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, case, func, cast as sql_cast
+from sqlalchemy.orm import Session, Query
+from sqlalchemy.sql import functions
 
 # Internal library imports
+from db import InMemoryDatabase
+from app.models.car import CarMySQLEntity
 from app.models.views.car_purchase import CarPurchaseView
+from app.resources.model_resource import ModelBaseReturnResource
+from app.resources.purchase_resource import PurchaseBaseReturnResource
+from app.repositories.car_repositories import prepare_in_memory_car
 
 from app.resources.view_resources.car_purchase_resource import (
     CarPurchaseSalePersonReturnResource,
     CarPurchaseCustomerReturnResource,
+    CarsSummaryReturnResource,
     SalesPersonWithCarsReturnResource,
     CustomerWithCarsReturnResource,
     SalesPersonReturnResource,
@@ -19,7 +28,8 @@ from app.resources.view_resources.car_purchase_resource import (
 
 def create_sales_person_with_cars_resource(
     sales_person_resource: SalesPersonReturnResource,
-    sale_person_cars: List[CarPurchaseSalePersonReturnResource]
+    sale_person_cars: List[CarPurchaseSalePersonReturnResource],
+    cars_summary: CarsSummaryReturnResource
 ) -> SalesPersonWithCarsReturnResource:
 
     return SalesPersonWithCarsReturnResource(
@@ -27,12 +37,14 @@ def create_sales_person_with_cars_resource(
         email=sales_person_resource.email,
         first_name=sales_person_resource.first_name,
         last_name=sales_person_resource.last_name,
+        cars_summary=cars_summary,
         cars=sale_person_cars
     )
 
 def create_customer_with_cars_resource(
         customer_resource: CustomerReturnResource,
-        customer_cars: List[CarPurchaseCustomerReturnResource]
+        customer_cars: List[CarPurchaseCustomerReturnResource],
+        cars_summary: CarsSummaryReturnResource
 ) -> CustomerWithCarsReturnResource:
 
     return CustomerWithCarsReturnResource(
@@ -42,23 +54,65 @@ def create_customer_with_cars_resource(
         first_name=customer_resource.first_name,
         last_name=customer_resource.last_name,
         address=customer_resource.address,
+        cars_summary=cars_summary,
         cars=customer_cars
     )
 
+def get_page(rows: list, cars_limit: Optional[int], cars_offset: int) -> list:
+    if cars_limit is None:
+        return rows[cars_offset:]
+    return rows[cars_offset:cars_offset + cars_limit]
+
+def prepare_in_memory_car_purchase_fields(database: InMemoryDatabase, car: dict) -> dict:
+    """
+    Returns the fields of a row in the car_purchase_view,
+    shared by the car purchase resources for the customers, sales people and cars.
+    """
+    purchases = database.find("purchases", "cars_id", car["id"])
+    car_resource = prepare_in_memory_car(database, car, is_purchased=bool(purchases))
+    return {
+        "id": car_resource.id,
+        "total_price": car_resource.total_price,
+        "purchase_deadline": car_resource.purchase_deadline,
+        "is_past_deadline": car_resource.purchase_deadline < date.today() and not purchases,
+        "model": ModelBaseReturnResource.model_validate(car_resource.model, from_attributes=True),
+        "color": car_resource.color,
+        "purchase": PurchaseBaseReturnResource(
+            id=purchases[0]["id"],
+            date_of_purchase=purchases[0]["date_of_purchase"]
+        ) if purchases else None,
+        "customer": car_resource.customer,
+        "sales_person": car_resource.sales_person,
+        "accessories": car_resource.accessories,
+        "insurances": car_resource.insurances
+    }
+
 
 class CarPurchaseRepository(ABC):  # pragma: no cover
     @abstractmethod
     def get_sales_person_with_cars(
             self,
-            sales_person_resource: SalesPersonReturnResource
+            sales_person_resource: SalesPersonReturnResource,
+            cars_limit: Optional[int] = None,
+            cars_offset: int = 0
     ) -> SalesPersonWithCarsReturnResource:
+        """
+        Returns the sales person with a page of their cars, ordered by car ID,
+        and the summary of all their cars. A cars_limit of None returns all the cars after the offset.
+        """
         pass
 
     @abstractmethod
     def get_customer_with_cars(
             self,
-            customer_resource: CustomerReturnResource
+            customer_resource: CustomerReturnResource,
+            cars_limit: Optional[int] = None,
+            cars_offset: int = 0
     ) -> CustomerWithCarsReturnResource:
+        """
+        Returns the customer with a page of their cars, ordered by car ID,
+        and the summary of all their cars. A cars_limit of None returns all the cars after the offset.
+        """
         pass
 
     @abstractmethod
@@ -80,33 +134,66 @@ class MySQLCarPurchaseRepository(CarPurchaseRepository):
     def __init__(self, session: Session):
         self.session = session
 
+    def get_cars_page(self, cars_filter, cars_limit: Optional[int], cars_offset: int) -> List[CarPurchaseView]:
+        cars_query: Query = self.session.query(CarPurchaseView).filter(cars_filter).order_by(CarPurchaseView.car_id)
+        if cars_offset > 0:
+            cars_query = cars_query.offset(cars_offset)
+        if cars_limit is not None:
+            cars_query = cars_query.limit(cars_limit)
+        return cast(List[CarPurchaseView], cars_query.all())
+
+    def get_cars_summary(self, cars_filter) -> CarsSummaryReturnResource:
+        # All the totals in a single aggregate query, without loading the cars
+        total_cars, purchased_cars, past_deadline_cars, revenue = (
+            self.session.query(
+                functions.count(CarPurchaseView.car_id),
+                functions.count(CarPurchaseView.purchase_id),
+                func.coalesce(func.sum(sql_cast(CarPurchaseView.is_past_deadline, Integer)), 0),
+                func.coalesce(func.sum(case(
+                    (CarPurchaseView.purchase_id.is_not(None), CarMySQLEntity.total_price), else_=0
+                )), 0)
+            )
+            .join(CarMySQLEntity, CarMySQLEntity.id == CarPurchaseView.car_id)
+            .filter(cars_filter)
+            .one()
+        )
+        return CarsSummaryReturnResource(
+            total_cars=total_cars,
+            purchased_cars=purchased_cars,
+            past_deadline_cars=int(past_deadline_cars),
+            revenue=round(float(revenue), 2)
+        )
+
     def get_sales_person_with_cars(
             self,
-            sales_person_resource: SalesPersonReturnResource
+            sales_person_resource: SalesPersonReturnResource,
+            cars_limit: Optional[int] = None,
+            cars_offset: int = 0
     ) -> SalesPersonWithCarsReturnResource:
 
-        car_purchase_sales_person_query = self.session.query(CarPurchaseView).filter_by(
-            sales_person_id=sales_person_resource.id
-        )
-
-        sales_person_cars = cast(List[CarPurchaseView], car_purchase_sales_person_query.all())
+        cars_filter = CarPurchaseView.sales_person_id == sales_person_resource.id
+        sales_person_cars = self.get_cars_page(cars_filter, cars_limit, cars_offset)
 
         return create_sales_person_with_cars_resource(
             sales_person_resource,
-            sale_person_cars=[sales_person_car.as_sales_person_resource() for sales_person_car in sales_person_cars]
+            sale_person_cars=[sales_person_car.as_sales_person_resource() for sales_person_car in sales_person_cars],
+            cars_summary=self.get_cars_summary(cars_filter)
         )
 
-    def get_customer_with_cars(self, customer_resource: CustomerReturnResource) -> CustomerWithCarsReturnResource:
-
-        car_purchase_customer_query = self.session.query(CarPurchaseView).filter_by(
-            customer_id=customer_resource.id
-        )
+    def get_customer_with_cars(
+            self,
+            customer_resource: CustomerReturnResource,
+            cars_limit: Optional[int] = None,
+            cars_offset: int = 0
+    ) -> CustomerWithCarsReturnResource:
 
-        customer_cars = cast(List[CarPurchaseView], car_purchase_customer_query.all())
+        cars_filter = CarPurchaseView.customer_id == customer_resource.id
+        customer_cars = self.get_cars_page(cars_filter, cars_limit, cars_offset)
 
         return create_customer_with_cars_resource(
             customer_resource,
-            customer_cars=[customer_car.as_customer_resource() for customer_car in customer_cars]
+            customer_cars=[customer_car.as_customer_resource() for customer_car in customer_cars],
+            cars_summary=self.get_cars_summary(cars_filter)
         )
 
     def get_cars_with_purchase(self, limit: Optional[int]) -> List[CarPurchaseReturnResource]:
@@ -126,6 +213,79 @@ class MySQLCarPurchaseRepository(CarPurchaseRepository):
         return None
 
 
+class InMemoryCarPurchaseRepository(CarPurchaseRepository):
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def get_cars_summary(self, cars: List[dict]) -> CarsSummaryReturnResource:
+        purchased_cars = [car for car in cars if self.database.find("purchases", "cars_id", car["id"])]
+        purchased_car_ids = {car["id"] for car in purchased_cars}
+        return CarsSummaryReturnResource(
+            total_cars=len(cars),
+            purchased_cars=len(purchased_cars),
+            past_deadline_cars=len([
+                car for car in cars if car["purchase_deadline"] < date.today() and car["id"] not in purchased_car_ids
+            ]),
+            revenue=round(sum(car["total_price"] for car in purchased_cars), 2)
+        )
+
+    def get_sales_person_with_cars(
+            self,
+            sales_person_resource: SalesPersonReturnResource,
+            cars_limit: Optional[int] = None,
+            cars_offset: int = 0
+    ) -> SalesPersonWithCarsReturnResource:
+
+        cars = sorted(self.database.find("cars", "sales_people_id", sales_person_resource.id), key=lambda car: car["id"])
+        sales_person_cars: List[CarPurchaseSalePersonReturnResource] = []
+        for car in get_page(cars, cars_limit, cars_offset):
+            fields = prepare_in_memory_car_purchase_fields(self.database, car)
+            fields.pop("sales_person")
+            sales_person_cars.append(CarPurchaseSalePersonReturnResource(**fields))
+
+        return create_sales_person_with_cars_resource(
+            sales_person_resource,
+            sale_person_cars=sales_person_cars,
+            cars_summary=self.get_cars_summary(cars)
+        )
+
+    def get_customer_with_cars(
+            self,
+            customer_resource: CustomerReturnResource,
+            cars_limit: Optional[int] = None,
+            cars_offset: int = 0
+    ) -> CustomerWithCarsReturnResource:
+
+        cars = sorted(self.database.find("cars", "customers_id", customer_resource.id), key=lambda car: car["id"])
+        customer_cars: List[CarPurchaseCustomerReturnResource] = []
+        for car in get_page(cars, cars_limit, cars_offset):
+            fields = prepare_in_memory_car_purchase_fields(self.database, car)
+            fields.pop("customer")
+            customer_cars.append(CarPurchaseCustomerReturnResource(**fields))
+
+        return create_customer_with_cars_resource(
+            customer_resource,
+            customer_cars=customer_cars,
+            cars_summary=self.get_cars_summary(cars)
+        )
+
+    def get_cars_with_purchase(self, limit: Optional[int]) -> List[CarPurchaseReturnResource]:
+        cars = self.database.all("cars")
+        if limit is not None and isinstance(limit, int) and limit > 0:
+            cars = cars[:limit]
+        return [
+            CarPurchaseReturnResource(**prepare_in_memory_car_purchase_fields(self.database, car))
+            for car in cars
+        ]
+
+    def get_car_with_purchase_by_id(self, car_id: str) -> Optional[CarPurchaseReturnResource]:
+        car = self.database.get("cars", car_id)
+        if car is not None:
+            return CarPurchaseReturnResource(**prepare_in_memory_car_purchase_fields(self.database, car))
+        return None
+
+
+
 # Placeholder for future repositories
 # class OtherDBCustomerRepository(CustomerRepository):
 #     ...
@@ -0,0 +1,36 @@
+from typing import Literal, Tuple
+from pydantic import BaseModel, ConfigDict, Field
+
+
+SalesDimension = Literal["brand", "model", "color", "sales_person", "month"]
+SALES_DIMENSIONS: Tuple[str, ...] = ("brand", "model", "color", "sales_person", "month")
+
+# Whether the sales are aggregated from the daily rollup of the sales ever recorded, which is updated on every purchase
+# and never decremented, or from the current purchases and their cars.
+SalesSource = Literal["rollup", "purchases"]
+SALES_SOURCES: Tuple[str, ...] = ("rollup", "purchases")
+
+
+class SalesReturnResource(BaseModel):
+    key: str = Field(
+        default=...,
+        description="UUID of the brand, model, color or sales person, or the month as YYYY-MM.",
+        examples=["feb2efdb-93ee-4f45-88b1-5e4086c00334"]
+    )
+    name: str = Field(
+        default=...,
+        description="Name of the brand, model, color or sales person, or the month as YYYY-MM.",
+        examples=["BMW"]
+    )
+    units: int = Field(
+        default=...,
+        description="The amount of cars sold.",
+        examples=[12]
+    )
+    revenue: float = Field(
+        default=...,
+        description="The sum of the total prices of the cars sold.",
+        examples=[1250000.0]
+    )
+
+    model_config = ConfigDict(from_attributes=True)
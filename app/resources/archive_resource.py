@@ -0,0 +1,33 @@
+# External Library imports
+from datetime import datetime
+from pydantic import Field
+
+# Internal library imports
+from app.resources.car_resource import CarReturnResource
+from app.resources.purchase_resource import PurchaseReturnResource
+
+
+class ArchivedPurchaseReturnResource(PurchaseReturnResource):
+    archive_month: str = Field(
+        default=...,
+        description="The month of the date of purchase as YYYY-MM, which the archived purchase is partitioned by.",
+        examples=["2024-11"]
+    )
+    archived_at: datetime = Field(
+        default=...,
+        description="When the purchase and its car were moved to the archive.",
+        examples=[datetime(2025, 11, 5, 3, 0)]
+    )
+
+
+class ArchivedCarReturnResource(CarReturnResource):
+    archive_month: str = Field(
+        default=...,
+        description="The month of the purchase deadline as YYYY-MM, which the archived car is partitioned by.",
+        examples=["2024-12"]
+    )
+    archived_at: datetime = Field(
+        default=...,
+        description="When the car was moved to the archive, after its purchase deadline passed without a purchase.",
+        examples=[datetime(2024, 12, 8, 3, 0)]
+    )
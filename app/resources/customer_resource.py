@@ -1,6 +1,13 @@
-from typing import Optional, Any
+from typing import Optional, Any, Literal
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
+# How customers are searched by their email:
+# contains matches anywhere in the email with a full scan,
+# prefix matches the start of the email using the email index, ordered by email,
+# fulltext matches anywhere in the email using an n-gram index, ranked by how early in the email it matches.
+EmailSearchMode = Literal["contains", "prefix", "fulltext"]
+EMAIL_SEARCH_MODES = ("contains", "prefix", "fulltext")
+
 
 class CustomerBaseResource(BaseModel):
     email: EmailStr = Field(
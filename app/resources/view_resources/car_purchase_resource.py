@@ -1,6 +1,6 @@
 # External Library imports
 from typing import Optional, List
-from pydantic import Field
+from pydantic import BaseModel, Field
 
 
 # Internal library imports
@@ -24,6 +24,29 @@ class CarPurchaseBaseReturnResource(CarBaseReturnResource):
     )
 
 
+class CarsSummaryReturnResource(BaseModel):
+    total_cars: int = Field(
+        default=...,
+        description="The amount of cars, including the cars that are not on the current page.",
+        examples=[120]
+    )
+    purchased_cars: int = Field(
+        default=...,
+        description="The amount of cars that have been purchased.",
+        examples=[80]
+    )
+    past_deadline_cars: int = Field(
+        default=...,
+        description="The amount of cars that are past their purchase deadline and have not been purchased.",
+        examples=[5]
+    )
+    revenue: float = Field(
+        default=...,
+        description="The sum of the total prices of the purchased cars.",
+        examples=[842464.0]
+    )
+
+
 class CarPurchaseSalePersonReturnResource(CarPurchaseBaseReturnResource):
     customer: CustomerReturnResource = Field(
         default=...,
@@ -32,9 +55,13 @@ class CarPurchaseSalePersonReturnResource(CarPurchaseBaseReturnResource):
 
 
 class SalesPersonWithCarsReturnResource(SalesPersonReturnResource):
+    cars_summary: CarsSummaryReturnResource = Field(
+        default=...,
+        description="The totals of all the sales person's cars as a CarsSummaryReturnResource."
+    )
     cars: List[CarPurchaseSalePersonReturnResource] = Field(
         default=...,
-        description="The sales person's cars as a list of CarPurchaseSalePersonReturnResource."
+        description="The page of the sales person's cars as a list of CarPurchaseSalePersonReturnResource."
     )
 
 
@@ -46,9 +73,13 @@ class CarPurchaseCustomerReturnResource(CarPurchaseBaseReturnResource):
 
 
 class CustomerWithCarsReturnResource(CustomerReturnResource):
+    cars_summary: CarsSummaryReturnResource = Field(
+        default=...,
+        description="The totals of all the customer's cars as a CarsSummaryReturnResource."
+    )
     cars: List[CarPurchaseCustomerReturnResource] = Field(
         default=...,
-        description="The customer's cars as a list of CarPurchaseCustomerReturnResource."
+        description="The page of the customer's cars as a list of CarPurchaseCustomerReturnResource."
     )
 
 class CarPurchaseReturnResource(CarPurchaseBaseReturnResource):
@@ -0,0 +1,49 @@
+# External Library imports
+from datetime import date
+from typing import List, Optional
+
+# Internal library imports
+from app.resources.analytics_resource import SalesDimension, SalesSource, SALES_DIMENSIONS, SALES_SOURCES
+from app.repositories.analytics_repositories import AnalyticsRepository, SalesReturnResource
+
+
+def get_sales(
+        repository: AnalyticsRepository,
+        dimension: SalesDimension,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        source: SalesSource = "rollup"
+) -> List[SalesReturnResource]:
+
+    if not isinstance(repository, AnalyticsRepository):
+        raise TypeError(f"repository must be of type AnalyticsRepository, "
+                        f"not {type(repository).__name__}.")
+    if not isinstance(dimension, str):
+        raise TypeError(f"dimension must be of type str, "
+                        f"not {type(dimension).__name__}.")
+    if dimension not in SALES_DIMENSIONS:
+        raise ValueError(f"dimension must be one of {', '.join(SALES_DIMENSIONS)}, "
+                         f"not '{dimension}'.")
+    if not (isinstance(start_date, date) or start_date is None):
+        raise TypeError(f"start_date must be of type date or None, "
+                        f"not {type(start_date).__name__}.")
+    if not (isinstance(end_date, date) or end_date is None):
+        raise TypeError(f"end_date must be of type date or None, "
+                        f"not {type(end_date).__name__}.")
+    if not isinstance(source, str):
+        raise TypeError(f"source must be of type str, "
+                        f"not {type(source).__name__}.")
+    if source not in SALES_SOURCES:
+        raise ValueError(f"source must be one of {', '.join(SALES_SOURCES)}, "
+                         f"not '{source}'.")
+
+    # No purchase can be made in an empty date range
+    if start_date is not None and end_date is not None and start_date > end_date:
+        return []
+
+    return repository.get_sales(
+        dimension=dimension,
+        start_date=start_date,
+        end_date=end_date,
+        source=source
+    )
@@ -0,0 +1,85 @@
+# External Library imports
+import re
+from datetime import date
+from typing import List, Optional
+
+# Internal library imports
+from app.repositories.archive_repositories import (
+    ArchiveRepository,
+    ArchivedPurchaseReturnResource,
+    ArchivedCarReturnResource
+)
+
+MONTH_PATTERN = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+
+def validate_archive_query(
+        repository: ArchiveRepository,
+        month: Optional[str],
+        customer_id: Optional[str],
+        limit: Optional[int],
+        offset: int
+) -> Optional[date]:
+    """
+    Validates the arguments of an archive query and returns the first day of the month, if a month is given.
+    """
+    if not isinstance(repository, ArchiveRepository):
+        raise TypeError(f"repository must be of type ArchiveRepository, "
+                        f"not {type(repository).__name__}.")
+    if not (isinstance(month, str) or month is None):
+        raise TypeError(f"month must be of type str or None, "
+                        f"not {type(month).__name__}.")
+    if month is not None and not MONTH_PATTERN.match(month):
+        raise ValueError(f"month must be a month as YYYY-MM, "
+                         f"not '{month}'.")
+    if not (isinstance(customer_id, str) or customer_id is None):
+        raise TypeError(f"customer_id must be of type str or None, "
+                        f"not {type(customer_id).__name__}.")
+    if isinstance(limit, bool) or not (isinstance(limit, int) or limit is None):
+        raise TypeError(f"limit must be of type int or None, "
+                        f"not {type(limit).__name__}.")
+    if isinstance(offset, bool) or not isinstance(offset, int):
+        raise TypeError(f"offset must be of type int, "
+                        f"not {type(offset).__name__}.")
+    if limit is not None and limit < 0:
+        raise ValueError(f"limit must be at least 0, not {limit}.")
+    if offset < 0:
+        raise ValueError(f"offset must be at least 0, not {offset}.")
+
+    return date.fromisoformat(f"{month}-01") if month is not None else None
+
+
+def get_archived_purchases(
+        repository: ArchiveRepository,
+        month: Optional[str] = None,
+        customer_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+) -> List[ArchivedPurchaseReturnResource]:
+
+    first_day_of_month = validate_archive_query(repository, month, customer_id, limit, offset)
+
+    return repository.get_archived_purchases(
+        month=first_day_of_month,
+        customer_id=customer_id,
+        limit=limit,
+        offset=offset
+    )
+
+
+def get_archived_cars(
+        repository: ArchiveRepository,
+        month: Optional[str] = None,
+        customer_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+) -> List[ArchivedCarReturnResource]:
+
+    first_day_of_month = validate_archive_query(repository, month, customer_id, limit, offset)
+
+    return repository.get_archived_cars(
+        month=first_day_of_month,
+        customer_id=customer_id,
+        limit=limit,
+        offset=offset
+    )
@@ -3,6 +3,7 @@ from typing import List, Optional
 
 # Internal library imports
 from app.exceptions.database_errors import UnableToFindIdError, AlreadyTakenFieldValueError
+from app.resources.customer_resource import EmailSearchMode, EMAIL_SEARCH_MODES
 from app.repositories.customer_repositories import (
     CustomerRepository,
     CustomerReturnResource,
@@ -14,7 +15,8 @@ from app.repositories.customer_repositories import (
 def get_all(
         repository: CustomerRepository,
         filter_customer_by_email: Optional[str] = None,
-        customers_limit: Optional[int] = None
+        customers_limit: Optional[int] = None,
+        email_search_mode: EmailSearchMode = "contains"
 ) -> List[CustomerReturnResource]:
 
     if not isinstance(repository, CustomerRepository):
@@ -26,7 +28,17 @@ def get_all(
     if isinstance(customers_limit, bool) or not (isinstance(customers_limit, int) or customers_limit is None):
         raise TypeError(f"customers_limit must be of type int or None, "
                         f"not {type(customers_limit).__name__}.")
-    return repository.get_all(email_filter=filter_customer_by_email, limit=customers_limit)
+    if not isinstance(email_search_mode, str):
+        raise TypeError(f"email_search_mode must be of type str, "
+                        f"not {type(email_search_mode).__name__}.")
+    if email_search_mode not in EMAIL_SEARCH_MODES:
+        raise ValueError(f"email_search_mode must be one of {', '.join(EMAIL_SEARCH_MODES)}, "
+                         f"not '{email_search_mode}'.")
+    return repository.get_all(
+        email_filter=filter_customer_by_email,
+        limit=customers_limit,
+        email_search_mode=email_search_mode
+    )
 
 
 def get_by_id(
@@ -62,13 +74,7 @@ def create(
         raise TypeError(f"customer_create_data must be of type CustomerCreateResource, "
                         f"not {type(customer_create_data).__name__}.")
 
-    if repository.is_email_taken(customer_create_data):
-        raise AlreadyTakenFieldValueError(
-            entity_name="Customer",
-            field="email",
-            value=customer_create_data.email
-        )
-
+    # The unique email index is checked by the insert itself, which raises AlreadyTakenFieldValueError
     return repository.create(customer_create_data)
 
 def update(
@@ -110,7 +110,9 @@ def create(
             entity_id=car_id
         )
 
-    if purchase_repository.is_car_taken(car):
+    # The car already tells whether it is purchased, so no extra query is needed here.
+    # Concurrent purchases of the same car are rejected by the unique cars_id index on insert.
+    if car.is_purchased:
         raise AlreadyTakenFieldValueError(
             entity_name="Purchase",
             field="cars_id",
@@ -2,7 +2,7 @@
 from typing import List, Optional
 
 # Internal library imports
-from app.exceptions.database_errors import UnableToFindIdError, AlreadyTakenFieldValueError
+from app.exceptions.database_errors import UnableToFindIdError
 from app.core.security import Token, create_access_token, verify_password, get_password_hash
 from app.exceptions.invalid_credentials_errors import IncorrectEmailError, IncorrectPasswordError
 from app.repositories.sales_person_repositories import (
@@ -92,10 +92,5 @@ def create(
                         f"not {type(sales_person_create_data).__name__}.")
 
     hashed_password: str = get_password_hash(sales_person_create_data.password)
-    if repository.is_email_taken(sales_person_create_data.email):
-        raise AlreadyTakenFieldValueError(
-            entity_name="Sales Person",
-            field="email",
-            value=sales_person_create_data.email
-        )
+    # The unique email index is checked by the insert itself, which raises AlreadyTakenFieldValueError
     return repository.create(sales_person_create_data, hashed_password)
@@ -11,10 +11,24 @@ from app.repositories.view_repositories.car_purchase_repositories import (
     SalesPersonWithCarsReturnResource
 )
 
+def validate_cars_page(cars_limit: Optional[int], cars_offset: int):
+    if isinstance(cars_limit, bool) or not (isinstance(cars_limit, int) or cars_limit is None):
+        raise TypeError(f"cars_limit must be of type int or None, "
+                        f"not {type(cars_limit).__name__}.")
+    if isinstance(cars_offset, bool) or not isinstance(cars_offset, int):
+        raise TypeError(f"cars_offset must be of type int, "
+                        f"not {type(cars_offset).__name__}.")
+    if cars_limit is not None and cars_limit < 0:
+        raise ValueError(f"cars_limit must be at least 0, not {cars_limit}.")
+    if cars_offset < 0:
+        raise ValueError(f"cars_offset must be at least 0, not {cars_offset}.")
+
 def get_sales_person_with_cars(
         car_purchase_repository: CarPurchaseRepository,
         sales_person_repository: SalesPersonRepository,
-        sales_person_id: str
+        sales_person_id: str,
+        cars_limit: Optional[int] = None,
+        cars_offset: int = 0
 ) -> SalesPersonWithCarsReturnResource:
 
     if not isinstance(car_purchase_repository, CarPurchaseRepository):
@@ -26,6 +40,7 @@ def get_sales_person_with_cars(
     if not isinstance(sales_person_id, str):
         raise TypeError(f"sales_person_id must be of type str, "
                         f"not {type(sales_person_id).__name__}.")
+    validate_cars_page(cars_limit, cars_offset)
 
     sales_person_resource = sales_person_repository.get_by_id(sales_person_id)
     if sales_person_resource is None:
@@ -34,12 +49,18 @@ def get_sales_person_with_cars(
             entity_id=sales_person_id
         )
 
-    return car_purchase_repository.get_sales_person_with_cars(sales_person_resource)
+    return car_purchase_repository.get_sales_person_with_cars(
+        sales_person_resource,
+        cars_limit=cars_limit,
+        cars_offset=cars_offset
+    )
 
 def get_customer_with_cars(
         car_purchase_repository: CarPurchaseRepository,
         customer_repository: CustomerRepository,
-        customer_id: str
+        customer_id: str,
+        cars_limit: Optional[int] = None,
+        cars_offset: int = 0
 ) -> CustomerWithCarsReturnResource:
 
     if not isinstance(car_purchase_repository, CarPurchaseRepository):
@@ -51,6 +72,7 @@ def get_customer_with_cars(
     if not isinstance(customer_id, str):
         raise TypeError(f"customer_id must be of type str, "
                         f"not {type(customer_id).__name__}.")
+    validate_cars_page(cars_limit, cars_offset)
 
     customer_resource = customer_repository.get_by_id(customer_id)
     if customer_resource is None:
@@ -59,7 +81,11 @@ def get_customer_with_cars(
             entity_id=customer_id
         )
 
-    return car_purchase_repository.get_customer_with_cars(customer_resource)
+    return car_purchase_repository.get_customer_with_cars(
+        customer_resource,
+        cars_limit=cars_limit,
+        cars_offset=cars_offset
+    )
 
 def get_cars_with_purchase(
         repository: CarPurchaseRepository,
@@ -1,5 +1,4 @@
 import os
-import requests
 from app.resources.weather_resource import WeatherReturnResource
 from app.exceptions.weather_errors import UnsupportedCountryError, WeatherAPIError
 
@@ -24,6 +23,8 @@ def get_weather_by_country(country: str) -> WeatherReturnResource:
     url = BASE_URL + "current.json?q=" + country + "&key=" + key
     print(url)
     # Make an HTTP GET request to the URL
+    # requests is imported here, so it is only loaded once the weather is requested
+    import requests  # pylint: disable=import-outside-toplevel
     response = requests.get(url, timeout=10)
     
     # Check if the response status code is 200 (OK)
@@ -0,0 +1,26 @@
+# External Library imports
+import time
+from datetime import date
+from typing import Callable
+
+
+class BatchSchedule:
+    """
+    How many rows a batch worker handles at a time and how long it pauses in between,
+    with the today and sleep it uses, which the tests replace so a pass runs without waiting.
+    """
+
+    def __init__(
+            self,
+            batch_size: int,
+            pause_seconds: float,
+            today: Callable[[], date] = date.today,
+            sleep: Callable[[float], None] = time.sleep
+    ):
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.today = today
+        self.sleep = sleep
+
+    def pause(self):
+        self.sleep(self.pause_seconds)
@@ -0,0 +1,155 @@
+"""
+Deletes the cars that are past their purchase deadline and have not been purchased,
+replacing the daily delete_old_none_purchased_cars MySQL event.
+In MySQL and MongoDB the cars are moved to the archived_cars archive before they are deleted.
+
+The cars are deleted in small batches in the order of the purchase deadline index, each batch in its own
+short transaction with a pause in between, so the expiry never holds many locks at once.
+The worker runs as a separate process per backend:
+    python -m app.workers.car_expiry_worker --backend=mysql
+"""
+# External Library imports
+import time
+import logging
+import argparse
+from threading import Event
+from datetime import date, datetime, timezone
+from typing import Callable, Optional
+
+# Internal library imports
+from db import get_db, get_mongodb, get_neo4j
+from app.core.metrics import MetricsRegistry, metrics_registry
+from app.core.config import (
+    SUPPORTED_BACKENDS,
+    CAR_EXPIRY_BATCH_SIZE,
+    CAR_EXPIRY_PAUSE_SECONDS,
+    CAR_EXPIRY_INTERVAL_SECONDS
+)
+from app.workers.batch_schedule import BatchSchedule
+from app.repositories.car_expiry_repositories import (
+    CarExpiryRepository,
+    ExpiryCursor,
+    MySQLCarExpiryRepository,
+    MongoDBCarExpiryRepository,
+    Neo4jCarExpiryRepository
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CarExpiryWorker:
+    """
+    Walks the expired cars in batches of batch_size, ordered by purchase deadline and ID,
+    remembering the last visited car, so every pass visits each expired car once
+    and the pass can resume after a failed batch.
+    """
+
+    def __init__(
+            self,
+            repository: CarExpiryRepository,
+            backend: str,
+            batch_size: int = CAR_EXPIRY_BATCH_SIZE,
+            pause_seconds: float = CAR_EXPIRY_PAUSE_SECONDS,
+            registry: MetricsRegistry = metrics_registry,
+            today: Callable[[], date] = date.today,
+            sleep: Callable[[float], None] = time.sleep
+    ):
+        self.repository = repository
+        self.backend = backend
+        self.schedule = BatchSchedule(batch_size, pause_seconds, today, sleep)
+        self.registry = registry
+        self.cursor: Optional[ExpiryCursor] = None
+
+    def expire_batch(self, expired_before: date) -> Optional[int]:
+        """
+        Deletes the next batch of expired cars after the cursor and returns the amount of deleted cars,
+        or None when the pass has visited every expired car.
+        """
+        expired_cars = self.repository.get_expired_cars(expired_before, self.cursor, self.schedule.batch_size)
+        if not expired_cars:
+            return None
+        started_at = time.perf_counter()
+        deleted_cars = self.repository.delete_expired_cars([car_id for _, car_id in expired_cars], expired_before)
+        self.cursor = expired_cars[-1]
+
+        labels = {"backend": self.backend}
+        self.registry.inc_counter(
+            "kea_car_expiry_deleted_cars_total", deleted_cars, labels=labels,
+            help_text="Cars deleted because they passed their purchase deadline without being purchased."
+        )
+        self.registry.inc_counter(
+            "kea_car_expiry_batches_total", labels=labels,
+            help_text="Batches of expired cars deleted by the car expiry worker."
+        )
+        self.registry.set_gauge(
+            "kea_car_expiry_last_batch_seconds", time.perf_counter() - started_at, labels=labels,
+            help_text="How long the last batch of expired cars took to delete."
+        )
+        logger.info("Deleted %s expired %s cars up to purchase deadline %s and car %s",
+                    deleted_cars, self.backend, *self.cursor)
+        return deleted_cars
+
+    def run_pass(self, stop_event: Optional[Event] = None) -> int:
+        """
+        Deletes all the cars that expired before today, pausing between the batches,
+        and returns the amount of deleted cars.
+        """
+        expired_before = self.schedule.today()
+        self.cursor = None
+        deleted_cars = 0
+        while stop_event is None or not stop_event.is_set():
+            deleted_batch_cars = self.expire_batch(expired_before)
+            if deleted_batch_cars is None:
+                break
+            deleted_cars += deleted_batch_cars
+            self.schedule.pause()
+        self.registry.set_gauge(
+            "kea_car_expiry_last_pass_timestamp_seconds", datetime.now(timezone.utc).timestamp(),
+            labels={"backend": self.backend},
+            help_text="When the car expiry worker last finished deleting the expired cars."
+        )
+        return deleted_cars
+
+    def run(self, stop_event: Event, interval_seconds: float = CAR_EXPIRY_INTERVAL_SECONDS):
+        """
+        Runs a pass every interval until the stop event is set.
+        """
+        while not stop_event.is_set():
+            try:
+                self.run_pass(stop_event)
+            # Any failure of a pass is logged and the next pass starts over, so the worker keeps running
+            except Exception as error:  # pragma: no cover  # pylint: disable=broad-exception-caught
+                logger.exception("Failed to delete the expired %s cars: %s", self.backend, error)
+            stop_event.wait(interval_seconds)
+
+
+def run_worker(backend: str, stop_event: Event, once: bool, interval_seconds: float):  # pragma: no cover
+    if backend == "mysql":
+        database_context, repository_class = get_db(use_replicas=False), MySQLCarExpiryRepository
+    elif backend == "mongodb":
+        database_context, repository_class = get_mongodb(), MongoDBCarExpiryRepository
+    else:
+        database_context, repository_class = get_neo4j(), Neo4jCarExpiryRepository
+
+    with database_context as database:
+        worker = CarExpiryWorker(repository_class(database), backend)
+        if once:
+            logger.info("Deleted %s expired %s cars", worker.run_pass(stop_event), backend)
+        else:
+            worker.run(stop_event, interval_seconds)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Delete the cars that passed their purchase deadline unpurchased.")
+    parser.add_argument('--backend', choices=SUPPORTED_BACKENDS, required=True,
+                        help="The database to delete the expired cars from")
+    parser.add_argument('--interval-seconds', type=float, default=CAR_EXPIRY_INTERVAL_SECONDS,
+                        help="How long to wait between the passes over the expired cars")
+    parser.add_argument('--once', action='store_true', help="Delete the expired cars once and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        run_worker(args.backend, Event(), args.once, args.interval_seconds)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,294 @@
+"""
+Replicates the MySQL writes to MongoDB and Neo4j through the change_events transactional outbox.
+
+Every MySQL repository write appends a change event in its own transaction, and the replicator applies the
+change events to a replica in batches, in the order of their ID, copying the current state of the changed
+customers, sales people, cars and purchases from MySQL. The last applied change event is saved per replica,
+so the replicator resumes where it stopped, and a replay from an earlier offset applies the changes again.
+The replicator runs as a separate process per replica:
+    python -m app.workers.change_replicator --replica=mongodb
+    python -m app.workers.change_replicator --replica=neo4j --replay-from=0 --once
+"""
+# External Library imports
+import time
+import logging
+import argparse
+from threading import Event
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+# Internal library imports
+from db import get_db, get_mongodb, get_neo4j
+from app.core.metrics import MetricsRegistry, metrics_registry
+from app.models.change_event import CHANGE_AGGREGATES, get_changed_at
+from app.core.config import (
+    SUPPORTED_REPLICAS,
+    REPLICATION_BATCH_SIZE,
+    REPLICATION_POLL_SECONDS,
+    REPLICATION_SETTLE_SECONDS,
+    REPLICATION_GAP_RECHECK_SECONDS,
+    REPLICATION_RETENTION_DAYS
+)
+from app.repositories.replication_repositories import (
+    ReplicationSourceRepository,
+    ReplicaRepository,
+    ChangeEvent,
+    MySQLReplicationSourceRepository,
+    MongoDBReplicaRepository,
+    Neo4jReplicaRepository
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_deleted_ids(changed_ids: List[str], current_ids: List[str]) -> List[str]:
+    # The changed aggregates that no longer exist in MySQL
+    current_id_set = set(current_ids)
+    return [changed_id for changed_id in changed_ids if changed_id not in current_id_set]
+
+
+class ChangeWindows:
+    """
+    The time windows of a replicator, counted back from now: how long a gap in the change event IDs is waited for,
+    how long a passed gap is checked again for a late commit, and how long the applied change events are kept.
+    """
+
+    def __init__(
+            self,
+            settle_seconds: float = REPLICATION_SETTLE_SECONDS,
+            gap_recheck_seconds: float = REPLICATION_GAP_RECHECK_SECONDS,
+            retention_days: int = REPLICATION_RETENTION_DAYS,
+            now: Callable[[], datetime] = get_changed_at
+    ):
+        self.settle_seconds = settle_seconds
+        self.gap_recheck_seconds = gap_recheck_seconds
+        self.retention_days = retention_days
+        self.now = now
+        # The IDs of the gaps that were passed and when, checked again until gap_recheck_seconds has passed
+        self.passed_gaps: Dict[int, datetime] = {}
+
+
+class ChangeReplicator:
+    """
+    Applies the change events after the offset of the replica in batches of batch_size.
+    Several changes to the same aggregate in a batch are written once, with its current state.
+    Only one replicator should run per replica, so the offset only moves forward.
+    """
+
+    def __init__(
+            self,
+            source: ReplicationSourceRepository,
+            replica: ReplicaRepository,
+            replica_name: str,
+            batch_size: int = REPLICATION_BATCH_SIZE,
+            settle_seconds: float = REPLICATION_SETTLE_SECONDS,
+            gap_recheck_seconds: float = REPLICATION_GAP_RECHECK_SECONDS,
+            retention_days: int = REPLICATION_RETENTION_DAYS,
+            registry: MetricsRegistry = metrics_registry,
+            now: Callable[[], datetime] = get_changed_at
+    ):
+        self.source = source
+        self.replica = replica
+        self.replica_name = replica_name
+        self.batch_size = batch_size
+        self.windows = ChangeWindows(settle_seconds, gap_recheck_seconds, retention_days, now)
+        self.registry = registry
+
+    def get_settled_changes(self, changes: List[ChangeEvent], last_change_id: int) -> List[ChangeEvent]:
+        """
+        Returns the changes up to the first gap in the IDs that is younger than settle_seconds.
+        The AUTO_INCREMENT IDs are handed out when the change events are inserted, but only become visible
+        when their transaction commits, so a gap can be a transaction that is still open.
+        Gaps left by rolled back transactions are passed once the change event after them is old enough,
+        and remembered, so the change events of a transaction that commits even later are still applied.
+        """
+        now = self.windows.now()
+        settled_before = now - timedelta(seconds=self.windows.settle_seconds)
+        settled_changes: List[ChangeEvent] = []
+        expected_change_id = last_change_id + 1
+        for change in changes:
+            change_id, _, _, created_at = change
+            if change_id != expected_change_id and created_at > settled_before:
+                break
+            for gap_change_id in range(expected_change_id, change_id):
+                self.windows.passed_gaps[gap_change_id] = now
+            settled_changes.append(change)
+            expected_change_id = change_id + 1
+        return settled_changes
+
+    def get_late_changes(self) -> List[ChangeEvent]:
+        """
+        Returns the change events committed since their gap was passed, and forgets the gaps older than gap_recheck_seconds.
+        The passed gaps are only kept in memory, so a gap passed shortly before the replicator restarts is not checked again.
+        """
+        windows = self.windows
+        if not windows.passed_gaps:
+            return []
+        recheck_after = windows.now() - timedelta(seconds=windows.gap_recheck_seconds)
+        windows.passed_gaps = {
+            change_id: passed_at for change_id, passed_at in windows.passed_gaps.items() if passed_at > recheck_after
+        }
+        late_changes = self.source.get_changes_by_ids(list(windows.passed_gaps)) if windows.passed_gaps else []
+        for change_id, _, _, _ in late_changes:
+            del windows.passed_gaps[change_id]
+        return late_changes
+
+    def apply_changes(self, changed_ids: Dict[str, List[str]]):
+        customers = self.source.get_customers(changed_ids["customer"]) if changed_ids["customer"] else []
+        sales_people = self.source.get_sales_people(changed_ids["sales_person"]) if changed_ids["sales_person"] else []
+        cars = self.source.get_cars(changed_ids["car"]) if changed_ids["car"] else []
+        purchases = self.source.get_purchases(changed_ids["purchase"]) if changed_ids["purchase"] else []
+
+        # Deleted from the purchases up and written from the customers down, so no reference is left dangling
+        deleted_purchase_ids = get_deleted_ids(changed_ids["purchase"], [purchase.id for purchase in purchases])
+        if deleted_purchase_ids:
+            self.replica.delete_purchases(deleted_purchase_ids)
+        deleted_car_ids = get_deleted_ids(changed_ids["car"], [car.id for car in cars])
+        if deleted_car_ids:
+            self.replica.delete_cars(deleted_car_ids)
+        deleted_sales_person_ids = get_deleted_ids(
+            changed_ids["sales_person"], [sales_person.id for sales_person, _ in sales_people]
+        )
+        if deleted_sales_person_ids:
+            self.replica.delete_sales_people(deleted_sales_person_ids)
+        deleted_customer_ids = get_deleted_ids(changed_ids["customer"], [customer.id for customer in customers])
+        if deleted_customer_ids:
+            self.replica.delete_customers(deleted_customer_ids)
+
+        if customers:
+            self.replica.upsert_customers(customers)
+        if sales_people:
+            self.replica.upsert_sales_people(sales_people)
+        if cars:
+            self.replica.upsert_cars(cars)
+        if purchases:
+            self.replica.upsert_purchases(purchases)
+
+    def replicate_batch(self) -> int:
+        """
+        Applies the next batch of settled change events and returns the amount of change events applied.
+        """
+        last_change_id = self.source.get_offset(self.replica_name)
+        late_changes = self.get_late_changes()
+        changes = self.get_settled_changes(self.source.get_changes(last_change_id, self.batch_size), last_change_id)
+        labels = {"replica": self.replica_name}
+        if late_changes or changes:
+            started_at = time.perf_counter()
+            self.apply_changes({
+                aggregate: list(dict.fromkeys(
+                    aggregate_id for _, change_aggregate, aggregate_id, _ in late_changes + changes
+                    if change_aggregate == aggregate
+                ))
+                for aggregate in CHANGE_AGGREGATES
+            })
+            if changes:
+                last_change_id = changes[-1][0]
+                self.source.save_offset(self.replica_name, last_change_id)
+            self.registry.inc_counter(
+                "kea_replication_applied_changes_total", len(late_changes) + len(changes), labels=labels,
+                help_text="MySQL change events applied to the replica."
+            )
+            self.registry.inc_counter(
+                "kea_replication_batches_total", labels=labels,
+                help_text="Batches of MySQL change events applied to the replica."
+            )
+            self.registry.set_gauge(
+                "kea_replication_last_batch_seconds", time.perf_counter() - started_at, labels=labels,
+                help_text="How long the last batch of change events took to apply to the replica."
+            )
+        self.update_lag_metrics(last_change_id)
+        return len(late_changes) + len(changes)
+
+    def update_lag_metrics(self, last_change_id: int):
+        labels = {"replica": self.replica_name}
+        pending_changes, oldest_created_at = self.source.get_pending_changes(last_change_id)
+        lag_seconds = (self.windows.now() - oldest_created_at).total_seconds() if oldest_created_at is not None else 0.0
+        self.registry.set_gauge(
+            "kea_replication_offset", last_change_id, labels=labels,
+            help_text="ID of the last MySQL change event applied to the replica."
+        )
+        self.registry.set_gauge(
+            "kea_replication_pending_changes", pending_changes, labels=labels,
+            help_text="MySQL change events waiting to be applied to the replica."
+        )
+        self.registry.set_gauge(
+            "kea_replication_lag_seconds", max(lag_seconds, 0.0), labels=labels,
+            help_text="Age of the oldest MySQL change event waiting to be applied to the replica."
+        )
+
+    def replay_from(self, change_id: int):
+        """
+        Moves the offset of the replica back, so the change events after change_id are applied again.
+        """
+        self.source.save_offset(self.replica_name, change_id)
+        logger.info("Replaying the change events after %s to the %s replica", change_id, self.replica_name)
+
+    def prune(self) -> int:
+        """
+        Deletes the change events applied by every replica that are older than the retention,
+        and returns the amount of deleted change events.
+        """
+        created_before = self.windows.now() - timedelta(days=self.windows.retention_days)
+        pruned_changes = 0
+        while True:
+            pruned_batch_changes = self.source.prune_changes(created_before, self.batch_size)
+            pruned_changes += pruned_batch_changes
+            if pruned_batch_changes < self.batch_size:
+                return pruned_changes
+
+    def run(self, stop_event: Event, poll_seconds: float = REPLICATION_POLL_SECONDS):
+        """
+        Applies batches until the stop event is set, pruning and waiting for new changes when it has caught up.
+        """
+        while not stop_event.is_set():
+            try:
+                applied_changes = self.replicate_batch()
+                if applied_changes < self.batch_size:
+                    self.prune()
+            # Any failure of a batch is logged and the batch is retried, so the replicator keeps running
+            except Exception as error:  # pragma: no cover  # pylint: disable=broad-exception-caught
+                logger.exception("Failed to replicate the change events to %s: %s", self.replica_name, error)
+                applied_changes = 0
+            if applied_changes < self.batch_size:
+                stop_event.wait(poll_seconds)
+
+
+def run_worker(
+        replica: str,
+        stop_event: Event,
+        once: bool,
+        poll_seconds: float,
+        replay_from: Optional[int]
+):  # pragma: no cover
+    if replica == "mongodb":
+        database_context, repository_class = get_mongodb(), MongoDBReplicaRepository
+    else:
+        database_context, repository_class = get_neo4j(), Neo4jReplicaRepository
+
+    with get_db(use_replicas=False) as session, database_context as database:
+        replicator = ChangeReplicator(MySQLReplicationSourceRepository(session), repository_class(database), replica)
+        if replay_from is not None:
+            replicator.replay_from(replay_from)
+        if once:
+            while replicator.replicate_batch() == replicator.batch_size:
+                pass
+        else:
+            replicator.run(stop_event, poll_seconds)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Replicate the MySQL change events to MongoDB or Neo4j.")
+    parser.add_argument('--replica', choices=SUPPORTED_REPLICAS, required=True,
+                        help="The database to apply the change events to")
+    parser.add_argument('--poll-seconds', type=float, default=REPLICATION_POLL_SECONDS,
+                        help="How long to wait for new change events when the replica has caught up")
+    parser.add_argument('--replay-from', type=int, default=None,
+                        help="Apply the change events after this change event ID again")
+    parser.add_argument('--once', action='store_true', help="Apply the pending change events once and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        run_worker(args.replica, Event(), args.once, args.poll_seconds, args.replay_from)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,145 @@
+"""
+Propagates the customer changes recorded in the MongoDB customer outbox
+to the copies of the customers embedded in the cars and purchases.
+
+The propagator runs as a separate process, or in a background thread of a single worker API
+started with MONGODB_OUTBOX_PROPAGATOR_IN_PROCESS=true:
+    python -m app.workers.mongodb_customer_propagator
+"""
+# External Library imports
+import logging
+import argparse
+from datetime import datetime, timezone
+from threading import Event, Thread
+from typing import Dict, Optional
+from pymongo import UpdateMany
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
+
+# Internal library imports
+from db import get_mongodb
+from app.core.metrics import MetricsRegistry, metrics_registry
+from app.core.config import MONGODB_OUTBOX_BATCH_SIZE, MONGODB_OUTBOX_POLL_SECONDS
+from app.repositories.customer_repositories import CUSTOMER_OUTBOX_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+
+def as_utc(moment: datetime) -> datetime:
+    # PyMongo returns naive datetimes in UTC unless the client is created with tz_aware=True
+    return moment if moment.tzinfo is not None else moment.replace(tzinfo=timezone.utc)
+
+
+class CustomerOutboxPropagator:
+    """
+    Applies the pending outbox entries in batches, oldest first.
+    Every customer in a batch is read once and written to all its cars and purchases
+    with one UpdateMany per collection, sent together in an unordered bulk write.
+    Only one propagator should run per database, so the copies are always written in the order of the changes.
+    """
+
+    def __init__(
+            self,
+            database: Database,
+            batch_size: int = MONGODB_OUTBOX_BATCH_SIZE,
+            registry: MetricsRegistry = metrics_registry
+    ):
+        self.database = database
+        self.batch_size = batch_size
+        self.registry = registry
+
+    def propagate_batch(self) -> int:
+        """
+        Propagates the next batch of pending changes and returns the amount of outbox entries processed.
+        """
+        outbox = self.database.get_collection(CUSTOMER_OUTBOX_COLLECTION)
+        entries = list(outbox.find({"processed_at": None}).sort("created_at", 1).limit(self.batch_size))
+        if entries:
+            customer_ids = list(dict.fromkeys(entry["customer_id"] for entry in entries))
+            # The current customers are propagated, so several changes to the same customer are written once.
+            customers: Dict[str, dict] = {
+                customer["_id"]: customer
+                for customer in self.database.get_collection("customers").find(
+                    {"_id": {"$in": customer_ids}},
+                    projection={"email_ngrams": False}
+                )
+            }
+            if customers:
+                self.database.get_collection("cars").bulk_write([
+                    UpdateMany({"customer._id": customer_id}, {"$set": {"customer": customer}})
+                    for customer_id, customer in customers.items()
+                ], ordered=False)
+                self.database.get_collection("purchases").bulk_write([
+                    UpdateMany({"car.customer._id": customer_id}, {"$set": {"car.customer": customer}})
+                    for customer_id, customer in customers.items()
+                ], ordered=False)
+            outbox.update_many(
+                {"_id": {"$in": [entry["_id"] for entry in entries]}},
+                {"$set": {"processed_at": datetime.now(timezone.utc)}}
+            )
+            self.registry.inc_counter(
+                "kea_mongodb_customer_outbox_propagated_total", len(entries),
+                help_text="Customer changes propagated to the embedded copies in the cars and purchases."
+            )
+        self.update_lag_metrics()
+        return len(entries)
+
+    def update_lag_metrics(self):
+        outbox = self.database.get_collection(CUSTOMER_OUTBOX_COLLECTION)
+        oldest_pending_entry: Optional[dict] = outbox.find_one({"processed_at": None}, sort=[("created_at", 1)])
+        lag_seconds = 0.0
+        if oldest_pending_entry is not None:
+            lag_seconds = (datetime.now(timezone.utc) - as_utc(oldest_pending_entry["created_at"])).total_seconds()
+        self.registry.set_gauge(
+            "kea_mongodb_customer_outbox_pending", outbox.count_documents({"processed_at": None}),
+            help_text="Customer changes waiting to be propagated to the cars and purchases."
+        )
+        self.registry.set_gauge(
+            "kea_mongodb_customer_outbox_lag_seconds", lag_seconds,
+            help_text="Age of the oldest customer change waiting to be propagated."
+        )
+
+    def run(self, stop_event: Event, poll_seconds: float = MONGODB_OUTBOX_POLL_SECONDS):
+        """
+        Propagates batches until the stop event is set, waiting for new changes when the outbox is drained.
+        """
+        while not stop_event.is_set():
+            try:
+                processed_entries = self.propagate_batch()
+            # A lost connection or a failed write is logged and the batch is retried, so the propagator keeps running
+            except PyMongoError as error:  # pragma: no cover
+                logger.exception("Failed to propagate the customer outbox: %s", error)
+                processed_entries = 0
+            if processed_entries < self.batch_size:
+                stop_event.wait(poll_seconds)
+
+
+def run_propagator(stop_event: Event, poll_seconds: float = MONGODB_OUTBOX_POLL_SECONDS):  # pragma: no cover
+    with get_mongodb() as database:
+        CustomerOutboxPropagator(database).run(stop_event, poll_seconds)
+
+
+def start_propagator_thread(stop_event: Event) -> Thread:  # pragma: no cover
+    thread = Thread(target=run_propagator, args=(stop_event,), name="mongodb-customer-propagator", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == '__main__':  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Propagate the MongoDB customer outbox to the cars and purchases.")
+    parser.add_argument('--poll-seconds', type=float, default=MONGODB_OUTBOX_POLL_SECONDS,
+                        help="How long to wait for new changes when the outbox is empty")
+    parser.add_argument('--once', action='store_true', help="Propagate the pending changes once and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.once:
+        with get_mongodb() as mongodb:
+            propagator = CustomerOutboxPropagator(mongodb)
+            while propagator.propagate_batch() == propagator.batch_size:
+                pass
+    else:
+        try:
+            run_propagator(Event(), args.poll_seconds)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,158 @@
+"""
+Moves the purchases older than PURCHASE_ARCHIVE_AFTER_DAYS, with a snapshot of their cars,
+from the hot purchases and cars tables to the archived_purchases archive, which is partitioned by month.
+
+The purchases are archived in small batches in the order of the date of purchase index, each batch in its own
+short transaction with a pause in between, like the car expiry worker.
+The worker runs as a separate process per backend:
+    python -m app.workers.purchase_archive_worker --backend=mysql
+"""
+# External Library imports
+import time
+import logging
+import argparse
+from threading import Event
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Optional
+
+# Internal library imports
+from db import get_db, get_mongodb
+from app.core.metrics import MetricsRegistry, metrics_registry
+from app.core.config import (
+    PURCHASE_ARCHIVE_AFTER_DAYS,
+    PURCHASE_ARCHIVE_BATCH_SIZE,
+    PURCHASE_ARCHIVE_PAUSE_SECONDS,
+    PURCHASE_ARCHIVE_INTERVAL_SECONDS
+)
+from app.workers.batch_schedule import BatchSchedule
+from app.repositories.archive_repositories import (
+    ArchiveRepository,
+    ArchiveCursor,
+    MySQLArchiveRepository,
+    MongoDBArchiveRepository
+)
+
+logger = logging.getLogger(__name__)
+
+# Neo4j has no cars or purchases to archive
+ARCHIVE_BACKENDS = ("mysql", "mongodb")
+
+
+class PurchaseArchiveWorker:
+    """
+    Walks the archivable purchases in batches of batch_size, ordered by date of purchase and ID,
+    remembering the last visited purchase, so every pass visits each archivable purchase once
+    and the pass can resume after a failed batch.
+    """
+
+    def __init__(
+            self,
+            repository: ArchiveRepository,
+            backend: str,
+            archive_after_days: int = PURCHASE_ARCHIVE_AFTER_DAYS,
+            batch_size: int = PURCHASE_ARCHIVE_BATCH_SIZE,
+            pause_seconds: float = PURCHASE_ARCHIVE_PAUSE_SECONDS,
+            registry: MetricsRegistry = metrics_registry,
+            today: Callable[[], date] = date.today,
+            sleep: Callable[[float], None] = time.sleep
+    ):
+        self.repository = repository
+        self.backend = backend
+        self.archive_after_days = archive_after_days
+        self.schedule = BatchSchedule(batch_size, pause_seconds, today, sleep)
+        self.registry = registry
+        self.cursor: Optional[ArchiveCursor] = None
+
+    def archive_batch(self, purchased_before: date) -> Optional[int]:
+        """
+        Archives the next batch of purchases after the cursor and returns the amount of archived purchases,
+        or None when the pass has visited every archivable purchase.
+        """
+        purchases = self.repository.get_archivable_purchases(purchased_before, self.cursor, self.schedule.batch_size)
+        if not purchases:
+            return None
+        started_at = time.perf_counter()
+        archived_purchases = self.repository.archive_purchases(
+            [purchase_id for _, purchase_id in purchases], purchased_before
+        )
+        self.cursor = purchases[-1]
+
+        labels = {"backend": self.backend}
+        self.registry.inc_counter(
+            "kea_purchase_archive_archived_purchases_total", archived_purchases, labels=labels,
+            help_text="Purchases moved with their cars to the archive by the purchase archive worker."
+        )
+        self.registry.inc_counter(
+            "kea_purchase_archive_batches_total", labels=labels,
+            help_text="Batches of purchases archived by the purchase archive worker."
+        )
+        self.registry.set_gauge(
+            "kea_purchase_archive_last_batch_seconds", time.perf_counter() - started_at, labels=labels,
+            help_text="How long the last batch of purchases took to archive."
+        )
+        logger.info("Archived %s %s purchases up to date of purchase %s and purchase %s",
+                    archived_purchases, self.backend, *self.cursor)
+        return archived_purchases
+
+    def run_pass(self, stop_event: Optional[Event] = None) -> int:
+        """
+        Archives all the purchases made more than archive_after_days ago, pausing between the batches,
+        and returns the amount of archived purchases.
+        """
+        purchased_before = self.schedule.today() - timedelta(days=self.archive_after_days)
+        self.cursor = None
+        archived_purchases = 0
+        while stop_event is None or not stop_event.is_set():
+            archived_batch_purchases = self.archive_batch(purchased_before)
+            if archived_batch_purchases is None:
+                break
+            archived_purchases += archived_batch_purchases
+            self.schedule.pause()
+        self.registry.set_gauge(
+            "kea_purchase_archive_last_pass_timestamp_seconds", datetime.now(timezone.utc).timestamp(),
+            labels={"backend": self.backend},
+            help_text="When the purchase archive worker last finished archiving the old purchases."
+        )
+        return archived_purchases
+
+    def run(self, stop_event: Event, interval_seconds: float = PURCHASE_ARCHIVE_INTERVAL_SECONDS):
+        """
+        Runs a pass every interval until the stop event is set.
+        """
+        while not stop_event.is_set():
+            try:
+                self.run_pass(stop_event)
+            # Any failure of a pass is logged and the next pass starts over, so the worker keeps running
+            except Exception as error:  # pragma: no cover  # pylint: disable=broad-exception-caught
+                logger.exception("Failed to archive the old %s purchases: %s", self.backend, error)
+            stop_event.wait(interval_seconds)
+
+
+def run_worker(backend: str, stop_event: Event, once: bool, interval_seconds: float):  # pragma: no cover
+    if backend == "mysql":
+        database_context, repository_class = get_db(use_replicas=False), MySQLArchiveRepository
+    else:
+        database_context, repository_class = get_mongodb(), MongoDBArchiveRepository
+
+    with database_context as database:
+        worker = PurchaseArchiveWorker(repository_class(database), backend)
+        if once:
+            logger.info("Archived %s old %s purchases", worker.run_pass(stop_event), backend)
+        else:
+            worker.run(stop_event, interval_seconds)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Move the old purchases and their cars to the archive.")
+    parser.add_argument('--backend', choices=ARCHIVE_BACKENDS, required=True,
+                        help="The database to archive the old purchases of")
+    parser.add_argument('--interval-seconds', type=float, default=PURCHASE_ARCHIVE_INTERVAL_SECONDS,
+                        help="How long to wait between the passes over the old purchases")
+    parser.add_argument('--once', action='store_true', help="Archive the old purchases once and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        run_worker(args.backend, Event(), args.once, args.interval_seconds)
+    except KeyboardInterrupt:
+        pass
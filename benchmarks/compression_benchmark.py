@@ -0,0 +1,94 @@
+"""
+Measures the bytes on the wire and the CPU time of every supported response compression
+for the payloads the API returns, from a single car to long car and model lists.
+
+The payloads are the JSON bodies of the seeded cars and models of the in-memory database,
+repeated up to the requested amount of items with new ids, so the numbers are close to the real responses.
+
+Usage:
+    python benchmarks/compression_benchmark.py
+    python benchmarks/compression_benchmark.py --items 1 10 100 1000 --rounds=10
+
+The best round of each compression is reported, like timeit does.
+"""
+# External Library imports
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+from itertools import cycle, islice
+from typing import Callable, List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Internal library imports
+from db import InMemoryDatabase
+from app.repositories.car_repositories import InMemoryCarRepository
+from app.repositories.model_repositories import InMemoryModelRepository
+from app.core.compression import (
+    StreamCompressor,
+    GzipCompressor,
+    BrotliCompressor,
+    ZstdCompressor,
+    COMPRESSORS,
+    compress
+)
+
+DEFAULT_ITEMS = [1, 10, 100, 1000]
+
+LEVELS = {
+    "gzip": [1, 6, 9],
+    "br": [1, 4, 11],
+    "zstd": [1, 3, 19],
+}
+
+COMPRESSOR_CLASSES = {"gzip": GzipCompressor, "br": BrotliCompressor, "zstd": ZstdCompressor}
+
+
+def create_payloads(items: List[int]) -> List[tuple]:
+    database = InMemoryDatabase.from_seed_file()
+    cars = [car.model_dump(mode="json") for car in InMemoryCarRepository(database).get_all()]
+    models = [model.model_dump(mode="json") for model in InMemoryModelRepository(database).get_all()]
+    payloads = []
+    for name, resources in (("cars", cars), ("models", models)):
+        for amount in items:
+            payload = [{**resource, "id": str(uuid.uuid4())} for resource in islice(cycle(resources), amount)]
+            payloads.append((f"{amount} {name}", json.dumps(payload).encode()))
+    return payloads
+
+
+def measure_compression(body: bytes, create_compressor: Callable[[], StreamCompressor], rounds: int) -> tuple:
+    best_seconds = float("inf")
+    compressed_body = b""
+    for _ in range(rounds):
+        start_time = time.perf_counter()
+        compressed_body = compress(body, create_compressor())
+        best_seconds = min(best_seconds, time.perf_counter() - start_time)
+    return len(compressed_body), best_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the size and CPU time of the response compressions.")
+    parser.add_argument('--items', type=int, nargs='+', default=DEFAULT_ITEMS,
+                        help="The amounts of cars and models per payload")
+    parser.add_argument('--rounds', type=int, default=5, help="The number of times every payload is compressed")
+    args = parser.parse_args()
+
+    print(f"{'payload':<14}{'encoding':<10}{'level':>6}{'bytes':>11}{'ratio':>8}{'ms':>9}{'MB/s':>9}")
+    for payload_name, body in create_payloads(args.items):
+        print(f"{payload_name:<14}{'identity':<10}{'-':>6}{len(body):>11}{1:>8.2f}{0:>9.3f}{'-':>9}")
+        for encoding in COMPRESSORS:
+            for level in LEVELS[encoding]:
+                size, seconds = measure_compression(
+                    body, lambda: COMPRESSOR_CLASSES[encoding](level), args.rounds
+                )
+                print(
+                    f"{'':<14}{encoding:<10}{level:>6}{size:>11}{len(body) / size:>8.2f}"
+                    f"{seconds * 1000:>9.3f}{len(body) / seconds / 1_000_000:>9.1f}"
+                )
+
+
+if __name__ == '__main__':
+    main()
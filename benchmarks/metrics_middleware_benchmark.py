@@ -0,0 +1,107 @@
+"""
+Measures the overhead the MetricsMiddleware adds per request.
+
+The same minimal FastAPI application is called directly through the ASGI interface,
+with and without the middleware, so no network or database time is part of the measurement.
+
+Usage:
+    python benchmarks/metrics_middleware_benchmark.py
+    python benchmarks/metrics_middleware_benchmark.py --requests=50000 --rounds=10
+
+The best round of each variant is reported, like timeit does, since slower rounds
+are caused by other processes and the garbage collector rather than by the code measured.
+"""
+# External Library imports
+import os
+import sys
+import time
+import asyncio
+import argparse
+import timeit
+from fastapi import FastAPI
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Internal library imports
+from app.core.metrics import MetricsMiddleware, MetricsRegistry
+
+
+def create_app(with_metrics: bool) -> FastAPI:
+    benchmark_app = FastAPI()
+    if with_metrics:
+        benchmark_app.add_middleware(MetricsMiddleware, registry=MetricsRegistry())
+
+    @benchmark_app.get("/mysql/car/{car_id}")
+    async def get_car(car_id: str):
+        return {"id": car_id}
+
+    return benchmark_app
+
+
+async def call(asgi_app, path: str):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("benchmark", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message):
+        return None
+
+    await asgi_app(scope, receive, send)
+
+
+async def run_round(asgi_app, requests: int) -> float:
+    start_time = time.perf_counter()
+    for index in range(requests):
+        await call(asgi_app, f"/mysql/car/{index}")
+    return (time.perf_counter() - start_time) / requests
+
+
+async def main(requests: int, rounds: int):
+    apps = {"without metrics": create_app(False), "with metrics": create_app(True)}
+    results = {name: [] for name in apps}
+
+    # Warm up both applications so the route matching and middleware stacks are built.
+    for asgi_app in apps.values():
+        await run_round(asgi_app, 1000)
+
+    for round_number in range(rounds):
+        # Alternate the order, so neither variant always runs on a warmer interpreter.
+        names = list(apps) if round_number % 2 == 0 else list(reversed(apps))
+        for name in names:
+            results[name].append(await run_round(apps[name], requests))
+
+    baseline = min(results["without metrics"])
+    instrumented = min(results["with metrics"])
+    registry = MetricsRegistry()
+    observe_time = timeit.timeit(
+        lambda: registry.observe_request("mysql", "GET", "/mysql/car/{car_id}", 200, 0.01),
+        number=requests
+    ) / requests
+    print(f"Requests per round: {requests}, rounds: {rounds}")
+    print(f"without metrics: {baseline * 1_000_000:8.2f} µs/request")
+    print(f"with metrics:    {instrumented * 1_000_000:8.2f} µs/request")
+    print(f"overhead:        {(instrumented - baseline) * 1_000_000:8.2f} µs/request "
+          f"({(instrumented / baseline - 1) * 100:.1f}%)")
+    print(f"registry observe: {observe_time * 1_000_000:7.2f} µs/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the overhead of the metrics middleware.")
+    parser.add_argument("--requests", type=int, default=20000, help="Requests per round.")
+    parser.add_argument("--rounds", type=int, default=10, help="Number of rounds, the best round is reported.")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
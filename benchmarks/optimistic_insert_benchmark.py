@@ -0,0 +1,109 @@
+"""
+Compares creating customers by checking the email first and then inserting (check then insert)
+with inserting directly and relying on the unique email index (insert).
+
+Both new emails and already taken emails are measured, since a taken email costs
+a failed insert instead of a cheap lookup on the insert path.
+Every insert runs inside a request trace, so the statements per insert are counted too.
+
+Usage:
+    python benchmarks/optimistic_insert_benchmark.py
+    python benchmarks/optimistic_insert_benchmark.py --backend=mysql --inserts=1000
+
+The MySQL inserts are made against the test database and rolled back,
+and the MongoDB customers are deleted again afterwards.
+"""
+# External Library imports
+import os
+import sys
+import time
+import argparse
+import statistics
+from uuid import uuid4
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Internal library imports
+from db import get_db, get_mongodb, get_in_memory_db
+from app.core.tracing import trace_request
+from app.services import customers_service
+from app.exceptions.database_errors import AlreadyTakenFieldValueError
+from app.resources.customer_resource import CustomerCreateResource
+from app.repositories.customer_repositories import (
+    CustomerRepository,
+    MySQLCustomerRepository,
+    MongoDBCustomerRepository,
+    InMemoryCustomerRepository
+)
+
+
+@contextmanager
+def get_customer_repository(backend: str) -> Iterator[CustomerRepository]:
+    if backend == "mysql":
+        with get_db(is_test_db=True) as session:
+            yield MySQLCustomerRepository(session)
+            session.rollback()
+    elif backend == "mongodb":
+        with get_mongodb() as database:
+            yield MongoDBCustomerRepository(database)
+            database.get_collection("customers").delete_many({"email": {"$regex": "^benchmark-"}})
+    else:
+        with get_in_memory_db() as database:
+            yield InMemoryCustomerRepository(database)
+
+
+def check_then_insert(repository: CustomerRepository, customer_create_data: CustomerCreateResource):
+    if repository.is_email_taken(customer_create_data):
+        raise AlreadyTakenFieldValueError("Customer", "email", customer_create_data.email)
+    repository.create(customer_create_data)
+
+
+def insert(repository: CustomerRepository, customer_create_data: CustomerCreateResource):
+    customers_service.create(repository, customer_create_data)
+
+
+def measure(
+        repository: CustomerRepository,
+        create: Callable[[CustomerRepository, CustomerCreateResource], None],
+        emails: List[str]
+) -> Tuple[List[float], float]:
+    durations: List[float] = []
+    statements = 0
+    for email in emails:
+        customer_create_data = CustomerCreateResource(
+            email=email, first_name="Bench", last_name="Mark", phone_number="12345678", address="Benchmark 1"
+        )
+        with trace_request() as trace:
+            start_time = time.perf_counter()
+            try:
+                create(repository, customer_create_data)
+            except AlreadyTakenFieldValueError:
+                pass
+            durations.append(time.perf_counter() - start_time)
+        statements += trace.count()
+    return durations, statements / len(emails)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare check then insert with constraint-backed inserts.")
+    parser.add_argument('--backend', choices=["mysql", "mongodb", "in-memory"], default="in-memory")
+    parser.add_argument('--inserts', type=int, default=200, help="The number of customers created per variant")
+    args = parser.parse_args()
+
+    print(f"{'variant':<20}{'emails':<8}{'median (ms)':>13}{'p95 (ms)':>10}{'statements':>12}")
+    with get_customer_repository(args.backend) as repository:
+        run_id = uuid4().hex
+        for name, create in (("check then insert", check_then_insert), ("insert", insert)):
+            new_emails = [f"benchmark-{run_id}-{name.replace(' ', '-')}-{index}@gmail.com" for index in range(args.inserts)]
+            for emails_name, emails in (("new", new_emails), ("taken", new_emails)):
+                durations, statements = measure(repository, create, emails)
+                print(
+                    f"{name:<20}{emails_name:<8}{statistics.median(durations) * 1000:>13.3f}"
+                    f"{statistics.quantiles(durations, n=20)[-1] * 1000:>10.3f}{statements:>12.1f}"
+                )
+
+
+if __name__ == '__main__':
+    main()
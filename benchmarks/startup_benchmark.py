@@ -0,0 +1,83 @@
+"""
+Measures the startup time and memory of the application for each ENABLED_BACKENDS configuration.
+
+Every run starts a fresh Python process that imports main, like a new pod does,
+and reports the time until the application is ready to serve, the peak resident memory (RSS)
+and the time the first request to /openapi.json takes, since the schema is generated on first use.
+
+Usage:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --runs=10 --configurations mysql mysql,mongodb,neo4j
+
+The median of the runs is reported, since the first run also pays for the cold file system cache.
+"""
+# External Library imports
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+PROJECT_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+DEFAULT_CONFIGURATIONS = ["mysql", "mongodb", "neo4j", "mysql,mongodb,neo4j"]
+
+# Runs inside the child process, so nothing is imported before the measurement starts.
+STARTUP_SCRIPT = """
+import sys
+import json
+import time
+import resource
+start_time = time.perf_counter()
+import main
+ready_time = time.perf_counter() - start_time
+start_time = time.perf_counter()
+main.app.openapi()
+openapi_time = time.perf_counter() - start_time
+print(json.dumps({
+    "ready_seconds": ready_time,
+    "openapi_seconds": openapi_time,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "paths": len(main.app.openapi()["paths"]),
+    "loaded_drivers": [module for module in ("pymongo", "neo4j", "requests") if module in sys.modules],
+}))
+"""
+
+
+def measure_startup(enabled_backends: str) -> dict:
+    environment = {**os.environ, "ENABLED_BACKENDS": enabled_backends}
+    completed_process = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=PROJECT_DIRECTORY,
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(completed_process.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the startup time and memory per ENABLED_BACKENDS.")
+    parser.add_argument('--runs', type=int, default=5, help="The number of processes started per configuration")
+    parser.add_argument(
+        '--configurations', nargs='+', default=DEFAULT_CONFIGURATIONS,
+        help="The ENABLED_BACKENDS values to measure"
+    )
+    args = parser.parse_args()
+
+    print(f"{'ENABLED_BACKENDS':<22}{'ready (ms)':>12}{'openapi (ms)':>14}{'RSS (MB)':>10}{'paths':>7}  drivers loaded")
+    for configuration in args.configurations:
+        results = [measure_startup(configuration) for _ in range(args.runs)]
+        ready_ms = statistics.median(result["ready_seconds"] for result in results) * 1000
+        openapi_ms = statistics.median(result["openapi_seconds"] for result in results) * 1000
+        max_rss_mb = statistics.median(result["max_rss_mb"] for result in results)
+        print(
+            f"{configuration:<22}{ready_ms:>12.0f}{openapi_ms:>14.0f}{max_rss_mb:>10.1f}"
+            f"{results[0]['paths']:>7}  {', '.join(results[0]['loaded_drivers']) or '-'}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,97 @@
 import os
+import json
+from time import time_ns, monotonic
+from uuid import UUID, uuid4
+from datetime import date, datetime, time, timedelta
+from threading import RLock
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 from dotenv import load_dotenv
+from functools import lru_cache
 from contextlib import contextmanager
-from sqlalchemy import create_engine, Engine
+from sqlalchemy import create_engine, Engine, String, BINARY, Select, TextClause
+from sqlalchemy.engine import Dialect
+from sqlalchemy.types import TypeDecorator, TypeEngine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
-from pymongo import MongoClient
-from pymongo.database import Database
-from neo4j import GraphDatabase, Driver, Session as Neo4jSession
+from app.core.tracing import TracedNeo4jSession
+from app.exceptions.database_errors import InMemoryDuplicateKeyError
+from app.core.config import (
+    MYSQL_UUID_STORAGE,
+    SUPPORTED_MYSQL_UUID_STORAGES,
+    MYSQL_REPLICA_URLS,
+    MYSQL_REPLICA_MAX_LAG_SECONDS,
+    MYSQL_REPLICA_CHECK_SECONDS,
+    MYSQL_REPLICA_CONNECT_TIMEOUT_SECONDS,
+    MYSQL_REPLICA_PROCEDURES
+)
+
+# pymongo and neo4j are imported when their backend is first used,
+# so deployments that only enable the MySQL backend never load them, see ENABLED_BACKENDS.
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from neo4j import Session as Neo4jSession
 
 load_dotenv()
 
 Base = declarative_base()
 
+
+def uuid7() -> UUID:
+    """
+    Returns a time-ordered UUID version 7, the milliseconds since the epoch followed by 74 random bits,
+    so new keys are appended to the end of the primary key index instead of scattered across it.
+    """
+    unix_ms = time_ns() // 1_000_000
+    random_bits = int.from_bytes(os.urandom(10), "big")
+    value = (unix_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76 | (random_bits >> 62 & 0xFFF) << 64
+    value |= 0b10 << 62 | random_bits & 0x3FFF_FFFF_FFFF_FFFF
+    return UUID(int=value)
+
+
+def new_uuid() -> str:
+    return str(uuid7() if MYSQL_UUID_STORAGE == "binary" else uuid4())
+
+
+# Bound for the IDs that are not UUIDs, the nil UUID is never generated as a key
+NO_ROW_BINARY_UUID = bytes(16)
+
+
+class UUIDString(TypeDecorator):
+    """
+    A UUID key that is a string to the rest of the API, stored as CHAR(36) or as BINARY(16) depending on the storage.
+    The binary UUIDs keep the byte order of the strings, like MySQL's UUID_TO_BIN without the swap flag,
+    so the keys sort the same way in both storages.
+    """
+    impl = String(36)
+    cache_ok = True
+
+    def __init__(self, storage: str = MYSQL_UUID_STORAGE):
+        if storage not in SUPPORTED_MYSQL_UUID_STORAGES:
+            raise ValueError(f"storage must be one of {', '.join(SUPPORTED_MYSQL_UUID_STORAGES)}, "
+                             f"not '{storage}'.")
+        super().__init__()
+        self.storage = storage
+
+    def load_dialect_impl(self, dialect: Dialect) -> TypeEngine:
+        if self.storage == "binary":
+            return dialect.type_descriptor(BINARY(16))
+        return dialect.type_descriptor(String(36))
+
+    def process_bind_param(self, value: Optional[str], dialect: Dialect) -> Optional[Union[str, bytes]]:
+        if value is None or self.storage == "char":
+            return value
+        try:
+            return UUID(value).bytes
+        except ValueError:
+            # An ID that is not a UUID can't be the key of any row, like a CHAR(36) key it just matches nothing
+            return NO_ROW_BINARY_UUID
+
+    def process_result_value(self, value: Optional[Union[str, bytes]], dialect: Dialect) -> Optional[str]:
+        if value is None or isinstance(value, str):
+            return value
+        return str(UUID(bytes=bytes(value)))
+
+
 def get_db_connection_string(is_test_connection_string: bool) -> str:
     """
     Creates a database engine using individual environment variables.
@@ -32,17 +113,160 @@ def get_db_connection_string(is_test_connection_string: bool) -> str:
     
     return connection_string
 
+@lru_cache(maxsize=None)
 def get_engine(is_test_engine: bool) -> Engine:
+    """
+    Returns the engine for the database, creating it on the first call,
+    so every session shares the same connection pool.
+    """
     connection_string = get_db_connection_string(is_test_connection_string=is_test_engine)
     engine = create_engine(connection_string, pool_pre_ping=True)
     return engine
 
-session_local = sessionmaker(autocommit=False, autoflush=False)
+def get_replica_lag_seconds(engine: Engine) -> Optional[float]:
+    """
+    Returns how many seconds the replica is behind its source, 0 for a server that is not replicating,
+    like a second schema on the same server, and None when its replication has stopped.
+    """
+    with engine.connect() as connection:
+        status = connection.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+    if status is None:
+        return 0.0
+    lag = status.get("Seconds_Behind_Source")
+    return None if lag is None else float(lag)
+
+
+class MySQLReplica:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.is_healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None
+
+
+class MySQLReplicaSet:
+    """
+    The replicas the read-only statements are spread over in turn. A replica is checked when its last check
+    is older than check_seconds, and skipped until the next check when it failed or lagged more than max_lag_seconds.
+    """
+
+    def __init__(
+            self,
+            engines: List[Engine],
+            max_lag_seconds: float = MYSQL_REPLICA_MAX_LAG_SECONDS,
+            check_seconds: float = MYSQL_REPLICA_CHECK_SECONDS,
+            get_lag_seconds: Callable[[Engine], Optional[float]] = get_replica_lag_seconds,
+            clock: Callable[[], float] = monotonic
+    ):
+        self.replicas = [MySQLReplica(engine) for engine in engines]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.get_lag_seconds = get_lag_seconds
+        self.clock = clock
+        self.lock = RLock()
+        self.next_index = 0
+
+    def check(self, replica: MySQLReplica):
+        try:
+            lag_seconds = self.get_lag_seconds(replica.engine)
+        except Exception:
+            lag_seconds = None
+        with self.lock:
+            replica.lag_seconds = lag_seconds
+            replica.is_healthy = lag_seconds is not None and lag_seconds <= self.max_lag_seconds
+
+    def get_replicas_to_check(self) -> List[MySQLReplica]:
+        # The replicas are claimed for their check under the lock, so only one thread checks each of them
+        with self.lock:
+            now = self.clock()
+            replicas = [
+                replica for replica in self.replicas
+                if replica.checked_at is None or now - replica.checked_at >= self.check_seconds
+            ]
+            for replica in replicas:
+                replica.checked_at = now
+        return replicas
+
+    def get_engine(self) -> Optional[Engine]:
+        """
+        Returns the engine of the next healthy replica, or None when none is, so the primary is used instead.
+        The due checks run outside the lock, so the other threads keep using the last known health meanwhile.
+        """
+        for replica in self.get_replicas_to_check():
+            self.check(replica)
+        with self.lock:
+            for offset in range(len(self.replicas)):
+                replica = self.replicas[(self.next_index + offset) % len(self.replicas)]
+                if replica.is_healthy:
+                    self.next_index = (self.next_index + offset + 1) % len(self.replicas)
+                    return replica.engine
+        return None
+
+
+def is_read_only_statement(statement: Any) -> bool:
+    """
+    Whether the statement only reads, a SELECT without FOR UPDATE, or a text SELECT or CALL of a read-only procedure.
+    """
+    if isinstance(statement, Select):
+        return statement._for_update_arg is None
+    if isinstance(statement, TextClause):
+        sql = " ".join(statement.text.split()).lower()
+        return sql.startswith("select ") or any(
+            sql.startswith(f"call {procedure}(") for procedure in MYSQL_REPLICA_PROCEDURES
+        )
+    return False
+
+
+class RoutingSession(Session):
+    """
+    A session that sends its read-only statements to a replica and everything else to the primary it is bound to.
+    The replica is picked on the first read and kept for the whole session, so its reads are consistent with each other.
+    Once the session has written, or locked rows, it keeps to the primary, so it reads its own writes.
+    """
+
+    def __init__(self, *args, replicas: Optional[MySQLReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.replica_engine: Optional[Engine] = None
+        self.is_using_primary = replicas is None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if not self.is_using_primary:
+            if self._flushing or not is_read_only_statement(clause):
+                self.is_using_primary = True
+            else:
+                if self.replica_engine is None:
+                    self.replica_engine = self.replicas.get_engine()
+                if self.replica_engine is not None:
+                    return self.replica_engine
+                # Without a healthy replica the session reads from the primary, and keeps to it
+                self.is_using_primary = True
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def get_replica_set() -> Optional[MySQLReplicaSet]:
+    """
+    Returns the replicas of MYSQL_REPLICA_URLS, creating their engines on the first call, or None without any.
+    """
+    if not MYSQL_REPLICA_URLS:
+        return None
+    return MySQLReplicaSet([
+        create_engine(url, pool_pre_ping=True, connect_args={"connect_timeout": MYSQL_REPLICA_CONNECT_TIMEOUT_SECONDS})
+        for url in MYSQL_REPLICA_URLS
+    ])
+
+session_local = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
 
 @contextmanager
-def get_db(is_test_db=False) -> Session:
+def get_db(is_test_db=False, use_replicas=True) -> Session:
+    """
+    Provides a session of the primary, which reads from the replicas until it writes, unless use_replicas is False.
+    The workers read what they are about to change, so they keep to the primary.
+    """
     engine = get_engine(is_test_engine=is_test_db)
-    session = session_local(bind=engine)
+    replicas = get_replica_set() if use_replicas and not is_test_db else None
+    session = session_local(bind=engine, replicas=replicas)
     try:
         yield session
         if not is_test_db:
@@ -53,12 +277,30 @@ def get_db(is_test_db=False) -> Session:
 
 
 
+def __getattr__(name: str) -> Any:
+    # The MongoDB and Neo4j controllers import these types from here for their dependencies.
+    if name == "Database":
+        from pymongo.database import Database
+        return Database
+    if name == "Neo4jSession":
+        from neo4j import Session as Neo4jSession
+        return Neo4jSession
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 @contextmanager
-def get_mongodb() -> Database:
+def get_mongodb() -> "Database":
     """
     Provides a MongoDB database connection using a context manager.
     """
-    client = MongoClient(host=os.getenv('MONGO_DB_HOST'), port=int(os.getenv('MONGO_DB_PORT')))
+    from pymongo import MongoClient
+    from app.core.mongodb_tracing import mongo_command_tracer
+
+    client = MongoClient(
+        host=os.getenv('MONGO_DB_HOST'),
+        port=int(os.getenv('MONGO_DB_PORT')),
+        event_listeners=[mongo_command_tracer]
+    )
     db_name = os.getenv('MONGO_DB_NAME')
     db = client.get_database(db_name)
     try:
@@ -67,11 +309,36 @@ def get_mongodb() -> Database:
         client.close()
 
 
+def as_mongodb_datetime(value: Union[date, str]) -> datetime:
+    """
+    Converts a date, or an ISO date string, to the datetime at midnight it is stored as in MongoDB,
+    since BSON has no date type and pymongo refuses to encode a date.
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return datetime.combine(value, time())
+
+
+def as_date(value: Union[date, str]) -> date:
+    """
+    Converts a datetime read from MongoDB, or an ISO date string not yet migrated, back to a date.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
 @contextmanager
-def get_neo4j() -> Neo4jSession:
+def get_neo4j() -> "Neo4jSession":
     """
     Provides a Neo4j database connection using a context manager.
     """
+    from neo4j import GraphDatabase, Driver
+
     neo4j_uri = os.getenv('NEO4J_URI')
     neo4j_user = os.getenv('NEO4J_USER')
     neo4j_password = os.getenv('NEO4J_PASSWORD')
@@ -79,6 +346,186 @@ def get_neo4j() -> Neo4jSession:
     driver: Driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
 
     try:
-        yield driver.session()
+        yield TracedNeo4jSession(driver.session())
     finally:
         driver.close()
+
+
+IN_MEMORY_SEED_FILEPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts", "mongodb_insert_data.json")
+# The car of the seed that can be purchased, whose purchase deadline is moved to this many days from the day it is seeded,
+# like the MySQL dumps do with DATE_ADD(CURDATE(), INTERVAL 30 DAY)
+PURCHASABLE_SEED_CAR_ID = "a5503fbb-c388-4789-a10c-d7ae7bdf7408"
+PURCHASABLE_SEED_CAR_DEADLINE_DAYS = 30
+
+
+class InMemoryDatabase:
+    """
+    Dict based tables with the same relations as the MySQL schema,
+    indexed on the columns the in-memory repositories filter by.
+    Rows are plain dicts keyed by their id, and many-to-many relations are stored as lists of ids.
+    The unique indexes of the MySQL schema are enforced, raising InMemoryDuplicateKeyError.
+    """
+
+    TABLES: Tuple[str, ...] = (
+        "accessories", "archived_cars", "archived_purchases", "brands", "cars", "change_events", "colors",
+        "customers", "insurances", "models", "purchases", "replication_offsets", "sales_daily_rollups", "sales_people"
+    )
+    INDEXES: Tuple[Tuple[str, str], ...] = (
+        ("archived_cars", "customers_id"),
+        ("archived_purchases", "customers_id"),
+        ("cars", "customers_id"),
+        ("cars", "sales_people_id"),
+        ("customers", "email"),
+        ("models", "brands_id"),
+        ("purchases", "cars_id"),
+        ("sales_people", "email"),
+    )
+    UNIQUE_INDEXES: Tuple[Tuple[str, str], ...] = (
+        ("customers", "email"),
+        ("purchases", "cars_id"),
+        ("sales_people", "email"),
+    )
+
+    def __init__(self):
+        self.lock = RLock()
+        self.tables: Dict[str, Dict[str, dict]] = {table: {} for table in self.TABLES}
+        # The ids in an index are kept in a dict, so rows are found in insertion order like a table scan.
+        self.indexes: Dict[Tuple[str, str], Dict[Any, Dict[str, None]]] = {index: {} for index in self.INDEXES}
+        # The last ID of the tables with auto increment IDs, like the change events
+        self.sequences: Dict[str, int] = {}
+
+    @staticmethod
+    def index_key(value: Any) -> Any:
+        # Emails are compared case-insensitively, like the MySQL collation does.
+        return value.lower() if isinstance(value, str) else value
+
+    def _add_to_indexes(self, table: str, row: dict):
+        for index_table, column in self.INDEXES:
+            if index_table == table:
+                self.indexes[(table, column)].setdefault(self.index_key(row.get(column)), {})[row["id"]] = None
+
+    def _check_unique_indexes(self, table: str, row: dict):
+        for index_table, column in self.UNIQUE_INDEXES:
+            if index_table == table:
+                ids = self.indexes[(table, column)].get(self.index_key(row.get(column)), {})
+                if any(row_id != row["id"] for row_id in ids):
+                    raise InMemoryDuplicateKeyError(table, column, row.get(column))
+
+    def _remove_from_indexes(self, table: str, row: dict):
+        for index_table, column in self.INDEXES:
+            if index_table == table:
+                ids = self.indexes[(table, column)].get(self.index_key(row.get(column)))
+                if ids is not None:
+                    ids.pop(row["id"], None)
+                    if not ids:
+                        del self.indexes[(table, column)][self.index_key(row.get(column))]
+
+    def next_id(self, table: str) -> int:
+        with self.lock:
+            self.sequences[table] = self.sequences.get(table, 0) + 1
+            return self.sequences[table]
+
+    def get(self, table: str, row_id: str) -> Optional[dict]:
+        return self.tables[table].get(row_id)
+
+    def all(self, table: str) -> List[dict]:
+        return list(self.tables[table].values())
+
+    def find(self, table: str, column: str, value: Any) -> List[dict]:
+        index = self.indexes.get((table, column))
+        if index is None:
+            return [row for row in self.tables[table].values() if row.get(column) == value]
+        rows = self.tables[table]
+        return [rows[row_id] for row_id in index.get(self.index_key(value), ()) if row_id in rows]
+
+    def insert(self, table: str, row: dict) -> dict:
+        with self.lock:
+            self._check_unique_indexes(table, row)
+            self.tables[table][row["id"]] = row
+            self._add_to_indexes(table, row)
+        return row
+
+    def update(self, table: str, row_id: str, fields: dict) -> Optional[dict]:
+        with self.lock:
+            row = self.tables[table].get(row_id)
+            if row is None:
+                return None
+            self._check_unique_indexes(table, {**row, **fields})
+            self._remove_from_indexes(table, row)
+            row.update(fields)
+            self._add_to_indexes(table, row)
+        return row
+
+    def delete(self, table: str, row_id: str) -> Optional[dict]:
+        with self.lock:
+            row = self.tables[table].pop(row_id, None)
+            if row is not None:
+                self._remove_from_indexes(table, row)
+        return row
+
+    @classmethod
+    def from_seed_file(cls, filepath: str = IN_MEMORY_SEED_FILEPATH) -> "InMemoryDatabase":
+        """
+        Creates a database with the same data as the MongoDB seed file,
+        which mirrors the data in the MySQL dump.
+        """
+        with open(filepath, "r", encoding="utf-8") as seed_file:
+            seed_data = json.load(seed_file)
+
+        database = cls()
+        for table in ("accessories", "brands", "colors", "customers", "insurances", "sales_people"):
+            for document in seed_data.get(table, []):
+                database.insert(table, {"id": document["_id"], **{
+                    key: value for key, value in document.items() if key != "_id"
+                }})
+        for model in seed_data.get("models", []):
+            database.insert("models", {
+                "id": model["_id"],
+                "name": model["name"],
+                "price": model["price"],
+                "image_url": model["image_url"],
+                "brands_id": model["brand"]["_id"],
+                "colors_ids": [color["_id"] for color in model["colors"]]
+            })
+        cars = seed_data.get("cars", []) + [purchase["car"] for purchase in seed_data.get("purchases", [])]
+        purchasable_car_deadline = date.today() + timedelta(days=PURCHASABLE_SEED_CAR_DEADLINE_DAYS)
+        for car in cars:
+            database.insert("cars", {
+                "id": car["_id"],
+                "purchase_deadline": purchasable_car_deadline if car["_id"] == PURCHASABLE_SEED_CAR_ID
+                else date.fromisoformat(car["purchase_deadline"]),
+                "total_price": car["total_price"],
+                "models_id": car["model"]["_id"],
+                "colors_id": car["color"]["_id"],
+                "customers_id": car["customer"]["_id"],
+                "sales_people_id": car["sales_person"]["_id"],
+                "accessories_ids": [accessory["_id"] for accessory in car["accessories"]],
+                "insurances_ids": [insurance["_id"] for insurance in car["insurances"]]
+            })
+        for purchase in seed_data.get("purchases", []):
+            database.insert("purchases", {
+                "id": purchase["_id"],
+                "cars_id": purchase["car"]["_id"],
+                "date_of_purchase": date.fromisoformat(purchase["date_of_purchase"])
+            })
+        for rollup in seed_data.get("sales_daily_rollups", []):
+            database.insert("sales_daily_rollups", {
+                "id": rollup["_id"],
+                "day": date.fromisoformat(rollup["day"]),
+                "brands_id": rollup["brand"]["_id"],
+                "models_id": rollup["model"]["_id"],
+                "colors_id": rollup["color"]["_id"],
+                "sales_people_id": rollup["sales_person"]["_id"],
+                "units": rollup["units"],
+                "revenue": rollup["revenue"]
+            })
+        return database
+
+
+@contextmanager
+def get_in_memory_db(database: Optional[InMemoryDatabase] = None) -> InMemoryDatabase:
+    """
+    Provides an in-memory database, seeded with the same data as the other databases
+    unless an existing in-memory database is given.
+    """
+    yield database if database is not None else InMemoryDatabase.from_seed_file()
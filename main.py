@@ -1,41 +1,88 @@
 # External Library imports
+from threading import Event
+from importlib import import_module
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List, Tuple
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
-from app.controllers import weather_controller
+from app.controllers import metrics_controller, weather_controller
+from app.core.config import ENABLED_BACKENDS, SUPPORTED_BACKENDS, MONGODB_OUTBOX_PROPAGATOR_IN_PROCESS
+from app.core.metrics import MetricsMiddleware
+from app.core.admission import AdmissionControlMiddleware
+from app.core.caching import ConditionalGetMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.tracing import TracingMiddleware
+from app.core.identity_cache import IdentityCacheMiddleware
 
-from app.controllers.mysql import (
-    accessories_controller as mysql_accessories_controller,
-    brands_controller as mysql_brands_controller,
-    cars_controller as mysql_cars_controller,
-    colors_controller as mysql_colors_controller,
-    customers_controller as mysql_customers_controller,
-    insurances_controller as mysql_insurances_controller,
-    models_controller as mysql_models_controller,
-    purchases_controller as mysql_purchases_controller,
-    sales_people_controller as mysql_sales_people_controller
-)
-from app.controllers.mysql.views import car_purchase_controller as mysql_car_purchase_controller
-from app.controllers.mongodb import (
-    accessories_controller as mongodb_accessories_controller,
-    brands_controller as mongodb_brands_controller,
-    cars_controller as mongodb_cars_controller,
-    colors_controller as mongodb_colors_controller,
-    customers_controller as mongodb_customers_controller,
-    insurances_controller as mongodb_insurances_controller,
-    models_controller as mongodb_models_controller,
-    purchases_controller as mongodb_purchases_controller,
-    sales_people_controller as mongodb_sales_people_controller
-)
-from app.controllers.neo4j import (
-    accessories_controller as neo4j_accessories_controller,
-    brands_controller as neo4j_brands_controller,
-    colors_controller as neo4j_colors_controller,
-    customers_controller as neo4j_customers_controller,
-    insurances_controller as neo4j_insurances_controller,
-    models_controller as neo4j_models_controller
-)
+# The controllers of each backend as (module, tag) pairs.
+# They are imported when their backend is enabled, so a deployment only loads the drivers,
+# models and routes of the backends it serves.
+BACKEND_ROUTERS: Dict[str, List[Tuple[str, str]]] = {
+    "mysql": [
+        ("app.controllers.mysql.accessories_controller", "MySQL - Accessories"),
+        ("app.controllers.mysql.analytics_controller", "MySQL - Analytics"),
+        ("app.controllers.mysql.archive_controller", "MySQL - Archive"),
+        ("app.controllers.mysql.brands_controller", "MySQL - Brands"),
+        ("app.controllers.mysql.cars_controller", "MySQL - Cars"),
+        ("app.controllers.mysql.colors_controller", "MySQL - Colors"),
+        ("app.controllers.mysql.customers_controller", "MySQL - Customers"),
+        ("app.controllers.mysql.insurances_controller", "MySQL - Insurances"),
+        ("app.controllers.mysql.models_controller", "MySQL - Models"),
+        ("app.controllers.mysql.purchases_controller", "MySQL - Purchases"),
+        ("app.controllers.mysql.sales_people_controller", "MySQL - Sales People"),
+        ("app.controllers.mysql.views.car_purchase_controller", "MySQL View - Cars Purchases"),
+    ],
+    "mongodb": [
+        ("app.controllers.mongodb.accessories_controller", "MongoDB - Accessories"),
+        ("app.controllers.mongodb.analytics_controller", "MongoDB - Analytics"),
+        ("app.controllers.mongodb.archive_controller", "MongoDB - Archive"),
+        ("app.controllers.mongodb.brands_controller", "MongoDB - Brands"),
+        ("app.controllers.mongodb.cars_controller", "MongoDB - Cars"),
+        ("app.controllers.mongodb.colors_controller", "MongoDB - Colors"),
+        ("app.controllers.mongodb.customers_controller", "MongoDB - Customers"),
+        ("app.controllers.mongodb.insurances_controller", "MongoDB - Insurances"),
+        ("app.controllers.mongodb.models_controller", "MongoDB - Models"),
+        ("app.controllers.mongodb.purchases_controller", "MongoDB - Purchases"),
+        ("app.controllers.mongodb.sales_people_controller", "MongoDB - Sales People"),
+    ],
+    "neo4j": [
+        ("app.controllers.neo4j.accessories_controller", "Neo4j - Accessories"),
+        ("app.controllers.neo4j.analytics_controller", "Neo4j - Analytics"),
+        ("app.controllers.neo4j.brands_controller", "Neo4j - Brands"),
+        ("app.controllers.neo4j.colors_controller", "Neo4j - Colors"),
+        ("app.controllers.neo4j.customers_controller", "Neo4j - Customers"),
+        ("app.controllers.neo4j.insurances_controller", "Neo4j - Insurances"),
+        ("app.controllers.neo4j.models_controller", "Neo4j - Models"),
+    ],
+}
+
+
+def include_backend_routers(fastapi_app: FastAPI, backends: Iterable[str]):
+    for backend in backends:
+        if backend not in SUPPORTED_BACKENDS:
+            raise ValueError(
+                f"Unsupported backend '{backend}' in ENABLED_BACKENDS, "
+                f"the supported backends are: {', '.join(SUPPORTED_BACKENDS)}"
+            )
+        for module_name, tag in BACKEND_ROUTERS[backend]:
+            controller = import_module(module_name)
+            fastapi_app.include_router(controller.router, prefix=f"/{backend}", tags=[tag])
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):  # pragma: no cover
+    # Propagates the customer changes to the cars and purchases in MongoDB off the request path,
+    # unless the propagator runs as its own process.
+    stop_event = Event()
+    if "mongodb" in ENABLED_BACKENDS and MONGODB_OUTBOX_PROPAGATOR_IN_PROCESS:
+        from app.workers.mongodb_customer_propagator import start_propagator_thread
+        start_propagator_thread(stop_event)
+    yield
+    stop_event.set()
 
-app = FastAPI()
+
+# The OpenAPI schema is generated by FastAPI on the first request to /openapi.json or /docs, not at startup.
+app = FastAPI(lifespan=lifespan)
 
 CORS_SETTINGS = {
     "allow_origins": ["*"],
@@ -44,38 +91,19 @@ CORS_SETTINGS = {
     "allow_headers": ["*"]
 }
 
+app.add_middleware(IdentityCacheMiddleware)
+app.add_middleware(ConditionalGetMiddleware)
 app.add_middleware(CORSMiddleware, **CORS_SETTINGS)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(MetricsMiddleware)
 
-# Including the MySQL Router endpoints
-app.include_router(mysql_accessories_controller.router, prefix="/mysql", tags=["MySQL - Accessories"])
-app.include_router(mysql_brands_controller.router, prefix="/mysql", tags=["MySQL - Brands"])
-app.include_router(mysql_cars_controller.router, prefix="/mysql", tags=["MySQL - Cars"])
-app.include_router(mysql_colors_controller.router, prefix="/mysql", tags=["MySQL - Colors"])
-app.include_router(mysql_customers_controller.router, prefix="/mysql", tags=["MySQL - Customers"])
-app.include_router(mysql_insurances_controller.router, prefix="/mysql", tags=["MySQL - Insurances"])
-app.include_router(mysql_models_controller.router, prefix="/mysql", tags=["MySQL - Models"])
-app.include_router(mysql_purchases_controller.router, prefix="/mysql", tags=["MySQL - Purchases"])
-app.include_router(mysql_sales_people_controller.router, prefix="/mysql", tags=["MySQL - Sales People"])
-app.include_router(mysql_car_purchase_controller.router, prefix="/mysql", tags=["MySQL View - Cars Purchases"])
-
-# Including the MongoDB Router endpoints
-app.include_router(mongodb_accessories_controller.router, prefix="/mongodb", tags=["MongoDB - Accessories"])
-app.include_router(mongodb_brands_controller.router, prefix="/mongodb", tags=["MongoDB - Brands"])
-app.include_router(mongodb_cars_controller.router, prefix="/mongodb", tags=["MongoDB - Cars"])
-app.include_router(mongodb_colors_controller.router, prefix="/mongodb", tags=["MongoDB - Colors"])
-app.include_router(mongodb_customers_controller.router, prefix="/mongodb", tags=["MongoDB - Customers"])
-app.include_router(mongodb_insurances_controller.router, prefix="/mongodb", tags=["MongoDB - Insurances"])
-app.include_router(mongodb_models_controller.router, prefix="/mongodb", tags=["MongoDB - Models"])
-app.include_router(mongodb_purchases_controller.router, prefix="/mongodb", tags=["MongoDB - Purchases"])
-app.include_router(mongodb_sales_people_controller.router, prefix="/mongodb", tags=["MongoDB - Sales People"])
-
-# Including the Neo4j Router endpoints
-app.include_router(neo4j_accessories_controller.router, prefix="/neo4j", tags=["Neo4j - Accessories"])
-app.include_router(neo4j_brands_controller.router, prefix="/neo4j", tags=["Neo4j - Brands"])
-app.include_router(neo4j_colors_controller.router, prefix="/neo4j", tags=["Neo4j - Colors"])
-app.include_router(neo4j_customers_controller.router, prefix="/neo4j", tags=["Neo4j - Customers"])
-app.include_router(neo4j_insurances_controller.router, prefix="/neo4j", tags=["Neo4j - Insurances"])
-app.include_router(neo4j_models_controller.router, prefix="/neo4j", tags=["Neo4j - Models"])
+# Including the Router endpoints of the enabled backends
+include_backend_routers(app, ENABLED_BACKENDS)
 
 # External Weathers API
 app.include_router(weather_controller.router, tags=["Weather API"])
+
+# Metrics
+app.include_router(metrics_controller.router, tags=["Metrics"])
@@ -0,0 +1,429 @@
+"""
+Benchmarks the same operations against the MySQL, MongoDB and Neo4j backends,
+either through their repositories and services or through their HTTP routes, to compare the backends.
+
+Every operation is run iterations times per backend after warmup runs, one at a time, with the IDs and emails
+picked from the customers and cars the backend returns, so the workload is the same for every backend.
+The throughput and the latency percentiles per operation and backend are printed as a table and written as JSON,
+and compared with a baseline report when one is given, exiting with 1 when an operation regressed more than allowed:
+    python scripts/benchmark_backends.py --layer=repository --backends=mysql,mongodb,neo4j --output=benchmark.json
+    python scripts/benchmark_backends.py --layer=http --base-url=http://localhost:8000 --email=hans@gmail.com \\
+        --password=<password> --baseline=benchmark.json --max-regression=0.2
+The create operations add cars and purchases, so they are best run against a generated dataset, see generate_dataset.py.
+The in-memory repositories are benchmarked as the memory backend, to measure the cost of the service layer alone.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import datetime
+from importlib import import_module
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, TYPE_CHECKING
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.services import cars_service, customers_service, purchases_service
+from app.resources.car_resource import CarCreateResource
+from app.resources.purchase_resource import PurchaseCreateResource
+
+if TYPE_CHECKING:
+    import httpx
+
+BENCHMARK_LAYERS = ("repository", "http")
+BENCHMARK_BACKENDS = ("mysql", "mongodb", "neo4j", "memory")
+OPERATIONS = (
+    "list_customers",
+    "get_customer",
+    "search_customers",
+    "list_cars",
+    "get_car",
+    "filter_cars",
+    "create_car",
+    "create_purchase",
+)
+CAR_OPERATIONS = ("list_cars", "get_car", "filter_cars", "create_car", "create_purchase")
+# Neo4j only has the customers of the operations
+BACKEND_OPERATIONS: Dict[str, Sequence[str]] = {
+    "mysql": OPERATIONS,
+    "mongodb": OPERATIONS,
+    "neo4j": ("list_customers", "get_customer", "search_customers"),
+    "memory": OPERATIONS,
+}
+REPOSITORY_CLASSES = {
+    "car": ("app.repositories.car_repositories", "CarRepository"),
+    "customer": ("app.repositories.customer_repositories", "CustomerRepository"),
+    "sales_person": ("app.repositories.sales_person_repositories", "SalesPersonRepository"),
+    "model": ("app.repositories.model_repositories", "ModelRepository"),
+    "color": ("app.repositories.color_repositories", "ColorRepository"),
+    "accessory": ("app.repositories.accessory_repositories", "AccessoryRepository"),
+    "insurance": ("app.repositories.insurance_repository", "InsuranceRepository"),
+    "purchase": ("app.repositories.purchase_repositories", "PurchaseRepository"),
+}
+REPOSITORY_CLASS_PREFIXES = {"mysql": "MySQL", "mongodb": "MongoDB", "neo4j": "Neo4j", "memory": "InMemory"}
+PERCENTILES = (50, 90, 95, 99)
+LIST_LIMIT = 100
+SEARCH_FRAGMENT_LENGTH = 4
+
+
+def as_dict(item: Any) -> dict:
+    return item.model_dump(mode="json") if hasattr(item, "model_dump") else item
+
+
+def get_percentile(sorted_latencies: List[float], percentile: float) -> float:
+    """
+    Returns the nearest-rank percentile of the sorted latencies.
+    """
+    if not sorted_latencies:
+        return 0.0
+    rank = max(1, -(-len(sorted_latencies) * percentile // 100))
+    return sorted_latencies[int(rank) - 1]
+
+
+def summarize_latencies(latencies: List[float], errors: int) -> Dict[str, float]:
+    """
+    Returns the throughput and the latency percentiles in milliseconds of the successful runs of an operation.
+    The throughput is of one client running the operation back to back.
+    """
+    sorted_latencies = sorted(latencies)
+    total_seconds = sum(latencies)
+    return {
+        "runs": len(latencies),
+        "errors": errors,
+        "operations_per_second": round(len(latencies) / total_seconds, 1) if total_seconds > 0 else 0.0,
+        "mean_ms": round(total_seconds / len(latencies) * 1000, 3) if latencies else 0.0,
+        **{
+            f"p{percentile}_ms": round(get_percentile(sorted_latencies, percentile) * 1000, 3)
+            for percentile in PERCENTILES
+        },
+        "max_ms": round(sorted_latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+def get_car_create_data(car: Mapping[str, Any]) -> dict:
+    # The new cars copy an existing car, so the model, color, accessories and insurances are known to fit together
+    return {
+        "models_id": car["model"]["id"],
+        "colors_id": car["color"]["id"],
+        "customers_id": car["customer"]["id"],
+        "sales_people_id": car["sales_person"]["id"],
+        "accessory_ids": [accessory["id"] for accessory in car["accessories"]],
+        "insurance_ids": [insurance["id"] for insurance in car["insurances"]],
+    }
+
+
+class RepositoryBenchmarkClient:
+    """
+    Runs the operations through the services with the repositories of a backend, like its controllers do.
+    """
+
+    def __init__(self, backend: str, database: Any):
+        self.repositories: Dict[str, Any] = {}
+        for name, (module_name, class_name) in REPOSITORY_CLASSES.items():
+            repository_class = getattr(import_module(module_name), REPOSITORY_CLASS_PREFIXES[backend] + class_name, None)
+            if repository_class is not None:
+                self.repositories[name] = repository_class(database)
+
+    def list_customers(self, limit: int) -> list:
+        return customers_service.get_all(self.repositories["customer"], customers_limit=limit)
+
+    def get_customer(self, customer_id: str) -> Any:
+        return customers_service.get_by_id(self.repositories["customer"], customer_id)
+
+    def search_customers(self, email_filter: str, limit: int) -> list:
+        return customers_service.get_all(
+            self.repositories["customer"], filter_customer_by_email=email_filter, customers_limit=limit
+        )
+
+    def list_cars(self, limit: int, customer_id: Optional[str] = None, is_purchased: Optional[bool] = None) -> list:
+        return cars_service.get_all(
+            car_repository=self.repositories["car"],
+            customer_repository=self.repositories["customer"],
+            sales_person_repository=self.repositories["sales_person"],
+            customer_id=customer_id,
+            is_purchased=is_purchased,
+            cars_limit=limit
+        )
+
+    def get_car(self, car_id: str) -> Any:
+        return cars_service.get_by_id(self.repositories["car"], car_id)
+
+    def create_car(self, car_create_data: dict) -> str:
+        return cars_service.create(
+            car_repository=self.repositories["car"],
+            customer_repository=self.repositories["customer"],
+            sales_person_repository=self.repositories["sales_person"],
+            model_repository=self.repositories["model"],
+            color_repository=self.repositories["color"],
+            accessory_repository=self.repositories["accessory"],
+            insurance_repository=self.repositories["insurance"],
+            car_create_data=CarCreateResource(**car_create_data)
+        ).id
+
+    def create_purchase(self, car_id: str) -> str:
+        return purchases_service.create(
+            purchase_repository=self.repositories["purchase"],
+            car_repository=self.repositories["car"],
+            purchase_create_data=PurchaseCreateResource(cars_id=car_id)
+        ).id
+
+
+class HttpBenchmarkClient:  # pragma: no cover
+    """
+    Runs the operations as requests to the routes of a backend, authorized with the token of a sales person.
+    """
+
+    def __init__(self, client: "httpx.Client", backend: str):
+        self.client = client
+        self.prefix = f"/{backend}"
+
+    def request(self, method: str, path: str, **kwargs) -> Any:
+        response = self.client.request(method, self.prefix + path, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def list_customers(self, limit: int) -> list:
+        return self.request("GET", "/customers", params={"limit": limit})
+
+    def get_customer(self, customer_id: str) -> dict:
+        return self.request("GET", f"/customer/{customer_id}")
+
+    def search_customers(self, email_filter: str, limit: int) -> list:
+        return self.request("GET", "/customers", params={"email_filter": email_filter, "limit": limit})
+
+    def list_cars(self, limit: int, customer_id: Optional[str] = None, is_purchased: Optional[bool] = None) -> list:
+        params = {"limit": limit, "customer_id": customer_id, "is_purchased": is_purchased}
+        return self.request("GET", "/cars", params={key: value for key, value in params.items() if value is not None})
+
+    def get_car(self, car_id: str) -> dict:
+        return self.request("GET", f"/car/{car_id}")
+
+    def create_car(self, car_create_data: dict) -> str:
+        return self.request("POST", "/car", json=car_create_data)["id"]
+
+    def create_purchase(self, car_id: str) -> str:
+        return self.request("POST", "/purchase", json={"cars_id": car_id})["id"]
+
+
+def get_workload(client: Any, operations: Sequence[str]) -> Dict[str, Any]:
+    """
+    Returns the customers and cars the operations pick their IDs and emails from, and the data of the new cars.
+    """
+    workload: Dict[str, Any] = {"customers": [as_dict(customer) for customer in client.list_customers(LIST_LIMIT)]}
+    if any(operation in CAR_OPERATIONS for operation in operations):
+        workload["cars"] = [as_dict(car) for car in client.list_cars(LIST_LIMIT)]
+        if workload["cars"]:
+            workload["car_create_data"] = get_car_create_data(workload["cars"][0])
+    return workload
+
+
+def prepare_operation(client: Any, workload: Dict[str, Any], operation: str, generator: random.Random) -> Callable[[], Any]:
+    """
+    Returns one run of the operation, after its untimed preparation, like creating the car of a purchase.
+    """
+    if operation == "list_customers":
+        return lambda: client.list_customers(LIST_LIMIT)
+    if operation == "get_customer":
+        customer_id = generator.choice(workload["customers"])["id"]
+        return lambda: client.get_customer(customer_id)
+    if operation == "search_customers":
+        # A part of the email, which only the email_ngrams index or the FULLTEXT index can find without a scan
+        email = generator.choice(workload["customers"])["email"]
+        start = generator.randrange(max(len(email) - SEARCH_FRAGMENT_LENGTH, 0) + 1)
+        email_filter = email[start:start + SEARCH_FRAGMENT_LENGTH]
+        return lambda: client.search_customers(email_filter, LIST_LIMIT)
+    if operation == "list_cars":
+        return lambda: client.list_cars(LIST_LIMIT)
+    if operation == "get_car":
+        car_id = generator.choice(workload["cars"])["id"]
+        return lambda: client.get_car(car_id)
+    if operation == "filter_cars":
+        customer_id = generator.choice(workload["cars"])["customer"]["id"]
+        return lambda: client.list_cars(LIST_LIMIT, customer_id=customer_id, is_purchased=False)
+    if operation == "create_car":
+        return lambda: client.create_car(workload["car_create_data"])
+    if operation == "create_purchase":
+        car_id = client.create_car(workload["car_create_data"])
+        return lambda: client.create_purchase(car_id)
+    raise ValueError(f"operation must be one of {', '.join(OPERATIONS)}, not '{operation}'.")
+
+
+def benchmark_backend(
+        client: Any,
+        operations: Sequence[str],
+        iterations: int,
+        warmup: int,
+        seed: int = 0
+) -> Dict[str, Dict[str, float]]:
+    """
+    Runs every operation warmup and then iterations times and returns the summary of every operation.
+    The failed runs are counted as errors and left out of the latencies.
+    """
+    generator = random.Random(seed)
+    workload = get_workload(client, operations)
+    results: Dict[str, Dict[str, float]] = {}
+    for operation in operations:
+        latencies: List[float] = []
+        errors = 0
+        for iteration in range(warmup + iterations):
+            try:
+                run = prepare_operation(client, workload, operation, generator)
+                started_at = time.perf_counter()
+                run()
+                latency = time.perf_counter() - started_at
+            except Exception:
+                if iteration >= warmup:
+                    errors += 1
+                continue
+            if iteration >= warmup:
+                latencies.append(latency)
+        results[operation] = summarize_latencies(latencies, errors)
+    return results
+
+
+def compare_with_baseline(
+        results: Dict[str, Dict[str, Dict[str, float]]],
+        baseline_results: Dict[str, Dict[str, Dict[str, float]]],
+        max_regression: float
+) -> List[str]:
+    """
+    Returns a message for every operation whose p95 latency grew, or whose throughput dropped,
+    by more than the max regression, as a share of the baseline.
+    """
+    regressions: List[str] = []
+    for backend, operations in results.items():
+        for operation, summary in operations.items():
+            baseline = baseline_results.get(backend, {}).get(operation)
+            if baseline is None:
+                continue
+            if baseline["p95_ms"] > 0 and summary["p95_ms"] > baseline["p95_ms"] * (1 + max_regression):
+                regressions.append(f"{backend} {operation}: p95 {summary['p95_ms']} ms, "
+                                   f"was {baseline['p95_ms']} ms")
+            if summary["operations_per_second"] < baseline["operations_per_second"] * (1 - max_regression):
+                regressions.append(f"{backend} {operation}: {summary['operations_per_second']} operations per second, "
+                                   f"was {baseline['operations_per_second']}")
+    return regressions
+
+
+def format_table(results: Dict[str, Dict[str, Dict[str, float]]]) -> str:
+    columns = ["operations_per_second", *(f"p{percentile}_ms" for percentile in PERCENTILES), "max_ms", "errors"]
+    lines = [f"{'backend':<8} {'operation':<17} " + " ".join(columns)]
+    for backend, operations in results.items():
+        for operation, summary in operations.items():
+            lines.append(f"{backend:<8} {operation:<17} " + " ".join(
+                f"{summary[column]:>{len(column)}}" for column in columns
+            ))
+    return "\n".join(lines)
+
+
+def run_repository_benchmarks(
+        backends: Sequence[str],
+        operations: Sequence[str],
+        iterations: int,
+        warmup: int,
+        seed: int
+) -> Dict[str, Dict[str, Dict[str, float]]]:  # pragma: no cover
+    from db import get_db, get_mongodb, get_neo4j, InMemoryDatabase
+
+    database_contexts = {
+        "mysql": get_db,
+        "mongodb": get_mongodb,
+        "neo4j": get_neo4j,
+        "memory": lambda: nullcontext(InMemoryDatabase.from_seed_file()),
+    }
+    results = {}
+    for backend in backends:
+        with database_contexts[backend]() as database:
+            client = RepositoryBenchmarkClient(backend, database)
+            backend_operations = [operation for operation in operations if operation in BACKEND_OPERATIONS[backend]]
+            results[backend] = benchmark_backend(client, backend_operations, iterations, warmup, seed)
+    return results
+
+
+def run_http_benchmarks(
+        base_url: str,
+        email: str,
+        password: str,
+        backends: Sequence[str],
+        operations: Sequence[str],
+        iterations: int,
+        warmup: int,
+        seed: int
+) -> Dict[str, Dict[str, Dict[str, float]]]:  # pragma: no cover
+    import httpx
+
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        # The token of one backend is accepted by every backend, Neo4j has no sales people to log in with
+        login_backend = next((backend for backend in backends if backend != "neo4j"), "mysql")
+        response = client.post(f"/{login_backend}/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        results = {}
+        for backend in backends:
+            backend_operations = [operation for operation in operations if operation in BACKEND_OPERATIONS[backend]]
+            results[backend] = benchmark_backend(
+                HttpBenchmarkClient(client, backend), backend_operations, iterations, warmup, seed
+            )
+    return results
+
+
+if __name__ == '__main__':  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Benchmark the same operations against every backend.")
+    parser.add_argument('--layer', choices=BENCHMARK_LAYERS, default="repository",
+                        help="Run the operations through the repositories or through the HTTP routes")
+    parser.add_argument('--backends', default="mysql,mongodb,neo4j",
+                        help=f"The comma separated backends to benchmark, of {', '.join(BENCHMARK_BACKENDS)}")
+    parser.add_argument('--operations', default=",".join(OPERATIONS),
+                        help=f"The comma separated operations to run, of {', '.join(OPERATIONS)}")
+    parser.add_argument('--iterations', type=int, default=200, help="The amount of timed runs of every operation")
+    parser.add_argument('--warmup', type=int, default=20, help="The amount of untimed runs before the timed runs")
+    parser.add_argument('--seed', type=int, default=0, help="The seed the IDs and emails are picked with")
+    parser.add_argument('--base-url', default="http://localhost:8000", help="The URL of the API for the HTTP layer")
+    parser.add_argument('--email', default=None, help="The email of the sales person to log in as for the HTTP layer")
+    parser.add_argument('--password', default=None, help="The password of the sales person for the HTTP layer")
+    parser.add_argument('--output', default=None, help="The file the JSON report is written to")
+    parser.add_argument('--baseline', default=None, help="A JSON report to compare the results with")
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help="The share the p95 latency may grow or the throughput may drop by compared with the baseline")
+    args = parser.parse_args()
+
+    selected_backends = args.backends.split(",")
+    selected_operations = args.operations.split(",")
+    if any(backend not in BENCHMARK_BACKENDS for backend in selected_backends):
+        parser.error(f"The backends are {', '.join(BENCHMARK_BACKENDS)}")
+    if any(operation not in OPERATIONS for operation in selected_operations):
+        parser.error(f"The operations are {', '.join(OPERATIONS)}")
+    if args.layer == "http" and ("memory" in selected_backends or not args.email or not args.password):
+        parser.error("The HTTP layer needs --email and --password, and has no memory backend")
+
+    start_time = datetime.now()
+    print(f"BENCHMARK_BACKENDS: {start_time}: Benchmarking {', '.join(selected_backends)} through the {args.layer} layer")
+    if args.layer == "repository":
+        benchmark_results = run_repository_benchmarks(
+            selected_backends, selected_operations, args.iterations, args.warmup, args.seed
+        )
+    else:
+        benchmark_results = run_http_benchmarks(
+            args.base_url, args.email, args.password, selected_backends, selected_operations,
+            args.iterations, args.warmup, args.seed
+        )
+    report = {
+        "layer": args.layer,
+        "created_at": start_time.isoformat(),
+        "iterations": args.iterations,
+        "results": benchmark_results,
+    }
+    print(format_table(benchmark_results))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            baseline_report = json.load(file)
+        found_regressions = compare_with_baseline(benchmark_results, baseline_report["results"], args.max_regression)
+        for regression in found_regressions:
+            print(f"Regression: {regression}")
+        if found_regressions:
+            sys.exit(1)
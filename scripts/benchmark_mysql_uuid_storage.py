@@ -0,0 +1,117 @@
+"""
+Compares the insert throughput and the index sizes of the two MySQL UUID storages, see MYSQL_UUID_STORAGE:
+CHAR(36) keys with random UUIDv4 values against BINARY(16) keys with time-ordered UUIDv7 values.
+
+Both storages insert the same amount of cars, with the car's own key, a customer key from a pool of customers
+and a purchase deadline, indexed like the cars table of scripts/mysql.sql, into scratch tables that are dropped afterwards:
+    python scripts/benchmark_mysql_uuid_storage.py --rows=10000000 --batch-size=5000
+The result is printed as JSON, with the throughput of every tenth of the inserts,
+since the random keys slow down once the primary key no longer fits in the buffer pool.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from uuid import uuid4
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from db import get_engine, uuid7
+
+BENCHMARK_CUSTOMERS = 10_000
+STORAGES: Dict[str, Dict[str, object]] = {
+    "char": {"column_type": "char(36)", "new_key": lambda: str(uuid4())},
+    "binary": {"column_type": "binary(16)", "new_key": lambda: uuid7().bytes},
+}
+
+
+def get_benchmark_table(storage: str) -> str:
+    return f"uuid_storage_benchmark_{storage}"
+
+
+def get_create_table(storage: str) -> str:
+    column_type = STORAGES[storage]["column_type"]
+    return (
+        f"CREATE TABLE `{get_benchmark_table(storage)}` ("
+        f"  `id` {column_type} NOT NULL,"
+        f"  `customers_id` {column_type} NOT NULL,"
+        f"  `purchase_deadline` date NOT NULL,"
+        f"  PRIMARY KEY (`id`),"
+        f"  KEY `customers_id_idx` (`customers_id`),"
+        f"  KEY `purchase_deadline_idx` (`purchase_deadline`, `id`)"
+        f") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci"
+    )
+
+
+def benchmark_storage(raw_connection, storage: str, rows: int, batch_size: int) -> dict:  # pragma: no cover
+    table = get_benchmark_table(storage)
+    new_key: Callable[[], object] = STORAGES[storage]["new_key"]
+    customer_keys = [new_key() for _ in range(BENCHMARK_CUSTOMERS)]
+    cursor = raw_connection.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS `{table}`")
+    cursor.execute(get_create_table(storage))
+
+    insert = f"INSERT INTO `{table}` (id, customers_id, purchase_deadline) VALUES (%s, %s, %s)"
+    report_every = max(rows // 10, batch_size)
+    checkpoints: List[dict] = []
+    inserted, checkpoint_inserted = 0, 0
+    started_at = checkpoint_started_at = time.perf_counter()
+    while inserted < rows:
+        batch = [
+            (new_key(), random.choice(customer_keys), date.today() + timedelta(days=random.randint(-30, 30)))
+            for _ in range(min(batch_size, rows - inserted))
+        ]
+        cursor.executemany(insert, batch)
+        raw_connection.commit()
+        inserted += len(batch)
+        if inserted - checkpoint_inserted >= report_every or inserted == rows:
+            now = time.perf_counter()
+            checkpoints.append({
+                "inserted_rows": inserted,
+                "rows_per_second": round((inserted - checkpoint_inserted) / (now - checkpoint_started_at))
+            })
+            checkpoint_inserted, checkpoint_started_at = inserted, now
+    duration = time.perf_counter() - started_at
+
+    cursor.execute(f"ANALYZE TABLE `{table}`")
+    cursor.fetchall()
+    cursor.execute(
+        "SELECT DATA_LENGTH, INDEX_LENGTH FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,)
+    )
+    data_length, index_length = cursor.fetchone()
+    cursor.execute(f"DROP TABLE `{table}`")
+    cursor.close()
+    return {
+        "storage": storage,
+        "rows": rows,
+        "seconds": round(duration, 2),
+        "rows_per_second": round(rows / duration),
+        "checkpoints": checkpoints,
+        "primary_key_and_data_megabytes": round(data_length / 1024 ** 2, 1),
+        "secondary_indexes_megabytes": round(index_length / 1024 ** 2, 1),
+    }
+
+
+if __name__ == '__main__':  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Benchmark the CHAR(36) and BINARY(16) MySQL UUID storages.")
+    parser.add_argument('--rows', type=int, default=10_000_000, help="The amount of cars inserted per storage")
+    parser.add_argument('--batch-size', type=int, default=5000, help="The amount of cars inserted per transaction")
+    parser.add_argument('--storage', choices=tuple(STORAGES), action='append',
+                        help="Only benchmark the given storage, can be repeated")
+    parser.add_argument('--test', action='store_true', help="Create the scratch tables in the test database instead")
+    args = parser.parse_args()
+
+    engine = get_engine(is_test_engine=args.test)
+    connection = engine.raw_connection()
+    try:
+        results = [
+            benchmark_storage(connection, storage, args.rows, args.batch_size)
+            for storage in (args.storage or STORAGES)
+        ]
+    finally:
+        connection.close()
+    print(json.dumps(results, indent=2))
@@ -26,6 +26,9 @@ GRANT SELECT ON * TO 'readonly_user'@'%';
 -- Grant EXECUTE privilege specifically for the "get_all_cars" stored procedure to the readonly user
 GRANT EXECUTE ON PROCEDURE get_all_cars TO 'readonly_user'@'%';
 
+-- Grant the REPLICATION CLIENT privilege so the API can check how far behind a replica is with SHOW REPLICA STATUS
+GRANT REPLICATION CLIENT ON *.* TO 'readonly_user'@'%';
+
 -- Apply the changes
 FLUSH PRIVILEGES;
 
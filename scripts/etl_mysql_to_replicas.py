@@ -0,0 +1,535 @@
+"""
+Copies the MySQL database into MongoDB or Neo4j in bulk, to load a new replica or to rebuild one.
+
+Every table is streamed from MySQL with a server-side cursor, ordered by its primary key, in batches of batch_size.
+The embedded MongoDB documents and the Neo4j nodes and relationships of a batch are built in memory from the catalog
+and a few lookups by the IDs of the batch, and written at once, with unordered insert_many to MongoDB
+and with one UNWIND statement per kind of node to Neo4j.
+The primary key of the last written row of every table is saved to a checkpoint file after each batch,
+so a stopped copy continues after the last saved batch when it is started again with the same checkpoint file:
+    python scripts/etl_mysql_to_replicas.py --target=mongodb --batch-size=5000
+    python scripts/etl_mysql_to_replicas.py --target=neo4j --checkpoint-file=neo4j_etl_checkpoint.json
+
+MongoDB is loaded into the collections and indexes created by seed_mongodb.py, documents that already exist are skipped.
+The ID of the last change event before the copy started is saved in the checkpoint as well,
+so the changes made during the copy are applied afterward by replaying them with the change replicator.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, TYPE_CHECKING
+from sqlalchemy import Table, select, tuple_, func
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from db import as_mongodb_datetime
+from app.models.brand import BrandMySQLEntity
+from app.models.color import ColorMySQLEntity, models_has_colors
+from app.models.model import ModelMySQLEntity
+from app.models.accessory import AccessoryMySQLEntity, cars_has_accessories
+from app.models.insurance import InsuranceMySQLEntity, cars_has_insurances
+from app.models.sales_person import SalesPersonMySQLEntity
+from app.models.customer import CustomerMySQLEntity, get_email_ngrams
+from app.models.car import CarMySQLEntity
+from app.models.purchase import PurchaseMySQLEntity
+from app.models.sales_rollup import SalesDailyRollupMySQLEntity
+from app.models.change_event import ChangeEventMySQLEntity
+
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from pymongo.collection import Collection
+    from neo4j import Session as Neo4jSession
+    from sqlalchemy.engine import Connection
+
+ETL_TARGETS = ("mongodb", "neo4j")
+SOURCE_TABLES: Dict[str, Table] = {
+    "brands": BrandMySQLEntity.__table__,
+    "colors": ColorMySQLEntity.__table__,
+    "models": ModelMySQLEntity.__table__,
+    "accessories": AccessoryMySQLEntity.__table__,
+    "insurances": InsuranceMySQLEntity.__table__,
+    "sales_people": SalesPersonMySQLEntity.__table__,
+    "customers": CustomerMySQLEntity.__table__,
+    "cars": CarMySQLEntity.__table__,
+    "purchases": PurchaseMySQLEntity.__table__,
+    "sales_daily_rollups": SalesDailyRollupMySQLEntity.__table__,
+    "models_has_colors": models_has_colors,
+    "cars_has_accessories": cars_has_accessories,
+    "cars_has_insurances": cars_has_insurances,
+}
+# The small tables every car embeds or refers to, which are held in memory during the copy
+CATALOG_TABLES = ("brands", "colors", "models", "accessories", "insurances", "sales_people")
+# The fields copied from the columns of the tables, besides the ID and the foreign keys
+DOCUMENT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "brands": ("name", "logo_url"),
+    "colors": ("name", "price", "red_value", "green_value", "blue_value"),
+    "models": ("name", "price", "image_url"),
+    "accessories": ("name", "price"),
+    "insurances": ("name", "price"),
+    "sales_people": ("email", "hashed_password", "first_name", "last_name"),
+    "customers": ("email", "phone_number", "first_name", "last_name", "address"),
+}
+NEO4J_LABELS = {
+    "brands": "Brand",
+    "colors": "Color",
+    "models": "Model",
+    "accessories": "Accessory",
+    "insurances": "Insurance",
+    "sales_people": "SalesPerson",
+    "customers": "Customer",
+    "cars": "Car",
+    "purchases": "Purchase",
+}
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+Row = Mapping[str, Any]
+# The MongoDB documents of the catalog tables by their ID
+Catalog = Dict[str, Dict[str, dict]]
+
+
+def as_mongodb_document(row: Row, table: str) -> dict:
+    return {"_id": row["id"], **{field: row[field] for field in DOCUMENT_FIELDS[table]}}
+
+
+def as_neo4j_properties(row: Row, table: str) -> dict:
+    return {"id": row["id"], **{field: row[field] for field in DOCUMENT_FIELDS[table]}}
+
+
+def group_ids(rows: Sequence[Row], key_column: str, id_column: str) -> Dict[str, List[str]]:
+    """
+    Groups the IDs of a many-to-many table by the key, like the accessory IDs of every car.
+    """
+    grouped_ids: Dict[str, List[str]] = {}
+    for row in rows:
+        grouped_ids.setdefault(row[key_column], []).append(row[id_column])
+    return grouped_ids
+
+
+def get_catalog(catalog_rows: Mapping[str, Sequence[Row]], color_ids_by_model: Mapping[str, List[str]]) -> Catalog:
+    catalog = {
+        table: {row["id"]: as_mongodb_document(row, table) for row in catalog_rows[table]}
+        for table in CATALOG_TABLES if table != "models"
+    }
+    catalog["models"] = {
+        model["id"]: {
+            **as_mongodb_document(model, "models"),
+            "brand": catalog["brands"][model["brands_id"]],
+            "colors": [catalog["colors"][color_id] for color_id in color_ids_by_model.get(model["id"], [])]
+        }
+        for model in catalog_rows["models"]
+    }
+    return catalog
+
+
+def as_mongodb_customer(customer: Row) -> dict:
+    return {**as_mongodb_document(customer, "customers"), "email_ngrams": get_email_ngrams(customer["email"])}
+
+
+def as_mongodb_car(
+        car: Row,
+        catalog: Catalog,
+        customer: Row,
+        accessory_ids: List[str],
+        insurance_ids: List[str]
+) -> dict:
+    """
+    Returns the car document with its model, color, customer, sales person, accessories and insurances embedded,
+    in the shape of CarMongoEntity.
+    """
+    return {
+        "_id": car["id"],
+        "total_price": car["total_price"],
+        "purchase_deadline": as_mongodb_datetime(car["purchase_deadline"]),
+        "model": catalog["models"][car["models_id"]],
+        "color": catalog["colors"][car["colors_id"]],
+        "customer": as_mongodb_document(customer, "customers"),
+        "sales_person": catalog["sales_people"][car["sales_people_id"]],
+        "accessories": [catalog["accessories"][accessory_id] for accessory_id in accessory_ids],
+        "insurances": [catalog["insurances"][insurance_id] for insurance_id in insurance_ids]
+    }
+
+
+def as_mongodb_purchase(purchase: Row, car_document: dict) -> dict:
+    return {
+        "_id": purchase["id"],
+        "date_of_purchase": as_mongodb_datetime(purchase["date_of_purchase"]),
+        "car": car_document
+    }
+
+
+def as_mongodb_sales_rollup(rollup: Row, catalog: Catalog) -> dict:
+    # The same ID as get_sales_rollup_id, so the replicated sales are added to the copied rollup
+    sales_person = catalog["sales_people"][rollup["sales_people_id"]]
+    return {
+        "_id": "|".join([
+            rollup["day"].isoformat(),
+            rollup["brands_id"],
+            rollup["models_id"],
+            rollup["colors_id"],
+            rollup["sales_people_id"]
+        ]),
+        "day": as_mongodb_datetime(rollup["day"]),
+        "brand": {"_id": rollup["brands_id"], "name": catalog["brands"][rollup["brands_id"]]["name"]},
+        "model": {"_id": rollup["models_id"], "name": catalog["models"][rollup["models_id"]]["name"]},
+        "color": {"_id": rollup["colors_id"], "name": catalog["colors"][rollup["colors_id"]]["name"]},
+        "sales_person": {
+            "_id": sales_person["_id"], "first_name": sales_person["first_name"], "last_name": sales_person["last_name"]
+        },
+        "units": rollup["units"],
+        "revenue": rollup["revenue"]
+    }
+
+
+def as_neo4j_car(car: Row, accessory_ids: List[str], insurance_ids: List[str]) -> dict:
+    return {
+        "id": car["id"],
+        "purchase_deadline": car["purchase_deadline"],
+        "total_price": car["total_price"],
+        "model_id": car["models_id"],
+        "color_id": car["colors_id"],
+        "customer_id": car["customers_id"],
+        "sales_person_id": car["sales_people_id"],
+        "accessory_ids": accessory_ids,
+        "insurance_ids": insurance_ids
+    }
+
+
+def get_row_key(table: Table, row: Row) -> List[Any]:
+    return [row[column.name] for column in table.primary_key.columns]
+
+
+def read_checkpoint(checkpoint_file: str) -> Dict[str, Any]:
+    """
+    Returns the primary key of the last copied row of every table, and the change event ID the copy started at.
+    """
+    if not os.path.exists(checkpoint_file):
+        return {}
+    with open(checkpoint_file, 'r') as file:
+        return json.load(file)
+
+
+def save_checkpoint(checkpoint_file: str, checkpoint: Dict[str, Any]):
+    # Written to a temporary file first, so a copy stopped while saving never leaves half a checkpoint
+    temporary_file = f"{checkpoint_file}.tmp"
+    with open(temporary_file, 'w') as file:
+        json.dump(checkpoint, file, default=str)
+    os.replace(temporary_file, checkpoint_file)
+
+
+def get_rows_per_second(rows: int, seconds: float) -> float:
+    return rows / seconds if seconds > 0 else 0.0
+
+
+def stream_rows(
+        connection: "Connection",
+        table_name: str,
+        after_key: Optional[List[Any]],
+        batch_size: int
+) -> Iterator[List[Row]]:  # pragma: no cover
+    """
+    Yields the rows of the table after the given primary key in batches, ordered by the primary key.
+    The server-side cursor keeps the connection busy until the table has been read.
+    """
+    table = SOURCE_TABLES[table_name]
+    key_columns = list(table.primary_key.columns)
+    query = select(table).order_by(*key_columns)
+    if after_key is not None:
+        query = query.where(tuple_(*key_columns) > tuple(after_key))
+    result = connection.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+    for rows in result.mappings().partitions(batch_size):
+        yield rows
+
+
+def get_rows_by(connection: "Connection", table_name: str, column: str, values: List[Any]) -> List[Row]:  # pragma: no cover
+    table = SOURCE_TABLES[table_name]
+    return connection.execute(select(table).where(table.c[column].in_(values))).mappings().all()
+
+
+def get_last_change_event_id(connection: "Connection") -> int:  # pragma: no cover
+    return connection.execute(select(func.max(ChangeEventMySQLEntity.id))).scalar() or 0
+
+
+def load_catalog(connection: "Connection") -> Catalog:  # pragma: no cover
+    catalog_rows = {
+        table: connection.execute(select(SOURCE_TABLES[table])).mappings().all()
+        for table in CATALOG_TABLES
+    }
+    model_colors = connection.execute(select(models_has_colors)).mappings().all()
+    return get_catalog(catalog_rows, group_ids(model_colors, "models_id", "colors_id"))
+
+
+class MongoDBLoader:  # pragma: no cover
+    """
+    Inserts the rows of every table as MongoDB documents, the purchases are inserted with their cars.
+    """
+    tables = CATALOG_TABLES + ("customers", "cars", "sales_daily_rollups")
+
+    def __init__(self, database: "Database", lookups: Optional["Connection"], catalog: Catalog):
+        self.database = database
+        self.lookups = lookups
+        self.catalog = catalog
+
+    def insert_documents(self, collection_name: str, documents: List[dict]):
+        from pymongo.errors import BulkWriteError
+
+        if not documents:
+            return
+        collection: "Collection" = self.database.get_collection(collection_name)
+        try:
+            collection.insert_many(documents, ordered=False)
+        except BulkWriteError as error:
+            # A resumed batch can have been partly written before the copy stopped, those documents are skipped
+            write_errors = error.details.get("writeErrors", [])
+            if error.details.get("writeConcernErrors") or any(
+                    write_error["code"] != DUPLICATE_KEY_ERROR_CODE for write_error in write_errors
+            ):
+                raise
+
+    def load(self, table: str, rows: List[Row]):
+        if table in CATALOG_TABLES:
+            self.insert_documents(table, [self.catalog[table][row["id"]] for row in rows])
+        elif table == "customers":
+            self.insert_documents(table, [as_mongodb_customer(row) for row in rows])
+        elif table == "cars":
+            self.load_cars(rows)
+        elif table == "sales_daily_rollups":
+            self.insert_documents(table, [as_mongodb_sales_rollup(row, self.catalog) for row in rows])
+
+    def load_cars(self, cars: List[Row]):
+        car_ids = [car["id"] for car in cars]
+        customers = {
+            customer["id"]: customer
+            for customer in get_rows_by(self.lookups, "customers", "id", list({car["customers_id"] for car in cars}))
+        }
+        self.insert_cars(
+            cars,
+            customers,
+            group_ids(get_rows_by(self.lookups, "cars_has_accessories", "cars_id", car_ids), "cars_id", "accessories_id"),
+            group_ids(get_rows_by(self.lookups, "cars_has_insurances", "cars_id", car_ids), "cars_id", "insurances_id"),
+            get_rows_by(self.lookups, "purchases", "cars_id", car_ids)
+        )
+
+    def insert_cars(
+            self,
+            cars: List[Row],
+            customers: Mapping[str, Row],
+            accessory_ids: Mapping[str, List[str]],
+            insurance_ids: Mapping[str, List[str]],
+            purchases: List[Row]
+    ):
+        car_documents = {
+            car["id"]: as_mongodb_car(
+                car, self.catalog, customers[car["customers_id"]],
+                accessory_ids.get(car["id"], []), insurance_ids.get(car["id"], [])
+            )
+            for car in cars
+        }
+        # Purchased cars stay in the cars collection as well, like in the seed data
+        self.insert_documents("cars", list(car_documents.values()))
+        self.insert_documents("purchases", [
+            as_mongodb_purchase(purchase, car_documents[purchase["cars_id"]]) for purchase in purchases
+        ])
+
+
+class Neo4jLoader:  # pragma: no cover
+    """
+    Merges the rows of every table as Neo4j nodes and relationships, the purchases are merged with their cars.
+    The nodes are merged on their ID, so a resumed batch leaves no duplicates behind.
+    """
+    tables = CATALOG_TABLES + ("customers", "cars")
+
+    def __init__(self, neo4j_session: "Neo4jSession", lookups: Optional["Connection"]):
+        self.neo4j_session = neo4j_session
+        self.lookups = lookups
+
+    def create_constraints(self):
+        # MERGE looks the nodes up by the index of the unique constraint, instead of scanning the label
+        for label in NEO4J_LABELS.values():
+            self.neo4j_session.run(f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE")
+
+    def merge_nodes(self, table: str, rows: List[Row]):
+        query = (
+            f"""
+            UNWIND $rows AS row
+            MERGE (n:{NEO4J_LABELS[table]} {{id: row.id}})
+            SET n += row
+            """
+        )
+        self.neo4j_session.run(query, {"rows": [as_neo4j_properties(row, table) for row in rows]})
+
+    def load(self, table: str, rows: List[Row]):
+        if table == "models":
+            self.load_models(rows)
+        elif table == "cars":
+            self.load_cars(rows)
+        else:
+            self.merge_nodes(table, rows)
+
+    def load_models(self, models: List[Row]):
+        self.merge_models(models, group_ids(
+            get_rows_by(self.lookups, "models_has_colors", "models_id", [model["id"] for model in models]),
+            "models_id", "colors_id"
+        ))
+
+    def merge_models(self, models: List[Row], color_ids: Mapping[str, List[str]]):
+        query = (
+            """
+            UNWIND $models AS model
+            MERGE (m:Model {id: model.id})
+            SET m.name = model.name, m.price = model.price, m.image_url = model.image_url
+            WITH m, model
+            MATCH (b:Brand {id: model.brand_id})
+            MERGE (m)-[:BELONGS_TO]->(b)
+            WITH m, model
+            CALL {
+                WITH m, model
+                UNWIND model.color_ids AS color_id
+                MATCH (c:Color {id: color_id})
+                MERGE (m)-[:HAS_COLOR]->(c)
+            }
+            """
+        )
+        self.neo4j_session.run(query, {"models": [
+            {**as_neo4j_properties(model, "models"), "brand_id": model["brands_id"],
+             "color_ids": color_ids.get(model["id"], [])}
+            for model in models
+        ]})
+
+    def load_cars(self, cars: List[Row]):
+        car_ids = [car["id"] for car in cars]
+        self.merge_cars(
+            cars,
+            group_ids(get_rows_by(self.lookups, "cars_has_accessories", "cars_id", car_ids), "cars_id", "accessories_id"),
+            group_ids(get_rows_by(self.lookups, "cars_has_insurances", "cars_id", car_ids), "cars_id", "insurances_id"),
+            get_rows_by(self.lookups, "purchases", "cars_id", car_ids)
+        )
+
+    def merge_cars(
+            self,
+            cars: List[Row],
+            accessory_ids: Mapping[str, List[str]],
+            insurance_ids: Mapping[str, List[str]],
+            purchases: List[Row]
+    ):
+        query = (
+            """
+            UNWIND $cars AS car
+            MERGE (c:Car {id: car.id})
+            SET c.purchase_deadline = car.purchase_deadline, c.total_price = car.total_price
+            WITH c, car
+            MATCH (m:Model {id: car.model_id}), (color:Color {id: car.color_id}),
+                  (customer:Customer {id: car.customer_id}), (sp:SalesPerson {id: car.sales_person_id})
+            MERGE (c)-[:HAS_MODEL]->(m)
+            MERGE (c)-[:HAS_COLOR]->(color)
+            MERGE (c)-[:OWNED_BY]->(customer)
+            MERGE (c)-[:SOLD_BY]->(sp)
+            WITH c, car
+            CALL {
+                WITH c, car
+                UNWIND car.accessory_ids AS accessory_id
+                MATCH (a:Accessory {id: accessory_id})
+                MERGE (c)-[:HAS_ACCESSORY]->(a)
+            }
+            CALL {
+                WITH c, car
+                UNWIND car.insurance_ids AS insurance_id
+                MATCH (i:Insurance {id: insurance_id})
+                MERGE (c)-[:HAS_INSURANCE]->(i)
+            }
+            """
+        )
+        self.neo4j_session.run(query, {"cars": [
+            as_neo4j_car(car, accessory_ids.get(car["id"], []), insurance_ids.get(car["id"], []))
+            for car in cars
+        ]})
+        purchases_query = (
+            """
+            UNWIND $purchases AS purchase
+            MATCH (car:Car {id: purchase.car_id})
+            MERGE (p:Purchase {id: purchase.id})
+            SET p.date_of_purchase = purchase.date_of_purchase
+            MERGE (p)-[:MADE_FOR]->(car)
+            """
+        )
+        self.neo4j_session.run(purchases_query, {"purchases": [
+            {"id": purchase["id"], "car_id": purchase["cars_id"], "date_of_purchase": purchase["date_of_purchase"]}
+            for purchase in purchases
+        ]})
+
+
+def copy_table(
+        connection: "Connection",
+        loader: Any,
+        table: str,
+        checkpoint: Dict[str, Any],
+        checkpoint_file: str,
+        batch_size: int
+) -> int:  # pragma: no cover
+    """
+    Copies the rows of the table after its checkpoint and returns the amount of copied rows.
+    """
+    copied_rows = 0
+    for rows in stream_rows(connection, table, checkpoint.get(table), batch_size):
+        loader.load(table, rows)
+        checkpoint[table] = get_row_key(SOURCE_TABLES[table], rows[-1])
+        save_checkpoint(checkpoint_file, checkpoint)
+        copied_rows += len(rows)
+    return copied_rows
+
+
+def run_etl(target: str, batch_size: int, checkpoint_file: str):  # pragma: no cover
+    from db import get_engine
+
+    checkpoint = read_checkpoint(checkpoint_file)
+    engine = get_engine(is_test_engine=False)
+    # The lookups of a batch are read over a second connection, while the first one streams the table
+    with engine.connect() as connection, engine.connect() as lookups:
+        if "change_event_id" not in checkpoint:
+            checkpoint["change_event_id"] = get_last_change_event_id(lookups)
+            save_checkpoint(checkpoint_file, checkpoint)
+        catalog = load_catalog(lookups)
+        if target == "mongodb":
+            from db import get_mongodb
+            database_context = get_mongodb()
+        else:
+            from db import get_neo4j
+            database_context = get_neo4j()
+
+        with database_context as database:
+            if target == "mongodb":
+                loader = MongoDBLoader(database, lookups, catalog)
+            else:
+                loader = Neo4jLoader(database, lookups)
+                loader.create_constraints()
+            total_rows, total_started_at = 0, time.perf_counter()
+            for table in loader.tables:
+                started_at = time.perf_counter()
+                copied_rows = copy_table(connection, loader, table, checkpoint, checkpoint_file, batch_size)
+                seconds = time.perf_counter() - started_at
+                total_rows += copied_rows
+                print(f"Copied {copied_rows} {table} in {seconds:.1f} seconds, "
+                      f"{get_rows_per_second(copied_rows, seconds):.0f} rows per second")
+            total_seconds = time.perf_counter() - total_started_at
+            print(f"Copied {total_rows} rows in {total_seconds:.1f} seconds, "
+                  f"{get_rows_per_second(total_rows, total_seconds):.0f} rows per second")
+    print(f"Apply the changes made during the copy with:\n"
+          f"python -m app.workers.change_replicator --replica={target} --replay-from={checkpoint['change_event_id']}")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Copy the MySQL database into MongoDB or Neo4j in bulk.")
+    parser.add_argument('--target', choices=ETL_TARGETS, required=True,
+                        help="The database to copy the MySQL database into")
+    parser.add_argument('--batch-size', type=int, default=5000,
+                        help="The amount of rows read and written at a time")
+    parser.add_argument('--checkpoint-file', default=None,
+                        help="The file the progress is saved to, etl_<target>_checkpoint.json by default")
+    args = parser.parse_args()
+
+    start_time = datetime.now()
+    print(f"ETL_MYSQL_TO_REPLICAS: {start_time}: Starting the copy of MySQL into {args.target}")
+    run_etl(args.target, args.batch_size, args.checkpoint_file or f"etl_{args.target}_checkpoint.json")
+    duration = (datetime.now() - start_time).total_seconds()
+    print(f"Successfully copied MySQL into {args.target}, it took {duration} seconds.")
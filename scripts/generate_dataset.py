@@ -0,0 +1,434 @@
+"""
+Generates a large synthetic dataset and loads it into MySQL, MongoDB and Neo4j, for benchmarks and capacity planning.
+
+The dataset is generated from a seed, so the same seed and reference date always generate the same rows,
+with the skew of real sales: a few sales people sell most of the cars, a few models are far more popular than the rest,
+most cars have a couple of accessories and some customers buy many cars.
+The cars are generated and written in batches of batch_size, to every target at once,
+with multi-row inserts to MySQL, unordered insert_many to MongoDB and UNWIND statements to Neo4j,
+and the rows per second of every table and target are printed:
+    python scripts/generate_dataset.py --targets=mysql,mongodb,neo4j --cars=1000000 --customers=200000 --seed=42
+
+The targets are expected to hold the schema, indexes and constraints of their seed scripts,
+and the generated rows are added to the rows they already hold.
+"""
+import os
+import sys
+import time
+import random
+import hashlib
+import argparse
+from uuid import UUID
+from itertools import accumulate
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scripts.etl_mysql_to_replicas import (
+    CATALOG_TABLES,
+    SOURCE_TABLES,
+    Row,
+    MongoDBLoader,
+    Neo4jLoader,
+    get_catalog,
+    group_ids,
+    get_rows_per_second
+)
+
+if TYPE_CHECKING:
+    from pymongo.database import Database
+    from neo4j import Session as Neo4jSession
+    from sqlalchemy.engine import Connection
+
+DATASET_TARGETS = ("mysql", "mongodb", "neo4j")
+DEFAULT_AMOUNTS: Dict[str, int] = {
+    "brands": 20,
+    "models": 500,
+    "colors": 40,
+    "accessories": 100,
+    "insurances": 20,
+    "sales_people": 200,
+    "customers": 200_000,
+    "cars": 1_000_000,
+}
+# The exponents of the Zipf distributions the cars pick from, a higher exponent is a stronger skew
+POPULARITY_EXPONENTS: Dict[str, float] = {
+    "sales_people": 1.1,
+    "models": 1.0,
+    "accessories": 0.8,
+    "customers": 0.5,
+}
+# The weights of 0, 1, 2, ... accessories and insurances on a car
+ACCESSORY_COUNT_WEIGHTS = (25, 30, 20, 12, 7, 4, 2)
+INSURANCE_COUNT_WEIGHTS = (40, 35, 15, 7, 3)
+COLORS_PER_MODEL = (2, 6)
+FIRST_NAMES = ("Anna", "Oliver", "Emma", "Noah", "Ida", "William", "Freja", "Lucas", "Clara", "Karl", "Sofie", "Emil")
+LAST_NAMES = ("Jensen", "Nielsen", "Hansen", "Pedersen", "Andersen", "Christensen", "Larsen", "Sørensen", "Rasmussen")
+# Dataset batches of cars also hold the rows that belong to the cars, by table
+CarBatch = Dict[str, Any]
+
+
+def get_zipf_cum_weights(amount: int, exponent: float) -> List[float]:
+    """
+    Returns the cumulative weights of a Zipf distribution over amount ranks, for random.choices.
+    """
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, amount + 1)))
+
+
+class DatasetGenerator:
+    """
+    Generates the rows of the MySQL tables in the shape of their columns.
+    The catalog is generated up front, while the customers and cars are generated in batches,
+    so the dataset never has to fit in memory. Only the sales rollup is summed up while the cars are generated.
+    """
+
+    def __init__(
+            self,
+            amounts: Dict[str, int],
+            seed: int = 0,
+            reference_date: Optional[date] = None,
+            purchased_share: float = 0.3,
+            hashed_password: str = ""
+    ):
+        for table, amount in amounts.items():
+            if amount < 1:
+                raise ValueError(f"The amount of {table} must be at least 1, not {amount}.")
+        if not 0 <= purchased_share <= 1:
+            raise ValueError(f"purchased_share must be between 0 and 1, not {purchased_share}.")
+        self.amounts = {**DEFAULT_AMOUNTS, **amounts}
+        self.seed = seed
+        self.reference_date = reference_date or date.today()
+        self.purchased_share = purchased_share
+        self.hashed_password = hashed_password
+        self.sales_rollups: Dict[Tuple[date, str, str, str, str], List[float]] = {}
+        self.catalog_rows = self.generate_catalog_rows(random.Random(f"{seed}:catalog"))
+        self.model_color_ids = group_ids(self.catalog_rows["models_has_colors"], "models_id", "colors_id")
+        self.prices = {
+            table: {row["id"]: row["price"] for row in self.catalog_rows[table]}
+            for table in ("models", "colors", "accessories", "insurances")
+        }
+        self.brand_ids = {model["id"]: model["brands_id"] for model in self.catalog_rows["models"]}
+
+    def get_id(self, table: str, index: int) -> str:
+        # Derived from the seed, the table and the index, so a customer's ID is known without keeping the customer
+        digest = hashlib.md5(f"{self.seed}:{table}:{index}".encode()).digest()
+        return str(UUID(bytes=digest, version=4))
+
+    def get_ids(self, table: str) -> List[str]:
+        return [self.get_id(table, index) for index in range(self.amounts[table])]
+
+    def generate_catalog_rows(self, generator: random.Random) -> Dict[str, List[Row]]:
+        brand_ids, color_ids = self.get_ids("brands"), self.get_ids("colors")
+        catalog_rows: Dict[str, List[Row]] = {
+            "brands": [
+                {"id": brand_id, "name": f"Brand {index + 1}",
+                 "logo_url": f"https://keacar.ams3.cdn.digitaloceanspaces.com/brand-{index + 1}.png"}
+                for index, brand_id in enumerate(brand_ids)
+            ],
+            "colors": [
+                {"id": color_id, "name": f"color {index + 1}", "price": round(generator.uniform(0, 500), 2),
+                 "red_value": generator.randint(0, 255), "green_value": generator.randint(0, 255),
+                 "blue_value": generator.randint(0, 255)}
+                for index, color_id in enumerate(color_ids)
+            ],
+            "models": [
+                {"id": model_id, "brands_id": generator.choice(brand_ids), "name": f"Model {index + 1}",
+                 "price": round(generator.uniform(10_000, 90_000), 2),
+                 "image_url": f"https://keacar.ams3.cdn.digitaloceanspaces.com/model-{index + 1}.png"}
+                for index, model_id in enumerate(self.get_ids("models"))
+            ],
+            "accessories": [
+                {"id": accessory_id, "name": f"Accessory {index + 1}", "price": round(generator.uniform(20, 2000), 2)}
+                for index, accessory_id in enumerate(self.get_ids("accessories"))
+            ],
+            "insurances": [
+                {"id": insurance_id, "name": f"Insurance {index + 1}", "price": round(generator.uniform(5, 100), 2)}
+                for index, insurance_id in enumerate(self.get_ids("insurances"))
+            ],
+            "sales_people": [
+                {"id": sales_person_id, "email": f"sales.person{index + 1}@keacar.dk",
+                 "hashed_password": self.hashed_password,
+                 "first_name": FIRST_NAMES[index % len(FIRST_NAMES)],
+                 "last_name": LAST_NAMES[index // len(FIRST_NAMES) % len(LAST_NAMES)]}
+                for index, sales_person_id in enumerate(self.get_ids("sales_people"))
+            ],
+        }
+        catalog_rows["models_has_colors"] = [
+            {"models_id": model["id"], "colors_id": color_id}
+            for model in catalog_rows["models"]
+            for color_id in generator.sample(color_ids, min(generator.randint(*COLORS_PER_MODEL), len(color_ids)))
+        ]
+        return catalog_rows
+
+    def get_customer(self, index: int) -> Row:
+        return {
+            "id": self.get_id("customers", index),
+            "email": f"customer{index + 1}@gmail.com",
+            "phone_number": f"{20_000_000 + index % 80_000_000}",
+            "first_name": FIRST_NAMES[index % len(FIRST_NAMES)],
+            "last_name": LAST_NAMES[index // len(FIRST_NAMES) % len(LAST_NAMES)],
+            "address": f"Testvej {index % 250 + 1}, {index // 250 % 9000 + 1000}"
+        }
+
+    def generate_customer_batches(self, batch_size: int) -> Iterator[List[Row]]:
+        for start in range(0, self.amounts["customers"], batch_size):
+            yield [self.get_customer(index) for index in range(start, min(start + batch_size, self.amounts["customers"]))]
+
+    def generate_car_batches(self, batch_size: int) -> Iterator[CarBatch]:
+        """
+        Yields the cars in batches, together with their accessories, insurances, purchases and customers.
+        """
+        generator = random.Random(f"{self.seed}:cars")
+        model_ids = [model["id"] for model in self.catalog_rows["models"]]
+        sales_person_ids = [sales_person["id"] for sales_person in self.catalog_rows["sales_people"]]
+        accessory_ids = [accessory["id"] for accessory in self.catalog_rows["accessories"]]
+        insurance_ids = [insurance["id"] for insurance in self.catalog_rows["insurances"]]
+        # The popularity is shuffled, so the first rows are not always the most popular ones
+        for ids in (model_ids, sales_person_ids, accessory_ids):
+            generator.shuffle(ids)
+        cum_weights = {
+            table: get_zipf_cum_weights(self.amounts[table], exponent)
+            for table, exponent in POPULARITY_EXPONENTS.items()
+        }
+        customer_indexes = range(self.amounts["customers"])
+
+        for start in range(0, self.amounts["cars"], batch_size):
+            batch: CarBatch = {
+                "cars": [], "cars_has_accessories": [], "cars_has_insurances": [], "purchases": [], "customers": {}
+            }
+            for index in range(start, min(start + batch_size, self.amounts["cars"])):
+                car_id = self.get_id("cars", index)
+                model_id = generator.choices(model_ids, cum_weights=cum_weights["models"])[0]
+                color_id = generator.choice(self.model_color_ids[model_id])
+                sales_person_id = generator.choices(sales_person_ids, cum_weights=cum_weights["sales_people"])[0]
+                customer = self.get_customer(generator.choices(customer_indexes, cum_weights=cum_weights["customers"])[0])
+                accessory_count = generator.choices(range(len(ACCESSORY_COUNT_WEIGHTS)), ACCESSORY_COUNT_WEIGHTS)[0]
+                car_accessory_ids = set()
+                while len(car_accessory_ids) < min(accessory_count, len(accessory_ids)):
+                    car_accessory_ids.add(generator.choices(accessory_ids, cum_weights=cum_weights["accessories"])[0])
+                insurance_count = generator.choices(range(len(INSURANCE_COUNT_WEIGHTS)), INSURANCE_COUNT_WEIGHTS)[0]
+                car_insurance_ids = generator.sample(insurance_ids, min(insurance_count, len(insurance_ids)))
+                total_price = round(
+                    self.prices["models"][model_id] + self.prices["colors"][color_id]
+                    + sum(self.prices["accessories"][accessory_id] for accessory_id in car_accessory_ids)
+                    + sum(self.prices["insurances"][insurance_id] for insurance_id in car_insurance_ids), 2
+                )
+                purchase_deadline = self.reference_date + timedelta(days=generator.randint(-90, 30))
+                batch["cars"].append({
+                    "id": car_id,
+                    "models_id": model_id,
+                    "colors_id": color_id,
+                    "customers_id": customer["id"],
+                    "sales_people_id": sales_person_id,
+                    "total_price": total_price,
+                    "purchase_deadline": purchase_deadline
+                })
+                batch["customers"][customer["id"]] = customer
+                batch["cars_has_accessories"].extend(
+                    {"cars_id": car_id, "accessories_id": accessory_id} for accessory_id in sorted(car_accessory_ids)
+                )
+                batch["cars_has_insurances"].extend(
+                    {"cars_id": car_id, "insurances_id": insurance_id} for insurance_id in car_insurance_ids
+                )
+                if generator.random() < self.purchased_share:
+                    # Bought before the deadline, and never after the reference date
+                    date_of_purchase = min(purchase_deadline - timedelta(days=generator.randint(0, 30)), self.reference_date)
+                    batch["purchases"].append({
+                        "id": self.get_id("purchases", index), "cars_id": car_id, "date_of_purchase": date_of_purchase
+                    })
+                    sales_rollup = self.sales_rollups.setdefault(
+                        (date_of_purchase, self.brand_ids[model_id], model_id, color_id, sales_person_id), [0, 0.0]
+                    )
+                    sales_rollup[0] += 1
+                    sales_rollup[1] += total_price
+            yield batch
+
+    def get_sales_rollup_rows(self) -> List[Row]:
+        """
+        Returns the sales rollup of the cars generated so far.
+        """
+        return [
+            {"day": day, "brands_id": brand_id, "models_id": model_id, "colors_id": color_id,
+             "sales_people_id": sales_person_id, "units": units, "revenue": round(revenue, 2)}
+            for (day, brand_id, model_id, color_id, sales_person_id), (units, revenue) in self.sales_rollups.items()
+        ]
+
+
+class MySQLDatasetWriter:  # pragma: no cover
+    """
+    Inserts the rows with multi-row inserts, committing every batch.
+    The foreign keys and unique keys are not checked during the load, since the generator only generates valid rows.
+    """
+
+    def __init__(self, connection: "Connection"):
+        from sqlalchemy import text
+
+        self.connection = connection
+        self.connection.execute(text("SET foreign_key_checks = 0, unique_checks = 0"))
+
+    def insert_rows(self, table: str, rows: List[Row]):
+        if rows:
+            self.connection.execute(SOURCE_TABLES[table].insert(), rows)
+
+    def write_catalog(self, catalog_rows: Dict[str, List[Row]]):
+        for table in CATALOG_TABLES + ("models_has_colors",):
+            self.insert_rows(table, catalog_rows[table])
+        self.connection.commit()
+
+    def write_customers(self, customers: List[Row]):
+        self.insert_rows("customers", customers)
+        self.connection.commit()
+
+    def write_cars(self, batch: CarBatch):
+        for table in ("cars", "cars_has_accessories", "cars_has_insurances", "purchases"):
+            self.insert_rows(table, batch[table])
+        self.connection.commit()
+
+    def write_sales_rollups(self, sales_rollups: List[Row]):
+        self.insert_rows("sales_daily_rollups", sales_rollups)
+        self.connection.commit()
+
+
+class MongoDBDatasetWriter:  # pragma: no cover
+    def __init__(self, database: "Database"):
+        self.database = database
+        self.loader: Optional[MongoDBLoader] = None
+
+    def write_catalog(self, catalog_rows: Dict[str, List[Row]]):
+        catalog = get_catalog(catalog_rows, group_ids(catalog_rows["models_has_colors"], "models_id", "colors_id"))
+        self.loader = MongoDBLoader(self.database, None, catalog)
+        for table in CATALOG_TABLES:
+            self.loader.load(table, catalog_rows[table])
+
+    def write_customers(self, customers: List[Row]):
+        self.loader.load("customers", customers)
+
+    def write_cars(self, batch: CarBatch):
+        self.loader.insert_cars(
+            batch["cars"],
+            batch["customers"],
+            group_ids(batch["cars_has_accessories"], "cars_id", "accessories_id"),
+            group_ids(batch["cars_has_insurances"], "cars_id", "insurances_id"),
+            batch["purchases"]
+        )
+
+    def write_sales_rollups(self, sales_rollups: List[Row]):
+        self.loader.load("sales_daily_rollups", sales_rollups)
+
+
+class Neo4jDatasetWriter:  # pragma: no cover
+    def __init__(self, neo4j_session: "Neo4jSession"):
+        self.loader = Neo4jLoader(neo4j_session, None)
+        self.loader.create_constraints()
+
+    def write_catalog(self, catalog_rows: Dict[str, List[Row]]):
+        for table in CATALOG_TABLES:
+            if table != "models":
+                self.loader.merge_nodes(table, catalog_rows[table])
+        self.loader.merge_models(
+            catalog_rows["models"], group_ids(catalog_rows["models_has_colors"], "models_id", "colors_id")
+        )
+
+    def write_customers(self, customers: List[Row]):
+        self.loader.merge_nodes("customers", customers)
+
+    def write_cars(self, batch: CarBatch):
+        self.loader.merge_cars(
+            batch["cars"],
+            group_ids(batch["cars_has_accessories"], "cars_id", "accessories_id"),
+            group_ids(batch["cars_has_insurances"], "cars_id", "insurances_id"),
+            batch["purchases"]
+        )
+
+    def write_sales_rollups(self, sales_rollups: List[Row]):
+        # Neo4j aggregates the sales from the purchases, so it has no rollup
+        pass
+
+
+def write_dataset(generator: DatasetGenerator, writers: Dict[str, Any], batch_size: int):  # pragma: no cover
+    """
+    Writes the dataset to every writer and prints the rows per second of every table and target.
+    """
+    def write(target: str, table: str, rows: int, write_rows):
+        started_at = time.perf_counter()
+        write_rows()
+        seconds = time.perf_counter() - started_at
+        throughput = throughputs.setdefault((target, table), [0, 0.0])
+        throughput[0] += rows
+        throughput[1] += seconds
+
+    throughputs: Dict[Tuple[str, str], List[float]] = {}
+    catalog_size = sum(len(generator.catalog_rows[table]) for table in CATALOG_TABLES)
+    for target, writer in writers.items():
+        write(target, "catalog", catalog_size, lambda: writer.write_catalog(generator.catalog_rows))
+    for customers in generator.generate_customer_batches(batch_size):
+        for target, writer in writers.items():
+            write(target, "customers", len(customers), lambda: writer.write_customers(customers))
+    generated_cars = 0
+    for batch in generator.generate_car_batches(batch_size):
+        for target, writer in writers.items():
+            write(target, "cars", len(batch["cars"]), lambda: writer.write_cars(batch))
+        generated_cars += len(batch["cars"])
+        print(f"Generated {generated_cars} of {generator.amounts['cars']} cars")
+    sales_rollups = generator.get_sales_rollup_rows()
+    for target, writer in writers.items():
+        write(target, "sales_daily_rollups", len(sales_rollups), lambda: writer.write_sales_rollups(sales_rollups))
+
+    for (target, table), (rows, seconds) in throughputs.items():
+        print(f"{target}: wrote {rows} {table} in {seconds:.1f} seconds, "
+              f"{get_rows_per_second(rows, seconds):.0f} rows per second")
+
+
+def run_generator(targets: List[str], generator: DatasetGenerator, batch_size: int):  # pragma: no cover
+    from contextlib import ExitStack
+
+    with ExitStack() as stack:
+        writers: Dict[str, Any] = {}
+        if "mysql" in targets:
+            from db import get_engine
+            writers["mysql"] = MySQLDatasetWriter(stack.enter_context(get_engine(is_test_engine=False).connect()))
+        if "mongodb" in targets:
+            from db import get_mongodb
+            writers["mongodb"] = MongoDBDatasetWriter(stack.enter_context(get_mongodb()))
+        if "neo4j" in targets:
+            from db import get_neo4j
+            writers["neo4j"] = Neo4jDatasetWriter(stack.enter_context(get_neo4j()))
+        write_dataset(generator, writers, batch_size)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    from app.core.security import get_password_hash
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset and load it into the databases.")
+    parser.add_argument('--targets', default="mysql",
+                        help=f"The comma separated databases to load the dataset into, of {', '.join(DATASET_TARGETS)}")
+    for table, amount in DEFAULT_AMOUNTS.items():
+        parser.add_argument(f"--{table.replace('_', '-')}", dest=table, type=int, default=amount,
+                            help=f"The amount of {table.replace('_', ' ')} to generate")
+    parser.add_argument('--purchased-share', type=float, default=0.3, help="The share of the cars that are purchased")
+    parser.add_argument('--seed', type=int, default=0, help="The seed the same dataset is generated from")
+    parser.add_argument('--reference-date', type=date.fromisoformat, default=date.today(),
+                        help="The date the purchase deadlines and dates of purchase are generated around")
+    parser.add_argument('--sales-person-password', default="password",
+                        help="The password every generated sales person logs in with")
+    parser.add_argument('--batch-size', type=int, default=5000, help="The amount of rows written at a time")
+    args = parser.parse_args()
+
+    targets = args.targets.split(",")
+    unknown_targets = [target for target in targets if target not in DATASET_TARGETS]
+    if unknown_targets:
+        parser.error(f"Unknown targets {', '.join(unknown_targets)}, the targets are {', '.join(DATASET_TARGETS)}")
+
+    start_time = datetime.now()
+    print(f"GENERATE_DATASET: {start_time}: Generating {args.cars} cars into {', '.join(targets)}")
+    dataset_generator = DatasetGenerator(
+        {table: getattr(args, table) for table in DEFAULT_AMOUNTS},
+        seed=args.seed,
+        reference_date=args.reference_date,
+        purchased_share=args.purchased_share,
+        # Hashed once, bcrypt is far too slow to hash a password per sales person
+        hashed_password=get_password_hash(args.sales_person_password)
+    )
+    run_generator(targets, dataset_generator, args.batch_size)
+    duration = (datetime.now() - start_time).total_seconds()
+    print(f"Successfully generated the dataset, it took {duration} seconds.")
@@ -0,0 +1,334 @@
+"""
+Generates load against a running API from a scenario file and checks the latencies against the SLO thresholds.
+
+A scenario declares the weighted mix of requests, the stages the amount of virtual users ramps through
+and the sales person the virtual users share the access token of, see load-tests/scenarios.
+Every virtual user is an asyncio task sending one request at a time, so thousands of users run in one process.
+The latencies are recorded in histograms per request, and the p95, p99 and error rate thresholds of
+load-tests/latency-thresholds-test.json are checked afterwards, exiting with 1 when one is exceeded:
+    LOAD_TEST_PASSWORD=<password> python scripts/load_test.py --scenario=load-tests/scenarios/mixed-backends.json
+    python scripts/load_test.py --scenario=... --base-url=http://localhost:8000 --output=load-test-results.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import operator
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+
+DEFAULT_THRESHOLDS_FILE = os.path.join(os.path.dirname(__file__), '..', 'load-tests', 'latency-thresholds-test.json')
+# The smallest latency bucket and how much every bucket is wider than the one before,
+# so a percentile is never more than 5% off the real latency, however many requests are recorded
+HISTOGRAM_MIN_MS = 0.1
+HISTOGRAM_GROWTH = 1.05
+HISTOGRAM_PERCENTILES = (50, 90, 95, 99)
+RAMP_INTERVAL_SECONDS = 0.1
+THRESHOLD_OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class LatencyHistogram:
+    """
+    Counts the latencies in buckets that grow by HISTOGRAM_GROWTH, instead of keeping every latency.
+    """
+
+    def __init__(self):
+        self.buckets: Counter = Counter()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float):
+        latency_ms = seconds * 1000
+        bucket = max(0, math.ceil(math.log(max(latency_ms, HISTOGRAM_MIN_MS) / HISTOGRAM_MIN_MS, HISTOGRAM_GROWTH)))
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def merge(self, other: "LatencyHistogram"):
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def get_percentile(self, percentile: float) -> float:
+        """
+        Returns the upper bound of the bucket of the nearest-rank percentile, in milliseconds.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percentile / 100))
+        counted = 0
+        for bucket in sorted(self.buckets):
+            counted += self.buckets[bucket]
+            if counted >= rank:
+                return min(HISTOGRAM_MIN_MS * HISTOGRAM_GROWTH ** bucket, self.max_ms)
+        return self.max_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            **{f"p{percentile}_ms": round(self.get_percentile(percentile), 3) for percentile in HISTOGRAM_PERCENTILES},
+            "max_ms": round(self.max_ms, 3),
+            "buckets_ms": {
+                f"{HISTOGRAM_MIN_MS * HISTOGRAM_GROWTH ** bucket:.3f}": self.buckets[bucket]
+                for bucket in sorted(self.buckets)
+            },
+        }
+
+
+class RequestStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.status_codes: Counter = Counter()
+
+    def record(self, seconds: float, status_code: Optional[int]):
+        # A request that failed without a response is counted under the status code 0
+        self.histogram.record(seconds)
+        self.status_codes[status_code or 0] += 1
+        if status_code is None or status_code >= 400:
+            self.errors += 1
+
+    def merge(self, other: "RequestStats"):
+        self.histogram.merge(other.histogram)
+        self.errors += other.errors
+        self.status_codes.update(other.status_codes)
+
+    def as_dict(self, duration_seconds: float) -> Dict[str, Any]:
+        requests = self.histogram.count
+        return {
+            "requests": requests,
+            "errors": self.errors,
+            "error_rate": round(self.errors / requests, 4) if requests else 0.0,
+            "requests_per_second": round(requests / duration_seconds, 1) if duration_seconds > 0 else 0.0,
+            "status_codes": {str(status_code): count for status_code, count in sorted(self.status_codes.items())},
+            **self.histogram.as_dict(),
+        }
+
+
+def validate_scenario(scenario: Dict[str, Any]):
+    if not scenario.get("requests"):
+        raise ValueError("The scenario must have at least one request.")
+    if not scenario.get("stages"):
+        raise ValueError("The scenario must have at least one stage.")
+    for request in scenario["requests"]:
+        if not request.get("name") or not request.get("path"):
+            raise ValueError(f"Every request must have a name and a path, not {request}.")
+        if request.get("weight", 1) <= 0:
+            raise ValueError(f"The weight of {request['name']} must be greater than 0, not {request['weight']}.")
+    for stage in scenario["stages"]:
+        if stage.get("duration_seconds", 0) <= 0 or stage.get("users", -1) < 0:
+            raise ValueError(f"Every stage must have a duration_seconds above 0 and users of at least 0, not {stage}.")
+
+
+def get_target_users(stages: List[Dict[str, Any]], elapsed_seconds: float) -> Optional[int]:
+    """
+    Returns the amount of virtual users at the elapsed time, ramping linearly from the users of the stage before,
+    and None when every stage has ended.
+    """
+    users_before, stage_start = 0, 0.0
+    for stage in stages:
+        stage_end = stage_start + stage["duration_seconds"]
+        if elapsed_seconds < stage_end:
+            progress = (elapsed_seconds - stage_start) / stage["duration_seconds"]
+            return round(users_before + (stage["users"] - users_before) * progress)
+        users_before, stage_start = stage["users"], stage_end
+    return None
+
+
+def render_path(path: str, variables: Dict[str, List[Any]], generator: random.Random) -> str:
+    # The {name} placeholders are replaced by a random value of the variable, like a random car ID
+    return path.format(**{
+        name: generator.choice(values) for name, values in variables.items() if f"{{{name}}}" in path
+    })
+
+
+def evaluate_thresholds(results: Dict[str, Any], thresholds: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Returns the names of the thresholds the results exceed. A threshold checks the total of every request,
+    unless it names a request, in the format of cpu-thresholds-test.json: {"name": {"metric": {"<": value}}}.
+    """
+    failed_thresholds = []
+    for threshold_name, threshold in thresholds.items():
+        request_name = threshold.get("request")
+        stats = results["requests"].get(request_name) if request_name else results["total"]
+        if stats is None:
+            failed_thresholds.append(f"{threshold_name}: no {request_name} requests were sent")
+            continue
+        for metric, conditions in threshold.items():
+            if metric == "request":
+                continue
+            for comparison, limit in conditions.items():
+                if not THRESHOLD_OPERATORS[comparison](stats[metric], limit):
+                    failed_thresholds.append(f"{threshold_name}: {metric} was {stats[metric]}")
+    return failed_thresholds
+
+
+class LoadTest:
+    """
+    Runs the virtual users of a scenario against the API and records the latency of every request.
+    """
+
+    def __init__(self, scenario: Dict[str, Any], client: "httpx.AsyncClient", seed: int = 0):
+        validate_scenario(scenario)
+        self.scenario = scenario
+        self.client = client
+        self.generator = random.Random(seed)
+        self.requests = scenario["requests"]
+        self.weights = [request.get("weight", 1) for request in self.requests]
+        self.think_time_seconds = scenario.get("think_time_seconds", 0)
+        self.variables: Dict[str, List[Any]] = {}
+        self.stats: Dict[str, RequestStats] = {request["name"]: RequestStats() for request in self.requests}
+
+    async def log_in(self):
+        # Every virtual user reuses the one token, like the sales people of a shop keep theirs
+        login = self.scenario.get("login")
+        if login is None:
+            return
+        password = login.get("password") or os.getenv(login.get("password_env", "LOAD_TEST_PASSWORD"), "")
+        response = await self.client.post(login["path"], json={"email": login["email"], "password": password})
+        response.raise_for_status()
+        self.client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+    async def load_variables(self):
+        # The values the paths pick from, like the IDs of the cars returned by a list route
+        for name, source in self.scenario.get("variables", {}).items():
+            response = await self.client.get(source["path"], params=source.get("params"))
+            response.raise_for_status()
+            self.variables[name] = [item[source.get("field", "id")] for item in response.json()]
+            if not self.variables[name]:
+                raise ValueError(f"The variable {name} has no values, {source['path']} returned nothing.")
+
+    async def send_request(self):
+        request = self.generator.choices(self.requests, weights=self.weights)[0]
+        status_code: Optional[int] = None
+        started_at = time.perf_counter()
+        try:
+            response = await self.client.request(
+                request.get("method", "GET"),
+                render_path(request["path"], self.variables, self.generator),
+                params=request.get("params"),
+                json=request.get("json")
+            )
+            status_code = response.status_code
+        except Exception:
+            pass
+        self.stats[request["name"]].record(time.perf_counter() - started_at, status_code)
+
+    async def run_user(self, stop_event: asyncio.Event):
+        while not stop_event.is_set():
+            await self.send_request()
+            if self.think_time_seconds:
+                await asyncio.sleep(self.think_time_seconds)
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Ramps the virtual users through the stages and returns the results of every request and of all of them.
+        A removed user finishes its request first, so no request is cut short.
+        """
+        await self.log_in()
+        await self.load_variables()
+        users: List[asyncio.Event] = []
+        tasks: List[asyncio.Task] = []
+        peak_users = 0
+        started_at = time.perf_counter()
+        while True:
+            target_users = get_target_users(self.scenario["stages"], time.perf_counter() - started_at)
+            if target_users is None:
+                break
+            while len(users) < target_users:
+                stop_event = asyncio.Event()
+                users.append(stop_event)
+                tasks.append(asyncio.create_task(self.run_user(stop_event)))
+            while len(users) > target_users:
+                users.pop().set()
+            peak_users = max(peak_users, len(users))
+            await asyncio.sleep(RAMP_INTERVAL_SECONDS)
+        for stop_event in users:
+            stop_event.set()
+        await asyncio.gather(*tasks)
+        duration_seconds = time.perf_counter() - started_at
+
+        total = RequestStats()
+        for stats in self.stats.values():
+            total.merge(stats)
+        return {
+            "duration_seconds": round(duration_seconds, 2),
+            "peak_users": peak_users,
+            "total": total.as_dict(duration_seconds),
+            "requests": {name: stats.as_dict(duration_seconds) for name, stats in self.stats.items()},
+        }
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    columns = ["requests", "requests_per_second", "error_rate", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    rows = {**results["requests"], "total": results["total"]}
+    name_width = max(len(name) for name in rows)
+    lines = [f"{'request':<{name_width}} " + " ".join(columns)]
+    for name, stats in rows.items():
+        lines.append(f"{name:<{name_width}} " + " ".join(f"{stats[column]:>{len(column)}}" for column in columns))
+    return "\n".join(lines)
+
+
+async def run_load_test(
+        scenario: Dict[str, Any],
+        base_url: str,
+        seed: int = 0,
+        transport: Optional["httpx.AsyncBaseTransport"] = None
+) -> Dict[str, Any]:
+    import httpx
+
+    # One connection per virtual user at the peak, so the users never wait on each other for a connection
+    peak_users = max(stage["users"] for stage in scenario["stages"])
+    limits = httpx.Limits(max_connections=max(peak_users, 1), max_keepalive_connections=max(peak_users, 1))
+    async with httpx.AsyncClient(
+            base_url=base_url, timeout=scenario.get("timeout_seconds", 30), limits=limits, transport=transport
+    ) as client:
+        return await LoadTest(scenario, client, seed).run()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Generate load against the API and check the latency SLOs.")
+    parser.add_argument('--scenario', required=True, help="The scenario file of the requests and stages")
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS_FILE, help="The SLO thresholds file")
+    parser.add_argument('--base-url', default=None, help="The URL of the API, overrides the base_url of the scenario")
+    parser.add_argument('--seed', type=int, default=0, help="The seed the requests are picked with")
+    parser.add_argument('--output', default=None, help="The file the JSON results are written to")
+    args = parser.parse_args()
+
+    with open(args.scenario, 'r') as file:
+        load_scenario = json.load(file)
+    with open(args.thresholds, 'r') as file:
+        slo_thresholds = json.load(file)
+
+    start_time = datetime.now()
+    base_url = args.base_url or load_scenario.get("base_url", "http://localhost:8000")
+    print(f"LOAD_TEST: {start_time}: Starting {args.scenario} against {base_url}")
+    load_test_results = asyncio.run(run_load_test(load_scenario, base_url, args.seed))
+    print(format_results(load_test_results))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(load_test_results, file, indent=2)
+
+    failed = evaluate_thresholds(load_test_results, slo_thresholds)
+    for failed_threshold in failed:
+        print(f"Threshold exceeded: {failed_threshold}")
+    if failed:
+        sys.exit(1)
+    print(f"Every threshold of {args.thresholds} was met.")
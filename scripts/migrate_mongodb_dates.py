@@ -0,0 +1,97 @@
+"""
+Converts the dates MongoDB used to store as ISO strings to BSON datetimes, in place,
+and replaces the customer._id index of the cars with a (customer._id, purchase_deadline) index.
+
+The documents are streamed with a cursor and updated in unordered bulk writes of batch_size,
+so the migration never holds a collection in memory and can run against a live database.
+Only the dates still stored as strings are updated, so the migration can be stopped and run again:
+    python scripts/migrate_mongodb_dates.py --batch-size=1000
+"""
+import os
+import sys
+import argparse
+from datetime import datetime
+from typing import Any, Dict, Tuple, TYPE_CHECKING
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from db import as_mongodb_datetime
+
+if TYPE_CHECKING:
+    from pymongo.collection import Collection
+
+# The date fields of every collection, nested fields are written with dots like in a MongoDB query
+DATE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "cars": ("purchase_deadline",),
+    "purchases": ("date_of_purchase", "car.purchase_deadline"),
+    "sales_daily_rollups": ("day",),
+}
+CARS_CUSTOMER_INDEX = "customer._id_1"
+
+
+def get_field(document: dict, field: str) -> Any:
+    for key in field.split("."):
+        if not isinstance(document, dict):
+            return None
+        document = document.get(key)
+    return document
+
+
+def get_date_updates(document: dict, fields: Tuple[str, ...]) -> Dict[str, datetime]:
+    """
+    Returns the $set of the given date fields the document still stores as ISO strings.
+    """
+    return {
+        field: as_mongodb_datetime(get_field(document, field))
+        for field in fields if isinstance(get_field(document, field), str)
+    }
+
+
+def migrate_collection(collection: "Collection", fields: Tuple[str, ...], batch_size: int) -> int:  # pragma: no cover
+    """
+    Converts the string dates of the collection and returns the amount of updated documents.
+    """
+    from pymongo import UpdateOne
+
+    string_dates_query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    documents = collection.find(string_dates_query, projection={field: True for field in fields}).batch_size(batch_size)
+    updated_documents = 0
+    operations = []
+    for document in documents:
+        updates = get_date_updates(document, fields)
+        # The old strings are part of the filter, so a date changed since it was read is not overwritten
+        operations.append(UpdateOne(
+            {"_id": document["_id"], **{field: get_field(document, field) for field in updates}},
+            {"$set": updates}
+        ))
+        if len(operations) == batch_size:
+            updated_documents += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated_documents += collection.bulk_write(operations, ordered=False).modified_count
+    return updated_documents
+
+
+def migrate_cars_customer_index(cars: "Collection"):  # pragma: no cover
+    # The compound index also serves the queries by customer alone, so the old index is dropped once it exists
+    cars.create_index([("customer._id", 1), ("purchase_deadline", 1)])
+    if CARS_CUSTOMER_INDEX in cars.index_information():
+        cars.drop_index(CARS_CUSTOMER_INDEX)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    from db import get_mongodb
+
+    parser = argparse.ArgumentParser(description="Convert the MongoDB dates stored as ISO strings to BSON datetimes.")
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help="The amount of documents read and updated at a time")
+    args = parser.parse_args()
+
+    start_time = datetime.now()
+    print(f"MIGRATE_MONGODB_DATES: {start_time}: Starting MongoDB date migration")
+    with get_mongodb() as database:
+        for collection_name, date_fields in DATE_FIELDS.items():
+            updated = migrate_collection(database.get_collection(collection_name), date_fields, args.batch_size)
+            print(f"Converted the dates of {updated} {collection_name}")
+        migrate_cars_customer_index(database.get_collection("cars"))
+    duration = (datetime.now() - start_time).total_seconds()
+    print(f"Successfully migrated the MongoDB dates, it took {duration} seconds.")
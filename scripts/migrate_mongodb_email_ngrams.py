@@ -0,0 +1,74 @@
+"""
+Backfills the email_ngrams field of the MongoDB customers created before it existed,
+and creates its multikey index, which the fulltext email search of the customers uses.
+
+The customers are streamed with a cursor and updated in unordered bulk writes of batch_size,
+so the migration never holds the collection in memory and can run against a live database.
+Only the customers without email_ngrams are updated, so the migration can be stopped and run again:
+    python scripts/migrate_mongodb_email_ngrams.py --batch-size=1000
+"""
+import os
+import sys
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.models.customer import get_email_ngrams
+
+if TYPE_CHECKING:
+    from pymongo.collection import Collection
+
+
+def get_email_ngrams_update(customer: dict) -> Optional[Dict[str, List[str]]]:
+    """
+    Returns the $set of the email_ngrams of the customer, or None when they are already stored for its email.
+    """
+    email_ngrams = get_email_ngrams(customer["email"])
+    if customer.get("email_ngrams") == email_ngrams:
+        return None
+    return {"email_ngrams": email_ngrams}
+
+
+def migrate_customers(customers: "Collection", batch_size: int) -> int:  # pragma: no cover
+    """
+    Stores the email_ngrams of the customers without them and returns the amount of updated customers.
+    """
+    from pymongo import UpdateOne
+
+    documents = customers.find(
+        {"email_ngrams": {"$exists": False}}, projection={"email": True, "email_ngrams": True}
+    ).batch_size(batch_size)
+    updated_customers = 0
+    operations = []
+    for customer in documents:
+        update = get_email_ngrams_update(customer)
+        if update is None:
+            continue
+        # The email is part of the filter, so the n-grams of an email changed since it was read are not overwritten
+        operations.append(UpdateOne({"_id": customer["_id"], "email": customer["email"]}, {"$set": update}))
+        if len(operations) == batch_size:
+            updated_customers += customers.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated_customers += customers.bulk_write(operations, ordered=False).modified_count
+    return updated_customers
+
+
+if __name__ == '__main__':  # pragma: no cover
+    from db import get_mongodb
+
+    parser = argparse.ArgumentParser(description="Backfill the email_ngrams of the MongoDB customers.")
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help="The amount of customers read and updated at a time")
+    args = parser.parse_args()
+
+    start_time = datetime.now()
+    print(f"MIGRATE_MONGODB_EMAIL_NGRAMS: {start_time}: Starting MongoDB email n-gram backfill")
+    with get_mongodb() as database:
+        customers_collection = database.get_collection("customers")
+        updated = migrate_customers(customers_collection, args.batch_size)
+        print(f"Stored the email n-grams of {updated} customers")
+        customers_collection.create_index("email_ngrams")
+    duration = (datetime.now() - start_time).total_seconds()
+    print(f"Successfully backfilled the MongoDB email n-grams, it took {duration} seconds.")
@@ -0,0 +1,250 @@
+"""
+Converts the CHAR(36) UUID keys of the MySQL schema to BINARY(16), see MYSQL_UUID_STORAGE in app/core/config.py.
+
+The migration runs in two phases:
+    python scripts/migrate_mysql_binary_uuids.py --phase=backfill --batch-size=5000
+    python scripts/migrate_mysql_binary_uuids.py --phase=cutover
+The backfill runs while the API keeps serving requests. It adds a BINARY(16) shadow column next to every UUID column,
+keeps it up to date with triggers and fills the existing rows in primary key order, one short transaction per batch.
+The cutover swaps the shadow columns in and rebuilds the keys, foreign keys and routines. It rebuilds every table,
+so the API must be stopped while it runs, and started again with MYSQL_UUID_STORAGE=binary afterwards.
+The binary UUIDs keep the byte order of the strings, UUID_TO_BIN without the swap flag, like the UUIDString type.
+"""
+import os
+import re
+import sys
+import argparse
+from datetime import datetime
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from db import get_engine
+
+SHADOW_COLUMN_SUFFIX = "_bin"
+UUID_TYPE_PATTERN = re.compile(r"\b(VAR)?CHAR\(36\)", flags=re.IGNORECASE)
+
+
+def get_shadow_column(column: str) -> str:
+    return f"{column}{SHADOW_COLUMN_SUFFIX}"
+
+
+def get_trigger_name(table: str, event: str) -> str:
+    return f"{table}_uuid_bin_BEFORE_{event}"
+
+
+def get_row_comparison(columns: Sequence[str], operator: str, prefix: str) -> str:
+    """
+    Compares the row of the columns with a row of bound parameters, e.g. (`a`, `b`) > (:after_0, :after_1).
+    """
+    row = ", ".join(f"`{column}`" for column in columns)
+    parameters = ", ".join(f":{prefix}_{index}" for index in range(len(columns)))
+    return f"({row}) {operator} ({parameters})"
+
+
+def get_row_parameters(row: Sequence[Any], prefix: str) -> Dict[str, Any]:
+    return {f"{prefix}_{index}": value for index, value in enumerate(row)}
+
+
+def get_index_definition(index_name: str, is_unique: bool, columns: Sequence[str]) -> str:
+    column_list = ", ".join(f"`{column}`" for column in columns)
+    if index_name == "PRIMARY":
+        return f"ADD PRIMARY KEY ({column_list})"
+    return f"ADD {'UNIQUE ' if is_unique else ''}KEY `{index_name}` ({column_list})"
+
+
+def as_binary_uuid_routine(create_routine: str) -> str:
+    """
+    Changes the CHAR(36) and VARCHAR(36) parameters of a routine definition to BINARY(16).
+    """
+    return UUID_TYPE_PATTERN.sub("BINARY(16)", create_routine)
+
+
+def get_uuid_columns(connection: Connection) -> Dict[str, List[str]]:  # pragma: no cover
+    uuid_columns = defaultdict(list)
+    result = connection.execute(text(
+        """
+        SELECT uuid_column.TABLE_NAME, uuid_column.COLUMN_NAME
+        FROM information_schema.COLUMNS AS uuid_column
+        JOIN information_schema.TABLES AS uuid_table
+          ON uuid_table.TABLE_SCHEMA = uuid_column.TABLE_SCHEMA AND uuid_table.TABLE_NAME = uuid_column.TABLE_NAME
+        WHERE uuid_column.TABLE_SCHEMA = DATABASE()
+          AND uuid_table.TABLE_TYPE = 'BASE TABLE'
+          AND uuid_column.DATA_TYPE = 'char' AND uuid_column.CHARACTER_MAXIMUM_LENGTH = 36
+        ORDER BY uuid_column.TABLE_NAME, uuid_column.ORDINAL_POSITION
+        """
+    ))
+    for table, column in result:
+        uuid_columns[table].append(column)
+    return dict(uuid_columns)
+
+
+def get_indexes(connection: Connection, table: str) -> Dict[str, Tuple[bool, List[str]]]:  # pragma: no cover
+    indexes: Dict[str, Tuple[bool, List[str]]] = {}
+    result = connection.execute(text(
+        """
+        SELECT INDEX_NAME, NON_UNIQUE, COLUMN_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_TYPE = 'BTREE'
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+        """
+    ), {"table": table})
+    for index_name, non_unique, column in result:
+        indexes.setdefault(index_name, (not non_unique, []))[1].append(column)
+    return indexes
+
+
+def get_foreign_keys(connection: Connection) -> List[dict]:  # pragma: no cover
+    foreign_keys: Dict[Tuple[str, str], dict] = {}
+    result = connection.execute(text(
+        """
+        SELECT constraint_usage.TABLE_NAME, constraint_usage.CONSTRAINT_NAME, constraint_usage.COLUMN_NAME,
+               constraint_usage.REFERENCED_TABLE_NAME, constraint_usage.REFERENCED_COLUMN_NAME,
+               referential.DELETE_RULE, referential.UPDATE_RULE
+        FROM information_schema.KEY_COLUMN_USAGE AS constraint_usage
+        JOIN information_schema.REFERENTIAL_CONSTRAINTS AS referential
+          ON referential.CONSTRAINT_SCHEMA = constraint_usage.CONSTRAINT_SCHEMA
+         AND referential.CONSTRAINT_NAME = constraint_usage.CONSTRAINT_NAME
+        WHERE constraint_usage.TABLE_SCHEMA = DATABASE()
+        ORDER BY constraint_usage.TABLE_NAME, constraint_usage.CONSTRAINT_NAME, constraint_usage.ORDINAL_POSITION
+        """
+    ))
+    for table, name, column, referenced_table, referenced_column, delete_rule, update_rule in result:
+        foreign_key = foreign_keys.setdefault((table, name), {
+            "table": table, "name": name, "columns": [], "referenced_table": referenced_table,
+            "referenced_columns": [], "delete_rule": delete_rule, "update_rule": update_rule
+        })
+        foreign_key["columns"].append(column)
+        foreign_key["referenced_columns"].append(referenced_column)
+    return list(foreign_keys.values())
+
+
+def backfill_table(connection: Connection, table: str, columns: List[str], batch_size: int) -> int:  # pragma: no cover
+    """
+    Adds and fills the shadow columns of the table and returns the amount of backfilled rows.
+    """
+    existing_columns = {row[0] for row in connection.execute(text(f"SHOW COLUMNS FROM `{table}`"))}
+    missing_shadow_columns = [column for column in columns if get_shadow_column(column) not in existing_columns]
+    if missing_shadow_columns:
+        connection.execute(text(f"ALTER TABLE `{table}` " + ", ".join(
+            f"ADD COLUMN `{get_shadow_column(column)}` BINARY(16) NULL" for column in missing_shadow_columns
+        )))
+
+    # The rows written during the backfill get their shadow columns from the triggers
+    assignments = ", ".join(f"NEW.`{get_shadow_column(column)}` = UUID_TO_BIN(NEW.`{column}`)" for column in columns)
+    for event in ("INSERT", "UPDATE"):
+        connection.execute(text(f"DROP TRIGGER IF EXISTS `{get_trigger_name(table, event)}`"))
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER `{get_trigger_name(table, event)}` BEFORE {event} ON `{table}` "
+            f"FOR EACH ROW SET {assignments}"
+        )
+
+    primary_key = get_indexes(connection, table)["PRIMARY"][1]
+    key_list = ", ".join(f"`{column}`" for column in primary_key)
+    updates = ", ".join(f"`{get_shadow_column(column)}` = UUID_TO_BIN(`{column}`)" for column in columns)
+    backfilled_rows = 0
+    after = None
+    while True:
+        after_filter = f"WHERE {get_row_comparison(primary_key, '>', 'after')}" if after is not None else ""
+        after_parameters = get_row_parameters(after, "after") if after is not None else {}
+        batch_keys = connection.execute(text(
+            f"SELECT {key_list} FROM `{table}` {after_filter} ORDER BY {key_list} LIMIT :limit"
+        ), {**after_parameters, "limit": batch_size}).fetchall()
+        if not batch_keys:
+            break
+        last = tuple(batch_keys[-1])
+        batch_filter = get_row_comparison(primary_key, "<=", "last")
+        if after is not None:
+            batch_filter += f" AND {get_row_comparison(primary_key, '>', 'after')}"
+        connection.execute(
+            text(f"UPDATE `{table}` SET {updates} WHERE {batch_filter}"),
+            {**after_parameters, **get_row_parameters(last, "last")}
+        )
+        connection.commit()
+        backfilled_rows += len(batch_keys)
+        after = last
+    return backfilled_rows
+
+
+def cutover(connection: Connection, uuid_columns: Dict[str, List[str]]):  # pragma: no cover
+    """
+    Replaces the UUID columns with their shadow columns, rebuilding the indexes, foreign keys and routines using them.
+    """
+    foreign_keys = [
+        foreign_key for foreign_key in get_foreign_keys(connection)
+        if set(foreign_key["columns"]) & set(uuid_columns.get(foreign_key["table"], []))
+    ]
+    connection.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
+    for foreign_key in foreign_keys:
+        connection.execute(text(f"ALTER TABLE `{foreign_key['table']}` DROP FOREIGN KEY `{foreign_key['name']}`"))
+
+    for table, columns in uuid_columns.items():
+        for event in ("INSERT", "UPDATE"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS `{get_trigger_name(table, event)}`"))
+        uuid_indexes = {
+            index_name: index for index_name, index in get_indexes(connection, table).items()
+            if set(index[1]) & set(columns)
+        }
+        alterations = [
+            "DROP PRIMARY KEY" if index_name == "PRIMARY" else f"DROP INDEX `{index_name}`"
+            for index_name in uuid_indexes
+        ]
+        # The triggers are gone, so the rows missed by the backfill, if any, are converted in the same rebuild
+        connection.execute(text(f"UPDATE `{table}` SET " + ", ".join(
+            f"`{get_shadow_column(column)}` = UUID_TO_BIN(`{column}`)" for column in columns
+        ) + " WHERE " + " OR ".join(f"`{get_shadow_column(column)}` IS NULL" for column in columns)))
+        for column in columns:
+            alterations += [
+                f"DROP COLUMN `{column}`",
+                f"CHANGE COLUMN `{get_shadow_column(column)}` `{column}` BINARY(16) NOT NULL"
+            ]
+        alterations += [
+            get_index_definition(index_name, is_unique, index_columns)
+            for index_name, (is_unique, index_columns) in uuid_indexes.items()
+        ]
+        connection.execute(text(f"ALTER TABLE `{table}` " + ", ".join(alterations)))
+
+    for foreign_key in foreign_keys:
+        connection.execute(text(
+            f"ALTER TABLE `{foreign_key['table']}` ADD CONSTRAINT `{foreign_key['name']}` "
+            f"FOREIGN KEY ({', '.join(f'`{column}`' for column in foreign_key['columns'])}) "
+            f"REFERENCES `{foreign_key['referenced_table']}` "
+            f"({', '.join(f'`{column}`' for column in foreign_key['referenced_columns'])}) "
+            f"ON DELETE {foreign_key['delete_rule']} ON UPDATE {foreign_key['update_rule']}"
+        ))
+    connection.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
+
+    routines = connection.execute(text(
+        "SELECT ROUTINE_TYPE, ROUTINE_NAME FROM information_schema.ROUTINES WHERE ROUTINE_SCHEMA = DATABASE()"
+    )).fetchall()
+    for routine_type, routine_name in routines:
+        create_routine = connection.exec_driver_sql(f"SHOW CREATE {routine_type} `{routine_name}`").fetchone()[2]
+        if UUID_TYPE_PATTERN.search(create_routine):
+            connection.exec_driver_sql(f"DROP {routine_type} `{routine_name}`")
+            connection.exec_driver_sql(as_binary_uuid_routine(create_routine))
+    connection.commit()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Convert the CHAR(36) UUID keys of the MySQL schema to BINARY(16).")
+    parser.add_argument('--phase', choices=("backfill", "cutover"), required=True,
+                        help="Fill the shadow columns online, or swap them in while the API is stopped")
+    parser.add_argument('--batch-size', type=int, default=5000, help="The amount of rows backfilled per transaction")
+    parser.add_argument('--test', action='store_true', help="Migrate the test database instead")
+    args = parser.parse_args()
+
+    start_time = datetime.now()
+    print(f"MIGRATE_MYSQL_BINARY_UUIDS: {start_time}: Starting the {args.phase} phase")
+    with get_engine(is_test_engine=args.test).connect() as connection:
+        uuid_columns = get_uuid_columns(connection)
+        if args.phase == "backfill":
+            for table_name, table_columns in uuid_columns.items():
+                backfilled = backfill_table(connection, table_name, table_columns, args.batch_size)
+                print(f"Backfilled {backfilled} rows of {table_name}")
+        else:
+            cutover(connection, uuid_columns)
+            print(f"Converted the UUID keys of {', '.join(uuid_columns)}, start the API with MYSQL_UUID_STORAGE=binary")
+    duration = (datetime.now() - start_time).total_seconds()
+    print(f"Successfully finished the {args.phase} phase, it took {duration} seconds.")
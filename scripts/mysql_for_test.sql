@@ -43,6 +43,49 @@ INSERT INTO `accessories` VALUES ('0d61b4ee-2c27-400c-9ff5-38123284626c','Air Co
 /*!40000 ALTER TABLE `accessories` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `archived_cars`
+--
+
+DROP TABLE IF EXISTS `archived_cars`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `archived_cars` (
+  `id` char(36) NOT NULL,
+  `archive_month` date NOT NULL,
+  `customers_id` char(36) NOT NULL,
+  `purchase_deadline` date NOT NULL,
+  `archived_at` datetime NOT NULL,
+  `snapshot` json NOT NULL,
+  PRIMARY KEY (`id`,`archive_month`),
+  KEY `archived_cars_customers_id_idx` (`customers_id`,`archive_month`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+/*!50500 PARTITION BY RANGE  COLUMNS(archive_month)
+(PARTITION p_future VALUES LESS THAN (MAXVALUE) ENGINE = InnoDB) */;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `archived_purchases`
+--
+
+DROP TABLE IF EXISTS `archived_purchases`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `archived_purchases` (
+  `id` char(36) NOT NULL,
+  `archive_month` date NOT NULL,
+  `cars_id` char(36) NOT NULL,
+  `customers_id` char(36) NOT NULL,
+  `date_of_purchase` date NOT NULL,
+  `archived_at` datetime NOT NULL,
+  `snapshot` json NOT NULL,
+  PRIMARY KEY (`id`,`archive_month`),
+  KEY `archived_purchases_customers_id_idx` (`customers_id`,`archive_month`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+/*!50500 PARTITION BY RANGE  COLUMNS(archive_month)
+(PARTITION p_future VALUES LESS THAN (MAXVALUE) ENGINE = InnoDB) */;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `brands`
 --
@@ -105,6 +148,7 @@ CREATE TABLE `cars` (
   KEY `fk_cars_colors1_idx` (`colors_id`),
   KEY `fk_cars_customers1_idx` (`customers_id`),
   KEY `fk_cars_sales_people1_idx` (`sales_people_id`),
+  KEY `cars_purchase_deadline_idx` (`purchase_deadline`,`id`),
   CONSTRAINT `fk_cars_colors1` FOREIGN KEY (`colors_id`) REFERENCES `colors` (`id`),
   CONSTRAINT `fk_cars_customers1` FOREIGN KEY (`customers_id`) REFERENCES `customers` (`id`) ON DELETE CASCADE,
   CONSTRAINT `fk_cars_models1` FOREIGN KEY (`models_id`) REFERENCES `models` (`id`),
@@ -182,6 +226,23 @@ INSERT INTO `cars_has_insurances` VALUES ('0be86135-c58f-43b6-a369-a3c5445b9948'
 /*!40000 ALTER TABLE `cars_has_insurances` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `change_events`
+--
+
+DROP TABLE IF EXISTS `change_events`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `change_events` (
+  `id` bigint NOT NULL AUTO_INCREMENT,
+  `aggregate` varchar(20) NOT NULL,
+  `aggregate_id` char(36) NOT NULL,
+  `operation` varchar(10) NOT NULL,
+  `created_at` datetime NOT NULL,
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `colors`
 --
@@ -218,6 +279,8 @@ UNLOCK TABLES;
 DROP TABLE IF EXISTS `customers`;
 /*!40101 SET @saved_cs_client     = @@character_set_client */;
 /*!50503 SET character_set_client = utf8mb4 */;
+-- The ngram parser skips every n-gram containing a stopword, so the email index is built without stopwords
+SET SESSION innodb_ft_enable_stopword = OFF;
 CREATE TABLE `customers` (
   `id` char(36) NOT NULL,
   `email` varchar(100) NOT NULL,
@@ -226,7 +289,8 @@ CREATE TABLE `customers` (
   `last_name` varchar(45) NOT NULL,
   `address` varchar(255) DEFAULT NULL,
   PRIMARY KEY (`id`),
-  UNIQUE KEY `customer_email_UNIQUE` (`email`)
+  UNIQUE KEY `customer_email_UNIQUE` (`email`),
+  FULLTEXT KEY `customer_email_FULLTEXT` (`email`) /*!50100 WITH PARSER `ngram` */ 
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -364,6 +428,7 @@ CREATE TABLE `purchases` (
   PRIMARY KEY (`id`),
   UNIQUE KEY `cars_id_UNIQUE` (`cars_id`),
   KEY `fk_purchases_cars1_idx` (`cars_id`),
+  KEY `purchases_date_of_purchase_idx` (`date_of_purchase`,`id`),
   CONSTRAINT `fk_purchases_cars1` FOREIGN KEY (`cars_id`) REFERENCES `cars` (`id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
@@ -378,6 +443,50 @@ INSERT INTO `purchases` VALUES ('bdfca7c4-e0ad-4618-8766-9bb355371c81','d4c7f1f8
 /*!40000 ALTER TABLE `purchases` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `replication_offsets`
+--
+
+DROP TABLE IF EXISTS `replication_offsets`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `replication_offsets` (
+  `replica` varchar(20) NOT NULL,
+  `last_change_id` bigint NOT NULL DEFAULT '0',
+  `updated_at` datetime NOT NULL,
+  PRIMARY KEY (`replica`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `sales_daily_rollups`
+--
+
+DROP TABLE IF EXISTS `sales_daily_rollups`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `sales_daily_rollups` (
+  `day` date NOT NULL,
+  `brands_id` char(36) NOT NULL,
+  `models_id` char(36) NOT NULL,
+  `colors_id` char(36) NOT NULL,
+  `sales_people_id` char(36) NOT NULL,
+  `units` int NOT NULL DEFAULT '0',
+  `revenue` double NOT NULL DEFAULT '0',
+  PRIMARY KEY (`day`,`brands_id`,`models_id`,`colors_id`,`sales_people_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `sales_daily_rollups`
+--
+
+LOCK TABLES `sales_daily_rollups` WRITE;
+/*!40000 ALTER TABLE `sales_daily_rollups` DISABLE KEYS */;
+INSERT INTO `sales_daily_rollups` VALUES ('2024-11-04','fff14a06-dc2a-447d-a707-9c03fe00c7a0','d4bd413c-00d8-45ce-be0e-1d1333ac5e75','7bb35b1d-37ff-43c2-988a-cf85c5b6d690','f9097a97-eca4-49b6-85a0-08423789c320',1,10530.8);
+/*!40000 ALTER TABLE `sales_daily_rollups` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `sales_people`
 --
@@ -1,6 +1,7 @@
 // Create the `Customer` nodes;
 CREATE CONSTRAINT FOR (c:Customer) REQUIRE c.id IS UNIQUE;
 CREATE CONSTRAINT FOR (c:Customer) REQUIRE c.email IS UNIQUE;
+CREATE TEXT INDEX customer_email_text IF NOT EXISTS FOR (c:Customer) ON (c.email);
 
 // Insert data into the `Customer` nodes;
 CREATE (c1:Customer {id:'0ac1d668-55aa-46a1-898a-8fa61457facb', email: 'henrik@gmail.com', phone_number:'10203040', first_name:'Henrik', last_name:'Henriksen', address:'Randomgade nr. 10 4. tv.'});
@@ -330,6 +331,7 @@ CREATE (m25)- [:HAS_COLOR] - >(c4), (m25)- [:HAS_COLOR] - >(c5);
 
 // Create the `Car` nodes;
 CREATE CONSTRAINT FOR (car:Car) REQUIRE car.id IS UNIQUE;
+CREATE INDEX car_purchase_deadline IF NOT EXISTS FOR (car:Car) ON (car.purchase_deadline);
 
 // Create the 1st `Car` node and relationships to `Model`, `Color`, `Customer`, `SalesPerson`, `Accessory`, and `Insurance` nodes;
 CREATE (car1:Car {id:'0be86135-c58f-43b6-a369-a3c5445b9948', purchase_deadline: date('2024-12-07'), total_price:10530.8})
@@ -1,4 +1,5 @@
 import os
+import re
 import subprocess
 from datetime import datetime
 from dotenv import load_dotenv
@@ -12,7 +13,23 @@ username = os.getenv('DB_USER')
 password = os.getenv('DB_PASSWORD')
 port = os.getenv('DB_PORT')
 
-def restore(filepath: str):
+def get_dump_database_name(dump: str) -> str:
+    """
+    Returns the name of the database the dump creates and uses.
+    """
+    match = re.search(r"^USE `([^`]+)`;", dump, flags=re.MULTILINE)
+    if match is None:
+        raise ValueError("The dump does not select a database with a USE statement")
+    return match.group(1)
+
+def retarget_dump(dump: str, database_name: str) -> str:
+    """
+    Rewrites the dump to create and use the given database instead,
+    so the same dump can be restored into several schemas side by side.
+    """
+    return dump.replace(f"`{get_dump_database_name(dump)}`", f"`{database_name}`")
+
+def restore(filepath: str, database_name: str = None):
     if host is None or username is None or password is None:
         return logging.error("DB_HOST, DB_USER, or DB_PASSWORD is not set in the .env file")
     if filepath is None:
@@ -32,11 +49,15 @@ def restore(filepath: str):
         if port: mysql_command.append(f'--port={port}')
         else: mysql_command.append(f'--port=3306')
         
-        # Run the restore command
         with open(filepath, 'r') as dump_file:
-            print(f"Restoring dump from: {filepath}")
-            print(f"Command: {' '.join(mysql_command)}")
-            result = subprocess.run(mysql_command, stdin=dump_file, stderr=subprocess.PIPE, text=True)
+            dump = dump_file.read()
+        if database_name is not None:
+            dump = retarget_dump(dump, database_name)
+
+        # Run the restore command
+        print(f"Restoring dump from: {filepath}" + (f" into: {database_name}" if database_name else ""))
+        print(f"Command: {' '.join(mysql_command)}")
+        result = subprocess.run(mysql_command, input=dump, stderr=subprocess.PIPE, text=True)
             
         # Check if the restore was successful
         if result.returncode != 0:
@@ -51,7 +72,8 @@ def restore(filepath: str):
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Run the restore function with a specified directory.")
     parser.add_argument('--filepath', type=str, required=True, help="The file path to the dump file to restore")  
-    
+    parser.add_argument('--database', type=str, default=None, help="Restore the dump into this database instead")
+
     args = parser.parse_args()
 
-    restore(args.filepath)
\ No newline at end of file
+    restore(args.filepath, database_name=args.database)
\ No newline at end of file
@@ -1,9 +1,13 @@
 import json
 import os
+import sys
 from dotenv import load_dotenv
 from datetime import datetime, date, timedelta
 from pymongo import MongoClient, UpdateOne, IndexModel
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from db import as_mongodb_datetime, PURCHASABLE_SEED_CAR_ID, PURCHASABLE_SEED_CAR_DEADLINE_DAYS
+from app.models.customer import get_email_ngrams
 
 load_dotenv()
 
@@ -20,7 +24,8 @@ collections = [
     'brands',
     'models',
     'cars',
-    'purchases'
+    'purchases',
+    'sales_daily_rollups'
 ]
 
 
@@ -42,13 +47,19 @@ if __name__ == '__main__':
 
     try:
         data = read_json()
-        future_date = date.today() + timedelta(days=30)
-        formatted_date = future_date.strftime("%Y-%m-%d")
-        car_id = "a5503fbb-c388-4789-a10c-d7ae7bdf7408"
+        future_date = date.today() + timedelta(days=PURCHASABLE_SEED_CAR_DEADLINE_DAYS)
+        # The dates are ISO strings in the JSON, but are stored as BSON datetimes
         for car in data['cars']:
-            if car['_id'] == car_id:
-                car['purchase_deadline'] = formatted_date
-                break
+            if car['_id'] == PURCHASABLE_SEED_CAR_ID:
+                car['purchase_deadline'] = future_date.isoformat()
+            car['purchase_deadline'] = as_mongodb_datetime(car['purchase_deadline'])
+        for purchase in data['purchases']:
+            purchase['date_of_purchase'] = as_mongodb_datetime(purchase['date_of_purchase'])
+            purchase['car']['purchase_deadline'] = as_mongodb_datetime(purchase['car']['purchase_deadline'])
+        for rollup in data['sales_daily_rollups']:
+            rollup['day'] = as_mongodb_datetime(rollup['day'])
+        for customer in data['customers']:
+            customer['email_ngrams'] = get_email_ngrams(customer['email'])
 
         client = MongoClient(host=MONGO_DB_HOST, port=int(MONGO_DB_PORT))
         db = client.get_database(MONGO_DB_NAME)
@@ -58,17 +69,39 @@ if __name__ == '__main__':
         db.drop_collection('brands')
         db.create_collection('brands').create_index('name', unique=True)
         db.drop_collection('cars')
-        db.create_collection('cars').create_indexes([IndexModel('customer._id'), IndexModel('sales_person._id')])
+        db.create_collection('cars').create_indexes([
+            IndexModel([('customer._id', 1), ('purchase_deadline', 1)]),
+            IndexModel('sales_person._id'),
+            IndexModel([('purchase_deadline', 1), ('_id', 1)])
+        ])
         db.drop_collection('colors')
         db.create_collection('colors').create_index('name', unique=True)
         db.drop_collection('customers')
-        db.create_collection('customers').create_index('email', unique=True)
+        db.create_collection('customers').create_indexes([IndexModel('email', unique=True), IndexModel('email_ngrams')])
         db.drop_collection('insurances')
         db.create_collection('insurances').create_index('name', unique=True)
         db.drop_collection('models')
         db.create_collection('models').create_indexes([IndexModel('brand._id'), IndexModel('name')])
         db.drop_collection('purchases')
-        db.create_collection('purchases').create_index('car._id', unique=True)
+        db.create_collection('purchases').create_indexes([
+            IndexModel('car._id', unique=True), IndexModel('car.customer._id'),
+            IndexModel([('date_of_purchase', 1), ('_id', 1)])
+        ])
+        # The archive is partitioned by the indexed archive_month, it starts empty
+        for archive_collection_name in ('archived_purchases', 'archived_cars'):
+            db.drop_collection(archive_collection_name)
+            db.create_collection(archive_collection_name).create_indexes([
+                IndexModel([('archive_month', -1), ('_id', 1)]),
+                IndexModel([('customer_id', 1), ('archive_month', -1)])
+            ])
+        db.drop_collection('customer_outbox')
+        db.create_collection('customer_outbox').create_indexes([
+            IndexModel([('processed_at', 1), ('created_at', 1)]),
+            # Processed changes are removed by MongoDB after a day
+            IndexModel('processed_at', expireAfterSeconds=86400)
+        ])
+        db.drop_collection('sales_daily_rollups')
+        db.create_collection('sales_daily_rollups').create_index('day')
         db.drop_collection('sales_people')
         db.create_collection('sales_people').create_index('email', unique=True)
 
@@ -1,21 +1,30 @@
 import main # Import main to ensure all classes are loaded
+import os
 import pytest
 import random
 import string
 from uuid import uuid4
 from datetime import date, timedelta
-from scripts.restore_mysql import restore
-
-from db import get_db
-from app.repositories.color_repositories import MySQLColorRepository
-from app.repositories.customer_repositories import MySQLCustomerRepository
-from app.repositories.accessory_repositories import MySQLAccessoryRepository
-from app.repositories.brand_repositories import MySQLBrandRepository
-from app.repositories.car_repositories import MySQLCarRepository
-from app.repositories.insurance_repository import MySQLInsuranceRepository
-from app.repositories.model_repositories import MySQLModelRepository
-from app.repositories.purchase_repositories import MySQLPurchaseRepository
-from app.repositories.sales_person_repositories import MySQLSalesPersonRepository
+from contextlib import contextmanager
+from scripts.restore_mysql import restore, get_dump_database_name
+
+from db import get_engine, session_local, InMemoryDatabase
+from app.core.tracing import trace_request, trace_observers
+from app.repositories.color_repositories import MySQLColorRepository, InMemoryColorRepository
+from app.repositories.customer_repositories import MySQLCustomerRepository, InMemoryCustomerRepository
+from app.repositories.accessory_repositories import MySQLAccessoryRepository, InMemoryAccessoryRepository
+from app.repositories.brand_repositories import MySQLBrandRepository, InMemoryBrandRepository
+from app.repositories.car_repositories import MySQLCarRepository, InMemoryCarRepository
+from app.repositories.insurance_repository import MySQLInsuranceRepository, InMemoryInsuranceRepository
+from app.repositories.model_repositories import MySQLModelRepository, InMemoryModelRepository
+from app.repositories.purchase_repositories import MySQLPurchaseRepository, InMemoryPurchaseRepository
+from app.repositories.sales_person_repositories import MySQLSalesPersonRepository, InMemorySalesPersonRepository
+from app.repositories.analytics_repositories import MySQLAnalyticsRepository, InMemoryAnalyticsRepository
+from app.repositories.archive_repositories import MySQLArchiveRepository, InMemoryArchiveRepository
+from app.repositories.view_repositories.car_purchase_repositories import (
+    MySQLCarPurchaseRepository,
+    InMemoryCarPurchaseRepository
+)
 
 def valid_email_test_data() -> str:
     domains = ["gmail.com", "hotmail.com", "yahoo.com", "outlook.com"]
@@ -24,9 +33,41 @@ def valid_email_test_data() -> str:
     username = ''.join(random.choices(string.ascii_lowercase + string.digits, k=username_length))
     return f"{username}@{domain}"
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--in-memory",
+        action="store_true",
+        default=False,
+        help="Run the repository fixtures against the in-memory repositories instead of the MySQL test database."
+    )
+
+MYSQL_TEST_DUMP_FILEPATH = "scripts/mysql_for_test.sql"
+
+def is_in_memory(config) -> bool:
+    return config.getoption("--in-memory")
+
+def pytest_configure(config):
+    # When running in parallel with pytest-xdist (pytest -n auto),
+    # every worker restores the test dump into its own schema, e.g. kea_cars_test_gw0,
+    # so the workers never see each other's uncommitted rows or lock waits.
+    worker_id = os.getenv("PYTEST_XDIST_WORKER")
+    if worker_id is None or is_in_memory(config):
+        return
+    with open(MYSQL_TEST_DUMP_FILEPATH, "r") as dump_file:
+        template_database_name = get_dump_database_name(dump_file.read())
+    os.environ["TEST_DB_NAME"] = f"{template_database_name}_{worker_id}"
+
+def create_repository(request, mysql_repository_class, in_memory_repository_class):
+    if is_in_memory(request.config):
+        return in_memory_repository_class(request.getfixturevalue("in_memory_database"))
+    return mysql_repository_class(request.getfixturevalue("session"))
+
 @pytest.fixture(scope="session", autouse=True)
-def setup_once():
-    restore("scripts/mysql_for_test.sql")
+def setup_once(request):
+    if is_in_memory(request.config):
+        return
+    worker_database_name = os.getenv("TEST_DB_NAME") if os.getenv("PYTEST_XDIST_WORKER") else None
+    restore(MYSQL_TEST_DUMP_FILEPATH, database_name=worker_database_name)
 
 @pytest.fixture(scope="function")
 def valid_customer_data() -> dict:
@@ -78,45 +119,132 @@ def valid_car_data() -> dict[str, any]:
 
 
 @pytest.fixture(scope="function")
-def mySQLColorRepository(session):
-    return MySQLColorRepository(session)
+def mySQLColorRepository(request):
+    return create_repository(request, MySQLColorRepository, InMemoryColorRepository)
+
+@pytest.fixture(scope="function")
+def mySQLCustomerRepository(request):
+    return create_repository(request, MySQLCustomerRepository, InMemoryCustomerRepository)
+
+@pytest.fixture(scope="function")
+def mySQLAccessoryRepository(request):
+    return create_repository(request, MySQLAccessoryRepository, InMemoryAccessoryRepository)
+
+@pytest.fixture(scope="function")
+def mySQLBrandRepository(request):
+    return create_repository(request, MySQLBrandRepository, InMemoryBrandRepository)
 
 @pytest.fixture(scope="function")
-def mySQLCustomerRepository(session):
-    return MySQLCustomerRepository(session)
+def mySQLCarRepository(request):
+    return create_repository(request, MySQLCarRepository, InMemoryCarRepository)
 
 @pytest.fixture(scope="function")
-def mySQLAccessoryRepository(session):
-    return MySQLAccessoryRepository(session)
+def mySQLInsuranceRepository(request):
+    return create_repository(request, MySQLInsuranceRepository, InMemoryInsuranceRepository)
 
 @pytest.fixture(scope="function")
-def mySQLBrandRepository(session):
-    return MySQLBrandRepository(session)
+def mySQLModelRepository(request):
+    return create_repository(request, MySQLModelRepository, InMemoryModelRepository)
 
 @pytest.fixture(scope="function")
-def mySQLCarRepository(session):
-    return MySQLCarRepository(session)
+def mySQLPurchaseRepository(request):
+    return create_repository(request, MySQLPurchaseRepository, InMemoryPurchaseRepository)
 
 @pytest.fixture(scope="function")
-def mySQLInsuranceRepository(session):
-    return MySQLInsuranceRepository(session)
+def mySQLSalesPersonRepository(request):
+    return create_repository(request, MySQLSalesPersonRepository, InMemorySalesPersonRepository)
 
 @pytest.fixture(scope="function")
-def mySQLModelRepository(session):
-    return MySQLModelRepository(session)
+def mySQLCarPurchaseRepository(request):
+    return create_repository(request, MySQLCarPurchaseRepository, InMemoryCarPurchaseRepository)
 
 @pytest.fixture(scope="function")
-def mySQLPurchaseRepository(session):
-    return MySQLPurchaseRepository(session)
+def mySQLAnalyticsRepository(request):
+    return create_repository(request, MySQLAnalyticsRepository, InMemoryAnalyticsRepository)
+
+@pytest.fixture(scope="function")
+def mySQLArchiveRepository(request):
+    return create_repository(request, MySQLArchiveRepository, InMemoryArchiveRepository)
+
+@pytest.fixture(scope="function")
+def in_memory_database() -> InMemoryDatabase:
+    return InMemoryDatabase.from_seed_file()
+
+@pytest.fixture(scope="function")
+def run_as_request(request):
+    """
+    Runs the target like a request would, with repositories of its own session that is committed at the end,
+    so concurrency tests can run it in several threads at once.
+    The target gets a create_repository(mysql_repository_class, in_memory_repository_class) to make its repositories.
+    Against MySQL the commits are real, so the test database is restored afterwards.
+
+    Usage:
+        run_as_request(lambda create_repository: customers_service.create(
+            create_repository(MySQLCustomerRepository, InMemoryCustomerRepository), customer_create_data
+        ))
+    """
+    if is_in_memory(request.config):
+        database = request.getfixturevalue("in_memory_database")
+        yield lambda target: target(lambda mysql_repository_class, in_memory_repository_class:
+                                    in_memory_repository_class(database))
+        return
+
+    def _run_as_request(target):
+        session = session_local(bind=get_engine(is_test_engine=True))
+        try:
+            result = target(lambda mysql_repository_class, in_memory_repository_class: mysql_repository_class(session))
+            session.commit()
+            return result
+        finally:
+            session.close()
+    try:
+        yield _run_as_request
+    finally:
+        worker_database_name = os.getenv("TEST_DB_NAME") if os.getenv("PYTEST_XDIST_WORKER") else None
+        restore(MYSQL_TEST_DUMP_FILEPATH, database_name=worker_database_name)
+
+@pytest.fixture(scope="session")
+def connection():
+    with get_engine(is_test_engine=True).connect() as connection:
+        yield connection
 
 @pytest.fixture(scope="function")
-def mySQLSalesPersonRepository(session):
-    return MySQLSalesPersonRepository(session)
+def session(connection):
+    """
+    Runs each test inside a transaction on the shared connection, which is rolled back afterwards.
+    The session joins it with savepoints, so commits and rollbacks made by the code under test
+    only release or roll back a savepoint, and the test database is left as restored.
+    """
+    transaction = connection.begin()
+    session = session_local(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
 
 @pytest.fixture(scope="function")
-def session():
-    with get_db(is_test_db=True) as session:
+def assert_max_queries():
+    """
+    Asserts that no request traced inside the block executes more than max_queries statements.
+    Both direct repository calls and requests made through a TestClient are traced.
+
+    Usage:
+        with assert_max_queries(3):
+            client.get("/mysql/cars")
+    """
+    @contextmanager
+    def _assert_max_queries(max_queries: int, backend: str = None):
+        request_traces = []
+        trace_observers.append(request_traces.append)
         try:
-            yield session
+            with trace_request() as trace:
+                yield trace
         finally:
-            session.rollback()
+            trace_observers.remove(request_traces.append)
+        for request_trace in [trace, *request_traces]:
+            query_count = request_trace.count(backend)
+            assert query_count <= max_queries, \
+                f"Expected at most {max_queries} statements, but {query_count} were executed: " \
+                f"{request_trace.as_dict()}"
+    return _assert_max_queries
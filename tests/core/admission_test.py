@@ -0,0 +1,86 @@
+import httpx
+import pytest
+import asyncio
+from fastapi import FastAPI
+from app.core.metrics import MetricsRegistry
+from app.core.admission import AdmissionControlMiddleware, parse_admission_limits
+
+
+def create_app(registry: MetricsRegistry, release_event: asyncio.Event, queue_timeout_seconds: float = 5) -> FastAPI:
+    test_app = FastAPI()
+    test_app.add_middleware(
+        AdmissionControlMiddleware,
+        limits={"/neo4j": (1, 1), "/neo4j/analytics": (1, 0)},
+        queue_timeout_seconds=queue_timeout_seconds,
+        retry_after_seconds=3,
+        registry=registry
+    )
+
+    @test_app.get("/neo4j/customers")
+    async def get_customers():
+        await release_event.wait()
+        return []
+
+    @test_app.get("/neo4j/analytics/sales")
+    async def get_sales():
+        return []
+
+    @test_app.get("/mysql/cars")
+    async def get_cars():
+        return []
+
+    return test_app
+
+
+def test_parse_admission_limits():
+    assert parse_admission_limits("/mysql=16:32, /neo4j/=8:0,") == {"/mysql": (16, 32), "/neo4j": (8, 0)}
+    with pytest.raises(ValueError, match="Invalid admission limit '/mysql=16', expected prefix=concurrency:queue"):
+        parse_admission_limits("/mysql=16")
+    with pytest.raises(ValueError, match="the concurrency must be at least 1"):
+        parse_admission_limits("/mysql=0:10")
+
+def test_over_capacity_requests_are_shed_per_route_group():
+    registry = MetricsRegistry()
+
+    async def run():
+        release_event = asyncio.Event()
+        transport = httpx.ASGITransport(app=create_app(registry, release_event))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            in_flight = asyncio.create_task(client.get("/neo4j/customers"))
+            await asyncio.sleep(0.05)
+            queued = asyncio.create_task(client.get("/neo4j/customers"))
+            await asyncio.sleep(0.05)
+            assert "kea_admission_queued_requests{group=\"/neo4j\"} 1" in registry.render()
+            shed = await client.get("/neo4j/customers")
+            # The other route groups are served while /neo4j is over capacity
+            other_backend = await client.get("/mysql/cars")
+            other_group = await client.get("/neo4j/analytics/sales")
+            release_event.set()
+            return shed, other_backend, other_group, await in_flight, await queued
+
+    shed, other_backend, other_group, in_flight, queued = asyncio.run(run())
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "3"
+    assert shed.json() == {"detail": "The /neo4j routes are over capacity, retry after 3 seconds"}
+    assert [other_backend.status_code, other_group.status_code, in_flight.status_code, queued.status_code] == [200] * 4
+    metrics = registry.render()
+    assert "kea_admission_shed_requests_total{group=\"/neo4j\",reason=\"queue_full\"} 1" in metrics
+    assert "kea_admission_in_flight_requests{group=\"/neo4j\"} 0" in metrics
+    assert "kea_admission_queued_requests{group=\"/neo4j\"} 0" in metrics
+
+def test_queued_requests_are_shed_after_the_queue_timeout():
+    registry = MetricsRegistry()
+
+    async def run():
+        release_event = asyncio.Event()
+        transport = httpx.ASGITransport(app=create_app(registry, release_event, queue_timeout_seconds=0.05))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            in_flight = asyncio.create_task(client.get("/neo4j/customers"))
+            await asyncio.sleep(0.05)
+            timed_out = await client.get("/neo4j/customers")
+            release_event.set()
+            await in_flight
+            return timed_out
+
+    assert asyncio.run(run()).status_code == 503
+    assert "kea_admission_shed_requests_total{group=\"/neo4j\",reason=\"queue_timeout\"} 1" in registry.render()
@@ -0,0 +1,112 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from app.core.caching import (
+    CATALOG_CACHE_POLICY,
+    ConditionalGetMiddleware,
+    ETagCache,
+    compute_etag,
+    etag_matches,
+    get_cache_policy
+)
+
+
+@pytest.fixture(scope="function")
+def endpoint_calls() -> dict:
+    return {"brands": 0, "car": 0}
+
+@pytest.fixture(scope="function")
+def client(endpoint_calls: dict) -> TestClient:
+    test_app = FastAPI()
+    test_app.add_middleware(ConditionalGetMiddleware, cache=ETagCache())
+    car = {"id": "1", "is_purchased": False}
+
+    @test_app.get("/mysql/brands")
+    async def get_brands():
+        endpoint_calls["brands"] += 1
+        return [{"name": "Audi"}]
+
+    @test_app.get("/mongodb/car/{car_id}")
+    async def get_car(car_id: str):
+        endpoint_calls["car"] += 1
+        if car_id != car["id"]:
+            raise HTTPException(status_code=404, detail="Car not found")
+        return car
+
+    @test_app.post("/mongodb/purchase")
+    async def create_purchase():
+        car["is_purchased"] = True
+        return car
+
+    @test_app.get("/mysql/customers")
+    async def get_customers():
+        return []
+
+    return TestClient(test_app)
+
+
+def test_get_cache_policy_matches_all_backends():
+    assert get_cache_policy("/neo4j/models") is CATALOG_CACHE_POLICY
+    assert get_cache_policy("/mongodb/accessory/123") is CATALOG_CACHE_POLICY
+    assert get_cache_policy("/mysql/car/123").cache_control == "private, no-cache"
+    assert get_cache_policy("/mysql/customers") is None
+    assert get_cache_policy("/mysql/car/123/extra") is None
+
+def test_etag_matches_uses_weak_comparison():
+    etag = compute_etag(b"body")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+
+def test_catalog_response_has_etag_and_cache_control(client: TestClient):
+    response = client.get("/mysql/brands")
+    assert response.status_code == 200
+    assert response.headers["etag"] == compute_etag(response.content)
+    assert response.headers["cache-control"] == CATALOG_CACHE_POLICY.cache_control
+
+def test_catalog_not_modified_does_not_call_the_endpoint(client: TestClient, endpoint_calls: dict):
+    etag = client.get("/mysql/brands").headers["etag"]
+
+    response = client.get("/mysql/brands", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert endpoint_calls["brands"] == 1
+
+def test_catalog_etags_are_cached_per_query_string(client: TestClient, endpoint_calls: dict):
+    etag = client.get("/mysql/brands").headers["etag"]
+
+    response = client.get("/mysql/brands?limit=1", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert endpoint_calls["brands"] == 2
+
+def test_car_is_revalidated_against_the_endpoint(client: TestClient, endpoint_calls: dict):
+    etag = client.get("/mongodb/car/1").headers["etag"]
+
+    assert client.get("/mongodb/car/1", headers={"If-None-Match": etag}).status_code == 304
+    assert endpoint_calls["car"] == 2
+
+    client.post("/mongodb/purchase")
+    response = client.get("/mongodb/car/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["is_purchased"] is True
+    assert response.headers["etag"] != etag
+    assert response.headers["cache-control"] == "private, no-cache"
+
+def test_errors_and_other_routes_are_not_cached(client: TestClient):
+    not_found_response = client.get("/mongodb/car/2")
+    assert not_found_response.status_code == 404
+    assert "etag" not in not_found_response.headers
+    assert "etag" not in client.get("/mysql/customers").headers
+
+def test_etag_cache_expires_entries():
+    cache = ETagCache(max_entries=1)
+    cache.set("a", '"1"', max_age=0)
+    assert cache.get("a") is None
+    cache.set("a", '"1"', max_age=60)
+    cache.set("b", '"2"', max_age=60)
+    assert cache.get("a") is None
+    assert cache.get("b") == '"2"'
@@ -0,0 +1,79 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app.core.caching import ConditionalGetMiddleware, ETagCache
+from app.core.compression import CompressionMiddleware, parse_accept_encoding, select_encoding
+
+MODELS = [{"id": str(index), "name": "A4", "brand": {"name": "Audi"}} for index in range(200)]
+
+
+@pytest.fixture(scope="function")
+def client() -> TestClient:
+    test_app = FastAPI()
+    test_app.add_middleware(ConditionalGetMiddleware, cache=ETagCache())
+    test_app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @test_app.get("/mysql/models")
+    async def get_models():
+        return MODELS
+
+    @test_app.get("/mysql/brands")
+    async def get_brands():
+        return [{"name": "Audi"}]
+
+    @test_app.get("/stream")
+    async def stream():
+        async def chunks():
+            for index in range(3):
+                yield f"chunk {index}\n".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return TestClient(test_app)
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.5, zstd;q=0") == {"gzip": 1.0, "br": 0.5, "zstd": 0.0}
+
+@pytest.mark.parametrize("accept_encoding, expected_encoding", [
+    ("gzip, deflate, br, zstd", "zstd"),
+    ("gzip, br", "br"),
+    ("gzip;q=1, br;q=0.5", "gzip"),
+    ("zstd;q=0, br;q=0, gzip", "gzip"),
+    ("*", "zstd"),
+    ("identity", None),
+    ("", None),
+])
+def test_select_encoding(accept_encoding, expected_encoding):
+    assert select_encoding(accept_encoding, ["zstd", "br", "gzip"]) == expected_encoding
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_large_responses_are_compressed(client: TestClient, encoding):
+    response = client.get("/mysql/models", headers={"Accept-Encoding": encoding})
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"].startswith('W/"')
+    assert response.json() == MODELS
+    assert int(response.headers["content-length"]) < len(response.text) / 5
+
+def test_small_responses_are_not_compressed(client: TestClient):
+    response = client.get("/mysql/brands", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"].startswith('"')
+
+def test_responses_are_not_compressed_without_accept_encoding(client: TestClient):
+    response = client.get("/mysql/models", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == MODELS
+
+def test_streaming_responses_are_compressed_per_chunk(client: TestClient):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "chunk 0\nchunk 1\nchunk 2\n"
+
+def test_weak_etag_still_matches_if_none_match(client: TestClient):
+    etag = client.get("/mysql/models", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    response = client.get("/mysql/models", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
@@ -0,0 +1,116 @@
+import pytest
+from datetime import date
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from db import InMemoryDatabase
+from app.core.metrics import MetricsRegistry
+from app.core.tracing import TracingMiddleware, trace_observers
+from app.core.identity_cache import IdentityCache, IdentityCacheMiddleware, identity_cache_scope, load
+from app.services import cars_service, purchases_service
+from app.repositories.car_repositories import InMemoryCarRepository
+from app.repositories.customer_repositories import InMemoryCustomerRepository
+from app.repositories.purchase_repositories import InMemoryPurchaseRepository
+from app.repositories.sales_person_repositories import InMemorySalesPersonRepository
+from app.resources.purchase_resource import PurchaseCreateResource
+
+
+CAR_ID = "0be86135-c58f-43b6-a369-a3c5445b9948"
+CUSTOMER_ID = "f159bdaf-bc83-46c3-8a3f-f6b5c93ebbdc"
+
+
+def test_load_caches_entities_and_missing_entities():
+    identity_cache = IdentityCache()
+    loaded_keys = []
+
+    def loader(key):
+        loaded_keys.append(key)
+        return None if key == "missing" else {"id": key}
+
+    for key in ["1", "1", "missing", "missing", "2"]:
+        identity_cache.load("car", key, lambda: loader(key))
+
+    assert loaded_keys == ["1", "missing", "2"]
+    assert identity_cache.as_dict() == {"car": {"hits": 2, "misses": 3}}
+
+def test_evict_a_single_entity_or_every_entity_with_the_name():
+    identity_cache = IdentityCache()
+    for key in ["1", "2"]:
+        identity_cache.store("car", key, {"id": key})
+    identity_cache.store("customer", "1", {"id": "1"})
+
+    identity_cache.evict("car", "1")
+    assert identity_cache.load("car", "1", lambda: "reloaded") == "reloaded"
+    identity_cache.evict("car")
+    assert identity_cache.load("car", "2", lambda: "reloaded") == "reloaded"
+    assert identity_cache.load("customer", "1", lambda: "reloaded") == {"id": "1"}
+
+def test_load_outside_a_request_always_loads():
+    assert [load("car", "1", lambda: index) for index in range(2)] == [0, 1]
+
+
+def test_create_purchase_reuses_the_car_loaded_earlier(in_memory_database: InMemoryDatabase):
+    car_repository = InMemoryCarRepository(in_memory_database)
+    with identity_cache_scope() as identity_cache:
+        car = car_repository.get_by_id(CAR_ID)
+        purchases_service.create(
+            InMemoryPurchaseRepository(in_memory_database),
+            car_repository,
+            PurchaseCreateResource(cars_id=CAR_ID, date_of_purchase=car.purchase_deadline)
+        )
+        assert identity_cache.as_dict()["car"] == {"hits": 1, "misses": 1}
+        assert identity_cache.as_dict()["car_is_purchased"] == {"hits": 0, "misses": 1}
+        # The purchase is not hidden by the car loaded before it
+        assert car_repository.get_by_id(CAR_ID).is_purchased
+
+def test_delete_car_loads_the_car_and_its_purchase_once(in_memory_database: InMemoryDatabase):
+    with identity_cache_scope() as identity_cache:
+        cars_service.delete(
+            InMemoryCarRepository(in_memory_database),
+            InMemoryPurchaseRepository(in_memory_database),
+            CAR_ID,
+            delete_purchase_too=False
+        )
+        assert identity_cache.as_dict()["car_is_purchased"] == {"hits": 1, "misses": 1}
+        assert InMemoryCarRepository(in_memory_database).get_by_id(CAR_ID) is None
+
+def test_get_all_cars_of_a_customer_loads_the_customer_once(in_memory_database: InMemoryDatabase):
+    with identity_cache_scope() as identity_cache:
+        cars = cars_service.get_all(
+            InMemoryCarRepository(in_memory_database),
+            InMemoryCustomerRepository(in_memory_database),
+            InMemorySalesPersonRepository(in_memory_database),
+            customer_id=CUSTOMER_ID
+        )
+        assert identity_cache.as_dict()["customer"] == {"hits": len(cars), "misses": 1}
+
+
+@pytest.fixture(scope="function")
+def registry() -> MetricsRegistry:
+    return MetricsRegistry()
+
+@pytest.fixture(scope="function")
+def client(registry: MetricsRegistry) -> TestClient:
+    test_app = FastAPI()
+    test_app.add_middleware(IdentityCacheMiddleware, registry=registry)
+    test_app.add_middleware(TracingMiddleware)
+
+    @test_app.get("/mysql/car/{car_id}")
+    def get_car(car_id: str):
+        return [load("car", car_id, lambda: {"id": car_id}) for _ in range(3)]
+
+    return TestClient(test_app)
+
+def test_middleware_reports_the_lookups(client: TestClient, registry: MetricsRegistry):
+    request_traces = []
+    trace_observers.append(request_traces.append)
+    try:
+        client.get(f"/mysql/car/{CAR_ID}")
+        client.get(f"/mysql/car/{CAR_ID}")
+    finally:
+        trace_observers.remove(request_traces.append)
+
+    # Every request starts with an empty identity cache
+    assert [trace.identity_cache for trace in request_traces] == [{"car": {"hits": 2, "misses": 1}}] * 2
+    metrics = registry.render()
+    assert 'kea_identity_cache_lookups_total{entity="car",result="hit"} 4' in metrics
+    assert 'kea_identity_cache_lookups_total{entity="car",result="miss"} 2' in metrics
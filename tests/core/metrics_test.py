@@ -0,0 +1,112 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from app.core.metrics import Histogram, MetricsMiddleware, MetricsRegistry, get_backend
+
+
+@pytest.fixture(scope="function")
+def registry() -> MetricsRegistry:
+    return MetricsRegistry()
+
+@pytest.fixture(scope="function")
+def client(registry: MetricsRegistry) -> TestClient:
+    test_app = FastAPI()
+    test_app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @test_app.get("/mysql/car/{car_id}")
+    async def get_car(car_id: str):
+        return {"id": car_id}
+
+    @test_app.get("/mongodb/fail")
+    async def fail():
+        raise HTTPException(status_code=503, detail="Unavailable")
+
+    return TestClient(test_app, raise_server_exceptions=False)
+
+
+backend_data = [
+    ("/mysql/cars", "mysql"),
+    ("/mongodb/car/123", "mongodb"),
+    ("/neo4j/brands", "neo4j"),
+    ("/metrics", "other"),
+    ("/", "other"),
+    ("/mysqlx/cars", "other"),
+]
+
+@pytest.mark.parametrize("path, expected_backend", backend_data)
+def test_get_backend(path, expected_backend):
+    assert get_backend(path) == expected_backend
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.1, 0.2, 0.4))
+    for _ in range(50):
+        histogram.observe(0.05)
+    for _ in range(45):
+        histogram.observe(0.15)
+    for _ in range(5):
+        histogram.observe(0.3)
+
+    assert histogram.count == 100
+    assert histogram.quantile(0.5) == pytest.approx(0.1)
+    assert 0.1 < histogram.quantile(0.95) <= 0.2
+    assert 0.2 < histogram.quantile(0.99) <= 0.4
+
+def test_histogram_quantile_in_infinite_bucket_returns_highest_bound():
+    histogram = Histogram(buckets=(0.1, 0.2))
+    histogram.observe(5.0)
+    assert histogram.quantile(0.99) == 0.2
+
+def test_histogram_quantile_without_observations():
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_middleware_records_route_template_and_status_class(client: TestClient, registry: MetricsRegistry):
+    for car_id in ("a", "b", "c"):
+        assert client.get(f"/mysql/car/{car_id}").status_code == 200
+
+    route_stats = registry.get_route_stats("mysql", "GET", "/mysql/car/{car_id}", "2xx")
+    assert route_stats is not None
+    assert route_stats.requests == 3
+    assert route_stats.errors == 0
+    assert route_stats.latency.count == 3
+
+def test_middleware_counts_errors(client: TestClient, registry: MetricsRegistry):
+    assert client.get("/mongodb/fail").status_code == 503
+
+    route_stats = registry.get_route_stats("mongodb", "GET", "/mongodb/fail", "5xx")
+    assert route_stats.requests == 1
+    assert route_stats.errors == 1
+
+def test_middleware_collapses_unmatched_paths(client: TestClient, registry: MetricsRegistry):
+    client.get("/neo4j/does-not-exist/1")
+    client.get("/neo4j/does-not-exist/2")
+
+    route_stats = registry.get_route_stats("neo4j", "GET", "unmatched", "4xx")
+    assert route_stats.requests == 2
+
+
+def test_render_prometheus_format(client: TestClient, registry: MetricsRegistry):
+    client.get("/mysql/car/a")
+    registry.set_gauge("kea_test_gauge", 3, labels={"queue": "mysql"}, help_text="A test gauge.")
+    registry.inc_counter("kea_test_total", 2)
+
+    output = registry.render()
+
+    labels = 'backend="mysql",method="GET",route="/mysql/car/{car_id}",status_class="2xx"'
+    assert f"kea_http_requests_total{{{labels}}} 1" in output
+    assert f"kea_http_request_errors_total{{{labels}}} 0" in output
+    assert f'kea_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in output
+    assert f"kea_http_request_duration_seconds_count{{{labels}}} 1" in output
+    assert f'kea_http_request_duration_quantile_seconds{{{labels},quantile="0.99"}}' in output
+    assert "# TYPE kea_http_request_duration_seconds histogram" in output
+    assert "# HELP kea_test_gauge A test gauge." in output
+    assert 'kea_test_gauge{queue="mysql"} 3' in output
+    assert "kea_test_total 2" in output
+
+def test_metrics_endpoint():
+    from main import app
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE kea_http_requests_total counter" in response.text
@@ -0,0 +1,223 @@
+import pytest
+from types import SimpleNamespace
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from app.core.tracing import (
+    SLOW_STATEMENT_THRESHOLDS_MS,
+    TracedNeo4jSession,
+    TracingMiddleware,
+    get_command_shape,
+    normalize_statement,
+    record_statement,
+    trace_request
+)
+from app.core.mongodb_tracing import MongoCommandTracer
+
+
+@pytest.fixture(scope="function")
+def sqlite_engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE cars (id INTEGER PRIMARY KEY, name TEXT)"))
+        connection.execute(text("INSERT INTO cars (id, name) VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="function")
+def client(sqlite_engine) -> TestClient:
+    test_app = FastAPI()
+    test_app.add_middleware(TracingMiddleware, n_plus_one_threshold=3)
+
+    @test_app.get("/mysql/cars")
+    def get_cars():
+        with sqlite_engine.connect() as connection:
+            ids = [row.id for row in connection.execute(text("SELECT id FROM cars"))]
+            # Deliberate N+1 query
+            return [
+                connection.execute(text("SELECT name FROM cars WHERE id = :id"), {"id": car_id}).scalar()
+                for car_id in ids
+            ]
+
+    return TestClient(test_app)
+
+
+normalize_statement_data = [
+    ("SELECT * FROM cars WHERE id = %s", "SELECT * FROM cars WHERE id = ?"),
+    ("SELECT * FROM cars WHERE id = :id_1", "SELECT * FROM cars WHERE id = ?"),
+    ("SELECT * FROM cars WHERE id = 'abc'", "SELECT * FROM cars WHERE id = ?"),
+    ("SELECT * FROM cars LIMIT 10", "SELECT * FROM cars LIMIT ?"),
+    ("SELECT * FROM cars WHERE id IN (%s, %s, %s)", "SELECT * FROM cars WHERE id IN (?)"),
+    ("SELECT *\n  FROM   cars", "SELECT * FROM cars"),
+]
+
+@pytest.mark.parametrize("statement, expected_shape", normalize_statement_data)
+def test_normalize_statement(statement, expected_shape):
+    assert normalize_statement(statement) == expected_shape
+
+
+def test_trace_request_counts_statements(sqlite_engine):
+    with trace_request(n_plus_one_threshold=3) as trace:
+        with sqlite_engine.connect() as connection:
+            for car_id in (1, 2, 3):
+                connection.execute(text("SELECT name FROM cars WHERE id = :id"), {"id": car_id})
+            connection.execute(text("SELECT COUNT(*) FROM cars"))
+
+    assert trace.count("sqlite") == 4
+    assert trace.count() == 4
+    assert trace.count("mysql") == 0
+    assert trace.duration("sqlite") > 0
+    assert trace.get_repeated_statements() == {
+        "sqlite": {"SELECT name FROM cars WHERE id = ?": 3}
+    }
+
+def test_statements_outside_trace_are_not_recorded(sqlite_engine):
+    with trace_request() as trace:
+        pass
+    with sqlite_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert trace.count() == 0
+
+def test_failed_statements_do_not_break_timing(sqlite_engine):
+    with trace_request() as trace:
+        with sqlite_engine.connect() as connection:
+            with pytest.raises(Exception):
+                connection.execute(text("SELECT * FROM missing_table"))
+            connection.execute(text("SELECT 1"))
+            assert not connection.info.get("query_start_times")
+    assert trace.count("sqlite") == 1
+
+
+def test_middleware_adds_server_timing_header(client: TestClient):
+    response = client.get("/mysql/cars")
+    assert response.status_code == 200
+    server_timing = response.headers["server-timing"]
+    assert server_timing.startswith("app;dur=")
+    assert 'sqlite;dur=' in server_timing
+    assert 'desc="4 statements"' in server_timing
+
+def test_middleware_logs_n_plus_one(client: TestClient, caplog):
+    with caplog.at_level("INFO", logger="app.core.tracing"):
+        client.get("/mysql/cars")
+    warnings = [record for record in caplog.records if record.levelname == "WARNING"]
+    assert len(warnings) == 1
+    assert '"event": "n_plus_one_detected"' in warnings[0].getMessage()
+    assert '"route": "/mysql/cars"' in warnings[0].getMessage()
+
+def test_assert_max_queries_fixture(client: TestClient, assert_max_queries):
+    with assert_max_queries(4):
+        client.get("/mysql/cars")
+
+    with pytest.raises(AssertionError, match="Expected at most 3 statements, but 4 were executed"):
+        with assert_max_queries(3):
+            client.get("/mysql/cars")
+
+
+def mongo_event(command_name: str, command: dict = None, reply: dict = None, request_id: int = 1):
+    return SimpleNamespace(
+        command_name=command_name,
+        command=command or {},
+        reply=reply or {},
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        duration_micros=1500
+    )
+
+command_shape_data = [
+    ("find", {"find": "cars", "filter": {"customer._id": "1", "is_purchased": True}},
+     "find cars {customer._id, is_purchased}"),
+    ("count", {"count": "purchases", "query": {"car._id": "1"}}, "count purchases {car._id}"),
+    ("update", {"update": "cars", "updates": [{"q": {"_id": "1"}, "u": {}}]}, "update cars {_id}"),
+    ("aggregate", {"aggregate": "cars", "pipeline": [{"$match": {}}, {"$limit": 5}]},
+     "aggregate cars [$match, $limit]"),
+    ("insert", {"insert": "customers", "documents": []}, "insert customers {}"),
+]
+
+@pytest.mark.parametrize("command_name, command, expected_shape", command_shape_data)
+def test_get_command_shape(command_name, command, expected_shape):
+    assert get_command_shape(command_name, command) == expected_shape
+
+def test_mongo_command_tracer_records_commands():
+    tracer = MongoCommandTracer()
+    with trace_request() as trace:
+        for request_id in (1, 2):
+            tracer.started(mongo_event("find", {"find": "cars", "filter": {"_id": request_id}}, request_id=request_id))
+            tracer.succeeded(mongo_event(
+                "find", reply={"cursor": {"firstBatch": [{}, {}]}}, request_id=request_id
+            ))
+        tracer.started(mongo_event("count", {"count": "purchases", "query": {}}, request_id=3))
+        tracer.succeeded(mongo_event("count", reply={"n": 7}, request_id=3))
+        tracer.started(mongo_event("hello", request_id=4))
+        tracer.succeeded(mongo_event("hello", request_id=4))
+
+    assert trace.count("mongodb") == 3
+    assert trace.backends["mongodb"].result_size == 11
+    assert trace.duration("mongodb") == pytest.approx(0.0045)
+    assert trace.backends["mongodb"].shapes["find cars {_id}"] == 2
+
+def test_mongo_command_tracer_records_failed_commands():
+    tracer = MongoCommandTracer()
+    with trace_request() as trace:
+        tracer.started(mongo_event("insert", {"insert": "customers"}))
+        tracer.failed(mongo_event("insert"))
+    assert trace.count("mongodb") == 1
+
+
+class FakeNeo4jResult:
+    def __init__(self, records):
+        self.records = records
+
+    def keys(self):
+        return ["c"]
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def consume(self):
+        return SimpleNamespace(result_available_after=3, result_consumed_after=2)
+
+class FakeNeo4jSession:
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    def run(self, query, parameters=None, **kwargs):
+        self.queries.append((query, parameters, kwargs))
+        return FakeNeo4jResult(self.records)
+
+    def close(self):
+        return "closed"
+
+def test_traced_neo4j_session_records_queries():
+    fake_session = FakeNeo4jSession([{"c": 1}, {"c": 2}])
+    session = TracedNeo4jSession(fake_session)
+    with trace_request() as trace:
+        result = session.run("MATCH (c:Customer {id: $customer_id}) RETURN c", customer_id="1")
+
+    assert [record["c"] for record in result] == [1, 2]
+    assert result.single() == {"c": 1}
+    assert result.keys() == ["c"]
+    assert fake_session.queries == [
+        ("MATCH (c:Customer {id: $customer_id}) RETURN c", None, {"customer_id": "1"})
+    ]
+    assert trace.count("neo4j") == 1
+    assert trace.duration("neo4j") == pytest.approx(0.005)
+    assert trace.backends["neo4j"].result_size == 2
+    assert "MATCH (c:Customer {id: ?}) RETURN c" in trace.backends["neo4j"].shapes
+    assert session.close() == "closed"
+
+def test_traced_neo4j_result_single_without_records():
+    session = TracedNeo4jSession(FakeNeo4jSession([]))
+    assert session.run("MATCH (c:Customer) RETURN c").single() is None
+
+
+def test_slow_statements_are_logged(caplog, monkeypatch):
+    monkeypatch.setitem(SLOW_STATEMENT_THRESHOLDS_MS, "mongodb", 1)
+    with caplog.at_level("WARNING", logger="app.core.tracing"):
+        record_statement("mongodb", "find cars {_id}", 0.002)
+        record_statement("mongodb", "find cars {_id}", 0.0005)
+    assert len(caplog.records) == 1
+    assert '"event": "slow_statement"' in caplog.records[0].getMessage()
@@ -0,0 +1,153 @@
+import pytest
+from threading import Event, Thread
+from uuid import UUID
+from sqlalchemy import create_engine, select, text, Column, Integer, String
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import declarative_base
+from db import UUIDString, NO_ROW_BINARY_UUID, uuid7, MySQLReplicaSet, session_local, is_read_only_statement
+from app.models.car import CarMySQLEntity
+
+
+CAR_ID = "d4c7f1f8-4451-43bc-a827-63216a2ddece"
+
+RoutingBase = declarative_base()
+
+
+class RoutedRow(RoutingBase):
+    __tablename__ = "routed_rows"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(20))
+
+
+def create_schema(name: str):
+    # Every engine has a row named after it, so a read shows which engine it was sent to
+    engine = create_engine("sqlite://")
+    RoutingBase.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(RoutedRow.__table__.insert(), {"id": 1, "name": name})
+    return engine
+
+
+def test_uuid7_is_time_ordered(monkeypatch):
+    monkeypatch.setattr("db.time_ns", lambda: 1_700_000_000_000_000_000)
+    earlier = uuid7()
+    monkeypatch.setattr("db.time_ns", lambda: 1_700_000_000_001_000_000)
+    later = uuid7()
+
+    assert earlier.version == later.version == 7
+    assert earlier.variant == later.variant == "specified in RFC 4122"
+    assert earlier.int >> 80 == 1_700_000_000_000
+    assert earlier < later
+    assert str(earlier) < str(later)
+
+def test_binary_uuid_string_round_trips_the_string_uuids():
+    uuid_type = UUIDString("binary")
+    dialect = mysql.dialect()
+    binary_id = uuid_type.bind_processor(dialect)(CAR_ID)
+
+    assert binary_id == UUID(CAR_ID).bytes
+    assert uuid_type.result_processor(dialect, None)(binary_id) == CAR_ID
+    assert uuid_type.result_processor(dialect, None)(None) is None
+    assert str(uuid_type.load_dialect_impl(dialect).compile(dialect=dialect)) == "BINARY(16)"
+
+@pytest.mark.parametrize("invalid_id", ["invalid_id", "unknown-id", ""])
+def test_binary_uuid_string_binds_the_ids_that_are_not_uuids_to_no_row(invalid_id):
+    bind = UUIDString("binary").bind_processor(mysql.dialect())
+    assert bind(invalid_id) == NO_ROW_BINARY_UUID == bytes(16)
+
+def test_char_uuid_string_keeps_the_string_uuids():
+    uuid_type = UUIDString("char")
+    dialect = mysql.dialect()
+
+    assert uuid_type.bind_processor(dialect)(CAR_ID) == CAR_ID
+    assert uuid_type.result_processor(dialect, None)(CAR_ID) == CAR_ID
+    assert str(uuid_type.load_dialect_impl(dialect).compile(dialect=dialect)) == "VARCHAR(36)"
+
+def test_uuid_columns_bind_through_the_uuid_string_type():
+    statement = select(CarMySQLEntity.id).where(CarMySQLEntity.customers_id == CAR_ID)
+    assert isinstance(statement.whereclause.right.type, UUIDString)
+
+def test_uuid_string_with_unsupported_storage():
+    with pytest.raises(ValueError, match="storage must be one of char, binary, not 'text'."):
+        UUIDString("text")
+
+def test_routing_session_reads_from_the_replicas_until_it_writes():
+    primary, replica = create_schema("primary"), create_schema("replica")
+    session = session_local(bind=primary, replicas=MySQLReplicaSet([replica], get_lag_seconds=lambda engine: 0.0))
+
+    assert session.scalar(select(RoutedRow.name)) == "replica"
+    assert session.execute(text("SELECT name FROM routed_rows")).scalar() == "replica"
+    session.add(RoutedRow(id=2, name="written"))
+    session.flush()
+    assert session.scalars(select(RoutedRow.name).order_by(RoutedRow.id)).all() == ["primary", "written"]
+    session.close()
+
+    locking_session = session_local(bind=primary, replicas=MySQLReplicaSet([replica], get_lag_seconds=lambda engine: 0.0))
+    assert is_read_only_statement(select(RoutedRow).with_for_update()) is False
+    assert locking_session.get_bind(clause=select(RoutedRow).with_for_update()) is primary
+    assert locking_session.scalar(select(RoutedRow.name)) == "primary"
+    locking_session.close()
+
+def test_routing_session_keeps_to_the_replica_of_its_first_read():
+    primary, first, second = create_schema("primary"), create_schema("first"), create_schema("second")
+    replicas = MySQLReplicaSet([first, second], get_lag_seconds=lambda engine: 0.0)
+    session = session_local(bind=primary, replicas=replicas)
+    other_session = session_local(bind=primary, replicas=replicas)
+
+    assert [session.scalar(select(RoutedRow.name)) for _ in range(3)] == ["first"] * 3
+    assert other_session.scalar(select(RoutedRow.name)) == "second"
+    session.close()
+    other_session.close()
+
+def test_replica_set_skips_lagging_and_failing_replicas_until_checked_again():
+    lagging, failing, healthy = create_engine("sqlite://"), create_engine("sqlite://"), create_engine("sqlite://")
+    lags = {lagging: 30.0, healthy: 0.5}
+    now = [0.0]
+
+    def get_lag_seconds(engine):
+        if engine is failing:
+            raise ConnectionError("Can't connect to the replica")
+        return lags[engine]
+
+    replicas = MySQLReplicaSet(
+        [lagging, failing, healthy], max_lag_seconds=5, check_seconds=10, get_lag_seconds=get_lag_seconds, clock=lambda: now[0]
+    )
+    assert [replicas.get_engine() for _ in range(3)] == [healthy, healthy, healthy]
+    lags[lagging] = 1.0
+    assert replicas.get_engine() is healthy
+    now[0] = 10.0
+    assert [replicas.get_engine() for _ in range(2)] == [lagging, healthy]
+    lags[lagging] = lags[healthy] = None
+    now[0] = 20.0
+    assert replicas.get_engine() is None
+    assert MySQLReplicaSet([]).get_engine() is None
+
+def test_replica_checks_do_not_block_the_other_threads():
+    slow, healthy = create_engine("sqlite://"), create_engine("sqlite://")
+    now = [0.0]
+    check_started, finish_check = Event(), Event()
+
+    def get_lag_seconds(engine):
+        if engine is slow and now[0] > 0:
+            check_started.set()
+            finish_check.wait(5)
+        return 0.0
+
+    replicas = MySQLReplicaSet([slow, healthy], check_seconds=10, get_lag_seconds=get_lag_seconds, clock=lambda: now[0])
+    assert replicas.get_engine() is slow
+    now[0] = 10.0
+    checking_thread = Thread(target=replicas.get_engine)
+    checking_thread.start()
+    assert check_started.wait(5)
+    # The replicas are read with their last known health while the slow check runs
+    assert [replicas.get_engine() for _ in range(2)] == [healthy, slow]
+    finish_check.set()
+    checking_thread.join()
+
+def test_read_only_statements():
+    assert is_read_only_statement(select(RoutedRow)) is True
+    assert is_read_only_statement(text("CALL get_all_cars(:p_customer_id, :p_limit)")) is True
+    assert is_read_only_statement(text("CALL delete_car(:car_id)")) is False
+    assert is_read_only_statement(text("ALTER TABLE purchases REORGANIZE PARTITION p_future")) is False
+    assert is_read_only_statement(RoutedRow.__table__.update().values(name="updated")) is False
+    assert is_read_only_statement(None) is False
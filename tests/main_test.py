@@ -0,0 +1,33 @@
+import os
+import sys
+import subprocess
+import pytest
+from fastapi import FastAPI
+from main import include_backend_routers
+
+
+def get_paths(fastapi_app: FastAPI) -> list[str]:
+    return list(fastapi_app.openapi()["paths"])
+
+def test_include_backend_routers_only_mounts_the_enabled_backends():
+    fastapi_app = FastAPI()
+    include_backend_routers(fastapi_app, ["mysql"])
+
+    paths = get_paths(fastapi_app)
+    assert "/mysql/cars" in paths
+    assert all(path.startswith("/mysql/") for path in paths)
+
+def test_include_backend_routers_with_unsupported_backend():
+    with pytest.raises(ValueError, match="Unsupported backend 'oracle'"):
+        include_backend_routers(FastAPI(), ["oracle"])
+
+def test_mysql_only_startup_does_not_load_the_other_drivers():
+    completed_process = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print(sorted({'pymongo', 'neo4j'} & set(sys.modules)))"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, "ENABLED_BACKENDS": "mysql"},
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    assert completed_process.stdout.strip() == "[]"
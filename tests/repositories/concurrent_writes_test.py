@@ -0,0 +1,63 @@
+from threading import Barrier, Thread
+from app.services import customers_service, purchases_service
+from app.exceptions.database_errors import AlreadyTakenFieldValueError
+from app.repositories.car_repositories import MySQLCarRepository, InMemoryCarRepository
+from app.repositories.customer_repositories import MySQLCustomerRepository, InMemoryCustomerRepository
+from app.repositories.purchase_repositories import MySQLPurchaseRepository, InMemoryPurchaseRepository
+from app.resources.customer_resource import CustomerCreateResource
+from app.resources.purchase_resource import PurchaseCreateResource
+
+NOT_PURCHASED_CAR_ID = "0be86135-c58f-43b6-a369-a3c5445b9948"
+
+
+def run_concurrently(amount: int, target) -> list:
+    """
+    Runs the target in amount threads started at the same time and returns what each returned or raised.
+    """
+    barrier = Barrier(amount)
+    results = [None] * amount
+
+    def run(index: int):
+        barrier.wait()
+        try:
+            results[index] = target()
+        except Exception as error:
+            results[index] = error
+
+    threads = [Thread(target=run, args=(index,)) for index in range(amount)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_purchases_of_the_same_car_only_create_one(run_as_request):
+    car = run_as_request(lambda create_repository: create_repository(
+        MySQLCarRepository, InMemoryCarRepository
+    ).get_by_id(NOT_PURCHASED_CAR_ID))
+    results = run_concurrently(20, lambda: run_as_request(lambda create_repository: purchases_service.create(
+        create_repository(MySQLPurchaseRepository, InMemoryPurchaseRepository),
+        create_repository(MySQLCarRepository, InMemoryCarRepository),
+        PurchaseCreateResource(cars_id=NOT_PURCHASED_CAR_ID, date_of_purchase=car.purchase_deadline)
+    )))
+
+    purchases = [result for result in results if not isinstance(result, AlreadyTakenFieldValueError)]
+    assert len(purchases) == 1
+    assert run_as_request(lambda create_repository: create_repository(
+        MySQLPurchaseRepository, InMemoryPurchaseRepository
+    ).get_by_car_id(car)).id == purchases[0].id
+
+def test_concurrent_customers_with_the_same_email_only_create_one(run_as_request):
+    customer_create_data = CustomerCreateResource(
+        email="concurrent@gmail.com", phone_number=None, first_name="Con", last_name="Current", address=None
+    )
+    results = run_concurrently(20, lambda: run_as_request(lambda create_repository: customers_service.create(
+        create_repository(MySQLCustomerRepository, InMemoryCustomerRepository), customer_create_data
+    )))
+
+    errors = [result for result in results if isinstance(result, AlreadyTakenFieldValueError)]
+    assert len(errors) == 19
+    assert str(errors[0]) == "Customer with email: concurrent@gmail.com is already taken."
+    assert len(run_as_request(lambda create_repository: create_repository(
+        MySQLCustomerRepository, InMemoryCustomerRepository
+    ).get_all(email_filter="concurrent@gmail.com"))) == 1
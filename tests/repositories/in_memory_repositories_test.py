@@ -0,0 +1,179 @@
+import pytest
+from types import SimpleNamespace
+from datetime import date, datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from db import InMemoryDatabase, InMemoryDuplicateKeyError, as_mongodb_datetime, as_date
+from app.exceptions.database_errors import (
+    UnableToDeleteCarWithoutDeletingPurchaseTooError,
+    is_duplicate_key_error
+)
+from app.repositories.car_repositories import InMemoryCarRepository
+from app.repositories.customer_repositories import InMemoryCustomerRepository
+from app.repositories.model_repositories import InMemoryModelRepository
+from app.repositories.brand_repositories import InMemoryBrandRepository
+from app.repositories.purchase_repositories import InMemoryPurchaseRepository
+from app.repositories.sales_person_repositories import InMemorySalesPersonRepository
+from app.repositories.view_repositories.car_purchase_repositories import InMemoryCarPurchaseRepository
+from app.resources.customer_resource import CustomerCreateResource, CustomerUpdateResource
+from app.resources.sales_person_resource import SalesPersonLoginResource
+
+
+PURCHASED_CAR_ID = "d4c7f1f8-4451-43bc-a827-63216a2ddece"
+NOT_PURCHASED_CAR_ID = "0be86135-c58f-43b6-a369-a3c5445b9948"
+CUSTOMER_WITH_PURCHASE_ID = "0ac1d668-55aa-46a1-898a-8fa61457facb"
+AUDI_BRAND_ID = "fff14a06-dc2a-447d-a707-9c03fe00c7a0"
+
+
+def test_seed_matches_the_other_databases(in_memory_database: InMemoryDatabase):
+    assert {table: len(rows) for table, rows in in_memory_database.tables.items()} == {
+        "accessories": 20, "archived_cars": 0, "archived_purchases": 0, "brands": 5, "cars": 4, "change_events": 0,
+        "colors": 5, "customers": 5, "insurances": 5, "models": 25, "purchases": 1, "replication_offsets": 0,
+        "sales_daily_rollups": 1, "sales_people": 2
+    }
+
+def test_indexes_follow_updates_and_deletes():
+    database = InMemoryDatabase()
+    database.insert("customers", {"id": "1", "email": "a@gmail.com"})
+    assert [row["id"] for row in database.find("customers", "email", "A@gmail.com")] == ["1"]
+
+    database.update("customers", "1", {"email": "b@gmail.com"})
+    assert database.find("customers", "email", "a@gmail.com") == []
+    assert [row["id"] for row in database.find("customers", "email", "b@gmail.com")] == ["1"]
+
+    database.delete("customers", "1")
+    assert database.find("customers", "email", "b@gmail.com") == []
+    assert database.indexes[("customers", "email")] == {}
+
+
+def test_unique_indexes_are_enforced_on_insert_and_update():
+    database = InMemoryDatabase()
+    database.insert("customers", {"id": "1", "email": "a@gmail.com"})
+    database.insert("customers", {"id": "2", "email": "b@gmail.com"})
+
+    with pytest.raises(InMemoryDuplicateKeyError):
+        database.insert("customers", {"id": "3", "email": "A@gmail.com"})
+    with pytest.raises(InMemoryDuplicateKeyError):
+        database.update("customers", "2", {"email": "a@gmail.com"})
+    assert database.update("customers", "1", {"email": "a@gmail.com"})["id"] == "1"
+    assert database.get("customers", "3") is None
+    assert database.get("customers", "2")["email"] == "b@gmail.com"
+
+@pytest.mark.parametrize("error, expected", [
+    (InMemoryDuplicateKeyError("customers", "email", "a@gmail.com"), True),
+    (IntegrityError("INSERT", {}, Exception(1062, "Duplicate entry")), True),
+    (IntegrityError("INSERT", {}, Exception(1452, "Cannot add or update a child row")), False),
+    (SimpleNamespace(code=11000), True),
+    (SimpleNamespace(code="Neo.ClientError.Schema.ConstraintValidationFailed"), True),
+    (SimpleNamespace(code="Neo.ClientError.Statement.SyntaxError"), False),
+    (ValueError("Duplicate entry"), False),
+])
+def test_is_duplicate_key_error(error, expected):
+    assert is_duplicate_key_error(error) == expected
+
+@pytest.mark.parametrize("value, expected_datetime", [
+    (date(2024, 11, 4), datetime(2024, 11, 4)),
+    ("2024-11-04", datetime(2024, 11, 4)),
+    (datetime(2024, 11, 4), datetime(2024, 11, 4)),
+])
+def test_dates_are_stored_as_mongodb_datetimes_and_read_back_as_dates(value, expected_datetime):
+    assert as_mongodb_datetime(value) == expected_datetime
+    assert as_date(as_mongodb_datetime(value)) == date(2024, 11, 4)
+    assert as_date(value) == date(2024, 11, 4)
+
+def test_car_filters(in_memory_database: InMemoryDatabase):
+    car_repository = InMemoryCarRepository(in_memory_database)
+    customer = InMemoryCustomerRepository(in_memory_database).get_by_id(CUSTOMER_WITH_PURCHASE_ID)
+
+    purchased_cars = car_repository.get_all(is_purchased=True)
+    assert [car.id for car in purchased_cars] == [PURCHASED_CAR_ID]
+    assert all(car.is_purchased for car in purchased_cars)
+    assert all(not car.is_purchased for car in car_repository.get_all(is_purchased=False))
+    assert all(car.customer.id == customer.id for car in car_repository.get_all(customer=customer))
+    assert len(car_repository.get_all(limit=2)) == 2
+    assert len(car_repository.get_all(limit=0)) == 4
+
+def test_car_past_purchase_deadline_filter(in_memory_database: InMemoryDatabase):
+    car_repository = InMemoryCarRepository(in_memory_database)
+    car_id = next(iter(in_memory_database.tables["cars"]))
+    in_memory_database.update("cars", car_id, {"purchase_deadline": date.today() + timedelta(days=1)})
+
+    not_past_deadline_ids = [car.id for car in car_repository.get_all(is_past_purchase_deadline=False)]
+    past_deadline_ids = [car.id for car in car_repository.get_all(is_past_purchase_deadline=True)]
+    assert car_id in not_past_deadline_ids
+    assert car_id not in past_deadline_ids
+    assert len(not_past_deadline_ids) + len(past_deadline_ids) == 4
+
+def test_car_delete_requires_deleting_the_purchase_too(in_memory_database: InMemoryDatabase):
+    car_repository = InMemoryCarRepository(in_memory_database)
+    car = car_repository.get_by_id(PURCHASED_CAR_ID)
+
+    with pytest.raises(UnableToDeleteCarWithoutDeletingPurchaseTooError):
+        car_repository.delete(car, delete_purchase_too=False)
+
+    car_repository.delete(car, delete_purchase_too=True)
+    assert car_repository.get_by_id(PURCHASED_CAR_ID) is None
+    assert InMemoryPurchaseRepository(in_memory_database).get_by_car_id(car) is None
+
+
+def test_customer_email_filter_and_taken_email_are_case_insensitive(in_memory_database: InMemoryDatabase):
+    customer_repository = InMemoryCustomerRepository(in_memory_database)
+    assert [customer.email for customer in customer_repository.get_all(email_filter="HENRIK")] == ["henrik@gmail.com"]
+
+    customer_create_data = CustomerCreateResource(
+        email="HENRIK@gmail.com", phone_number=None, first_name="Henrik", last_name="Hansen", address=None
+    )
+    assert customer_repository.is_email_taken(customer_create_data)
+    assert not customer_repository.is_email_taken(customer_create_data, customer_id=CUSTOMER_WITH_PURCHASE_ID)
+
+def test_customer_update(in_memory_database: InMemoryDatabase):
+    customer_repository = InMemoryCustomerRepository(in_memory_database)
+    customer = customer_repository.update(CUSTOMER_WITH_PURCHASE_ID, CustomerUpdateResource(first_name="Henrika"))
+
+    assert customer.first_name == "Henrika"
+    assert customer.email == "henrik@gmail.com"
+    car = InMemoryCarRepository(in_memory_database).get_all(customer=customer)[0]
+    assert car.customer.first_name == "Henrika"
+
+def test_customer_delete_cascades_to_cars_and_purchases(in_memory_database: InMemoryDatabase):
+    customer_repository = InMemoryCustomerRepository(in_memory_database)
+    customer = customer_repository.get_by_id(CUSTOMER_WITH_PURCHASE_ID)
+    customer_car_ids = [car["id"] for car in in_memory_database.find("cars", "customers_id", customer.id)]
+    assert PURCHASED_CAR_ID in customer_car_ids
+
+    customer_repository.delete(customer)
+
+    assert customer_repository.get_by_id(customer.id) is None
+    assert all(in_memory_database.get("cars", car_id) is None for car_id in customer_car_ids)
+    assert in_memory_database.find("purchases", "cars_id", PURCHASED_CAR_ID) == []
+
+
+def test_models_filtered_by_brand(in_memory_database: InMemoryDatabase):
+    brand = InMemoryBrandRepository(in_memory_database).get_by_id(AUDI_BRAND_ID)
+    models = InMemoryModelRepository(in_memory_database).get_all(brand_resource=brand)
+
+    assert len(models) > 0
+    assert all(model.brand.id == AUDI_BRAND_ID for model in models)
+    assert all(len(model.colors) > 0 for model in models)
+
+def test_sales_person_login_returns_the_hashed_password(in_memory_database: InMemoryDatabase):
+    login = InMemorySalesPersonRepository(in_memory_database).login_by_email(
+        SalesPersonLoginResource(email="james@gmail.com", password="12345678")
+    )
+    sales_person, hashed_password = login
+    assert sales_person.email == "james@gmail.com"
+    assert hashed_password.startswith("$2b$")
+    assert "hashed_password" not in sales_person.model_dump()
+
+
+def test_car_purchase_view(in_memory_database: InMemoryDatabase):
+    car_purchase_repository = InMemoryCarPurchaseRepository(in_memory_database)
+
+    purchased_car = car_purchase_repository.get_car_with_purchase_by_id(PURCHASED_CAR_ID)
+    assert purchased_car.purchase is not None
+    assert purchased_car.is_past_deadline is False
+
+    customer = InMemoryCustomerRepository(in_memory_database).get_by_id(CUSTOMER_WITH_PURCHASE_ID)
+    customer_with_cars = car_purchase_repository.get_customer_with_cars(customer)
+    assert PURCHASED_CAR_ID in [car.id for car in customer_with_cars.cars]
+    assert len(car_purchase_repository.get_cars_with_purchase(limit=3)) == 3
+    assert car_purchase_repository.get_car_with_purchase_by_id("unknown") is None
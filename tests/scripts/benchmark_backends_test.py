@@ -0,0 +1,34 @@
+from db import InMemoryDatabase
+from scripts.benchmark_backends import (
+    OPERATIONS,
+    RepositoryBenchmarkClient,
+    benchmark_backend,
+    compare_with_baseline,
+    get_percentile,
+    format_table
+)
+
+
+def test_benchmark_runs_every_operation_against_the_in_memory_repositories(in_memory_database: InMemoryDatabase):
+    results = benchmark_backend(RepositoryBenchmarkClient("memory", in_memory_database), OPERATIONS, 5, 1)
+    assert list(results) == list(OPERATIONS)
+    assert all(summary["runs"] == 5 and summary["errors"] == 0 for summary in results.values())
+    assert all(0 < summary["p50_ms"] <= summary["p99_ms"] <= summary["max_ms"] for summary in results.values())
+    # Every create_purchase run purchased a new car, besides the warmup run
+    assert len(in_memory_database.all("purchases")) == 1 + 6
+    assert "create_purchase" in format_table({"memory": results})
+
+def test_benchmark_percentiles_and_baseline_regressions():
+    latencies = [index / 1000 for index in range(1, 101)]
+    assert [get_percentile(latencies, percentile) for percentile in (50, 95, 99, 100)] == [0.05, 0.095, 0.099, 0.1]
+    assert get_percentile([], 95) == 0.0
+    baseline = {"mysql": {"get_car": {"p95_ms": 10.0, "operations_per_second": 100.0}}}
+    assert compare_with_baseline(
+        {"mysql": {"get_car": {"p95_ms": 11.0, "operations_per_second": 90.0}}}, baseline, 0.2
+    ) == []
+    assert compare_with_baseline(
+        {"mysql": {"get_car": {"p95_ms": 13.0, "operations_per_second": 70.0}}, "neo4j": {"get_car": {}}}, baseline, 0.2
+    ) == [
+        "mysql get_car: p95 13.0 ms, was 10.0 ms",
+        "mysql get_car: 70.0 operations per second, was 100.0"
+    ]
@@ -0,0 +1,48 @@
+import json
+from datetime import date, datetime
+from db import InMemoryDatabase, as_mongodb_datetime
+from scripts.etl_mysql_to_replicas import (
+    CATALOG_TABLES,
+    get_catalog,
+    as_mongodb_car,
+    as_mongodb_purchase,
+    as_mongodb_sales_rollup,
+    read_checkpoint,
+    save_checkpoint
+)
+
+
+PURCHASED_CAR_ID = "d4c7f1f8-4451-43bc-a827-63216a2ddece"
+AUDI_BRAND_ID = "fff14a06-dc2a-447d-a707-9c03fe00c7a0"
+
+
+def test_etl_builds_the_same_mongodb_documents_as_the_seed(in_memory_database: InMemoryDatabase):
+    with open("scripts/mongodb_insert_data.json", "r") as file:
+        seed = json.load(file)
+    catalog = get_catalog(
+        {table: in_memory_database.all(table) for table in CATALOG_TABLES},
+        {model["id"]: model["colors_ids"] for model in in_memory_database.all("models")}
+    )
+    car = in_memory_database.get("cars", PURCHASED_CAR_ID)
+    car_document = as_mongodb_car(
+        car, catalog, in_memory_database.get("customers", car["customers_id"]),
+        car["accessories_ids"], car["insurances_ids"]
+    )
+    seed_car = next(seed_car for seed_car in seed["cars"] if seed_car["_id"] == PURCHASED_CAR_ID)
+    assert car_document == {**seed_car, "purchase_deadline": as_mongodb_datetime(seed_car["purchase_deadline"])}
+
+    purchase_document = as_mongodb_purchase(in_memory_database.all("purchases")[0], car_document)
+    assert purchase_document["car"] is car_document
+    assert purchase_document["date_of_purchase"] == datetime(2024, 11, 4)
+    seed_rollup = seed["sales_daily_rollups"][0]
+    assert as_mongodb_sales_rollup(in_memory_database.all("sales_daily_rollups")[0], catalog) == {
+        **seed_rollup, "day": as_mongodb_datetime(seed_rollup["day"])
+    }
+
+def test_etl_checkpoint_is_saved_and_read_back(tmp_path):
+    checkpoint_file = str(tmp_path / "checkpoint.json")
+    assert read_checkpoint(checkpoint_file) == {}
+    save_checkpoint(checkpoint_file, {"change_event_id": 7, "sales_daily_rollups": [date(2024, 11, 4), AUDI_BRAND_ID]})
+    assert read_checkpoint(checkpoint_file) == {
+        "change_event_id": 7, "sales_daily_rollups": ["2024-11-04", AUDI_BRAND_ID]
+    }
@@ -0,0 +1,42 @@
+from datetime import date
+from scripts.generate_dataset import DatasetGenerator
+
+
+def test_dataset_generator_is_deterministic_and_consistent():
+    amounts = {"customers": 50, "cars": 200}
+    batch = next(DatasetGenerator(amounts, seed=42, reference_date=date(2024, 11, 4)).generate_car_batches(200))
+    assert batch == next(DatasetGenerator(amounts, seed=42, reference_date=date(2024, 11, 4)).generate_car_batches(200))
+    assert batch != next(DatasetGenerator(amounts, seed=43, reference_date=date(2024, 11, 4)).generate_car_batches(200))
+
+    generator = DatasetGenerator(amounts, seed=42, reference_date=date(2024, 11, 4))
+    batch = next(generator.generate_car_batches(200))
+    car = batch["cars"][0]
+    accessory_ids = [row["accessories_id"] for row in batch["cars_has_accessories"] if row["cars_id"] == car["id"]]
+    insurance_ids = [row["insurances_id"] for row in batch["cars_has_insurances"] if row["cars_id"] == car["id"]]
+    assert car["total_price"] == round(
+        generator.prices["models"][car["models_id"]] + generator.prices["colors"][car["colors_id"]]
+        + sum(generator.prices["accessories"][accessory_id] for accessory_id in accessory_ids)
+        + sum(generator.prices["insurances"][insurance_id] for insurance_id in insurance_ids), 2
+    )
+    assert car["colors_id"] in generator.model_color_ids[car["models_id"]]
+    assert batch["customers"][car["customers_id"]] == generator.get_customer(
+        next(index for index in range(50) if generator.get_id("customers", index) == car["customers_id"])
+    )
+    deadlines = {car["id"]: car["purchase_deadline"] for car in batch["cars"]}
+    assert all(
+        purchase["date_of_purchase"] <= min(deadlines[purchase["cars_id"]], date(2024, 11, 4))
+        for purchase in batch["purchases"]
+    )
+    assert sum(rollup["units"] for rollup in generator.get_sales_rollup_rows()) == len(batch["purchases"])
+
+def test_dataset_generator_skews_the_sales_to_a_few_sales_people():
+    generator = DatasetGenerator({"sales_people": 100, "customers": 100, "cars": 5000}, seed=1)
+    cars = [car for batch in generator.generate_car_batches(1000) for car in batch["cars"]]
+    cars_per_sales_person = sorted(
+        (sum(1 for car in cars if car["sales_people_id"] == sales_person["id"])
+         for sales_person in generator.catalog_rows["sales_people"]),
+        reverse=True
+    )
+    assert sum(cars_per_sales_person[:10]) > len(cars) / 2
+    customers = [customer for customers in generator.generate_customer_batches(30) for customer in customers]
+    assert len({customer["email"] for customer in customers}) == 100
@@ -0,0 +1,51 @@
+import httpx
+import asyncio
+from scripts.load_test import LatencyHistogram, get_target_users, evaluate_thresholds, run_load_test
+
+
+def test_load_test_histogram_ramp_and_thresholds():
+    histogram = LatencyHistogram()
+    for index in range(1, 1001):
+        histogram.record(index / 1000)
+    assert histogram.count == 1000 and histogram.max_ms == 1000.0
+    for percentile, latency_ms in ((50, 500), (95, 950), (99, 990), (100, 1000)):
+        assert latency_ms <= histogram.get_percentile(percentile) <= latency_ms * 1.05
+    stages = [{"duration_seconds": 10, "users": 100}, {"duration_seconds": 10, "users": 0}]
+    assert [get_target_users(stages, elapsed) for elapsed in (0, 5, 10, 15, 20)] == [0, 50, 100, 50, None]
+    results = {"total": {"p95_ms": 250.0, "error_rate": 0.02}, "requests": {"get car": {"p95_ms": 400.0}}}
+    assert evaluate_thresholds(results, {
+        "p95": {"p95_ms": {"<": 300}},
+        "errors": {"error_rate": {"<": 0.01}},
+        "car p95": {"request": "get car", "p95_ms": {"<=": 300}},
+        "customer p95": {"request": "get customer", "p95_ms": {"<": 300}}
+    }) == ["errors: error_rate was 0.02", "car p95: p95_ms was 400.0", "customer p95: no get customer requests were sent"]
+
+def test_load_test_reuses_the_token_and_records_every_request():
+    car_ids = ["car-1", "car-2"]
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/mysql/login":
+            return httpx.Response(200, json={"access_token": "token", "token_type": "bearer"})
+        assert request.headers["Authorization"] == "Bearer token"
+        if request.url.path == "/mysql/cars":
+            return httpx.Response(200, json=[{"id": car_id} for car_id in car_ids])
+        if request.url.path.split("/")[-1] in car_ids:
+            return httpx.Response(200, json={})
+        return httpx.Response(404)
+
+    scenario = {
+        "login": {"path": "/mysql/login", "email": "hans@gmail.com", "password": "password"},
+        "stages": [{"duration_seconds": 0.1, "users": 2}, {"duration_seconds": 0.3, "users": 2}],
+        "think_time_seconds": 0.01,
+        "variables": {"car_id": {"path": "/mysql/cars"}},
+        "requests": [
+            {"name": "get car", "path": "/mysql/car/{car_id}", "weight": 3},
+            {"name": "missing", "path": "/mysql/missing", "weight": 1}
+        ]
+    }
+    results = asyncio.run(run_load_test(scenario, "http://test", transport=httpx.MockTransport(handle)))
+    get_car, missing = results["requests"]["get car"], results["requests"]["missing"]
+    assert get_car["requests"] > 0 and get_car["errors"] == 0 and get_car["status_codes"] == {"200": get_car["requests"]}
+    assert missing["errors"] == missing["requests"]
+    assert results["total"]["requests"] == get_car["requests"] + missing["requests"]
+    assert results["peak_users"] == 2
@@ -0,0 +1,13 @@
+from datetime import datetime
+from scripts.migrate_mongodb_dates import DATE_FIELDS, get_date_updates
+
+
+def test_date_migration_only_updates_the_dates_stored_as_strings():
+    purchase = {
+        "_id": "bdfca7c4", "date_of_purchase": "2024-11-04", "car": {"purchase_deadline": datetime(2024, 12, 7)}
+    }
+    assert get_date_updates(purchase, DATE_FIELDS["purchases"]) == {"date_of_purchase": datetime(2024, 11, 4)}
+    assert get_date_updates({"_id": "1", "car": {"purchase_deadline": "2024-12-07"}}, DATE_FIELDS["purchases"]) == {
+        "car.purchase_deadline": datetime(2024, 12, 7)
+    }
+    assert get_date_updates({"_id": "1", "purchase_deadline": datetime(2024, 12, 7)}, DATE_FIELDS["cars"]) == {}
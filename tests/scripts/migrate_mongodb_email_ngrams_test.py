@@ -0,0 +1,11 @@
+from scripts.migrate_mongodb_email_ngrams import get_email_ngrams_update
+
+EMAIL_NGRAMS = [".dk", "@x.", "ans", "han", "ns@", "s@x", "x.d"]
+
+
+def test_email_ngrams_backfill_only_updates_the_customers_without_them():
+    assert get_email_ngrams_update({"_id": "1", "email": "Hans@x.dk"}) == {"email_ngrams": EMAIL_NGRAMS}
+    assert get_email_ngrams_update({"_id": "1", "email": "hans@x.dk", "email_ngrams": ["han"]}) == {
+        "email_ngrams": EMAIL_NGRAMS
+    }
+    assert get_email_ngrams_update({"_id": "1", "email": "hans@x.dk", "email_ngrams": EMAIL_NGRAMS}) is None
@@ -0,0 +1,136 @@
+from datetime import date
+import pytest
+from app.services import analytics_service
+from app.resources.analytics_resource import SalesReturnResource, SALES_DIMENSIONS, SALES_SOURCES
+from app.resources.purchase_resource import PurchaseCreateResource
+
+# The only seeded purchase is the white Audi R8 sold by Hans Hansen on the 4th of November 2024
+expected_sales = {
+    "brand": SalesReturnResource(key="fff14a06-dc2a-447d-a707-9c03fe00c7a0", name="Audi", units=1, revenue=10530.8),
+    "model": SalesReturnResource(key="d4bd413c-00d8-45ce-be0e-1d1333ac5e75", name="R8", units=1, revenue=10530.8),
+    "color": SalesReturnResource(key="7bb35b1d-37ff-43c2-988a-cf85c5b6d690", name="white", units=1, revenue=10530.8),
+    "sales_person": SalesReturnResource(
+        key="f9097a97-eca4-49b6-85a0-08423789c320", name="Hans Hansen", units=1, revenue=10530.8
+    ),
+    "month": SalesReturnResource(key="2024-11", name="2024-11", units=1, revenue=10530.8),
+}
+
+
+# VALID TESTS FOR get_sales
+
+@pytest.mark.parametrize("valid_source", SALES_SOURCES)
+@pytest.mark.parametrize("valid_dimension", SALES_DIMENSIONS)
+def test_get_sales_with_valid_partitions(mySQLAnalyticsRepository, valid_dimension, valid_source):
+    sales = analytics_service.get_sales(
+        repository=mySQLAnalyticsRepository,
+        dimension=valid_dimension,
+        source=valid_source
+    )
+    assert sales == [expected_sales[valid_dimension]], \
+        f"Sales by {valid_dimension} from the {valid_source} are not {[expected_sales[valid_dimension]]}, but {sales}"
+
+
+@pytest.mark.parametrize("valid_source", SALES_SOURCES)
+@pytest.mark.parametrize("valid_start_date, valid_end_date, expecting_sales_amount", [
+    (None, None, 1),
+    (date(2024, 11, 4), None, 1),
+    (None, date(2024, 11, 4), 1),
+    (date(2024, 11, 4), date(2024, 11, 4), 1),
+    (date(2024, 11, 5), None, 0),
+    (None, date(2024, 11, 3), 0),
+    (date(2024, 11, 5), date(2024, 11, 3), 0),
+])
+def test_get_sales_with_valid_date_range_partitions(
+        mySQLAnalyticsRepository, valid_start_date, valid_end_date, expecting_sales_amount, valid_source
+):
+    sales = analytics_service.get_sales(
+        repository=mySQLAnalyticsRepository,
+        dimension="brand",
+        start_date=valid_start_date,
+        end_date=valid_end_date,
+        source=valid_source
+    )
+    assert len(sales) == expecting_sales_amount, \
+        f"Amount of sales between {valid_start_date} and {valid_end_date} is not {expecting_sales_amount}, but {len(sales)}"
+
+
+def test_get_sales_rollup_is_updated_when_a_purchase_is_created(
+        mySQLAnalyticsRepository, mySQLPurchaseRepository, mySQLCarRepository
+):
+    car = mySQLCarRepository.get_by_id("a5503fbb-c388-4789-a10c-d7ae7bdf7408")
+    mySQLPurchaseRepository.create(
+        PurchaseCreateResource(cars_id=car.id, date_of_purchase=date(2024, 12, 1)),
+        car
+    )
+
+    for dimension in SALES_DIMENSIONS:
+        rollup_sales = analytics_service.get_sales(mySQLAnalyticsRepository, dimension, source="rollup")
+        purchases_sales = analytics_service.get_sales(mySQLAnalyticsRepository, dimension, source="purchases")
+        assert rollup_sales == purchases_sales, \
+            f"Sales by {dimension} from the rollup {rollup_sales} are not the sales from the purchases {purchases_sales}"
+    months = analytics_service.get_sales(mySQLAnalyticsRepository, "month")
+    assert sorted(month.key for month in months) == ["2024-11", "2024-12"], \
+        f"Sales by month are not for 2024-11 and 2024-12, but {months}"
+    assert sum(month.units for month in months) == 2, \
+        f"Amount of units sold is not 2, but {sum(month.units for month in months)}"
+
+
+def test_get_sales_rollup_keeps_the_sales_of_deleted_purchases(mySQLAnalyticsRepository, mySQLCarRepository):
+    car = mySQLCarRepository.get_by_id("d4c7f1f8-4451-43bc-a827-63216a2ddece")
+    mySQLCarRepository.delete(car, delete_purchase_too=True)
+
+    rollup_sales = analytics_service.get_sales(mySQLAnalyticsRepository, "brand", source="rollup")
+    purchases_sales = analytics_service.get_sales(mySQLAnalyticsRepository, "brand", source="purchases")
+    assert rollup_sales == [expected_sales["brand"]], \
+        f"Sales by brand from the rollup are not the sales ever recorded {[expected_sales['brand']]}, but {rollup_sales}"
+    assert purchases_sales == [], f"Sales by brand from the purchases are not [], but {purchases_sales}"
+
+# INVALID TESTS FOR get_sales
+
+@pytest.mark.parametrize("invalid_dimension, expecting_error, expecting_error_message", [
+    (None, TypeError, "dimension must be of type str, not NoneType."),
+    (1, TypeError, "dimension must be of type str, not int."),
+    ("year", ValueError, "dimension must be one of brand, model, color, sales_person, month, not 'year'."),
+    ("", ValueError, "dimension must be one of brand, model, color, sales_person, month, not ''."),
+])
+def test_get_sales_with_invalid_dimension_partitions(
+        mySQLAnalyticsRepository, invalid_dimension, expecting_error, expecting_error_message
+):
+    with pytest.raises(expecting_error, match=expecting_error_message):
+        analytics_service.get_sales(repository=mySQLAnalyticsRepository, dimension=invalid_dimension)
+
+
+@pytest.mark.parametrize("invalid_date_argument, invalid_date, expecting_error_message", [
+    ("start_date", "2024-11-04", "start_date must be of type date or None, not str."),
+    ("start_date", 20241104, "start_date must be of type date or None, not int."),
+    ("end_date", "2024-11-04", "end_date must be of type date or None, not str."),
+    ("end_date", True, "end_date must be of type date or None, not bool."),
+])
+def test_get_sales_with_invalid_date_partitions(
+        mySQLAnalyticsRepository, invalid_date_argument, invalid_date, expecting_error_message
+):
+    with pytest.raises(TypeError, match=expecting_error_message):
+        analytics_service.get_sales(
+            repository=mySQLAnalyticsRepository, dimension="brand", **{invalid_date_argument: invalid_date}
+        )
+
+
+@pytest.mark.parametrize("invalid_source, expecting_error, expecting_error_message", [
+    (None, TypeError, "source must be of type str, not NoneType."),
+    ("cars", ValueError, "source must be one of rollup, purchases, not 'cars'."),
+])
+def test_get_sales_with_invalid_source_partitions(
+        mySQLAnalyticsRepository, invalid_source, expecting_error, expecting_error_message
+):
+    with pytest.raises(expecting_error, match=expecting_error_message):
+        analytics_service.get_sales(repository=mySQLAnalyticsRepository, dimension="brand", source=invalid_source)
+
+
+@pytest.mark.parametrize("invalid_repository, expecting_error_message", [
+    (None, "repository must be of type AnalyticsRepository, not NoneType."),
+    ({}, "repository must be of type AnalyticsRepository, not dict."),
+    ("", "repository must be of type AnalyticsRepository, not str."),
+])
+def test_get_sales_with_invalid_repository_partitions(invalid_repository, expecting_error_message):
+    with pytest.raises(TypeError, match=expecting_error_message):
+        analytics_service.get_sales(repository=invalid_repository, dimension="brand")
@@ -0,0 +1,55 @@
+import pytest
+from app.services import archive_service
+
+
+# VALID TESTS FOR get_archived_purchases AND get_archived_cars
+
+@pytest.mark.parametrize("get_archived", [archive_service.get_archived_purchases, archive_service.get_archived_cars])
+@pytest.mark.parametrize("valid_month, valid_customer_id, valid_limit, valid_offset", [
+    (None, None, None, 0),
+    ("2024-11", None, None, 0),
+    (None, "0ac1d668-55aa-46a1-898a-8fa61457facb", 10, 0),
+    ("2024-12", "0ac1d668-55aa-46a1-898a-8fa61457facb", 0, 5),
+])
+def test_get_archived_with_valid_partitions(
+        mySQLArchiveRepository, get_archived, valid_month, valid_customer_id, valid_limit, valid_offset
+):
+    # Nothing of the seed has been archived
+    archived = get_archived(
+        repository=mySQLArchiveRepository,
+        month=valid_month,
+        customer_id=valid_customer_id,
+        limit=valid_limit,
+        offset=valid_offset
+    )
+    assert archived == [], f"The archive is not empty, but {archived}"
+
+
+# INVALID TESTS FOR get_archived_purchases AND get_archived_cars
+
+@pytest.mark.parametrize("get_archived", [archive_service.get_archived_purchases, archive_service.get_archived_cars])
+@pytest.mark.parametrize("invalid_argument, invalid_value, expecting_error, expecting_error_message", [
+    ("month", 202411, TypeError, "month must be of type str or None, not int."),
+    ("month", "2024-13", ValueError, "month must be a month as YYYY-MM, not '2024-13'."),
+    ("month", "2024-11-04", ValueError, "month must be a month as YYYY-MM, not '2024-11-04'."),
+    ("customer_id", 1, TypeError, "customer_id must be of type str or None, not int."),
+    ("limit", "10", TypeError, "limit must be of type int or None, not str."),
+    ("limit", -1, ValueError, "limit must be at least 0, not -1."),
+    ("offset", None, TypeError, "offset must be of type int, not NoneType."),
+    ("offset", -1, ValueError, "offset must be at least 0, not -1."),
+])
+def test_get_archived_with_invalid_partitions(
+        mySQLArchiveRepository, get_archived, invalid_argument, invalid_value, expecting_error, expecting_error_message
+):
+    with pytest.raises(expecting_error, match=expecting_error_message):
+        get_archived(repository=mySQLArchiveRepository, **{invalid_argument: invalid_value})
+
+
+@pytest.mark.parametrize("get_archived", [archive_service.get_archived_purchases, archive_service.get_archived_cars])
+@pytest.mark.parametrize("invalid_repository, expecting_error_message", [
+    (None, "repository must be of type ArchiveRepository, not NoneType."),
+    ({}, "repository must be of type ArchiveRepository, not dict."),
+])
+def test_get_archived_with_invalid_repository_partitions(get_archived, invalid_repository, expecting_error_message):
+    with pytest.raises(TypeError, match=expecting_error_message):
+        get_archived(repository=invalid_repository)
@@ -0,0 +1,112 @@
+import pytest
+from app.services.view_services import car_purchase_service
+from app.resources.view_resources.car_purchase_resource import (
+    SalesPersonWithCarsReturnResource,
+    CustomerWithCarsReturnResource
+)
+
+sales_person_hans_id = "f9097a97-eca4-49b6-85a0-08423789c320"
+sales_person_hans_car_ids = sorted([
+    "0be86135-c58f-43b6-a369-a3c5445b9948",
+    "a5503fbb-c388-4789-a10c-d7ae7bdf7408",
+    "d4c7f1f8-4451-43bc-a827-63216a2ddece"
+])
+customer_henrik_id = "0ac1d668-55aa-46a1-898a-8fa61457facb"
+
+
+# VALID TESTS FOR get_sales_person_with_cars
+
+def test_get_sales_person_with_cars_with_valid_partitions(
+        mySQLCarPurchaseRepository, mySQLSalesPersonRepository
+):
+    sales_person = car_purchase_service.get_sales_person_with_cars(
+        car_purchase_repository=mySQLCarPurchaseRepository,
+        sales_person_repository=mySQLSalesPersonRepository,
+        sales_person_id=sales_person_hans_id
+    )
+    assert isinstance(sales_person, SalesPersonWithCarsReturnResource), \
+        f"Sales person is not a SalesPersonWithCarsReturnResource, but {type(sales_person).__name__}"
+    assert [car.id for car in sales_person.cars] == sales_person_hans_car_ids, \
+        f"Sales person cars are not {sales_person_hans_car_ids}, but {[car.id for car in sales_person.cars]}"
+
+    summary = sales_person.cars_summary
+    assert summary.total_cars == 3, f"Total cars is not 3, but {summary.total_cars}"
+    assert summary.purchased_cars == 1, f"Purchased cars is not 1, but {summary.purchased_cars}"
+    assert summary.revenue == 10530.8, f"Revenue is not 10530.8, but {summary.revenue}"
+    expected_past_deadline_cars = len([car for car in sales_person.cars if car.is_past_deadline])
+    assert summary.past_deadline_cars == expected_past_deadline_cars, \
+        f"Past deadline cars is not {expected_past_deadline_cars}, but {summary.past_deadline_cars}"
+
+
+@pytest.mark.parametrize("valid_cars_limit, valid_cars_offset, expected_car_ids", [
+    (None, 0, sales_person_hans_car_ids),
+    (2, 0, sales_person_hans_car_ids[:2]),
+    (2, 2, sales_person_hans_car_ids[2:]),
+    (None, 1, sales_person_hans_car_ids[1:]),
+    (1, 1, sales_person_hans_car_ids[1:2]),
+    (0, 0, []),
+    (5, 3, []),
+])
+def test_get_sales_person_with_cars_with_valid_page_partitions(
+        mySQLCarPurchaseRepository, mySQLSalesPersonRepository, valid_cars_limit, valid_cars_offset, expected_car_ids
+):
+    sales_person = car_purchase_service.get_sales_person_with_cars(
+        car_purchase_repository=mySQLCarPurchaseRepository,
+        sales_person_repository=mySQLSalesPersonRepository,
+        sales_person_id=sales_person_hans_id,
+        cars_limit=valid_cars_limit,
+        cars_offset=valid_cars_offset
+    )
+    assert [car.id for car in sales_person.cars] == expected_car_ids, \
+        f"Sales person cars are not {expected_car_ids}, but {[car.id for car in sales_person.cars]}"
+    assert sales_person.cars_summary.total_cars == 3, \
+        f"Total cars is not 3 for every page, but {sales_person.cars_summary.total_cars}"
+
+
+# VALID TESTS FOR get_customer_with_cars
+
+def test_get_customer_with_cars_with_valid_partitions(mySQLCarPurchaseRepository, mySQLCustomerRepository):
+    customer = car_purchase_service.get_customer_with_cars(
+        car_purchase_repository=mySQLCarPurchaseRepository,
+        customer_repository=mySQLCustomerRepository,
+        customer_id=customer_henrik_id,
+        cars_limit=0
+    )
+    assert isinstance(customer, CustomerWithCarsReturnResource), \
+        f"Customer is not a CustomerWithCarsReturnResource, but {type(customer).__name__}"
+    assert customer.cars == [], f"Customer cars are not empty, but {customer.cars}"
+    assert customer.cars_summary.model_dump() == {
+        "total_cars": 1, "purchased_cars": 1, "past_deadline_cars": 0, "revenue": 10530.8
+    }, f"Customer cars summary is not the purchased car, but {customer.cars_summary}"
+
+
+# INVALID TESTS FOR the cars page
+
+@pytest.mark.parametrize("invalid_cars_limit, invalid_cars_offset, expected_error, expecting_error_message", [
+    ("2", 0, TypeError, "cars_limit must be of type int or None, not str."),
+    (True, 0, TypeError, "cars_limit must be of type int or None, not bool."),
+    (None, None, TypeError, "cars_offset must be of type int, not NoneType."),
+    (None, 1.5, TypeError, "cars_offset must be of type int, not float."),
+    (-1, 0, ValueError, "cars_limit must be at least 0, not -1."),
+    (None, -1, ValueError, "cars_offset must be at least 0, not -1."),
+])
+def test_get_with_cars_with_invalid_page_partitions(
+        mySQLCarPurchaseRepository, mySQLSalesPersonRepository, mySQLCustomerRepository,
+        invalid_cars_limit, invalid_cars_offset, expected_error, expecting_error_message
+):
+    with pytest.raises(expected_error, match=expecting_error_message):
+        car_purchase_service.get_sales_person_with_cars(
+            car_purchase_repository=mySQLCarPurchaseRepository,
+            sales_person_repository=mySQLSalesPersonRepository,
+            sales_person_id=sales_person_hans_id,
+            cars_limit=invalid_cars_limit,
+            cars_offset=invalid_cars_offset
+        )
+    with pytest.raises(expected_error, match=expecting_error_message):
+        car_purchase_service.get_customer_with_cars(
+            car_purchase_repository=mySQLCarPurchaseRepository,
+            customer_repository=mySQLCustomerRepository,
+            customer_id=customer_henrik_id,
+            cars_limit=invalid_cars_limit,
+            cars_offset=invalid_cars_offset
+        )
@@ -389,6 +389,32 @@ def test_get_all_customers_with_valid_email_filter_and_customers_limit_values_pa
                 f"Email filter '{valid_email_filter}' is not in customer email '{customer.email}'."
 
 
+@pytest.mark.parametrize("valid_email_search_mode, valid_email_filter, valid_customers_limit, expecting_emails", [
+    ("prefix", "t", None, ["test@test.dk", "tom@gmail.com"]),
+    ("prefix", "", 2, ["henrik@gmail.com", "james@gmail.com"]),
+    ("prefix", "gmail", None, []),
+    ("fulltext", "gmail", None, ["tom@gmail.com", "james@gmail.com", "henrik@gmail.com"]),
+    ("fulltext", "gmail", 2, ["tom@gmail.com", "james@gmail.com"]),
+    ("fulltext", ".dk", None, ["oli@oli.dk", "test@test.dk"]),
+    ("fulltext", "test", None, ["test@test.dk"]),
+    ("fulltext", "unknown-email", None, []),
+])
+def test_get_all_customers_with_valid_email_search_mode_partitions(
+        mySQLCustomerRepository, valid_email_search_mode, valid_email_filter, valid_customers_limit, expecting_emails
+):
+    customers = customers_service.get_all(
+        repository=mySQLCustomerRepository,
+        filter_customer_by_email=valid_email_filter,
+        customers_limit=valid_customers_limit,
+        email_search_mode=valid_email_search_mode
+    )
+
+    actual_emails = [customer.email for customer in customers]
+    assert actual_emails == expecting_emails, \
+        (f"The actual emails {actual_emails} do not match the expected emails {expecting_emails} "
+         f"in the expected order.")
+
+
 # INVALID TESTS FOR get_all_customers
 
 @pytest.mark.parametrize("invalid_customers_limit, expecting_error_message", [
@@ -421,6 +447,22 @@ def test_get_all_customers_with_invalid_email_filter_values_partitions(
         )
 
 
+@pytest.mark.parametrize("invalid_email_search_mode, expecting_error, expecting_error_message", [
+    (None, TypeError, "email_search_mode must be of type str, not NoneType."),
+    (1, TypeError, "email_search_mode must be of type str, not int."),
+    ("suffix", ValueError, "email_search_mode must be one of contains, prefix, fulltext, not 'suffix'."),
+])
+def test_get_all_customers_with_invalid_email_search_mode_partitions(
+        mySQLCustomerRepository, invalid_email_search_mode, expecting_error, expecting_error_message
+):
+    with pytest.raises(expecting_error, match=expecting_error_message):
+        customers_service.get_all(
+            repository=mySQLCustomerRepository,
+            filter_customer_by_email="gmail",
+            email_search_mode=invalid_email_search_mode
+        )
+
+
 @pytest.mark.parametrize("invalid_repository, expecting_error_message", [
     (None, "repository must be of type CustomerRepository, not NoneType."),
     (1, "repository must be of type CustomerRepository, not int."),
@@ -0,0 +1,67 @@
+from datetime import date
+from db import InMemoryDatabase
+from app.core.metrics import MetricsRegistry
+from app.workers.car_expiry_worker import CarExpiryWorker
+from app.repositories.car_expiry_repositories import InMemoryCarExpiryRepository
+from app.repositories.archive_repositories import InMemoryArchiveRepository
+
+PURCHASED_CAR_ID = "d4c7f1f8-4451-43bc-a827-63216a2ddece"
+# Cars of the seed that have not been purchased, ordered by their purchase deadline
+EXPIRED_CARS = [
+    (date(2024, 12, 4), "a1b1e305-1a89-4b06-86d1-21ac1fa3c8a6"),
+    (date(2024, 12, 7), "0be86135-c58f-43b6-a369-a3c5445b9948"),
+]
+
+
+def create_worker(database: InMemoryDatabase, registry: MetricsRegistry, batch_size: int = 1) -> CarExpiryWorker:
+    return CarExpiryWorker(
+        InMemoryCarExpiryRepository(database), "in-memory",
+        batch_size=batch_size, pause_seconds=0, registry=registry,
+        today=lambda: date(2024, 12, 8), sleep=lambda seconds: None
+    )
+
+
+def test_expired_cars_are_visited_in_deadline_order_after_the_cursor(in_memory_database: InMemoryDatabase):
+    in_memory_database.update("cars", "a5503fbb-c388-4789-a10c-d7ae7bdf7408", {"purchase_deadline": date(2025, 1, 1)})
+    repository = InMemoryCarExpiryRepository(in_memory_database)
+
+    assert repository.get_expired_cars(date(2024, 12, 8), None, 10) == EXPIRED_CARS
+    assert repository.get_expired_cars(date(2024, 12, 8), EXPIRED_CARS[0], 10) == EXPIRED_CARS[1:]
+    assert repository.get_expired_cars(date(2024, 12, 5), None, 10) == EXPIRED_CARS[:1]
+
+
+def test_run_pass_deletes_the_expired_cars_in_batches(in_memory_database: InMemoryDatabase):
+    in_memory_database.update("cars", "a5503fbb-c388-4789-a10c-d7ae7bdf7408", {"purchase_deadline": date(2025, 1, 1)})
+    registry = MetricsRegistry()
+
+    assert create_worker(in_memory_database, registry, batch_size=1).run_pass() == 2
+
+    assert all(in_memory_database.get("cars", car_id) is None for _, car_id in EXPIRED_CARS)
+    assert in_memory_database.get("cars", PURCHASED_CAR_ID) is not None
+    assert in_memory_database.get("cars", "a5503fbb-c388-4789-a10c-d7ae7bdf7408") is not None
+    archived_cars = InMemoryArchiveRepository(in_memory_database).get_archived_cars()
+    assert sorted(car.id for car in archived_cars) == sorted(car_id for _, car_id in EXPIRED_CARS)
+    assert {car.archive_month for car in archived_cars} == {"2024-12"}
+    metrics = registry.render()
+    assert 'kea_car_expiry_deleted_cars_total{backend="in-memory"} 2' in metrics
+    assert 'kea_car_expiry_batches_total{backend="in-memory"} 2' in metrics
+    assert "kea_car_expiry_last_pass_timestamp_seconds" in metrics
+
+
+def test_cars_purchased_after_being_selected_are_not_deleted(in_memory_database: InMemoryDatabase):
+    repository = InMemoryCarExpiryRepository(in_memory_database)
+    expired_cars = repository.get_expired_cars(date(2024, 12, 8), None, 10)
+    in_memory_database.insert("purchases", {
+        "id": "late-purchase", "cars_id": EXPIRED_CARS[0][1], "date_of_purchase": date(2024, 12, 3)
+    })
+
+    assert repository.delete_expired_cars([car_id for _, car_id in expired_cars], date(2024, 12, 8)) == len(expired_cars) - 1
+    assert in_memory_database.get("cars", EXPIRED_CARS[0][1]) is not None
+
+
+def test_a_second_pass_has_nothing_to_delete(in_memory_database: InMemoryDatabase):
+    registry = MetricsRegistry()
+    worker = create_worker(in_memory_database, registry, batch_size=500)
+
+    assert worker.run_pass() >= 2
+    assert worker.run_pass() == 0
@@ -0,0 +1,167 @@
+from datetime import date, timedelta
+from db import InMemoryDatabase
+from app.core.metrics import MetricsRegistry
+from app.models.change_event import get_changed_at
+from app.workers.change_replicator import ChangeReplicator
+from app.resources.customer_resource import CustomerCreateResource, CustomerUpdateResource
+from app.resources.purchase_resource import PurchaseCreateResource
+from app.repositories.car_repositories import InMemoryCarRepository
+from app.repositories.customer_repositories import InMemoryCustomerRepository
+from app.repositories.purchase_repositories import InMemoryPurchaseRepository
+from app.repositories.car_expiry_repositories import InMemoryCarExpiryRepository
+from app.repositories.replication_repositories import InMemoryReplicationSourceRepository, InMemoryReplicaRepository
+
+UNPURCHASED_CAR_ID = "a5503fbb-c388-4789-a10c-d7ae7bdf7408"
+EXPIRED_CAR_ID = "a1b1e305-1a89-4b06-86d1-21ac1fa3c8a6"
+CUSTOMER_DATA = {
+    "email": "replicated@gmail.com",
+    "phone_number": "12345678",
+    "first_name": "Replicated",
+    "last_name": "Customer",
+    "address": "Test 21"
+}
+
+
+def create_replicator(
+        source_database: InMemoryDatabase,
+        replica_database: InMemoryDatabase,
+        registry: MetricsRegistry = None,
+        now=get_changed_at,
+        replica_name: str = "in-memory"
+) -> ChangeReplicator:
+    return ChangeReplicator(
+        InMemoryReplicationSourceRepository(source_database), InMemoryReplicaRepository(replica_database),
+        replica_name, batch_size=10, registry=registry or MetricsRegistry(), now=now
+    )
+
+
+def test_created_and_updated_customers_are_replicated_with_their_current_state(in_memory_database: InMemoryDatabase):
+    replica_database = InMemoryDatabase.from_seed_file()
+    registry = MetricsRegistry()
+    customer_repository = InMemoryCustomerRepository(in_memory_database)
+    customer = customer_repository.create(CustomerCreateResource(**CUSTOMER_DATA))
+    customer_repository.update(customer.id, CustomerUpdateResource(first_name="Updated"))
+
+    assert create_replicator(in_memory_database, replica_database, registry).replicate_batch() == 2
+
+    assert replica_database.get("customers", customer.id)["first_name"] == "Updated"
+    assert InMemoryReplicationSourceRepository(in_memory_database).get_offset("in-memory") == 2
+    metrics = registry.render()
+    assert 'kea_replication_applied_changes_total{replica="in-memory"} 2' in metrics
+    assert 'kea_replication_pending_changes{replica="in-memory"} 0' in metrics
+    assert 'kea_replication_offset{replica="in-memory"} 2' in metrics
+
+
+def test_deleted_customers_are_deleted_with_their_cars_and_purchases(in_memory_database: InMemoryDatabase):
+    replica_database = InMemoryDatabase.from_seed_file()
+    customer_repository = InMemoryCustomerRepository(in_memory_database)
+    customer = customer_repository.get_by_id("0ac1d668-55aa-46a1-898a-8fa61457facb")
+    customer_repository.delete(customer)
+
+    assert create_replicator(in_memory_database, replica_database).replicate_batch() == 1
+
+    assert replica_database.get("customers", customer.id) is None
+    assert replica_database.find("cars", "customers_id", customer.id) == []
+    assert replica_database.all("purchases") == []
+
+
+def test_new_purchases_are_replicated_once_to_the_rollup_even_when_replayed(in_memory_database: InMemoryDatabase):
+    replica_database = InMemoryDatabase.from_seed_file()
+    car = InMemoryCarRepository(in_memory_database).get_by_id(UNPURCHASED_CAR_ID)
+    purchase = InMemoryPurchaseRepository(in_memory_database).create(
+        PurchaseCreateResource(cars_id=UNPURCHASED_CAR_ID, date_of_purchase=date(2024, 11, 4)), car
+    )
+    replicator = create_replicator(in_memory_database, replica_database)
+
+    assert replicator.replicate_batch() == 1
+    replicator.replay_from(0)
+    assert replicator.replicate_batch() == 1
+
+    assert replica_database.get("purchases", purchase.id)["cars_id"] == UNPURCHASED_CAR_ID
+    assert [rollup["units"] for rollup in replica_database.all("sales_daily_rollups")] == \
+           [rollup["units"] for rollup in in_memory_database.all("sales_daily_rollups")]
+
+
+def test_expired_cars_are_deleted_from_the_replica(in_memory_database: InMemoryDatabase):
+    replica_database = InMemoryDatabase.from_seed_file()
+    InMemoryCarExpiryRepository(in_memory_database).delete_expired_cars([EXPIRED_CAR_ID], date(2024, 12, 8))
+
+    assert create_replicator(in_memory_database, replica_database).replicate_batch() == 1
+
+    assert replica_database.get("cars", EXPIRED_CAR_ID) is None
+
+
+def test_gaps_in_the_change_ids_are_waited_for_until_they_settle(in_memory_database: InMemoryDatabase):
+    replica_database = InMemoryDatabase.from_seed_file()
+    customer_repository = InMemoryCustomerRepository(in_memory_database)
+    customer_repository.create(CustomerCreateResource(**CUSTOMER_DATA))
+    customer_repository.create(CustomerCreateResource(**{**CUSTOMER_DATA, "email": "gap@gmail.com"}))
+    customer_repository.create(CustomerCreateResource(**{**CUSTOMER_DATA, "email": "after-gap@gmail.com"}))
+    # The second change event is in a transaction that has not committed yet
+    in_memory_database.delete("change_events", 2)
+
+    assert create_replicator(in_memory_database, replica_database).replicate_batch() == 1
+    later = lambda: get_changed_at() + timedelta(seconds=60)
+    assert create_replicator(in_memory_database, replica_database, now=later).replicate_batch() == 1
+    assert InMemoryReplicationSourceRepository(in_memory_database).get_offset("in-memory") == 3
+
+
+def test_passed_gaps_are_applied_when_their_transaction_commits_later(in_memory_database: InMemoryDatabase):
+    replica_database = InMemoryDatabase.from_seed_file()
+    customer_repository = InMemoryCustomerRepository(in_memory_database)
+    customer_repository.create(CustomerCreateResource(**CUSTOMER_DATA))
+    late_customer = customer_repository.create(CustomerCreateResource(**{**CUSTOMER_DATA, "email": "late@gmail.com"}))
+    customer_repository.create(CustomerCreateResource(**{**CUSTOMER_DATA, "email": "after-late@gmail.com"}))
+    # The second change event is in a transaction that stays open past the settle time
+    late_change = in_memory_database.delete("change_events", 2)
+    in_memory_database.delete("customers", late_customer.id)
+    later = lambda: get_changed_at() + timedelta(seconds=60)
+    replicator = create_replicator(in_memory_database, replica_database, now=later)
+
+    assert replicator.replicate_batch() == 2
+    assert replica_database.get("customers", late_customer.id) is None
+    in_memory_database.insert("customers", {"id": late_customer.id, **late_customer.model_dump(exclude={"id"})})
+    in_memory_database.insert("change_events", late_change)
+    assert replicator.replicate_batch() == 1
+    assert replica_database.get("customers", late_customer.id)["email"] == "late@gmail.com"
+    assert replicator.replicate_batch() == 0
+    assert InMemoryReplicationSourceRepository(in_memory_database).get_offset("in-memory") == 3
+
+
+def test_prune_only_deletes_old_changes_applied_by_every_replica(in_memory_database: InMemoryDatabase):
+    replica_database = InMemoryDatabase.from_seed_file()
+    InMemoryCustomerRepository(in_memory_database).create(CustomerCreateResource(**CUSTOMER_DATA))
+    source = InMemoryReplicationSourceRepository(in_memory_database)
+    next_week = lambda: get_changed_at() + timedelta(days=8)
+    replicator = create_replicator(in_memory_database, replica_database, now=next_week, replica_name="mongodb")
+    replicator.replicate_batch()
+    source.save_offset("neo4j", 1)
+    source.save_offset("lagging-replica", 0)
+
+    assert replicator.prune() == 0
+    source.save_offset("lagging-replica", 1)
+    assert create_replicator(in_memory_database, replica_database, replica_name="mongodb").prune() == 0
+    assert replicator.prune() == 1
+    assert in_memory_database.all("change_events") == []
+
+
+def test_prune_waits_for_the_replicas_that_never_ran(in_memory_database: InMemoryDatabase):
+    mongodb_database, neo4j_database = InMemoryDatabase.from_seed_file(), InMemoryDatabase.from_seed_file()
+    customer = InMemoryCustomerRepository(in_memory_database).create(CustomerCreateResource(**CUSTOMER_DATA))
+    next_week = lambda: get_changed_at() + timedelta(days=8)
+    mongodb_replicator = create_replicator(in_memory_database, mongodb_database, now=next_week, replica_name="mongodb")
+    neo4j_replicator = create_replicator(in_memory_database, neo4j_database, now=next_week, replica_name="neo4j")
+
+    # Only the MongoDB replicator has run, so the Neo4j replica has no offset yet
+    assert mongodb_replicator.replicate_batch() == 1
+    assert mongodb_replicator.prune() == 0
+    assert neo4j_replicator.replicate_batch() == 1
+    assert neo4j_database.get("customers", customer.id)["email"] == CUSTOMER_DATA["email"]
+    assert neo4j_replicator.prune() == 1
+
+
+def test_replicate_batch_without_changes(in_memory_database: InMemoryDatabase):
+    registry = MetricsRegistry()
+
+    assert create_replicator(in_memory_database, InMemoryDatabase.from_seed_file(), registry).replicate_batch() == 0
+    assert 'kea_replication_lag_seconds{replica="in-memory"} 0' in registry.render()
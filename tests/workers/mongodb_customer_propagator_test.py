@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateMany
+from app.core.metrics import MetricsRegistry
+from app.workers.mongodb_customer_propagator import CustomerOutboxPropagator
+
+
+class FakeCursor(list):
+    def sort(self, key: str, direction: int):
+        return FakeCursor(sorted(self, key=lambda document: document[key], reverse=direction < 0))
+
+    def limit(self, amount: int):
+        return FakeCursor(self[:amount])
+
+
+def matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if isinstance(condition, dict) and "$in" in condition:
+            if document.get(key) not in condition["$in"]:
+                return False
+        elif document.get(key) != condition:
+            return False
+    return True
+
+
+class FakeCollection:
+    def __init__(self, documents=None):
+        self.documents = documents or []
+        self.bulk_writes = []
+
+    def find(self, query: dict, projection=None):
+        return FakeCursor(document for document in self.documents if matches(document, query))
+
+    def find_one(self, query: dict, sort=None):
+        documents = self.find(query)
+        if sort:
+            documents = documents.sort(*sort[0])
+        return documents[0] if documents else None
+
+    def count_documents(self, query: dict) -> int:
+        return len(self.find(query))
+
+    def update_many(self, query: dict, update: dict):
+        for document in self.find(query):
+            document.update(update["$set"])
+
+    def bulk_write(self, operations, ordered=True):
+        self.bulk_writes.append((operations, ordered))
+
+
+class FakeDatabase:
+    def __init__(self, **collections):
+        self.collections = collections
+
+    def get_collection(self, name: str) -> FakeCollection:
+        return self.collections.setdefault(name, FakeCollection())
+
+
+def create_outbox_entry(entry_id: str, customer_id: str, seconds_ago: float) -> dict:
+    return {
+        "_id": entry_id,
+        "customer_id": customer_id,
+        "created_at": datetime.now(timezone.utc) - timedelta(seconds=seconds_ago),
+        "processed_at": None
+    }
+
+
+def test_propagate_batch_writes_each_customer_once_in_bulk():
+    henrik = {"_id": "1", "email": "henrik@gmail.com"}
+    database = FakeDatabase(
+        customers=FakeCollection([henrik]),
+        customer_outbox=FakeCollection([
+            create_outbox_entry("a", "1", seconds_ago=3),
+            create_outbox_entry("b", "1", seconds_ago=2),
+            create_outbox_entry("c", "deleted-customer", seconds_ago=1),
+        ])
+    )
+    registry = MetricsRegistry()
+
+    assert CustomerOutboxPropagator(database, batch_size=10, registry=registry).propagate_batch() == 3
+
+    [(car_operations, ordered)] = database.get_collection("cars").bulk_writes
+    assert car_operations == [UpdateMany({"customer._id": "1"}, {"$set": {"customer": henrik}})]
+    assert ordered is False
+    [(purchase_operations, _)] = database.get_collection("purchases").bulk_writes
+    assert purchase_operations == [UpdateMany({"car.customer._id": "1"}, {"$set": {"car.customer": henrik}})]
+    assert all(entry["processed_at"] is not None for entry in database.get_collection("customer_outbox").documents)
+    rendered_metrics = registry.render()
+    assert "kea_mongodb_customer_outbox_propagated_total 3" in rendered_metrics
+    assert "kea_mongodb_customer_outbox_pending 0" in rendered_metrics
+
+
+def test_propagate_batch_processes_the_oldest_changes_first_and_reports_the_lag():
+    database = FakeDatabase(
+        customers=FakeCollection([{"_id": "1"}, {"_id": "2"}]),
+        customer_outbox=FakeCollection([
+            create_outbox_entry("new", "2", seconds_ago=5),
+            create_outbox_entry("old", "1", seconds_ago=60),
+        ])
+    )
+    registry = MetricsRegistry()
+
+    assert CustomerOutboxPropagator(database, batch_size=1, registry=registry).propagate_batch() == 1
+
+    outbox = {entry["_id"]: entry for entry in database.get_collection("customer_outbox").documents}
+    assert outbox["old"]["processed_at"] is not None
+    assert outbox["new"]["processed_at"] is None
+    rendered_metrics = registry.render()
+    assert "kea_mongodb_customer_outbox_pending 1" in rendered_metrics
+    lag_seconds = float(rendered_metrics.split("kea_mongodb_customer_outbox_lag_seconds ")[-1].split()[0])
+    assert 4 < lag_seconds < 60
+
+
+def test_propagate_batch_with_empty_outbox():
+    database = FakeDatabase()
+    assert CustomerOutboxPropagator(database, registry=MetricsRegistry()).propagate_batch() == 0
+    assert database.get_collection("cars").bulk_writes == []
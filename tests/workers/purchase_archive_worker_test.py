@@ -0,0 +1,62 @@
+from datetime import date
+from db import InMemoryDatabase
+from app.core.metrics import MetricsRegistry
+from app.workers.purchase_archive_worker import PurchaseArchiveWorker
+from app.repositories.archive_repositories import InMemoryArchiveRepository
+
+PURCHASE_ID = "bdfca7c4-e0ad-4618-8766-9bb355371c81"
+PURCHASED_CAR_ID = "d4c7f1f8-4451-43bc-a827-63216a2ddece"
+CUSTOMER_ID = "0ac1d668-55aa-46a1-898a-8fa61457facb"
+
+
+def create_worker(database: InMemoryDatabase, registry: MetricsRegistry, today: date) -> PurchaseArchiveWorker:
+    return PurchaseArchiveWorker(
+        InMemoryArchiveRepository(database), "in-memory",
+        archive_after_days=365, batch_size=1, pause_seconds=0, registry=registry,
+        today=lambda: today, sleep=lambda seconds: None
+    )
+
+
+def test_purchases_younger_than_the_archive_age_are_kept(in_memory_database: InMemoryDatabase):
+    assert create_worker(in_memory_database, MetricsRegistry(), today=date(2025, 11, 4)).run_pass() == 0
+
+    assert in_memory_database.get("purchases", PURCHASE_ID) is not None
+    assert in_memory_database.get("cars", PURCHASED_CAR_ID) is not None
+
+
+def test_run_pass_moves_the_old_purchases_and_their_cars_to_the_archive(in_memory_database: InMemoryDatabase):
+    registry = MetricsRegistry()
+
+    assert create_worker(in_memory_database, registry, today=date(2025, 11, 5)).run_pass() == 1
+
+    assert in_memory_database.get("purchases", PURCHASE_ID) is None
+    assert in_memory_database.get("cars", PURCHASED_CAR_ID) is None
+    archived_purchases = InMemoryArchiveRepository(in_memory_database).get_archived_purchases()
+    assert [purchase.id for purchase in archived_purchases] == [PURCHASE_ID]
+    assert archived_purchases[0].archive_month == "2024-11"
+    assert archived_purchases[0].date_of_purchase == date(2024, 11, 4)
+    assert archived_purchases[0].car.id == PURCHASED_CAR_ID
+    metrics = registry.render()
+    assert 'kea_purchase_archive_archived_purchases_total{backend="in-memory"} 1' in metrics
+    assert 'kea_purchase_archive_batches_total{backend="in-memory"} 1' in metrics
+    assert "kea_purchase_archive_last_pass_timestamp_seconds" in metrics
+
+
+def test_archived_purchases_are_filtered_by_month_and_customer(in_memory_database: InMemoryDatabase):
+    create_worker(in_memory_database, MetricsRegistry(), today=date(2025, 11, 5)).run_pass()
+    repository = InMemoryArchiveRepository(in_memory_database)
+
+    assert len(repository.get_archived_purchases(month=date(2024, 11, 1))) == 1
+    assert repository.get_archived_purchases(month=date(2024, 12, 1)) == []
+    assert len(repository.get_archived_purchases(customer_id=CUSTOMER_ID)) == 1
+    assert repository.get_archived_purchases(customer_id="bbbb06bc-268d-4f88-8b8e-3da4df118328") == []
+    assert repository.get_archived_purchases(limit=0) == []
+    assert repository.get_archived_purchases(offset=1) == []
+
+
+def test_a_second_pass_has_nothing_to_archive(in_memory_database: InMemoryDatabase):
+    worker = create_worker(in_memory_database, MetricsRegistry(), today=date(2025, 11, 5))
+
+    assert worker.run_pass() == 1
+    assert worker.run_pass() == 0
+    assert len(InMemoryArchiveRepository(in_memory_database).get_archived_purchases()) == 1